@@ -0,0 +1,109 @@
+# Event index for BVB achievements.
+# Locked achievements are bucketed by the (type, key) pair an event can
+# satisfy, e.g. ('score', None), ('counter', 'power_red'), ('collect',
+# 'purple_egg'), ('special', 'synergy_pair'), and each bucket is a deque
+# sorted by how far the achievement is from its goal. An event then only
+# looks at the front of its bucket: threshold events pop entries while the
+# value reached their goal, counter events bump the progress of the bucket's
+# (few) members and pop the ones that got there. Unlocked achievements leave
+# the index, so a bucket whose achievements are all done costs a dict lookup.
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+# Field that selects the bucket within an achievement type
+BUCKET_FIELDS = {
+    'counter': 'key',
+    'collect': 'loot',
+    'special': 'event',
+    'area': 'key',
+    'color_count': 'key',
+}
+
+
+def bucket_of(a: Dict) -> Tuple:
+    kind = a.get('type')
+    field = BUCKET_FIELDS.get(kind)
+    return (kind, a.get(field) if field else None)
+
+
+class AchievementIndex:
+    def __init__(self, achievements: Dict):
+        self.rebuild(achievements)
+
+    def rebuild(self, achievements: Dict):
+        """Index the locked entries of `achievements` (which is kept, not copied)."""
+        self.source = achievements
+        self.order: Dict[str, int] = {}
+        self.bucket: Dict[str, Tuple] = {}
+        buckets: Dict[Tuple, List] = {}
+        for n, (aid, a) in enumerate(achievements.items()):
+            self.order[aid] = n
+            if a.get('unlocked'):
+                continue
+            b = bucket_of(a)
+            self.bucket[aid] = b
+            buckets.setdefault(b, []).append(aid)
+        self._buckets: Dict[Tuple, deque] = {}
+        for b, aids in buckets.items():
+            aids.sort(key=lambda aid: (self._remaining(aid), self.order[aid]))
+            self._buckets[b] = deque(aids)
+
+    def _remaining(self, aid: str):
+        a = self.source[aid]
+        return a.get('goal', 0) - a.get('progress', 0)
+
+    def candidates(self, bucket: Tuple) -> Iterable[str]:
+        return self._buckets.get(bucket, ())
+
+    def reached(self, bucket: Tuple, value) -> List[str]:
+        """Pop the achievements of `bucket` whose goal is <= value."""
+        q = self._buckets.get(bucket)
+        due = []
+        while q and value >= self.source[q[0]].get('goal', 0):
+            due.append(self._pop(q))
+        return due
+
+    def advance(self, bucket: Tuple, step: int = 1) -> List[str]:
+        """Add `step` to the progress of every locked member; pop those that reached their goal."""
+        q = self._buckets.get(bucket)
+        if not q:
+            return []
+        src = self.source
+        for aid in q:
+            a = src[aid]
+            a['progress'] = a.get('progress', 0) + step
+        due = []
+        while q and src[q[0]]['progress'] >= src[q[0]].get('goal', 0):
+            due.append(self._pop(q))
+        return due
+
+    def take(self, bucket: Tuple) -> List[str]:
+        """Pop every locked achievement of `bucket` (goal-less types: collect, special)."""
+        q = self._buckets.get(bucket)
+        due = []
+        while q:
+            due.append(self._pop(q))
+        return due
+
+    def discard(self, aid: str):
+        """Drop an achievement that was unlocked outside of an index query."""
+        b = self.bucket.pop(aid, None)
+        if b is None:
+            return
+        q = self._buckets.get(b)
+        try:
+            q.remove(aid)
+        except (AttributeError, ValueError):
+            pass
+
+    def _pop(self, q: deque) -> str:
+        aid = q.popleft()
+        self.bucket.pop(aid, None)
+        return aid
+
+    def sort_unlocks(self, aids: List[str]) -> List[str]:
+        """Order achievements the way they are defined (notification order)."""
+        return sorted(aids, key=lambda aid: self.order.get(aid, 0))
+
+    def __len__(self) -> int:
+        return len(self.bucket)
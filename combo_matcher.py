@@ -0,0 +1,84 @@
+# Streaming combo matcher for BVB.
+# A combo is an ordered list of steps (an action name, optionally restricted
+# to some colours and to a lane distance from the previous step) that has to
+# happen within `window` frames; other actions may occur in between. Each
+# pattern keeps, per number of steps matched so far and per lane of the last
+# matched step, the most recent frame a partial match started at: the latest
+# start is always the one with the most time left, so that is all a pattern
+# has to remember. Feeding an action touches every pattern once and each of
+# its steps once, independent of how many actions are in the window.
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+
+class Step(NamedTuple):
+    action: str
+    colors: Optional[FrozenSet] = None   # accepted colour values (None: any colour)
+    lane_delta: Optional[int] = None     # required |lane - lane of the previous step|
+
+    def matches(self, action, color) -> bool:
+        if action != self.action:
+            return False
+        # actions without a colour match any colour restriction
+        return self.colors is None or color is None or color in self.colors
+
+
+class ComboPattern:
+    def __init__(self, event: str, steps: Iterable[Step], window: int, cooldown: Optional[int] = None):
+        self.event = event
+        self.steps = tuple(steps)
+        if not self.steps:
+            raise ValueError(f'combo {event!r} has no steps')
+        self.window = int(window)
+        self.cooldown = self.window if cooldown is None else int(cooldown)
+        self.reset()
+
+    def reset(self):
+        # _partials[k]: lane of the (k+1)-th matched step -> latest start frame
+        self._partials: List[Dict[int, int]] = [dict() for _ in self.steps[:-1]]
+
+    def feed(self, action, frame: int, lane=None, color=None) -> bool:
+        """Advance the pattern by one action; True when it completes the combo."""
+        lane = lane or 0
+        steps = self.steps
+        last = len(steps) - 1
+        # walk from the last step down so one action advances a partial match at most once
+        for k in range(last, 0, -1):
+            step = steps[k]
+            if not step.matches(action, color):
+                continue
+            prev = self._partials[k - 1]
+            best = None
+            for plane, start in list(prev.items()):
+                if frame - start > self.window:
+                    del prev[plane]
+                    continue
+                if step.lane_delta is not None and abs(lane - plane) != step.lane_delta:
+                    continue
+                if best is None or start > best:
+                    best = start
+            if best is None:
+                continue
+            if k == last:
+                self.reset()
+                return True
+            nxt = self._partials[k]
+            if nxt.get(lane, best - 1) < best:
+                nxt[lane] = best
+        if steps[0].matches(action, color):
+            if last == 0:
+                return True
+            self._partials[0][lane] = frame
+        return False
+
+
+class ComboMatcher:
+    def __init__(self, patterns: Iterable[ComboPattern] = ()):
+        self.patterns = list(patterns)
+
+    def reset(self):
+        for p in self.patterns:
+            p.reset()
+
+    def feed(self, action, frame: int, lane=None, color=None) -> List[ComboPattern]:
+        """Feed one action to every pattern; returns the patterns it completed."""
+        return [p for p in self.patterns if p.feed(action, frame, lane, color)]
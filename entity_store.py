@@ -0,0 +1,104 @@
+# Entity storage for BVB (bats, obstacles, loot/crumbs, projectiles).
+# Entities live in an insertion-ordered slot list. remove() does not shift the
+# list: it looks the entity's slot up in a dict and leaves a tombstone (None)
+# there, so it is O(1) and iterating while removing is safe without copying
+# the list first. compact() drops the tombstones in one pass; the game calls it
+# once at the end of every frame, after which the order of the survivors is
+# exactly what repeated list.remove() calls would have left.
+# Every entity also gets an integer handle when it is added. Handles are never
+# reused, so get(handle) returns None once the entity is gone (instead of some
+# newer entity), which makes them safe to keep in side tables and queues.
+# Iteration only visits entities that were present when it started; ones added
+# meanwhile are seen by the next iteration. Records compare by identity, so
+# the same object can only be stored once.
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class EntityStore:
+    def __init__(self, items: Iterable = ()):
+        self._slots: List[Any] = []
+        self._slot: Dict[Any, int] = {}
+        self._handle: Dict[Any, int] = {}
+        self._by_handle: Dict[int, Any] = {}
+        self._dead = 0
+        self._next = 1
+        for ent in items:
+            self.add(ent)
+
+    def add(self, ent) -> int:
+        """Append `ent`; returns its handle (the existing one if it is already stored)."""
+        h = self._handle.get(ent)
+        if h is not None:
+            return h
+        h = self._next
+        self._next += 1
+        self._slot[ent] = len(self._slots)
+        self._slots.append(ent)
+        self._handle[ent] = h
+        self._by_handle[h] = ent
+        return h
+
+    def remove(self, ent):
+        """Tombstone `ent` (ValueError if it is not stored, like list.remove)."""
+        if not self.discard(ent):
+            raise ValueError('entity not in store')
+
+    def discard(self, ent) -> bool:
+        """Tombstone `ent` if stored; True when it was."""
+        i = self._slot.pop(ent, None)
+        if i is None:
+            return False
+        self._slots[i] = None
+        del self._by_handle[self._handle.pop(ent)]
+        self._dead += 1
+        return True
+
+    def get(self, handle: int):
+        """The entity with this handle, or None once it has been removed."""
+        return self._by_handle.get(handle)
+
+    def handle(self, ent) -> Optional[int]:
+        return self._handle.get(ent)
+
+    def compact(self) -> int:
+        """Drop the tombstones left by remove(); returns how many there were."""
+        dead = self._dead
+        if dead:
+            # a fresh list, so an iteration in progress keeps its own view
+            self._slots = [e for e in self._slots if e is not None]
+            self._slot = {e: i for i, e in enumerate(self._slots)}
+            self._dead = 0
+        return dead
+
+    def clear(self):
+        self._slots = []
+        self._slot.clear()
+        self._handle.clear()
+        self._by_handle.clear()
+        self._dead = 0
+
+    @property
+    def tombstones(self) -> int:
+        return self._dead
+
+    @property
+    def issued(self) -> int:
+        """Number of handles handed out so far (changes on every add)."""
+        return self._next - 1
+
+    def __len__(self) -> int:
+        return len(self._slots) - self._dead
+
+    def __contains__(self, ent) -> bool:
+        return ent in self._slot
+
+    def __iter__(self) -> Iterator:
+        slots = self._slots
+        for i in range(len(slots)):
+            ent = slots[i]
+            if ent is not None:
+                yield ent
+
+    def __repr__(self) -> str:
+        # same text as the plain list it replaces (part of the state digest)
+        return repr(list(self))
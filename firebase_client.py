@@ -2,24 +2,82 @@
 # No triple-quoted module docstring to avoid parser issues.
 from typing import Optional, Dict, Any
 import os
+import queue
+import threading
 import time
 import uuid
 
+try:
+    from outbox import Outbox
+except Exception:
+    Outbox = None
+
 # module state
 _app = None
 _db = None
 _user_id: Optional[str] = None
 _service_account_path: Optional[str] = None
+_outbox = None
+_outbox_failed = False
 
 # Hard-coded Firebase project/app name as requested
 DEFAULT_PROJECT = 'birds-vs-bats'
 DEFAULT_DB = 'birds-vs-bats'
 
+# Telemetry dispatcher tuning (see _Dispatcher)
+QUEUE_MAX = 512          # bounded queue; beyond this new items are dropped
+BATCH_MAX = 100          # writes per Firestore batch (Firestore allows 500)
+BATCH_INTERVAL = 1.0     # seconds a write may wait for others to share its batch
+SAMPLE_HIGH_WATER = 0.75  # queue fill ratio above which droppable events are sampled
+SAMPLE_EVERY = 4         # ... keeping one in SAMPLE_EVERY
+QUEUE_RESERVED = 64      # last slots kept for scores, unlocks and other non-droppable items
+CLOSE_TIMEOUT = 2.0      # flush deadline used by close()
+
 
 def _id_file() -> str:
     return os.path.join(os.path.dirname(__file__), 'firebase_user_id.txt')
 
 
+def _outbox_file() -> str:
+    return os.path.join(os.path.dirname(__file__), 'firebase_outbox.sqlite3')
+
+
+def _get_outbox():
+    # Opened lazily on first use, whether or not firebase-admin is set up, so
+    # offline sessions (no SDK, no credentials) keep their writes until a
+    # later launch can upload them; if the local store cannot be used writes
+    # go straight to Firestore as before.
+    global _outbox, _outbox_failed
+    if _outbox is None and not _outbox_failed and Outbox is not None:
+        try:
+            _outbox = Outbox(_outbox_file())
+        except Exception:
+            _outbox_failed = True
+    return _outbox
+
+
+def _write_now(collection: str, payload: Dict[str, Any]) -> Optional[str]:
+    # Store the write in the outbox, then try it right away. Returns the
+    # document id on success; on failure the entry stays queued for the drainer.
+    ob = _get_outbox()
+    key = None
+    if ob is not None:
+        try:
+            key = ob.append('write', collection, payload)
+        except Exception:
+            key = None
+    if _db is None:
+        return None
+    try:
+        doc_ref = _db.collection(collection).document(key) if key else _db.collection(collection).document()
+        doc_ref.set(payload)
+        if key:
+            ob.ack([key])
+        return doc_ref.id
+    except Exception:
+        return None
+
+
 def get_or_create_local_user_id() -> str:
     global _user_id
     if _user_id:
@@ -95,6 +153,9 @@ def init_from_env(service_account_path: Optional[str] = None) -> bool:
         _service_account_path = found
         # ensure stable local id
         get_or_create_local_user_id()
+        # upload whatever earlier (offline) sessions left in the outbox
+        if _db is not None and _get_outbox() is not None:
+            _dispatcher.wake()
         return True
     except Exception:
         # best-effort: don't crash importers; leave _db possibly None
@@ -151,47 +212,48 @@ def sign_in_anonymous():
 
 
 def send_score(name: str, score: int, time_played_seconds: Optional[int] = None, time_played: Optional[str] = None, version: Optional[str] = None, avg_ppm: Optional[float] = None) -> Optional[Dict[str, Any]]:
-    global _db
-    if _db is None:
-        # best-effort: do nothing if Firestore client not available
-        return None
     try:
         # Create a new leaderboard document for every submission (append mode).
         # We still store a stable local user id in the payload so entries can be
         # grouped or filtered by user, but we do NOT upsert by uid anymore.
-        uid = get_or_create_local_user_id()
-        doc_ref = _db.collection('leaderboard').document()
-        payload = {'name': name, 'score': int(score), 'userId': uid, 'ts': int(time.time())}
-        # Attach optional play time information if provided
-        try:
-            if time_played_seconds is not None:
-                payload['time_played_seconds'] = int(time_played_seconds)
-        except Exception:
-            pass
-        try:
-            if time_played is not None:
-                payload['time_played'] = str(time_played)
-        except Exception:
-            pass
-        # Optional version and average points-per-minute
-        try:
-            if version is not None:
-                payload['version'] = str(version)
-        except Exception:
-            pass
-        try:
-            if avg_ppm is not None:
-                # store as float (rounded to 3 decimals to save space)
-                payload['avg_ppm'] = float(round(float(avg_ppm), 3))
-        except Exception:
-            pass
-        # set() with the uid as document id performs an upsert (create or replace)
-        doc_ref.set(payload)
-        return {'id': doc_ref.id, **payload}
+        payload = _score_payload(name, score, time_played_seconds, time_played, version, avg_ppm)
+        doc_id = _write_now('leaderboard', payload)
+        if doc_id is None:
+            return None
+        return {'id': doc_id, **payload}
     except Exception:
         return None
 
 
+def _score_payload(name, score, time_played_seconds=None, time_played=None, version=None, avg_ppm=None) -> Dict[str, Any]:
+    uid = get_or_create_local_user_id()
+    payload = {'name': name, 'score': int(score), 'userId': uid, 'ts': int(time.time())}
+    # Attach optional play time information if provided
+    try:
+        if time_played_seconds is not None:
+            payload['time_played_seconds'] = int(time_played_seconds)
+    except Exception:
+        pass
+    try:
+        if time_played is not None:
+            payload['time_played'] = str(time_played)
+    except Exception:
+        pass
+    # Optional version and average points-per-minute
+    try:
+        if version is not None:
+            payload['version'] = str(version)
+    except Exception:
+        pass
+    try:
+        if avg_ppm is not None:
+            # store as float (rounded to 3 decimals to save space)
+            payload['avg_ppm'] = float(round(float(avg_ppm), 3))
+    except Exception:
+        pass
+    return payload
+
+
 def get_leaderboard(limit: int = 10):
     global _db
     if _db is None:
@@ -215,48 +277,65 @@ def get_leaderboard(limit: int = 10):
 
 
 def unlock_achievement(achievement_id: str) -> bool:
-    global _db
+    # Returns True only if this call recorded the unlock remotely. The unlock
+    # is kept in the outbox (one entry per achievement) until it is uploaded.
+    payload = {'unlocked': True, 'ts': int(time.time())}
+    ob = _get_outbox()
+    key = None
+    if ob is not None:
+        try:
+            key = ob.append('unlock', achievement_id, payload, key='unlock:' + achievement_id)
+        except Exception:
+            key = None
     if _db is None:
         return False
     try:
-        uid = get_or_create_local_user_id()
-        doc_ref = _db.collection('users').document(uid).collection('achievements').document(achievement_id)
-        # Try to create the doc atomically: create() will succeed only if the
-        # document does not exist. This avoids a race where two clients both
-        # read 'missing' and then both write.
-        payload = {'unlocked': True, 'ts': int(time.time())}
+        created = _write_achievement(achievement_id, payload)
+    except Exception:
+        return False
+    if key:
         try:
-            # create() raises AlreadyExists if the document is present
-            doc_ref.create(payload)
-            return True
-        except Exception as e:
-            # If the error is an AlreadyExists from the API, treat as already unlocked
-            try:
-                from google.api_core.exceptions import AlreadyExists
-                if isinstance(e, AlreadyExists):
-                    return False
-            except Exception:
-                # If we can't import the exception type, fall through to checks
-                pass
+            ob.ack([key])
+        except Exception:
+            pass
+    return created
 
-            # Fallback: attempt a read; if unlocked, skip writing. Otherwise try set.
-            try:
-                existing = doc_ref.get()
-                if existing.exists:
-                    data = existing.to_dict() or {}
-                    if data.get('unlocked'):
-                        return False
-            except Exception:
-                # read failed (offline/permissions) — we'll attempt the write as a best-effort
-                pass
 
-            try:
-                doc_ref.set(payload)
-                return True
-            except Exception:
+def _write_achievement(achievement_id: str, payload: Dict[str, Any]) -> bool:
+    # True if the document was created, False if it was already unlocked;
+    # raises if the unlock could not be recorded (offline, permissions).
+    uid = get_or_create_local_user_id()
+    doc_ref = _db.collection('users').document(uid).collection('achievements').document(achievement_id)
+    # Try to create the doc atomically: create() will succeed only if the
+    # document does not exist. This avoids a race where two clients both
+    # read 'missing' and then both write.
+    try:
+        # create() raises AlreadyExists if the document is present
+        doc_ref.create(payload)
+        return True
+    except Exception as e:
+        # If the error is an AlreadyExists from the API, treat as already unlocked
+        try:
+            from google.api_core.exceptions import AlreadyExists
+            if isinstance(e, AlreadyExists):
                 return False
-    except Exception:
-        return False
+        except Exception:
+            # If we can't import the exception type, fall through to checks
+            pass
+
+        # Fallback: attempt a read; if unlocked, skip writing. Otherwise try set.
+        try:
+            existing = doc_ref.get()
+            if existing.exists:
+                data = existing.to_dict() or {}
+                if data.get('unlocked'):
+                    return False
+        except Exception:
+            # read failed (offline/permissions) — we'll attempt the write as a best-effort
+            pass
+
+        doc_ref.set(payload)
+        return True
 
 
 def sync_achievements(achievements: Dict[str, Any]):
@@ -272,26 +351,285 @@ def sync_achievements(achievements: Dict[str, Any]):
 
 
 def log_event(name: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-    global _db
-    if _db is None:
-        return None
     try:
-        payload = {'name': name, 'params': params or {}, 'ts': int(time.time()), 'userId': get_or_create_local_user_id()}
-        doc_ref = _db.collection('events').document()
-        doc_ref.set(payload)
-        return {'id': doc_ref.id, **payload}
+        payload = _event_payload(name, params)
+        doc_id = _write_now('events', payload)
+        if doc_id is None:
+            return None
+        return {'id': doc_id, **payload}
     except Exception:
         return None
 
 
+def _event_payload(name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {'name': name, 'params': params or {}, 'ts': int(time.time()), 'userId': get_or_create_local_user_id()}
+
+
 def report_crash(stack_text: str) -> None:
-    global _db
     try:
-        if _db is None:
-            return
         payload = {'stack': stack_text, 'ts': int(time.time()), 'userId': get_or_create_local_user_id()}
-        doc_ref = _db.collection('crashes').document()
-        doc_ref.set(payload)
+        _write_now('crashes', payload)
     except Exception:
         return
 
+
+
+# ---------------------------------------------------------------------------
+# Telemetry dispatcher: one worker thread drains a bounded queue. Plain
+# document writes (events, scores) are grouped, committed to the local
+# outbox and uploaded as Firestore batched writes when BATCH_MAX writes are
+# pending or the oldest has waited BATCH_INTERVAL seconds; the same worker
+# retries the outbox backlog with backoff. Other calls (achievement unlocks,
+# sign-in) run on the worker in order. Under backpressure droppable events
+# are sampled and, with the queue full, new items are dropped and counted.
+# ---------------------------------------------------------------------------
+class _Dispatcher:
+    def __init__(self):
+        self._q: 'queue.Queue' = queue.Queue(QUEUE_MAX)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._flushing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._sample_n = 0
+        self.stats = {'queued': 0, 'persisted': 0, 'written': 0, 'batches': 0, 'calls': 0,
+                      'failed': 0, 'dropped': 0, 'sampled_out': 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='bvb-telemetry', daemon=True)
+            self._thread.start()
+
+    def submit(self, item, droppable: bool = False) -> bool:
+        if self._closed:
+            self._count('dropped')
+            return False
+        if droppable and self._q.qsize() >= QUEUE_MAX - QUEUE_RESERVED:
+            self._count('dropped')
+            return False
+        if droppable and self._q.qsize() >= QUEUE_MAX * SAMPLE_HIGH_WATER:
+            self._sample_n += 1
+            if self._sample_n % SAMPLE_EVERY:
+                self._count('sampled_out')
+                return False
+        with self._lock:
+            self._pending += 1
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            self._done(1)
+            self._count('dropped')
+            return False
+        self._count('queued')
+        self._start()
+        return True
+
+    def _done(self, n):
+        with self._lock:
+            self._pending -= n
+            if self._pending <= 0:
+                self._idle.notify_all()
+
+    def _run(self):
+        writes = []
+        first_ts = 0.0
+        while True:
+            if writes:
+                timeout = 0.0 if self._flushing.is_set() else max(0.0, first_ts + BATCH_INTERVAL - time.monotonic())
+            else:
+                timeout = self._backlog_delay()
+            try:
+                item = self._q.get(timeout=timeout) if timeout != 0.0 else self._q.get_nowait()
+            except queue.Empty:
+                item = None
+            if item is not None:
+                if item[0] == 'write':
+                    if not writes:
+                        first_ts = time.monotonic()
+                    writes.append(item)
+                    if len(writes) < BATCH_MAX:
+                        continue
+                elif item[0] == 'flush':
+                    pass
+                else:
+                    # keep submission order: pending writes go out before the call
+                    self._commit(writes)
+                    writes = []
+                    self._call(item)
+                    continue
+            self._commit(writes)
+            writes = []
+
+    def _commit(self, writes):
+        # Persist the writes to the outbox in one transaction, then upload
+        # whatever is due there (these writes plus any backlog).
+        n = len(writes)
+        try:
+            ob = _get_outbox()
+            if ob is not None:
+                if writes:
+                    try:
+                        ob.append_many([('write', collection, payload) for _, collection, payload in writes])
+                        self._count('persisted', len(writes))
+                        writes = []
+                    except Exception:
+                        ob = None
+                if ob is not None:
+                    self._drain(ob)
+            if not writes:
+                return
+            if _db is None:
+                self._count('dropped', len(writes))
+                return
+            try:
+                batch = _db.batch()
+                for _, collection, payload in writes:
+                    batch.set(_db.collection(collection).document(), payload)
+                batch.commit()
+                self._count('written', len(writes))
+                self._count('batches')
+            except Exception:
+                self._count('failed', len(writes))
+        finally:
+            self._done(n)
+
+    def _drain(self, ob):
+        # Upload due outbox entries in batches; stop at the first failure
+        # (the failed entries are rescheduled with backoff).
+        if _db is None:
+            return
+        try:
+            while True:
+                entries = ob.due(BATCH_MAX)
+                if not entries:
+                    return
+                writes = [e for e in entries if e.kind == 'write']
+                if writes:
+                    keys = [e.key for e in writes]
+                    try:
+                        batch = _db.batch()
+                        for e in writes:
+                            # the idempotency key is the document id
+                            batch.set(_db.collection(e.target).document(e.key), e.payload)
+                        batch.commit()
+                    except Exception:
+                        ob.retry(keys)
+                        self._count('failed', len(keys))
+                        return
+                    ob.ack(keys)
+                    self._count('written', len(keys))
+                    self._count('batches')
+                for e in entries:
+                    if e.kind != 'unlock':
+                        continue
+                    try:
+                        _write_achievement(e.target, e.payload)
+                    except Exception:
+                        ob.retry([e.key])
+                        self._count('failed')
+                        return
+                    ob.ack([e.key])
+                    self._count('written')
+        except Exception:
+            return
+
+    def _backlog_delay(self) -> Optional[float]:
+        # How long the idle worker may block before outbox entries are due.
+        if _db is None or _outbox is None:
+            return None
+        try:
+            nxt = _outbox.next_due()
+        except Exception:
+            return None
+        if nxt is None:
+            return None
+        return max(0.05, nxt - time.time())
+
+    def wake(self):
+        """Start the worker if needed and let it upload the outbox backlog."""
+        if self._closed:
+            return
+        self._start()
+        try:
+            self._q.put_nowait(('flush',))
+        except queue.Full:
+            pass
+
+    def _call(self, item):
+        _, func, a, kw = item
+        try:
+            func(*a, **kw)
+            self._count('calls')
+        except Exception:
+            self._count('failed')
+        finally:
+            self._done(1)
+
+    def flush(self, timeout: float = CLOSE_TIMEOUT) -> bool:
+        """Wait up to `timeout` seconds for everything queued to be written."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        self._flushing.set()
+        try:
+            try:
+                # wake the worker if it is waiting to coalesce a batch
+                self._q.put_nowait(('flush',))
+            except queue.Full:
+                pass
+            with self._lock:
+                while self._pending > 0:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        return False
+                    self._idle.wait(left)
+            return True
+        finally:
+            self._flushing.clear()
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> bool:
+        self._closed = True
+        if self._thread is None:
+            return True
+        return self.flush(timeout)
+
+
+_dispatcher = _Dispatcher()
+
+
+def enqueue_event(name: str, params: Optional[Dict[str, Any]] = None, droppable: bool = True) -> bool:
+    """Queue an analytics event; it is written in a batch by the telemetry worker."""
+    return _dispatcher.submit(('write', 'events', _event_payload(name, params)), droppable)
+
+
+def enqueue_score(name: str, score: int, time_played_seconds: Optional[int] = None, time_played: Optional[str] = None, version: Optional[str] = None, avg_ppm: Optional[float] = None) -> bool:
+    """Queue a leaderboard submission (never sampled out)."""
+    payload = _score_payload(name, score, time_played_seconds, time_played, version, avg_ppm)
+    return _dispatcher.submit(('write', 'leaderboard', payload))
+
+
+def enqueue_call(func, *a, **kw) -> bool:
+    """Run `func(*a, **kw)` on the telemetry worker (errors are counted, not raised)."""
+    return _dispatcher.submit(('call', func, a, kw))
+
+
+def flush(timeout: float = CLOSE_TIMEOUT) -> bool:
+    return _dispatcher.flush(timeout)
+
+
+def close(timeout: float = CLOSE_TIMEOUT) -> bool:
+    """Flush queued telemetry with a deadline and stop accepting new items."""
+    return _dispatcher.close(timeout)
+
+
+def telemetry_stats() -> Dict[str, int]:
+    with _dispatcher._lock:
+        out = dict(_dispatcher.stats)
+    try:
+        out['backlog'] = len(_outbox) if _outbox is not None else 0
+    except Exception:
+        out['backlog'] = 0
+    return out
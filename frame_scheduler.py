@@ -0,0 +1,99 @@
+# Fixed-timestep frame scheduler for the BVB terminal client.
+# Simulation ticks are placed on absolute perf_counter() deadlines, so the
+# time spent on input, simulation and rendering is absorbed by the wait
+# instead of being added to it. When the loop falls behind it runs several
+# simulation ticks back-to-back without rendering (bounded by max_catchup);
+# rendering has its own, independently capped rate.
+import time
+from typing import Callable, Dict
+
+
+class FrameScheduler:
+    def __init__(self, max_catchup: int = 5, max_render_fps: float = 60.0,
+                 clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_catchup = max(1, int(max_catchup))
+        self.render_interval = 1.0 / max_render_fps if max_render_fps and max_render_fps > 0 else 0.0
+        self.clock = clock
+        self._sleep = sleep
+        self.reset()
+
+    def reset(self):
+        now = self.clock()
+        self.next_tick = now
+        self.next_render = now
+        self._batch = 0
+        # counters (see stats())
+        self.ticks = 0
+        self.renders = 0
+        self.missed = 0        # ticks that ran more than one step after their deadline
+        self.dropped = 0       # ticks skipped outright when the catch-up budget ran out
+        self.catchup_ticks = 0  # ticks run without a render in between
+        self.max_lateness = 0.0
+
+    # ---- simulation ----
+    def begin(self):
+        """Start a loop iteration (resets the per-iteration catch-up budget)."""
+        self._batch = 0
+
+    def step_due(self, step_seconds: float) -> bool:
+        """True if a simulation tick should run now.
+
+        Once max_catchup ticks ran in this iteration and the loop is still
+        behind, the backlog is dropped and the deadline re-anchored to now.
+        """
+        now = self.clock()
+        if now < self.next_tick:
+            return False
+        if self._batch >= self.max_catchup:
+            step = max(1e-6, float(step_seconds))
+            behind = int((now - self.next_tick) / step) + 1
+            self.dropped += behind
+            self.next_tick = now + step
+            return False
+        return True
+
+    def advance(self, step_seconds: float):
+        """Record that one tick ran and move its deadline by `step_seconds`."""
+        now = self.clock()
+        step = max(0.0, float(step_seconds))
+        lateness = now - self.next_tick
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        if step > 0 and lateness > step:
+            self.missed += 1
+        if self._batch > 0:
+            self.catchup_ticks += 1
+        self._batch += 1
+        self.ticks += 1
+        self.next_tick += step
+
+    # ---- rendering ----
+    def render_due(self) -> bool:
+        return self.clock() >= self.next_render
+
+    def rendered(self):
+        now = self.clock()
+        self.renders += 1
+        # never schedule renders in the past: a slow frame must not cause a burst
+        self.next_render = max(self.next_render + self.render_interval, now)
+
+    # ---- waiting ----
+    def wait(self, render_pending: bool = False, max_wait: float = 0.05):
+        """Sleep until the next tick (or the next allowed render if one is pending)."""
+        target = self.next_tick
+        if render_pending and self.next_render < target:
+            target = self.next_render
+        delay = min(target - self.clock(), max_wait)
+        if delay > 0:
+            self._sleep(delay)
+
+    def stats(self) -> Dict:
+        return {
+            'ticks': self.ticks,
+            'renders': self.renders,
+            'missed_deadlines': self.missed,
+            'dropped_ticks': self.dropped,
+            'catchup_ticks': self.catchup_ticks,
+            'max_lateness_ms': round(self.max_lateness * 1000.0, 2),
+        }
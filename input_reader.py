@@ -0,0 +1,225 @@
+# Keyboard input for the BVB terminal client.
+# A reader thread waits on the terminal fd with `selectors`, decodes the bytes
+# into key names (LEFT, RIGHT, UP, DOWN, SPACE, QUIT or the typed character)
+# and queues them as timestamped KeyEvents; the main loop drains the queue
+# once per pass and hands every key, in order, to the next simulation tick.
+# The decoder keeps incomplete escape sequences (and split UTF-8 characters)
+# between reads, so an arrow key split across two reads is still one key; a
+# lone ESC that is not followed by anything within ESC_TIMEOUT is dropped.
+# Where the fd cannot be watched (Windows console) PollingReader drains a
+# get_key()-style function instead.
+# LatencyStats collects the time from a key's arrival to the first frame
+# written after the tick that consumed it.
+import codecs
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import selectors
+except Exception:
+    selectors = None
+
+from profiler import RollingHistogram
+
+# Seconds an unfinished escape sequence may wait for the rest of its bytes
+ESC_TIMEOUT = 0.05
+# Longest escape sequence kept while waiting (anything longer is garbage)
+_MAX_PENDING = 32
+
+# Final byte of CSI (ESC [ ... X) / SS3 (ESC O X) cursor key sequences
+_ARROWS = {'A': 'UP', 'B': 'DOWN', 'C': 'RIGHT', 'D': 'LEFT'}
+
+
+class KeyEvent(NamedTuple):
+    key: str
+    t: float    # clock() when the bytes were read
+
+
+class KeyDecoder:
+    """Incremental terminal bytes -> key names decoder."""
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending = ''
+        self._since = 0.0
+
+    def feed(self, data: bytes, now: float = 0.0) -> List[str]:
+        """Decode `data`; returns the completed keys in order."""
+        buf = self._pending + self._utf8.decode(data)
+        keys: List[str] = []
+        i = 0
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+            if ch == '\x1b':
+                if i + 1 >= n:
+                    break
+                if buf[i + 1] in '[O':
+                    # skip parameter/intermediate bytes up to the final byte
+                    j = i + 2
+                    while j < n and '\x20' <= buf[j] <= '\x3f':
+                        j += 1
+                    if j >= n:
+                        break
+                    key = _ARROWS.get(buf[j])
+                    if key:
+                        keys.append(key)
+                    i = j + 1
+                    continue
+                # ESC + other char (e.g. Alt+key): ignore the ESC
+                i += 1
+                continue
+            if ch == ' ':
+                keys.append('SPACE')
+            elif ch == '\x03' or ch == 'q':
+                keys.append('QUIT')
+            elif ch.isprintable():
+                keys.append(ch)
+            i += 1
+        rest = buf[i:]
+        if len(rest) > _MAX_PENDING:
+            rest = ''
+        # a sequence that was already waiting keeps its start time
+        if rest and (i > 0 or not self._pending):
+            self._since = now
+        self._pending = rest
+        return keys
+
+    def flush(self, now: float):
+        """Drop an escape sequence that stayed incomplete for ESC_TIMEOUT."""
+        if self._pending and now - self._since >= ESC_TIMEOUT:
+            self._pending = ''
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+
+class LatencyStats:
+    """Key-to-screen latencies: running count/mean/max plus a rolling histogram."""
+
+    def __init__(self, window: int = 600):
+        self.hist = RollingHistogram(window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.hist.add(int(seconds * 1e9))
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self) -> Dict:
+        # bucket upper bounds can overshoot the largest sample
+        top = int(self.max * 1e9)
+        p50, p99 = (min(p, top) for p in self.hist.percentiles(50, 99))
+        return {
+            'keys': self.count,
+            'mean_ms': round(self.total / self.count * 1000.0, 2) if self.count else 0.0,
+            'p50_ms': round(p50 / 1e6, 2),
+            'p99_ms': round(p99 / 1e6, 2),
+            'max_ms': round(self.max * 1000.0, 2),
+        }
+
+
+class InputReader:
+    """Background reader of a (non-blocking) terminal fd."""
+
+    def __init__(self, fd: int, clock: Callable[[], float] = time.perf_counter):
+        self.fd = fd
+        self.clock = clock
+        self.decoder = KeyDecoder()
+        self.latency = LatencyStats()
+        # appended by the reader thread, popped by the main loop (deque ops are atomic)
+        self._events = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if selectors is None or self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='bvb-input', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        t = self._thread
+        self._thread = None
+        if t is not None:
+            t.join(timeout=0.5)
+
+    def _read(self) -> bool:
+        """Read what is available and queue its keys; False on EOF/closed fd."""
+        try:
+            data = os.read(self.fd, 4096)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+        if not data:
+            return False
+        now = self.clock()
+        for key in self.decoder.feed(data, now):
+            self._events.append(KeyEvent(key, now))
+        return True
+
+    def _run(self):
+        sel = selectors.DefaultSelector()
+        try:
+            sel.register(self.fd, selectors.EVENT_READ)
+            while not self._stop.is_set():
+                # wake up often enough to drop a lone ESC and to notice stop()
+                if sel.select(ESC_TIMEOUT if self.decoder.pending else 0.1):
+                    if not self._read():
+                        break
+                self.decoder.flush(self.clock())
+        except Exception:
+            pass
+        finally:
+            sel.close()
+
+    def drain(self) -> List[KeyEvent]:
+        """All key events read since the last call, oldest first."""
+        if self._thread is None:
+            # not threaded: read whatever is there right now
+            self._read()
+            self.decoder.flush(self.clock())
+        out = []
+        q = self._events
+        while q:
+            out.append(q.popleft())
+        return out
+
+
+class PollingReader:
+    """Drains a get_key()-style function (None when no key is waiting)."""
+
+    def __init__(self, read_key: Callable[[], Optional[str]], clock: Callable[[], float] = time.perf_counter,
+                 max_keys: int = 64):
+        self.read_key = read_key
+        self.clock = clock
+        self.max_keys = max_keys
+        self.latency = LatencyStats()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def drain(self) -> List[KeyEvent]:
+        out = []
+        for _ in range(self.max_keys):
+            key = self.read_key()
+            if not key:
+                break
+            out.append(KeyEvent(key, self.clock()))
+        return out
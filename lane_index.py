@@ -0,0 +1,207 @@
+# Lane-bucketed spatial index for bats and obstacles.
+# Obstacles live in exactly one lane (obs['lane']); a bat is registered in
+# every lane its sprite span x_pos..x_pos+width overlaps. Collision code asks
+# for the entities of one lane instead of scanning the whole entity lists.
+# Buckets are dicts keyed by the entity itself (identity hash) so removal is
+# O(1) and the index survives copy.deepcopy together with its entities.
+# sweep_up() answers "what does a shot moving up this lane hit first" for a
+# whole frame's travel at once instead of one query per row.
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class LaneIndex:
+    def __init__(self, lane_positions: Sequence[int], half_width: int = 2, bat_width: int = 8):
+        self.lane_positions = list(lane_positions)
+        self.half_width = int(half_width)
+        self.bat_width = int(bat_width)
+        self._bats: List[Dict] = [dict() for _ in self.lane_positions]
+        self._obstacles: List[Dict] = [dict() for _ in self.lane_positions]
+        self._bat_lanes: Dict = {}
+
+    def configure(self, lane_positions: Sequence[int], half_width: int, bat_width: int):
+        """Change geometry; existing entries are re-bucketed."""
+        bats = list(self._bat_lanes.keys())
+        obstacles = [o for bucket in self._obstacles for o in bucket]
+        self.__init__(lane_positions, half_width, bat_width)
+        for bat in bats:
+            self.add_bat(bat)
+        for obs in obstacles:
+            self.add_obstacle(obs)
+
+    def clear(self):
+        for bucket in self._bats:
+            bucket.clear()
+        for bucket in self._obstacles:
+            bucket.clear()
+        self._bat_lanes.clear()
+
+    def lanes_spanned(self, left: int, right: int) -> Tuple[int, ...]:
+        """Lanes whose collision band [x - half_width, x + half_width] overlaps [left, right]."""
+        hw = self.half_width
+        return tuple(li for li, x in enumerate(self.lane_positions)
+                     if not (right < x - hw or left > x + hw))
+
+    # ---- bats ----
+    def add_bat(self, bat):
+        left = bat['x_pos']
+        lanes = self.lanes_spanned(left, left + self.bat_width)
+        self._bat_lanes[bat] = lanes
+        for li in lanes:
+            self._bats[li][bat] = None
+
+    def remove_bat(self, bat):
+        lanes = self._bat_lanes.pop(bat, ())
+        for li in lanes:
+            self._bats[li].pop(bat, None)
+
+    def move_bat(self, bat):
+        """Re-bucket a bat after its x_pos changed (no-op if its lanes did not change)."""
+        left = bat['x_pos']
+        lanes = self.lanes_spanned(left, left + self.bat_width)
+        old = self._bat_lanes.get(bat)
+        if old == lanes:
+            return
+        if old is not None:
+            for li in old:
+                self._bats[li].pop(bat, None)
+        self._bat_lanes[bat] = lanes
+        for li in lanes:
+            self._bats[li][bat] = None
+
+    def bat_lanes(self, bat) -> Tuple[int, ...]:
+        return self._bat_lanes.get(bat, ())
+
+    def bats_in_lane(self, lane: int) -> List:
+        """Snapshot list of bats overlapping `lane` (safe to remove while iterating)."""
+        try:
+            return list(self._bats[lane])
+        except (IndexError, TypeError):
+            return []
+
+    def sweep_up(self, lane: int, x: int, y_start: int, y_end: int, bat_span: Optional[int] = None,
+                 bat_rows: int = 1, obstacle_reach: int = 0):
+        """First bat or obstacle met by a point moving up `lane` from row y_start to y_end.
+
+        Rows are visited y_start, y_start - 1, ..., y_end. A bat covers rows
+        y_pos..y_pos+bat_rows where x_pos <= x <= x_pos+bat_span; an obstacle covers
+        rows within obstacle_reach of its y_pos. Returns (row, entity, is_bat) for
+        the first row with a hit, or None. On the same row bats come before
+        obstacles and earlier-added entities before later ones, as when stepping
+        one row at a time and scanning the buckets.
+        """
+        if y_start < y_end:
+            return None
+        span = self.bat_width if bat_span is None else bat_span
+        best = None
+        try:
+            bats = self._bats[lane]
+            obstacles = self._obstacles[lane]
+        except (IndexError, TypeError):
+            return None
+        for bat in bats:
+            left = bat['x_pos']
+            if not left <= x <= left + span:
+                continue
+            top = bat['y_pos']
+            row = min(top + bat_rows, y_start)
+            if row >= top and row >= y_end and (best is None or row > best[0]):
+                best = (row, bat, True)
+        for obs in obstacles:
+            if obs['lane'] != lane:
+                continue
+            oy = obs['y_pos']
+            row = min(oy + obstacle_reach, y_start)
+            if row >= oy - obstacle_reach and row >= y_end and (best is None or row > best[0]):
+                best = (row, obs, False)
+        return best
+
+    # ---- obstacles ----
+    def add_obstacle(self, obs):
+        try:
+            self._obstacles[obs['lane']][obs] = None
+        except (IndexError, KeyError, TypeError):
+            pass
+
+    def remove_obstacle(self, obs):
+        try:
+            self._obstacles[obs['lane']].pop(obs, None)
+        except (IndexError, KeyError, TypeError):
+            pass
+
+    def obstacles_in_lane(self, lane: int) -> List:
+        try:
+            return list(self._obstacles[lane])
+        except (IndexError, TypeError):
+            return []
+
+    def occupied(self, lane: int) -> bool:
+        """True when any bat or obstacle is in `lane`."""
+        try:
+            return bool(self._bats[lane]) or bool(self._obstacles[lane])
+        except (IndexError, TypeError):
+            return False
+
+    def occupied_lanes(self) -> List[bool]:
+        """occupied() of every lane, in lane order."""
+        return [bool(b) or bool(o) for b, o in zip(self._bats, self._obstacles)]
+
+    def obstacles_in_lanes(self, lanes: Sequence[int]) -> List:
+        out = []
+        for li in lanes:
+            try:
+                out.extend(self._obstacles[li])
+            except (IndexError, TypeError):
+                pass
+        return out
+
+
+if __name__ == '__main__':
+    # Micro-benchmark: per-bird lane collision queries vs. scanning the full lists.
+    import random
+    import time
+
+    lanes = [5, 9, 13, 17, 21, 25, 29, 33, 37]
+    birds = 9
+    queries = 2000
+
+    class _Ent(dict):
+        __hash__ = object.__hash__
+
+    print(f"{'entities':>8} {'scan us/frame':>14} {'index us/frame':>15} {'speedup':>8}")
+    for n in (25, 50, 100, 200, 400, 800):
+        rnd = random.Random(n)
+        bats = [_Ent(x_pos=rnd.randint(0, 37), y_pos=rnd.randint(1, 20)) for _ in range(n // 2)]
+        obstacles = [_Ent(lane=rnd.randrange(9), y_pos=rnd.randint(1, 25)) for _ in range(n - n // 2)]
+        idx = LaneIndex(lanes)
+        for b in bats:
+            idx.add_bat(b)
+        for o in obstacles:
+            idx.add_obstacle(o)
+
+        t0 = time.perf_counter()
+        hits_scan = 0
+        for q in range(queries):
+            for bird in range(birds):
+                x = lanes[bird]
+                for b in bats[:]:
+                    if not (b['x_pos'] + 8 < x - 2 or b['x_pos'] > x + 2) and b['y_pos'] == q % 20:
+                        hits_scan += 1
+                for o in obstacles[:]:
+                    if o['lane'] == bird and o['y_pos'] == q % 25:
+                        hits_scan += 1
+        t_scan = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        hits_idx = 0
+        for q in range(queries):
+            for bird in range(birds):
+                x = lanes[bird]
+                for b in idx.bats_in_lane(bird):
+                    if not (b['x_pos'] + 8 < x - 2 or b['x_pos'] > x + 2) and b['y_pos'] == q % 20:
+                        hits_idx += 1
+                for o in idx.obstacles_in_lane(bird):
+                    if o['y_pos'] == q % 25:
+                        hits_idx += 1
+        t_idx = time.perf_counter() - t0
+        assert hits_scan == hits_idx
+        print(f"{n:>8} {t_scan / queries * 1e6:>14.1f} {t_idx / queries * 1e6:>15.1f} {t_scan / t_idx:>7.1f}x")
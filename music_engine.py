@@ -10,6 +10,8 @@ and logs to /tmp/bvb-music.log.
 
 This is intentionally tiny and deterministic so it's easy to inspect and
 modify: change PATTERN or TONE_FREQ at the top of the file.
+Instruments and the mixed pattern are synthesized with NumPy when it is
+installed (vectorized, a few milliseconds) and with `array` otherwise.
 """
 from threading import Thread, Lock
 import time
@@ -57,14 +59,18 @@ TONE_AMPLITUDE = 0.25  # 0..1
 SIMPLEAUDIO_AVAILABLE = False
 sa = None
 
-# Try sounddevice + numpy for low-latency streaming playback (preferred)
+# NumPy vectorizes synthesis and mixing; without it the pure `array` path is used
 try:
-    import sounddevice as sd
     import numpy as np
-    SOUNDEVICE_AVAILABLE = True
 except Exception:
-    sd = None
     np = None
+
+# Try sounddevice (needs numpy) for low-latency streaming playback (preferred)
+try:
+    import sounddevice as sd
+    SOUNDEVICE_AVAILABLE = np is not None
+except Exception:
+    sd = None
     SOUNDEVICE_AVAILABLE = False
 
 AFPLAY_AVAILABLE = sys.platform == 'darwin' and shutil.which('afplay') is not None
@@ -77,214 +83,186 @@ def _log(msg: str):
     return
 
 
-def _write_wav_tone(fname: str, freq: float, duration: float, amp: float):
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp)
-    arr = array.array('h')
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        v = math.sin(2.0 * math.pi * freq * t)
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
+# ----------------------------- synthesis -----------------------------
+# Each instrument is one waveform expression of the time axis `t` (seconds)
+# and optional deterministic noise, written against a math namespace `xp`.
+# With NumPy, `t`/noise are whole arrays and `xp` is numpy; otherwise the
+# same expression is evaluated per sample with floats and `xp` is math.
 
+def _wave_tone(t, noise, xp, duration, freq=TONE_FREQ):
+    return xp.sin(2.0 * math.pi * freq * t)
 
-def _write_wav_snare(fname: str, duration: float, amp: float):
-    """Synthesize a deterministic snare-like 1s sound using pseudo-noise
-    plus a short tonal body. Uses an LCG for deterministic noise.
-    """
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp)
-    arr = array.array('h')
 
-    # simple deterministic LCG PRNG (32-bit)
-    seed = 0x12345678
-    state = seed
+def _wave_snare(t, noise, xp, duration):
+    # mostly noise with a small tonal click (slightly pitched), fast attack, medium decay
+    tone = xp.sin(2.0 * math.pi * 180.0 * t) * xp.exp(-20.0 * t)
+    return (noise[0] * 0.9 + tone * 0.5) * xp.exp(-10.0 * t)
 
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        # envelope: fast attack, medium decay
-        env = math.exp(-10.0 * t)
-        # deterministic noise sample in [-1,1]
-        state = (1103515245 * state + 12345) & 0xFFFFFFFF
-        noise = ((state >> 16) & 0x7FFF) / 32767.0
-        noise = (noise * 2.0) - 1.0
 
-        # tonal body (slightly pitched click)
-        tone = math.sin(2.0 * math.pi * 180.0 * t) * math.exp(-20.0 * t)
+def _wave_kick(t, noise, xp, duration):
+    # low sine with falling pitch and quick exponential decay
+    freq = 100.0 * (1.0 - 0.8 * (t / max(1e-9, duration)))
+    return xp.sin(2.0 * math.pi * freq * t) * xp.exp(-12.0 * t)
 
-        # mix: mostly noise with a small tonal click
-        v = (noise * 0.9 + tone * 0.5) * env
 
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
+def _wave_hat(t, noise, xp, duration):
+    return noise[0] * xp.exp(-50.0 * t)
 
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
 
+def _wave_open_hat(t, noise, xp, duration):
+    return noise[0] * xp.exp(-8.0 * t)
 
-def _write_wav_kick(fname: str, duration: float, amp: float):
-    """Synthesize a deterministic kick-like sound (low sine with fast decay)."""
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp)
-    arr = array.array('h')
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        # quick exponential decay
-        env = math.exp(-12.0 * t)
-        # falling pitch (simulate kick pitch drop)
-        freq = 100.0 * (1.0 - 0.8 * (t / max(1e-9, duration)))
-        v = math.sin(2.0 * math.pi * freq * t) * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
 
+def _wave_clap(t, noise, xp, duration):
+    # two micro-bursts from consecutive noise draws
+    return (noise[0] * 0.6 + noise[1] * 0.4) * xp.exp(-30.0 * t)
 
-def _write_wav_hat(fname: str, duration: float, amp: float):
-    """Short high-frequency noise (closed hi-hat)."""
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp * 0.6)
-    arr = array.array('h')
-    state = 0xabcdef01
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        env = math.exp(-50.0 * t)
-        state = (1103515245 * state + 12345) & 0xFFFFFFFF
-        noise = ((state >> 16) & 0x7FFF) / 32767.0
-        noise = (noise * 2.0) - 1.0
-        v = noise * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
 
+def _wave_tom(t, noise, xp, duration, base=120.0):
+    # slight pitch glide
+    freq = base * (1.0 - 0.5 * t / max(1e-9, duration))
+    return xp.sin(2.0 * math.pi * freq * t) * xp.exp(-6.0 * t)
 
-def _write_wav_open_hat(fname: str, duration: float, amp: float):
-    """Longer decay open hi-hat (noise with slower envelope)."""
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp * 0.5)
-    arr = array.array('h')
-    state = 0x13579bdf
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        env = math.exp(-8.0 * t)
-        state = (1103515245 * state + 12345) & 0xFFFFFFFF
-        noise = ((state >> 16) & 0x7FFF) / 32767.0
-        noise = (noise * 2.0) - 1.0
-        v = noise * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
 
+def _wave_rim(t, noise, xp, duration):
+    return xp.sin(2.0 * math.pi * 3000.0 * t) * xp.exp(-80.0 * t)
 
-def _write_wav_clap(fname: str, duration: float, amp: float):
-    """Clap: stacked short noise bursts (deterministic)."""
-    frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp * 0.7)
-    arr = array.array('h')
-    state = 0x86420
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        env = math.exp(-30.0 * t)
-        # create two micro-bursts offset deterministically
-        state = (1103515245 * state + 12345) & 0xFFFFFFFF
-        noise1 = (((state >> 16) & 0x7FFF) / 32767.0) * 2.0 - 1.0
-        state = (1103515245 * state + 12345) & 0xFFFFFFFF
-        noise2 = (((state >> 16) & 0x7FFF) / 32767.0) * 2.0 - 1.0
-        v = (noise1 * 0.6 + noise2 * 0.4) * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
 
+def _wave_bass(t, noise, xp, duration):
+    freq = 55.0 * (1.0 - 0.2 * t / max(1e-9, duration))
+    return xp.sin(2.0 * math.pi * freq * t) * xp.exp(-5.0 * t)
 
-def _write_wav_tom(fname: str, duration: float, amp: float, high=False):
-    """Tom: low/med pitch sine with exponential decay."""
-    frames = int(round(SAMPLE_RATE * duration))
-    base = 220.0 if high else 120.0
-    max_amp = int(32767 * amp * (0.8 if high else 0.9))
-    arr = array.array('h')
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        env = math.exp(-6.0 * t)
-        # slight pitch glide
-        freq = base * (1.0 - 0.5 * t / max(1e-9, duration))
-        v = math.sin(2.0 * math.pi * freq * t) * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
+
+# name -> (waveform, amplitude scale, LCG seed or None, noise draws per sample)
+INSTRUMENT_SYNTHS = {
+    'snare': (_wave_snare, 1.0, 0x12345678, 1),
+    'kick': (_wave_kick, 1.0, None, 0),
+    'hat': (_wave_hat, 0.6, 0xabcdef01, 1),
+    'open_hat': (_wave_open_hat, 0.5, 0x13579bdf, 1),
+    'clap': (_wave_clap, 0.7, 0x86420, 2),
+    'tom_low': (lambda t, n, xp, d: _wave_tom(t, n, xp, d, base=120.0), 0.9, None, 0),
+    'tom_high': (lambda t, n, xp, d: _wave_tom(t, n, xp, d, base=220.0), 0.8, None, 0),
+    'rim': (_wave_rim, 0.7, None, 0),
+    'bass': (_wave_bass, 0.9, None, 0),
+}
+
+# 32-bit LCG used for all deterministic noise
+_LCG_A = 1103515245
+_LCG_C = 12345
+
+
+def _lcg_noise_np(seed: int, count: int):
+    """`count` LCG noise values in [-1, 1], bit-identical to stepping the LCG in a loop.
+
+    Jump-ahead form: state_n = A_n * seed + C_n (mod 2**32) with A_n = a**n and
+    C_n = c * (1 + a + ... + a**(n-1)); uint64 cumprod/cumsum wrap modulo 2**64,
+    which preserves the low 32 bits.
+    """
+    a = np.full(count, _LCG_A, dtype=np.uint64)
+    powers = np.cumprod(a)                                   # a**1 .. a**count
+    geo = np.empty(count, dtype=np.uint64)                  # a**0 .. a**(count-1)
+    geo[:1] = 1
+    geo[1:] = powers[:-1]
+    offsets = np.cumsum(geo) * np.uint64(_LCG_C)
+    states = (powers * np.uint64(seed) + offsets) & np.uint64(0xFFFFFFFF)
+    return ((states >> np.uint64(16)) & np.uint64(0x7FFF)).astype(np.float64) / 32767.0 * 2.0 - 1.0
+
+
+def synthesize(instr: str, duration: float, amp: float):
+    """Render one instrument hit as 16-bit PCM samples.
+
+    Returns an `np.int16` array with NumPy, else an `array.array('h')`.
+    """
+    wave_fn, scale, seed, draws = INSTRUMENT_SYNTHS[instr]
+    return _render(wave_fn, duration, int(32767 * amp * scale), seed, draws)
 
 
-def _write_wav_rim(fname: str, duration: float, amp: float):
-    """Rim click: short high-frequency click"""
+def _render(wave_fn, duration, max_amp, seed=None, draws=0):
     frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp * 0.7)
+    if np is not None:
+        t = np.arange(frames, dtype=np.float64) / float(SAMPLE_RATE)
+        noise = ()
+        if seed is not None and draws:
+            raw = _lcg_noise_np(seed, frames * draws).reshape(frames, draws)
+            noise = tuple(raw[:, k] for k in range(draws))
+        v = wave_fn(t, noise, np, duration)
+        return np.clip(v * max_amp, -32767, 32767).astype(np.int16)
     arr = array.array('h')
+    state = seed
+    noise = [0.0] * draws
     for n in range(frames):
         t = n / float(SAMPLE_RATE)
-        env = math.exp(-80.0 * t)
-        v = math.sin(2.0 * math.pi * 3000.0 * t) * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
+        for k in range(draws):
+            state = (_LCG_A * state + _LCG_C) & 0xFFFFFFFF
+            noise[k] = ((state >> 16) & 0x7FFF) / 32767.0 * 2.0 - 1.0
+        v = wave_fn(t, noise, math, duration)
+        arr.append(int(max(-32767, min(32767, v * max_amp))))
+    return arr
 
 
-def _write_wav_bass(fname: str, duration: float, amp: float):
-    """Bass synth: low sine with quick attack and medium decay."""
+def silence(duration: float):
     frames = int(round(SAMPLE_RATE * duration))
-    max_amp = int(32767 * amp * 0.9)
-    arr = array.array('h')
-    for n in range(frames):
-        t = n / float(SAMPLE_RATE)
-        env = math.exp(-5.0 * t)
-        freq = 55.0 * (1.0 - 0.2 * t / max(1e-9, duration))
-        v = math.sin(2.0 * math.pi * freq * t) * env
-        s = int(max(-32767, min(32767, v * max_amp)))
-        arr.append(s)
+    if np is not None:
+        return np.zeros(frames, dtype=np.int16)
+    return array.array('h', bytes(2 * frames))
+
+
+def mix_pattern(instr_samples, patterns, repeat: int = 1):
+    """Mix instrument hits into `repeat` cycles of the step patterns.
+
+    `instr_samples` maps instrument -> one step of PCM samples (all the same
+    length); a step sums the instruments whose pattern is 1 there, clamped to
+    16 bits. Each distinct step is mixed once and the cycle is then tiled.
+    """
+    names = [n for n in INSTRUMENT_NAMES if n in instr_samples]
+    plen = max((len(p) for p in patterns.values()), default=1)
+    repeat = int(max(1, repeat))
+    step_len = len(instr_samples[names[0]]) if names else 0
+
+    def _active(i):
+        out = []
+        for instr in names:
+            pattern = patterns.get(instr, [0])
+            if len(pattern) > 0 and pattern[i % len(pattern)]:
+                out.append(instr)
+        return out
+
+    if np is not None:
+        stack = {n: np.asarray(instr_samples[n], dtype=np.int32) for n in names}
+        cycle = np.zeros((plen, step_len), dtype=np.int32)
+        for i in range(plen):
+            for instr in _active(i):
+                cycle[i] += stack[instr]
+        np.clip(cycle, -32767, 32767, out=cycle)
+        # steps are clamped to 16 bits already, so no normalization pass is needed
+        return np.tile(cycle.reshape(-1).astype(np.int16), repeat)
+
+    cycle = array.array('h')
+    for i in range(plen):
+        active = [instr_samples[n] for n in _active(i)]
+        if not active:
+            cycle.extend(array.array('h', bytes(2 * step_len)))
+            continue
+        for total in map(sum, zip(*active)):
+            cycle.append(32767 if total > 32767 else (-32767 if total < -32767 else total))
+    # steps are clamped to 16 bits already, so no normalization pass is needed
+    return cycle * repeat
+
+
+def _write_wav(fname: str, samples):
     with wave.open(fname, 'wb') as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
+        wf.writeframes(samples.tobytes())
+
+
+def _write_wav_tone(fname: str, freq: float, duration: float, amp: float):
+    _write_wav(fname, _render(lambda t, n, xp, d: _wave_tone(t, n, xp, d, freq), duration, int(32767 * amp)))
 
 
 def _write_wav_silence(fname: str, duration: float):
-    frames = int(round(SAMPLE_RATE * duration))
-    arr = array.array('h', [0] * frames)
-    with wave.open(fname, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(arr.tobytes())
+    _write_wav(fname, silence(duration))
 
 
 class MusicEngine:
@@ -297,9 +275,12 @@ class MusicEngine:
         self.step_seconds = float(STEP_SECONDS)
         self.tone_amp = float(TONE_AMPLITUDE)
 
-        # pre-generate files: one WAV per instrument plus silence and the concatenated pattern
-        self._instr_files = {}
-        self._silence_file = None
+        # in-memory buffers: one hit per instrument, silence and the mixed pattern
+        self._instr_samples = {}
+        self._silence_samples = None
+        self._pattern = None
+        self._pattern_view = None
+        # WAV copy of the pattern, only written when afplay needs a file
         self._pattern_file = None
         self._pattern_bytes = None
         self._pattern_channels = None
@@ -312,152 +293,68 @@ class MusicEngine:
         self._current_proc = None
         # persistent sounddevice stream (if used)
         self._sd_stream = None
-        # prepare files (may set _pattern_file/_pattern_np)
-        self._prepare_files()
+        # prepare buffers (may set _pattern_np)
+        self._prepare_buffers()
 
-    def _prepare_files(self):
+    def _prepare_buffers(self):
         try:
-            # create one file per instrument
-            writers = {
-                'snare': _write_wav_snare,
-                'kick': _write_wav_kick,
-                'hat': _write_wav_hat,
-                'open_hat': _write_wav_open_hat,
-                'clap': _write_wav_clap,
-                'tom_low': lambda f, d, a: _write_wav_tom(f, d, a, high=False),
-                'tom_high': lambda f, d, a: _write_wav_tom(f, d, a, high=True),
-                'rim': _write_wav_rim,
-                'bass': _write_wav_bass,
-            }
+            # synthesize every instrument in memory (vectorized with NumPy)
+            self._silence_samples = silence(self.step_seconds)
             for instr in INSTRUMENT_NAMES:
                 try:
-                    tf = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                    name = tf.name
-                    tf.close()
-                    # write deterministic instrument
-                    writers[instr](name, self.step_seconds, self.tone_amp)
-                    self._instr_files[instr] = name
+                    self._instr_samples[instr] = synthesize(instr, self.step_seconds, self.tone_amp)
                 except Exception:
-                    # on failure, skip instrument
-                    self._instr_files[instr] = None
-            # silence
-            sf = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            sfname = sf.name
-            sf.close()
-            _write_wav_silence(sfname, self.step_seconds)
-            self._silence_file = sfname
-
-            # note: mixing will happen below when building the concatenated pattern
-            try:
-                names = {k: v for k, v in self._instr_files.items()}
-                _log(f"music_engine(minimal): prepared instrument files={list(names.keys())} silence={self._silence_file}")
-            except Exception:
-                pass
-
-            # prepare a concatenated pattern file (one cycle of the patterns)
-            try:
-                patternf = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                pattern_name = patternf.name
-                patternf.close()
-
-                # read raw arrays for each possible step type
-                def _read_arr(fname):
-                    with wave.open(fname, 'rb') as wf:
-                        frames = wf.readframes(wf.getnframes())
-                    a = array.array('h')
-                    a.frombytes(frames)
-                    return a
-
-                # read arrays for each instrument (use silence if instrument missing)
-                instr_arrs = {}
-                for instr in INSTRUMENT_NAMES:
-                    fname = self._instr_files.get(instr)
-                    if fname and os.path.exists(fname):
-                        instr_arrs[instr] = _read_arr(fname)
-                    else:
-                        instr_arrs[instr] = _read_arr(self._silence_file)
+                    # on failure, the instrument plays silence
+                    self._instr_samples[instr] = self._silence_samples
+            _log(f"music_engine(minimal): prepared instruments={list(self._instr_samples.keys())}")
+
+            # mix PATTERN_REPEAT cycles of the patterns into one buffer
+            repeat = int(max(1, globals().get('PATTERN_REPEAT', 1)))
+            self._pattern = mix_pattern(self._instr_samples, self.instrument_patterns, repeat)
+            self._pattern_view = memoryview(self._pattern).cast('B')
+            # We intentionally do NOT cache simpleaudio WaveObject bytes to avoid
+            # importing/using simpleaudio (it can crash on some macOS/Python
+            # combinations).
+            self._pattern_bytes = None
+            self._pattern_channels = None
+            self._pattern_sampwidth = None
+            self._pattern_rate = None
 
-                # build pattern sequence repeated PATTERN_REPEAT times by mixing active instruments per step
-                seq = array.array('h')
-                plen = max(len(p) for p in self.instrument_patterns.values())
-                repeat = int(max(1, globals().get('PATTERN_REPEAT', 1)))
-                step_len = len(instr_arrs[INSTRUMENT_NAMES[0]]) if INSTRUMENT_NAMES[0] in instr_arrs else len(instr_arrs.get(self._silence_file, []))
-                for r in range(repeat):
-                    for i in range(plen):
-                        # initialize per-step mixed buffer
-                        # assume all instr arrays are same length (step_len)
-                        for sidx in range(step_len):
-                            total = 0
-                            for instr in INSTRUMENT_NAMES:
-                                pattern = self.instrument_patterns.get(instr, [0])
-                                val = pattern[i % len(pattern)] if len(pattern) > 0 else 0
-                                if val:
-                                    total += int(instr_arrs[instr][sidx])
-                            # clamp and append
-                            if total > 32767:
-                                total = 32767
-                            elif total < -32767:
-                                total = -32767
-                            seq.append(int(total))
-
-                # normalize to avoid clipping (scale if necessary)
-                if len(seq) > 0:
-                    mx = max(abs(x) for x in seq)
-                    if mx == 0:
-                        scale = 1.0
-                    else:
-                        scale = min(1.0, 32767.0 / float(mx))
-                else:
-                    scale = 1.0
-
-                if scale < 0.999999:
-                    for idx in range(len(seq)):
-                        seq[idx] = int(max(-32767, min(32767, int(seq[idx] * scale))))
-
-                # write pattern file
-                with wave.open(pattern_name, 'wb') as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(2)
-                    wf.setframerate(SAMPLE_RATE)
-                    wf.writeframes(seq.tobytes())
-
-                self._pattern_file = pattern_name
-                # We intentionally do NOT cache simpleaudio WaveObject bytes to avoid
-                # importing/using simpleaudio (it can crash on some macOS/Python
-                # combinations). If sounddevice is present we'll prepare a numpy
-                # buffer instead (below).
-                self._pattern_bytes = None
-                self._pattern_channels = None
-                self._pattern_sampwidth = None
-                self._pattern_rate = None
-
-                # If sounddevice + numpy available, create an int16 numpy array of the pattern
-                try:
-                    if SOUNDEVICE_AVAILABLE and np is not None:
-                        # seq is array.array('h') (int16). Convert to numpy int16 without copy
-                        self._pattern_np = np.frombuffer(seq.tobytes(), dtype=np.int16)
-                        self._pattern_pos = 0
-                    else:
-                        self._pattern_np = None
-                        self._pattern_pos = 0
-                except Exception:
-                    self._pattern_np = None
-                    self._pattern_pos = 0
-            except Exception as e:
-                _log(f"music_engine(minimal): error preparing pattern file: {e}")
-                self._pattern_file = None
+            # With sounddevice the stream callback reads the mixed buffer
+            # through a zero-copy int16 view
+            if SOUNDEVICE_AVAILABLE and np is not None:
+                self._pattern_np = np.frombuffer(self._pattern_view, dtype=np.int16)
+            else:
+                self._pattern_np = None
+            self._pattern_pos = 0
         except Exception as e:
-            _log(f"music_engine(minimal): error preparing files: {e}")
-            self._snare_file = None
-            self._kick_file = None
-            self._mix_file = None
-            self._silence_file = None
-            self._pattern_file = None
+            _log(f"music_engine(minimal): error preparing buffers: {e}")
+            self._pattern = None
+            self._pattern_view = None
+            self._pattern_np = None
             self._pattern_bytes = None
             self._pattern_channels = None
             self._pattern_sampwidth = None
             self._pattern_rate = None
 
+    def _pattern_wav_file(self):
+        """Path of a WAV copy of the pattern, written on first use (afplay needs a file)."""
+        if self._pattern_file and os.path.exists(self._pattern_file):
+            return self._pattern_file
+        if self._pattern is None:
+            return None
+        try:
+            tf = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+            name = tf.name
+            tf.close()
+            _write_wav(name, self._pattern)
+            self._pattern_file = name
+            return name
+        except Exception as e:
+            _log(f"music_engine(minimal): error writing pattern file: {e}")
+            self._pattern_file = None
+            return None
+
     # ----------------------- sounddevice helpers -----------------------
     def _start_sd_stream(self) -> bool:
         """Start a persistent sounddevice OutputStream if possible.
@@ -769,15 +666,16 @@ class MusicEngine:
         # Play the whole pattern file in a loop. This reduces per-step overhead
         # (afplay process startup) so tempos < ~0.1s behave correctly.
         while self._running:
-            if self._pattern_file:
-                self._play_file_blocking(self._pattern_file)
+            fname = self._pattern_wav_file()
+            if fname:
+                self._play_file_blocking(fname)
             else:
                 # fallback: sleep for one pattern length
-                plen = max(len(self.snare_pattern), len(self.kick_pattern))
+                plen = max(len(p) for p in self.instrument_patterns.values())
                 time.sleep(self.step_seconds * max(1, plen))
 
     def cleanup(self):
-        # remove temp files
+        # remove the afplay temp file (if one was written)
         try:
             # stop playback and streams first
             try:
@@ -788,16 +686,9 @@ class MusicEngine:
                 self._stop_sd_stream()
             except Exception:
                 pass
-            if self._snare_file and os.path.exists(self._snare_file):
-                os.unlink(self._snare_file)
-            if self._kick_file and os.path.exists(self._kick_file):
-                os.unlink(self._kick_file)
-            if self._mix_file and os.path.exists(self._mix_file):
-                os.unlink(self._mix_file)
-            if self._silence_file and os.path.exists(self._silence_file):
-                os.unlink(self._silence_file)
-            if hasattr(self, '_pattern_file') and self._pattern_file and os.path.exists(self._pattern_file):
+            if self._pattern_file and os.path.exists(self._pattern_file):
                 os.unlink(self._pattern_file)
+            self._pattern_file = None
             _log("music_engine(minimal): cleaned up temp files")
         except Exception:
             pass
@@ -0,0 +1,128 @@
+# Durable local outbox for BVB telemetry (scores, events, achievements, crashes).
+# Every remote write is appended here first and only deleted once Firestore
+# acknowledged it, so offline sessions keep their data and upload it in bulk
+# on a later launch. SQLite in WAL mode with synchronous=NORMAL: each append
+# commit survives a crash of the game, fsyncs are batched at checkpoints.
+# Each entry carries an idempotency key that the uploader uses as Firestore
+# document id, so a write retried after an ambiguous failure overwrites the
+# same document instead of duplicating it.
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+try:
+    import sqlite3
+except Exception:
+    sqlite3 = None
+
+# Retry delay for failed uploads: BACKOFF_BASE * 2**attempts (jittered), capped
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+
+
+class Entry(NamedTuple):
+    key: str
+    kind: str      # 'write' (target = collection path) or 'unlock' (target = achievement id)
+    target: str
+    payload: Dict
+    attempts: int
+
+
+class Outbox:
+    def __init__(self, path: str):
+        if sqlite3 is None:
+            raise RuntimeError('sqlite3 is not available')
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' key TEXT NOT NULL UNIQUE,'
+            ' kind TEXT NOT NULL,'
+            ' target TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' next_try REAL NOT NULL DEFAULT 0,'
+            ' created REAL NOT NULL)')
+
+    def append(self, kind: str, target: str, payload: Dict, key: Optional[str] = None) -> str:
+        return self.append_many([(kind, target, payload, key)])[0]
+
+    def append_many(self, entries: Iterable[Sequence]) -> List[str]:
+        """Store (kind, target, payload[, key]) tuples in one transaction; returns their keys.
+
+        An entry whose key is already stored is ignored (e.g. the same
+        achievement unlocked in two offline sessions).
+        """
+        now = time.time()
+        rows = []
+        for e in entries:
+            kind, target, payload = e[0], e[1], e[2]
+            key = e[3] if len(e) > 3 and e[3] else uuid.uuid4().hex
+            rows.append((key, kind, target, json.dumps(payload, default=str), now))
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO outbox (key, kind, target, payload, created) VALUES (?, ?, ?, ?, ?)', rows)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [r[0] for r in rows]
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[Entry]:
+        """Oldest entries whose retry time has come."""
+        now = time.time() if now is None else now
+        with self._lock:
+            cur = self._conn.execute(
+                'SELECT key, kind, target, payload, attempts FROM outbox WHERE next_try <= ? ORDER BY id LIMIT ?',
+                (now, int(limit)))
+            rows = cur.fetchall()
+        return [Entry(k, kind, target, json.loads(p), a) for k, kind, target, p, a in rows]
+
+    def ack(self, keys: Sequence[str]):
+        """Delete entries that were written remotely."""
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany('DELETE FROM outbox WHERE key = ?', [(k,) for k in keys])
+
+    def retry(self, keys: Sequence[str]):
+        """Push failed entries back with exponential backoff."""
+        if not keys:
+            return
+        now = time.time()
+        with self._lock:
+            for k in keys:
+                row = self._conn.execute('SELECT attempts FROM outbox WHERE key = ?', (k,)).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** min(attempts - 1, 16)))
+                delay *= 0.5 + random.random() / 2
+                self._conn.execute('UPDATE outbox SET attempts = ?, next_try = ? WHERE key = ?',
+                                   (attempts, now + delay, k))
+
+    def next_due(self) -> Optional[float]:
+        """time.time() at which the next entry becomes due (None if empty)."""
+        with self._lock:
+            row = self._conn.execute('SELECT MIN(next_try) FROM outbox').fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
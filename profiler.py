@@ -0,0 +1,252 @@
+# Frame phase timers for BVB.
+# The main loop is cut into named phases (input, spawn, bats, birds, render,
+# ...). begin() starts a frame, lap(name) charges the time since the previous
+# lap (or since begin()) to `name`, end() closes the frame and files the
+# per-phase times, in perf_counter_ns nanoseconds, as samples. With
+# `history` set, only the most recent frames are kept. NullTimer has the same
+# interface and does nothing, so instrumented code costs one method call per
+# lap when profiling is off.
+# With `window` set, every phase also feeds a rolling log-scale histogram of
+# its last `window` frames; percentiles read from it cost a walk over a few
+# dozen buckets, cheap enough to refresh a HUD line while playing. Other
+# rolling histograms (e.g. input latency) can be watch()ed to show up there too.
+# Optionally the timer also measures memory: with track_alloc on (and
+# tracemalloc tracing), each lap records how far the traced memory peaked
+# above its level at the start of the phase.
+import csv
+import json
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import tracemalloc
+except Exception:
+    tracemalloc = None
+
+# Histogram resolution: buckets per power of two
+_SUB_BITS = 2
+_SUB = 1 << _SUB_BITS
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0..100); 0 when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    rank = max(1, int(-(-q * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _bucket(v: int) -> int:
+    if v < _SUB:
+        return max(0, v)
+    shift = v.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + ((v >> shift) - _SUB)
+
+
+def _bucket_high(b: int) -> int:
+    """Largest value that falls in bucket `b`."""
+    if b < _SUB:
+        return b
+    shift = b // _SUB - 1
+    return ((_SUB + b % _SUB + 1) << shift) - 1
+
+
+class RollingHistogram:
+    """Log-scale histogram of the last `size` samples (4 buckets per power of two)."""
+
+    def __init__(self, size: int):
+        self.size = max(1, int(size))
+        self._window = deque()
+        self._counts: List[int] = [0] * (64 * _SUB)
+
+    def add(self, v: int):
+        b = _bucket(int(v))
+        self._window.append(b)
+        self._counts[b] += 1
+        if len(self._window) > self.size:
+            self._counts[self._window.popleft()] -= 1
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def percentiles(self, *qs: float) -> List[int]:
+        """Upper bounds of the buckets holding the given percentiles (one pass)."""
+        n = len(self._window)
+        out = [0] * len(qs)
+        if not n:
+            return out
+        ranks = sorted((max(1, -(-q * n // 100)), i) for i, q in enumerate(qs))
+        seen = 0
+        k = 0
+        for b, c in enumerate(self._counts):
+            seen += c
+            while k < len(ranks) and seen >= ranks[k][0]:
+                out[ranks[k][1]] = _bucket_high(b)
+                k += 1
+            if k == len(ranks):
+                break
+        return out
+
+
+class NullTimer:
+    enabled = False
+
+    def begin(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end(self, frame=None):
+        pass
+
+    def watch(self, label: str, hist):
+        pass
+
+
+class PhaseTimer:
+    enabled = True
+
+    def __init__(self, phases: Iterable[str] = (), history: Optional[int] = None,
+                 window: Optional[int] = None, track_alloc: bool = False):
+        self.history = history
+        self.window = window
+        self.track_alloc = bool(track_alloc) and tracemalloc is not None
+        self.samples: Dict[str, deque] = {}
+        self.allocs: Dict[str, deque] = {}
+        self.hists: Dict[str, RollingHistogram] = {}
+        self.totals = deque(maxlen=history)
+        self.marks = deque(maxlen=history)
+        self.total_hist = RollingHistogram(window) if window else None
+        self.watched: Dict[str, RollingHistogram] = {}
+        self.current: Dict[str, int] = {}
+        self._alloc: Dict[str, int] = {}
+        for name in phases:
+            self._phase(name)
+        self._t0 = self._t = 0
+        self._mem = 0
+        self._hud = ''
+        self._hud_age = 0
+
+    def _phase(self, name: str):
+        self.samples[name] = deque([0] * len(self.totals), maxlen=self.history)
+        self.allocs[name] = deque([0] * len(self.totals), maxlen=self.history)
+        if self.window:
+            self.hists[name] = RollingHistogram(self.window)
+
+    def begin(self):
+        self.current = {}
+        self._alloc = {}
+        if self.track_alloc and tracemalloc.is_tracing():
+            self._mem = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._t0 = self._t = time.perf_counter_ns()
+
+    def lap(self, phase: str):
+        now = time.perf_counter_ns()
+        self.current[phase] = self.current.get(phase, 0) + now - self._t
+        if self.track_alloc and tracemalloc.is_tracing():
+            mem, peak = tracemalloc.get_traced_memory()
+            self._alloc[phase] = self._alloc.get(phase, 0) + max(0, peak - self._mem)
+            self._mem = mem
+            tracemalloc.reset_peak()
+        # the bookkeeping above is not charged to the next phase
+        self._t = time.perf_counter_ns()
+
+    def end(self, frame=None):
+        """Close the frame; `frame` is an optional label kept with it (e.g. the frame counter)."""
+        total = self._t - self._t0
+        self.totals.append(total)
+        self.marks.append(frame)
+        for name in self.current:
+            if name not in self.samples:
+                self._phase(name)
+        for name, q in self.samples.items():
+            v = self.current.get(name, 0)
+            q.append(v)
+            self.allocs[name].append(self._alloc.get(name, 0))
+            if self.window:
+                self.hists[name].add(v)
+        if self.total_hist is not None:
+            self.total_hist.add(total)
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def watch(self, label: str, hist: RollingHistogram):
+        """Show the p50/p99 of another rolling histogram (nanoseconds) next to the frame time."""
+        self.watched[label] = hist
+
+    def reset(self):
+        self.totals.clear()
+        self.marks.clear()
+        for name in list(self.samples):
+            self._phase(name)
+        if self.window:
+            self.total_hist = RollingHistogram(self.window)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-phase mean/p50/p99/max in microseconds and share of the frame time."""
+        total = sum(self.totals) or 1
+        out = {}
+        for name, q in self.samples.items():
+            n = len(q) or 1
+            out[name] = {
+                'mean_us': round(sum(q) / n / 1000, 2),
+                'p50_us': round(percentile(q, 50) / 1000, 2),
+                'p99_us': round(percentile(q, 99) / 1000, 2),
+                'max_us': round(max(q, default=0) / 1000, 2),
+                'share': round(sum(q) / total, 4),
+            }
+            if self.track_alloc:
+                out[name]['alloc_bytes'] = round(sum(self.allocs[name]) / n)
+        return out
+
+    def hud(self, width: int = 80, every: int = 15) -> str:
+        """One-line p50/p99 (ms) readout of the rolling window, slowest phases first.
+
+        The text is rebuilt every `every` calls; in between the last one is returned.
+        """
+        if not self.total_hist:
+            return ''
+        self._hud_age -= 1
+        if self._hud and self._hud_age > 0:
+            return self._hud[:width]
+        self._hud_age = every
+        p50, p99 = self.total_hist.percentiles(50, 99)
+        parts = [f"PERF ms p50/p99 frame {p50 / 1e6:.1f}/{p99 / 1e6:.1f}"]
+        for label, h in self.watched.items():
+            if len(h):
+                a, b = h.percentiles(50, 99)
+                parts[0] += f" {label} {a / 1e6:.1f}/{b / 1e6:.1f}"
+        rows = [(name, *h.percentiles(50, 99)) for name, h in self.hists.items()]
+        rows.sort(key=lambda r: r[2], reverse=True)
+        parts += [f"{name} {a / 1e6:.2f}/{b / 1e6:.2f}" for name, a, b in rows if b]
+        self._hud = ' | '.join(parts[:2]) + (' ' + ' '.join(parts[2:]) if len(parts) > 2 else '')
+        return self._hud[:width]
+
+    def dump(self, path: str):
+        """Write the kept frames as a trace: CSV (one row per frame) or JSON (by extension)."""
+        names = list(self.samples)
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as fh:
+                w = csv.writer(fh)
+                w.writerow(['frame', 'total_ns'] + [f'{n}_ns' for n in names])
+                cols = [self.samples[n] for n in names]
+                for row in zip(self.marks, self.totals, *cols):
+                    w.writerow(row)
+            return
+        trace = {
+            'format': 'bvb-profile',
+            'version': 1,
+            'frames': list(self.marks),
+            'total_ns': list(self.totals),
+            'phases_ns': {n: list(self.samples[n]) for n in names},
+            'summary': self.summary(),
+            'watched': {label: dict(zip(('p50_ms', 'p99_ms'), (round(v / 1e6, 2) for v in h.percentiles(50, 99))))
+                        for label, h in self.watched.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(trace, fh)
@@ -0,0 +1,165 @@
+# Differential cell-buffer renderer for the BVB terminal UI.
+# The game draws every frame into a back buffer (one char + one SGR
+# attribute string per cell); flush() diffs it against what is already on
+# screen and returns only the escape sequences needed to update the
+# changed runs, instead of clearing and repainting the whole screen.
+from typing import List, Optional
+import re
+
+RESET = "\033[0m"
+CLEAR_SCREEN = "\033[2J"
+
+# Unchanged cells between two dirty runs that we still rewrite rather than
+# paying for a cursor move (`\033[y;xH` is 6-8 bytes).
+RUN_MERGE_GAP = 4
+
+_SGR_RE = re.compile(r"\033\[[0-9;]*m")
+
+
+def parse_ansi(text: str):
+    """Split a string with embedded SGR sequences into (offset, text, sgr) runs.
+
+    Each run starts `offset` cells after the first character and is drawn
+    with the SGR active at that point (RESET maps to '' like in put()).
+    Sprite atlases parse their coloured lines once and draw the runs.
+    """
+    runs = []
+    sgr = ''
+    pos = 0
+    col = 0
+    for m in _SGR_RE.finditer(text):
+        chunk = text[pos:m.start()]
+        if chunk:
+            runs.append((col, chunk, sgr))
+            col += len(chunk)
+        seq = m.group(0)
+        sgr = '' if seq == RESET else seq
+        pos = m.end()
+    chunk = text[pos:]
+    if chunk:
+        runs.append((col, chunk, sgr))
+    return tuple(runs)
+
+
+class Screen:
+    """Front/back cell buffer. Coordinates are 1-based (row, col) like ANSI CUP."""
+
+    def __init__(self, width: int, height: int):
+        self.width = max(1, int(width))
+        self.height = max(1, int(height))
+        self._blank_chars = [' '] * self.width
+        self._blank_attrs = [''] * self.width
+        self._back_chars: List[List[str]] = [list(self._blank_chars) for _ in range(self.height)]
+        self._back_attrs: List[List[str]] = [list(self._blank_attrs) for _ in range(self.height)]
+        self._front_chars: List[List[str]] = [list(self._blank_chars) for _ in range(self.height)]
+        self._front_attrs: List[List[str]] = [list(self._blank_attrs) for _ in range(self.height)]
+        self._needs_clear = True
+        # stats of the last flush (handy for benchmarks/profiling)
+        self.last_bytes = 0
+        self.last_cells = 0
+
+    def resize(self, width: int, height: int):
+        self.__init__(width, height)
+
+    def invalidate(self):
+        """Forget what is on screen: the next flush clears and repaints everything."""
+        for r in range(self.height):
+            self._front_chars[r][:] = self._blank_chars
+            self._front_attrs[r][:] = self._blank_attrs
+        self._needs_clear = True
+
+    def begin_frame(self):
+        """Reset the back buffer to blanks before drawing a new frame."""
+        for r in range(self.height):
+            self._back_chars[r][:] = self._blank_chars
+            self._back_attrs[r][:] = self._blank_attrs
+
+    def put(self, y: int, x: int, text: str, sgr: str = ''):
+        """Write `text` starting at (y, x) with a single SGR attribute; clipped to the screen."""
+        r = y - 1
+        if r < 0 or r >= self.height or not text:
+            return
+        c = x - 1
+        if c < 0:
+            text = text[-c:]
+            c = 0
+        room = self.width - c
+        if room <= 0:
+            return
+        if len(text) > room:
+            text = text[:room]
+        n = len(text)
+        self._back_chars[r][c:c + n] = text
+        self._back_attrs[r][c:c + n] = [sgr] * n
+
+    def put_ansi(self, y: int, x: int, text: str):
+        """Like put() but `text` may embed SGR sequences (e.g. per-char coloured sprite lines)."""
+        self.put_runs(y, x, parse_ansi(text))
+
+    def put_runs(self, y: int, x: int, runs):
+        """Write pre-parsed (offset, text, sgr) runs (see parse_ansi) starting at (y, x)."""
+        for off, text, sgr in runs:
+            self.put(y, x + off, text, sgr)
+
+    def flush(self) -> str:
+        """Diff back against front, make back the new front and return the escape string."""
+        out: List[str] = []
+        if self._needs_clear:
+            out.append(CLEAR_SCREEN)
+            self._needs_clear = False
+        cur_attr = ''
+        cur_row = -1
+        cur_col: Optional[int] = None
+        cells = 0
+        width = self.width
+        for r in range(self.height):
+            bc = self._back_chars[r]
+            ba = self._back_attrs[r]
+            fc = self._front_chars[r]
+            fa = self._front_attrs[r]
+            if bc == fc and ba == fa:
+                continue
+            c = 0
+            while c < width:
+                if bc[c] == fc[c] and ba[c] == fa[c]:
+                    c += 1
+                    continue
+                # extend the run, swallowing short clean gaps
+                end = c + 1
+                gap = 0
+                k = end
+                while k < width and gap <= RUN_MERGE_GAP:
+                    if bc[k] != fc[k] or ba[k] != fa[k]:
+                        end = k + 1
+                        gap = 0
+                    else:
+                        gap += 1
+                    k += 1
+                if cur_row != r:
+                    cur_row = r
+                    cur_col = None
+                for i in range(c, end):
+                    if cur_col != i:
+                        out.append(f"\033[{r + 1};{i + 1}H")
+                    a = ba[i]
+                    if a != cur_attr:
+                        out.append(RESET + a if cur_attr else a)
+                        cur_attr = a
+                    ch = bc[i]
+                    out.append(ch)
+                    cells += 1
+                    # non-ASCII glyph width is terminal-dependent, and the last
+                    # column leaves a pending wrap: re-anchor before the next cell
+                    if ch > '\x7f' or i + 1 >= width:
+                        cur_col = None
+                    else:
+                        cur_col = i + 1
+                c = end
+            fc[:] = bc
+            fa[:] = ba
+        if cur_attr:
+            out.append(RESET)
+        s = ''.join(out)
+        self.last_bytes = len(s.encode('utf-8', 'replace'))
+        self.last_cells = cells
+        return s
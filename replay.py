@@ -0,0 +1,84 @@
+# Input replay files for BVB.
+# A replay stores the RNG seed plus the key events delivered to every
+# simulation tick (GameEngine.step), which is all that is needed to re-run a
+# game bit-exactly. Text format, one record per line:
+#
+#   {"format": "bvb-replay", "version": 1, "seed": 1234, ...}   header (JSON)
+#   57                  57 consecutive ticks without keys
+#   :UP                 one tick with the listed keys (space separated)
+#   :SPACE LEFT
+#   #{"frames": 2210, "digest": "..."}                        trailer (JSON)
+#
+# Idle ticks dominate a game, so runs of them collapse into a single number.
+import json
+from typing import Dict, List, Optional, Tuple
+
+FORMAT = 'bvb-replay'
+VERSION = 1
+
+
+class ReplayWriter:
+    def __init__(self, path: str, header: Dict):
+        self.path = path
+        self.ticks = 0
+        self._idle = 0
+        self._fh = open(path, 'w', encoding='utf-8')
+        head = {'format': FORMAT, 'version': VERSION}
+        head.update(header)
+        self._fh.write(json.dumps(head, sort_keys=True) + '\n')
+
+    def record(self, keys):
+        """Record the keys delivered to one tick (empty/None entries are dropped)."""
+        keys = [k for k in (keys or ()) if k]
+        self.ticks += 1
+        if not keys:
+            self._idle += 1
+            return
+        self._flush_idle()
+        self._fh.write(':' + ' '.join(keys) + '\n')
+
+    def _flush_idle(self):
+        if self._idle:
+            self._fh.write(f'{self._idle}\n')
+            self._idle = 0
+
+    def close(self, trailer: Optional[Dict] = None):
+        if self._fh is None:
+            return
+        self._flush_idle()
+        if trailer:
+            self._fh.write('#' + json.dumps(trailer, sort_keys=True) + '\n')
+        self._fh.close()
+        self._fh = None
+
+
+def read_header(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as fh:
+        head = json.loads(fh.readline())
+    if not isinstance(head, dict) or head.get('format') != FORMAT:
+        raise ValueError(f'{path}: not a {FORMAT} file')
+    if int(head.get('version', 0)) > VERSION:
+        raise ValueError(f'{path}: replay version {head.get("version")} is newer than supported ({VERSION})')
+    return head
+
+
+def load(path: str) -> Tuple[Dict, List[List[str]], Dict]:
+    """Return (header, per-tick key lists, trailer) of a replay file."""
+    header = read_header(path)
+    ticks: List[List[str]] = []
+    trailer: Dict = {}
+    with open(path, 'r', encoding='utf-8') as fh:
+        fh.readline()
+        for lineno, line in enumerate(fh, start=2):
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if line[0] == ':':
+                ticks.append(line[1:].split(' '))
+            elif line[0] == '#':
+                trailer = json.loads(line[1:])
+            elif line.isdigit():
+                ticks.extend([] for _ in range(int(line)))
+            else:
+                raise ValueError(f'{path}:{lineno}: bad replay record {line!r}')
+    return header, ticks, trailer
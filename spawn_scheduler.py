@@ -0,0 +1,108 @@
+# Spawn queue for BVB.
+# The bat and obstacle spawners do not put entities on screen directly: they
+# queue them here, and the frame lets one queued entity in whenever the screen
+# is under MAX_ENTITIES. Every kind has its own deque; pop() serves the kinds
+# in priority order (bats before obstacles), oldest entry first within a kind.
+# A kind whose quota is reached refuses new entries (the spawner retries
+# later), and when the whole backlog would exceed max_backlog the oldest entry
+# of any kind is dropped to make room.
+# Spawn-time random draws that depend on the queue (finding a bat position
+# clear of the bats on screen and in the queue) come from the injected `rng`,
+# the gameplay RNG of the run, so seeded games stay reproducible.
+# backlog / peak / throttled / dropped are the metrics: a backlog that
+# keeps growing while `throttled` counts up means MAX_ENTITIES is holding
+# content back.
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+class SpawnScheduler:
+    def __init__(self, rng, kinds: Sequence[str] = ('bat', 'obstacle'),
+                 quotas: Optional[Dict[str, int]] = None, max_backlog: Optional[int] = None):
+        self.rng = rng
+        self.kinds = tuple(kinds)
+        self._queues: Dict[str, deque] = {k: deque() for k in self.kinds}
+        self._seq = 0
+        self.quotas: Dict[str, int] = {}
+        self.max_backlog: Optional[int] = None
+        self.configure(quotas, max_backlog)
+        self.reset_stats()
+
+    def configure(self, quotas: Optional[Dict[str, int]] = None, max_backlog: Optional[int] = None):
+        """Set the per-kind quotas (None or missing: unlimited) and the total backlog cap."""
+        self.quotas = {k: int(v) for k, v in (quotas or {}).items() if v is not None}
+        self.max_backlog = None if max_backlog is None else max(1, int(max_backlog))
+
+    def reset_stats(self):
+        self.throttled = 0   # frames an entity was waiting but the screen was full
+        self.dropped = 0     # entries pushed out of a full backlog
+        self.peak = 0        # largest backlog seen
+
+    def clear(self):
+        for q in self._queues.values():
+            q.clear()
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def __len__(self) -> int:
+        return self.backlog
+
+    def count(self, kind: str) -> int:
+        return len(self._queues[kind])
+
+    def full(self, kind: str) -> bool:
+        """True when `kind` has used up its quota."""
+        quota = self.quotas.get(kind)
+        return quota is not None and len(self._queues[kind]) >= quota
+
+    def push(self, kind: str, entity) -> bool:
+        """Queue `entity`; False (and nothing queued) when the kind's quota is full."""
+        if self.full(kind):
+            return False
+        self._seq += 1
+        self._queues[kind].append((self._seq, entity))
+        if self.max_backlog is not None:
+            while self.backlog > self.max_backlog:
+                self._drop_oldest()
+        self.peak = max(self.peak, self.backlog)
+        return True
+
+    def _drop_oldest(self):
+        oldest = min((q for q in self._queues.values() if q), key=lambda q: q[0][0])
+        oldest.popleft()
+        self.dropped += 1
+
+    def pop(self) -> Optional[Tuple[str, object]]:
+        """Next (kind, entity) to spawn by priority, or None when nothing is queued."""
+        for kind in self.kinds:
+            q = self._queues[kind]
+            if q:
+                return kind, q.popleft()[1]
+        return None
+
+    def queued(self, kind: str) -> Iterator:
+        """The queued entities of `kind`, oldest first."""
+        return (entity for _, entity in self._queues[kind])
+
+    def place(self, lo: int, hi: int, taken: Iterable[int], separation: int, attempts: int) -> Optional[int]:
+        """Draw up to `attempts` positions in [lo, hi] until one is at least `separation` from all `taken`."""
+        taken = list(taken)
+        for _ in range(attempts):
+            x = self.rng.randint(lo, hi)
+            if all(abs(x - t) >= separation for t in taken):
+                return x
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        out = {'backlog': self.backlog, 'peak': self.peak, 'throttled': self.throttled,
+               'dropped': self.dropped}
+        for kind in self.kinds:
+            out[kind] = len(self._queues[kind])
+        return out
+
+    def __repr__(self) -> str:
+        # no rng here: this text goes into the state digest
+        return (f"SpawnScheduler({ {k: [e for _, e in q] for k, q in self._queues.items()}!r}, "
+                f"{self.stats()!r})")
@@ -10,6 +10,14 @@ import time
 import os
 import random
 import argparse
+import shutil
+import copy
+import hashlib
+import heapq
+import math
+from array import array
+from collections import deque
+from bisect import bisect_right
 try:
     import yaml
 except Exception:
@@ -18,31 +26,57 @@ try:
     import jsonschema
 except Exception:
     jsonschema = None
+try:
+    import numpy as np
+except Exception:
+    np = None
 try:
     import firebase_client
 except Exception:
     firebase_client = None
-import threading
-
-
-def _safe_call(func, *a, **kw):
-    try:
-        func(*a, **kw)
-    except Exception:
-        pass
-
+from renderer import Screen, parse_ansi
+from lane_index import LaneIndex
+from entity_store import EntityStore
+from spawn_scheduler import SpawnScheduler
+from achievement_index import AchievementIndex
+from combo_matcher import ComboMatcher, ComboPattern, Step
+from frame_scheduler import FrameScheduler
+from profiler import NullTimer, PhaseTimer, percentile
+from input_reader import InputReader, PollingReader
+import replay
+
+
+# Parse CLI args (allow other args to pass through). Parsed up front because
+# the seed is needed before the initial lane shuffle below.
+parser = argparse.ArgumentParser(add_help=False)
+parser.add_argument('--config', help='Path to YAML config file to override defaults')
+parser.add_argument('--seed', type=int, help='Seed for the game RNG (same seed + same keys = same game)')
+parser.add_argument('--record', metavar='PATH', help='Record a replay of this game to PATH')
+parser.add_argument('--replay', metavar='PATH', help='Re-simulate a recorded game headlessly and exit')
+parser.add_argument('--profile', action='store_true', help='Time the main loop phases (perf overlay + trace at exit)')
+parser.add_argument('--profile-out', metavar='PATH', help='Where --profile writes its trace (.json or .csv)')
+args, _rest = parser.parse_known_args()
 
-def background_call(func, *a, **kw):
-    try:
-        t = threading.Thread(target=_safe_call, args=(func,)+a, kwargs=kw, daemon=True)
-        t.start()
-    except Exception:
-        pass
+replay_header = None
+if args.replay:
+    replay_header = replay.read_header(args.replay)
+    game_seed = int(replay_header.get('seed', 0))
+elif args.seed is not None:
+    game_seed = args.seed
+elif _rest[:1] in (['bench'], ['simulate']):
+    # benchmark/simulation runs are only comparable on the same worlds
+    game_seed = 0
+else:
+    game_seed = random.SystemRandom().randrange(2 ** 32)
+# Every gameplay random draw goes through `rng` (bound from the active
+# GameState), so a run is fully determined by its seed and key events.
+# Purely cosmetic draws in the renderer use `fx_rng` and never touch it.
+rng = random.Random(game_seed)
+fx_rng = random.Random()
 # Loot selection logic with dynamic egg probability and new eggs
 def choose_loot_type(rarity):
     # Count empty lanes (no bird)
-    empty_lanes = [lane for lane in range(NUM_LANES) if lane not in random_lanes or all(ball_lost[idx] or random_lanes[idx] != lane for idx in range(NUM_BALLS))]
-    num_empty = len(empty_lanes)
+    num_empty = len(state.empty_lanes)
     # Egg probability by empty lanes (configurable EGG_PROBS)
     # Support either dict {empty_count: prob} or legacy list/tuple.
     egg_prob = 0.0
@@ -81,7 +115,7 @@ def choose_loot_type(rarity):
     else:  # epic
         loot_pool = ['egg', 'wide_cursor_max', 'tailwind_max', 'shuffle++']
     # Decide whether to drop an egg (based on empty lanes)
-    if random.random() < egg_prob:
+    if rng.random() < egg_prob:
         # Egg selection by rarity (rare tier may include gold_egg)
         # We must respect on-field limits per bird TYPE to avoid overspawning
         # Map egg name -> bird color constant
@@ -169,20 +203,20 @@ def choose_loot_type(rarity):
         # If there are allowed egg candidates, pick one with weights
         if allowed_candidates:
             # Use random.choices to pick respecting weights
-            return random.choices(allowed_candidates, weights=allowed_weights)[0]
+            return rng.choices(allowed_candidates, weights=allowed_weights)[0]
 
         # No egg candidate is allowed due to on-field limits — fallback to non-egg loot
         non_egg = [p for p in loot_pool if p != 'egg']
         if not non_egg:
             # As ultimate fallback, return a safe common egg
             return 'yellow_egg'
-        return random.choice(non_egg)
+        return rng.choice(non_egg)
     else:
         # Return a non-egg loot (power-up)
         non_egg = [p for p in loot_pool if p != 'egg']
         if not non_egg:
             return 'yellow_egg'
-        return random.choice(non_egg)
+        return rng.choice(non_egg)
 if os.name == 'nt':
     import msvcrt
 else:
@@ -330,13 +364,23 @@ OBSTACLE_SPRITE = [
 ]
 
 # Color helpers: map HP ratio to RGB truecolor escape
+_truecolor = None
+
+
+def terminal_truecolor() -> bool:
+    """Whether the terminal likely supports truecolor (COLORTERM hint); checked once."""
+    global _truecolor
+    if _truecolor is None:
+        try:
+            ct = os.environ.get('COLORTERM', '').lower()
+        except Exception:
+            ct = ''
+        _truecolor = ct in ('truecolor', '24bit')
+    return _truecolor
+
+
 def _rgb_escape(r: int, g: int, b: int) -> str:
-    # Decide if terminal likely supports truecolor (COLORTERM hint).
-    try:
-        ct = os.environ.get('COLORTERM', '').lower()
-    except Exception:
-        ct = ''
-    truecolor = ct in ('truecolor', '24bit')
+    truecolor = terminal_truecolor()
 
     # Clamp values
     r = max(0, min(255, int(r)))
@@ -357,7 +401,15 @@ def _rgb_escape(r: int, g: int, b: int) -> str:
     code = _rgb_to_256(r, g, b)
     return f"\033[38;5;{code}m"
 
+# (base_rgb, hp, max_hp) -> escape; HP values are small integers, so this stays small
+_hp_colors = {}
+
+
 def _color_from_hp(base_rgb: tuple, hp: int, max_hp: int) -> str:
+    key = (base_rgb, hp, max_hp)
+    color = _hp_colors.get(key)
+    if color is not None:
+        return color
     hp_percentage = hp / max_hp if max_hp > 0 else 0
     try:
         r = int(base_rgb[0] * hp_percentage)
@@ -365,7 +417,11 @@ def _color_from_hp(base_rgb: tuple, hp: int, max_hp: int) -> str:
         b = int(base_rgb[2] * hp_percentage)
     except Exception:
         r = g = b = 0
-    return _rgb_escape(r, g, b)
+    color = _rgb_escape(r, g, b)
+    if len(_hp_colors) >= 4096:
+        _hp_colors.clear()
+    _hp_colors[key] = color
+    return color
 
 
 def _render_patchwork_line(line: str) -> str:
@@ -414,6 +470,104 @@ def _render_clockwork_line(line: str, charge: int, blink_on: bool) -> str:
     except Exception:
         return CLOCKWORK + line + RESET
 
+
+# ---------------- Sprite atlas ----------------
+# Loot glyphs and per-character coloured bird sprite lines, keyed by
+# (kind, loot type or sprite line, state). render_frame() draws entries
+# straight from here instead of re-deriving colours per entity per frame.
+# Coloured lines are stored as pre-parsed renderer runs. build_sprite_atlas()
+# fills the common entries at startup; anything else is added on first use.
+_sprite_atlas = {}
+
+# Eggs have a fixed colour; power-ups take the colour of their rarity
+LOOT_EGG_SPRITES = {
+    'yellow_egg': ("⬯", YELLOW),
+    'red_egg': ("⬯", RED),
+    'blue_egg': ("⬯", BLUE),
+    'white_egg': ("⬯", WHITE),
+    'clockwork_egg': ("⬯", CLOCKWORK),
+    'gold_egg': ("⬯", GOLD),
+    'stealth_egg': ("⬯", DARK_GRAY),
+    'patchwork_egg': ("⬯", PATCHWORK),
+    'orange_egg': ("⬯", ORANGE),
+    'cookie_egg': ("⬯", COOKIE),
+    'cookie_crumb': ("•", COOKIE),  # small dot for crumb
+    'dinosaur_egg': ("⬯", DINOSAUR),
+    'glitch_egg': ("⬯", GLITCH),
+}
+# (substring of the loot type, glyph), checked in order
+LOOT_POWERUP_GLYPHS = (
+    ('wide_cursor', "↔"),
+    ('bounce_boost', "↺"),
+    ('suction', "⥥"),
+    ('tailwind', "༄"),  # decorative wind/ornament symbol
+    ('shuffle', "𖦹"),
+)
+LOOT_RARITY_COLORS = {'common': YELLOW, 'uncommon': RED, 'rare': BLUE}  # legendary: WHITE
+
+
+def loot_sprite(loot_type, rarity):
+    """(glyph, color) of a loot item, or None if the type has no sprite."""
+    key = ('loot', loot_type, rarity)
+    try:
+        return _sprite_atlas[key]
+    except KeyError:
+        pass
+    sprite = LOOT_EGG_SPRITES.get(loot_type)
+    if sprite is None:
+        for name, glyph in LOOT_POWERUP_GLYPHS:
+            if name in loot_type:
+                sprite = (glyph, LOOT_RARITY_COLORS.get(rarity, WHITE))
+                break
+    _sprite_atlas[key] = sprite
+    return sprite
+
+
+def patchwork_runs(line):
+    """Renderer runs of a PATCHWORK sprite line."""
+    key = ('patchwork', line)
+    runs = _sprite_atlas.get(key)
+    if runs is None:
+        runs = _sprite_atlas[key] = parse_ansi(_render_patchwork_line(line))
+    return runs
+
+
+def clockwork_runs(line, charge, blink_on):
+    """Renderer runs of a CLOCKWORK sprite line for a charge level and blink phase."""
+    try:
+        level = 2 if charge is None or charge > 1 else (1 if charge == 1 else 0)
+    except Exception:
+        return parse_ansi(_render_clockwork_line(line, charge, blink_on))
+    key = ('clockwork', line, level, bool(blink_on))
+    runs = _sprite_atlas.get(key)
+    if runs is None:
+        runs = _sprite_atlas[key] = parse_ansi(_render_clockwork_line(line, level, blink_on))
+    return runs
+
+
+def build_sprite_atlas():
+    """Pre-render the atlas entries every game needs (called once the config is applied)."""
+    _sprite_atlas.clear()
+    _hp_colors.clear()
+    for loot_type in LOOT_EGG_SPRITES:
+        loot_sprite(loot_type, 'common')
+    for rarity in ('common', 'uncommon', 'rare', 'epic', 'legendary'):
+        for name, _ in LOOT_POWERUP_GLYPHS:
+            for tier in ('', '+', '++', '_max'):
+                loot_sprite(name + tier, rarity)
+    for sprite in (BIRD_UP_1, BIRD_UP_2, BIRD_DOWN_1, BIRD_DOWN_2):
+        for line in sprite:
+            patchwork_runs(line)
+            for level in (0, 1, 2):
+                clockwork_runs(line, level, True)
+                clockwork_runs(line, level, False)
+    try:
+        for tier, max_hp in _OBST_MAX_HP_BY_TIER.items():
+            for hp in range(int(max_hp) + 1):
+                _color_from_hp(_OBST_BASE_RGB, hp, max_hp)
+    except Exception:
+        pass
+
 # Base colors (full HP)
 _BATS_BASE_RGB = (255, 0, 255)   # magenta FF00FF
 _OBST_BASE_RGB = (0, 255, 0)     # green 00FF00
@@ -546,6 +700,7 @@ PRESTIGE_MODIFIERS = {
     'A2': 1.0,
     'S': 5.0,
 }
+_DEFAULT_PRESTIGE_MODIFIERS = dict(PRESTIGE_MODIFIERS)
 # Multiplier factor used when adjusting rarity weights: factor = 1 + prestige * PRESTIGE_RARITY_FACTOR
 PRESTIGE_RARITY_FACTOR = 0.1
 
@@ -596,6 +751,12 @@ CLOCKWORK_MAX_CHARGE = 3
 DINOSAUR_SPRITE_HEIGHT = 3
 NORMAL_BIRD_SPRITE_HEIGHT = 2
 
+# Main loop profiling (also turned on by --profile)
+PROFILE_ENABLED = False
+PROFILE_OUT = 'bvb_profile.json'  # trace written at exit (.json or .csv)
+PROFILE_HISTORY = 3600  # frames kept for the trace
+PROFILE_WINDOW = 120  # frames behind the overlay percentiles
+
 # Collision/hitbox constants
 LANE_COLLISION_HALF_WIDTH = 2  # Bird lane collision half-width
 LOOT_COLLECTION_DISTANCE = 2  # Max distance for loot collection (both X and Y)
@@ -703,7 +864,7 @@ OBSTACLE_SPAWN_VARIANCE_MIN = 10  # Minimum variance
 OBSTACLE_SPAWN_VARIANCE_LEVEL_MULTIPLIER = 2  # How much to reduce variance per level
 OBSTACLE_RETRY_TIMER_DIVISOR = 2  # When spawn fails, retry after base_spawn_rate // this
 OBSTACLE_RETRY_TIMER_MIN = 5  # Minimum retry timer
-OBSTACLE_CONSECUTIVE_SPAWN_LIMIT = 2  # Max consecutive obstacle spawns in queue
+OBSTACLE_CONSECUTIVE_SPAWN_LIMIT = 2  # Max obstacles waiting in the spawn queue
 
 # Obstacle tier weights (4 weight values per tier for different level ranges)
 OBSTACLE_TIER_WEIGHTS_LEVEL_0_2 = [70, 20, 8, 2]  # Level 0-2
@@ -755,8 +916,8 @@ BAT_SPAWN_X_MIN = 1  # Min X position for bat spawn
 BAT_SPAWN_X_MARGIN = 9  # Margin from right edge (bat is 8 chars wide + 1)
 BAT_MIN_SEPARATION = 15  # Minimum distance between bats
 BAT_SPAWN_FAIL_RETRY_TIMER = 50  # Timer when spawn position not found
-BAT_CONSECUTIVE_SPAWN_LIMIT = 2  # Max consecutive bat spawns in queue
-BAT_CONSECUTIVE_RETRY_TIMER = 20  # Timer when consecutive limit reached
+BAT_CONSECUTIVE_SPAWN_LIMIT = 2  # Max bats waiting in the spawn queue
+BAT_CONSECUTIVE_RETRY_TIMER = 20  # Timer when that limit is reached
 BAT_SPAWN_Y_START = 1  # Starting Y position for bat spawn
 SHUFFLE_LEVEL_PLUSPLUS = 3  # shuffle++: 6 birds
 SHUFFLE_LEVEL_MAX = 4  # shuffle_max: all outer birds
@@ -771,6 +932,8 @@ KEY_PAUSE = 'p'
 KEY_PAUSE_ALT = 'P'
 KEY_TOGGLE_XP = 'x'
 KEY_TOGGLE_XP_ALT = 'X'
+KEY_TOGGLE_PERF = 'o'
+KEY_TOGGLE_PERF_ALT = 'O'
 KEY_QUIT = 'QUIT'
 
 
@@ -816,10 +979,9 @@ while len(ball_colors) < NUM_BALLS:
     ball_colors.append(YELLOW)
 
 # Randomize which bird goes to which lane
-random.seed()
 random_lanes = list(range(NUM_LANES))  # [0, 1, 2, 3, 4, 5, 6, 7, 8]
 if RANDOMIZE_LANES:
-    random.shuffle(random_lanes)  # Shuffle to randomize
+    rng.shuffle(random_lanes)  # Shuffle to randomize
 
 ball_cols = [LANE_POSITIONS[random_lanes[i]] for i in range(NUM_BALLS)]
 # All birds start at the same height, near the bottom (4 lines from bottom)
@@ -832,191 +994,617 @@ bird_power_used = [False] * NUM_BALLS  # Track if bird used its special power wh
 bird_power_uses = [0] * NUM_BALLS
 
 
-def set_ball_vy(idx, val):
-    """Safely set vertical velocity for bird idx.
+# ---------------- Game state ----------------
+# Entity records use fixed attribute sets (__slots__) instead of one dict per
+# entity. They keep the mapping protocol (rec['hp'], rec.get('tier')) that the
+# main loop uses everywhere, so existing call sites keep working.
+class _Record:
+    __slots__ = ()
 
-    When a PURPLE bird is actively charging (purple_state == 2) or is in the
-    immediate post-fire protection window (purple_just_fired_frames > 0), we
-    must avoid overwriting its stored vertical velocity to prevent flips and
-    unintended motion. This helper centralizes that guard.
+    def __init__(self, **fields):
+        for k, v in fields.items():
+            setattr(self, k, v)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return [k for k in self.__slots__ if hasattr(self, k)]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.keys()]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class Bat(_Record):
+    __slots__ = ('x_pos', 'y_pos', 'target_y', 'tier', 'hp', 'max_hp', 'direction', 'wave_offset', 'spawn_ts')
+
+
+class Obstacle(_Record):
+    __slots__ = ('lane', 'y_pos', 'tier', 'hp', 'spawn_ts')
+
+
+class Loot(_Record):
+    __slots__ = ('x_pos', 'y_pos', 'type', 'rarity', 'xp', 'spawn_ts', 'bird')   # bird: owner of an orange egg
+
+
+class Projectile(_Record):
+    __slots__ = ('x_pos', 'y_pos', 'lane', 'damage', 'powered', 'owner', 'speed', 'color')
+
+
+# Per-bird numeric columns kept in compact typed arrays: (name, typecode)
+_BIRD_ARRAY_COLUMNS = (
+    ('random_lanes', 'i'),
+    ('ball_cols', 'i'),
+    ('ball_y', 'i'),
+    ('ball_vy', 'b'),
+    ('ball_lost', 'b'),
+    ('ball_speeds', 'i'),
+    ('bird_power_used', 'b'),
+    ('bird_power_uses', 'i'),
+    ('per_bird_xp', 'd'),
+    ('transformed_s', 'b'),
+    ('purple_state', 'b'),
+    ('purple_primed_frame', 'i'),
+    ('purple_charge_started_frame', 'i'),
+    ('purple_miss_count', 'i'),
+    ('purple_just_fired_frames', 'i'),
+    ('purple_hold_counter', 'i'),
+)
+# Per-bird columns that hold non-numeric values (colour escapes, None)
+_BIRD_LIST_COLUMNS = ('ball_colors', 'purple_saved_vy')
+# Per-bird timers/counters keyed by bird index, entity lists and power-up flags
+_STATE_CONTAINERS = (
+    'speed_boosts', 'dinosaur_up_presses', 'scared_birds', 'stealth_timers',
+    'stealth_prev_speeds', 'clockwork_charge', 'cookie_crumbs_made',
+    'obstacles', 'bats', 'loot_items', 'red_projectiles', 'spawn_queue',
+    'powerups', 'despawn_heap', 'orange_eggs',
+)
+# Run scalars: plain attributes of the state (state.score, state.level, ...)
+_STATE_SCALARS = (
+    'score', 'level', 'lives', 'game_over', 'swaps_used', 'paused',
+    'frame_count', 'player_lane', 'selected_lane', 'last_space_state',
+    'last_up_state', 'obstacle_spawn_timer', 'bat_spawn_timer',
+    'up_hold_counter', 'up_miss_counter', 'original_alive_frames',
+    'sim_time',
+)
+
+
+class GameState:
+    """All mutable state of one run: per-bird columns, timers, entities and run scalars.
+
+    Numeric per-bird columns are `array.array` buffers; bats, obstacles, loot
+    and projectiles are __slots__ records; the run scalars (score, level,
+    lives, frame_count, ...) are attributes, which the main loop reads and
+    writes as state.score etc. bind_state() makes a state the active one and
+    points the module-level column and container names (ball_y, bats, ...) at
+    its buffers, so the main loop indexes them directly. snapshot()
+    deep-copies a state.
     """
-    try:
-        if 0 <= int(idx) < NUM_BALLS:
-            if purple_state[idx] == 2 or (purple_just_fired_frames and purple_just_fired_frames[idx] > 0):
-                return
-            ball_vy[idx] = val
-    except Exception:
+
+    __slots__ = (('num_balls', 'lane_index', 'rng', 'prestige_cache', 'grade_hi', 'roster_version',
+                  'num_lanes', 'lane_birds', 'empty_lanes')
+                 + tuple(name for name, _ in _BIRD_ARRAY_COLUMNS)
+                 + _BIRD_LIST_COLUMNS + _STATE_CONTAINERS + _STATE_SCALARS)
+
+    @classmethod
+    def from_globals(cls):
+        """Build a state from the module-level columns (as set up by the config loader)."""
+        g = globals()
+        st = cls.__new__(cls)
+        st.num_balls = NUM_BALLS
+        for name, code in _BIRD_ARRAY_COLUMNS:
+            setattr(st, name, array(code, g[name]))
+        for name in _BIRD_LIST_COLUMNS:
+            setattr(st, name, list(g[name]))
+        for name in _STATE_CONTAINERS:
+            setattr(st, name, g[name])
+        # The run scalars move onto the state: without the module-level
+        # defaults a bare `score` fails loudly instead of reading a stale copy
+        for name in _STATE_SCALARS:
+            setattr(st, name, g.pop(name))
+        st.rng = rng
+        st.prestige_cache = None
+        # bumped whenever a bird's lost flag or colour changes (prestige cache key)
+        st.roster_version = 0
+        # per bird: XP at which its grade changes next (prestige cache key)
+        st.grade_hi = [-1.0] * st.num_balls
+        # Collision queries use the bucket of the relevant lane. The band is
+        # never narrower than the hard-coded widths used by the projectile and
+        # bat-vs-obstacle checks, so buckets are always a superset.
+        st.lane_index = LaneIndex(LANE_POSITIONS,
+                                  max(2, int(LANE_COLLISION_HALF_WIDTH)),
+                                  max(8, int(BAT_SPRITE_WIDTH)))
+        for bat in st.bats:
+            st.lane_index.add_bat(bat)
+        for obs in st.obstacles:
+            st.lane_index.add_obstacle(obs)
+        st.rebuild_lane_map()
+        return st
+
+    def snapshot(self):
+        """Return an independent deep copy of this state (scalars included)."""
+        return copy.deepcopy(self)
+
+    def digest(self):
+        """Stable hash of the whole state (including the RNG), used to verify replays."""
+        h = hashlib.sha1()
+        h.update(repr(sorted((name, getattr(self, name)) for name in _STATE_SCALARS)).encode())
+        for name, _ in _BIRD_ARRAY_COLUMNS:
+            h.update(getattr(self, name).tobytes())
+        for name in _BIRD_LIST_COLUMNS + _STATE_CONTAINERS:
+            h.update(repr(getattr(self, name)).encode())
+        h.update(repr(self.rng.getstate()).encode())
+        return h.hexdigest()
+
+    def spawn_bat(self, bat):
+        handle = self.bats.add(bat)
+        self.lane_index.add_bat(bat)
+        self.schedule_despawn(bat, _DESPAWN_BAT, handle)
+
+    def remove_bat(self, bat):
+        """Remove a bat from the world (ValueError if it is already gone)."""
+        self.bats.remove(bat)
+        self.lane_index.remove_bat(bat)
+
+    def spawn_obstacle(self, obs):
+        self.obstacles.add(obs)
+        self.lane_index.add_obstacle(obs)
+
+    def remove_obstacle(self, obs):
+        """Remove an obstacle from the world (ValueError if it is already gone)."""
+        self.obstacles.remove(obs)
+        self.lane_index.remove_obstacle(obs)
+
+    def spawn_loot(self, loot):
+        """Drop a loot item (egg, power-up, crumb); returns its handle in loot_items."""
+        handle = self.loot_items.add(loot)
+        self.schedule_despawn(loot, _DESPAWN_LOOT, handle)
+        if loot.get('type') == 'orange_egg' and loot.get('bird') is not None:
+            self.orange_eggs[loot['bird']] = handle
+        return handle
+
+    def orange_egg(self, bird):
+        """The orange egg laid by `bird` if it is still on screen, else None."""
+        return self.loot_items.get(self.orange_eggs.get(bird, 0))
+
+    # Despawn timers: despawn_heap is a min-heap of (expiry, kind, handle) on
+    # the game clock (sim_time), so a frame only looks at the entries that are
+    # due. Entities that went away earlier leave their entry behind; it is
+    # skipped when popped because the handle no longer resolves.
+    def schedule_despawn(self, ent, kind, handle):
+        ttl = BAT_DESPAWN_TIME if kind == _DESPAWN_BAT else LOOT_DESPAWN_TIME
         try:
-            # best-effort fallback
-            ball_vy[idx] = val
+            ts = ent.get('spawn_ts')
+            if ts is not None:
+                heapq.heappush(self.despawn_heap, (float(ts) + ttl, kind, handle))
         except Exception:
+            # malformed spawn_ts: never despawned
             pass
 
-def reset_bird_power(idx):
-    try:
-        bird_power_used[idx] = False
-    except Exception:
-        pass
-    try:
-        bird_power_uses[idx] = 0
-    except Exception:
-        pass
+    def expired(self, now):
+        """Pop the bats and loot whose despawn time has passed: yields (kind, entity) by expiry."""
+        heap = self.despawn_heap
+        stores = (self.bats, self.loot_items)
+        while heap and heap[0][0] < now:
+            _, kind, handle = heapq.heappop(heap)
+            ent = stores[kind].get(handle)
+            if ent is not None:
+                yield kind, ent
+
+    def compact(self):
+        """Drop the entities removed this frame from the entity stores."""
+        for store in (self.bats, self.obstacles, self.loot_items, self.red_projectiles):
+            store.compact()
+
+    # Lane <-> bird map. random_lanes maps bird -> lane; lane_birds is its
+    # inverse and empty_lanes holds the lanes without a living bird. Both are
+    # kept in sync by swap_lanes() and set_lost(), so lane lookups never scan.
+    def shuffle_lanes(self):
+        """Deal the birds to the lanes in a new random order (drawn from self.rng)."""
+        lanes = list(range(len(self.random_lanes)))
+        self.rng.shuffle(lanes)
+        self.random_lanes[:] = array('i', lanes)
+        for i in range(self.num_balls):
+            self.ball_cols[i] = LANE_POSITIONS[lanes[i]]
+        self.rebuild_lane_map()
+
+    def rebuild_lane_map(self):
+        self.num_lanes = NUM_LANES
+        self.lane_birds = {}
+        for i, lane in enumerate(self.random_lanes):
+            self.lane_birds.setdefault(lane, i)
+        self.empty_lanes = set()
+        for lane in range(self.num_lanes):
+            self._refresh_lane(lane)
+
+    def _refresh_lane(self, lane):
+        i = self.lane_birds.get(lane, -1)
+        if 0 <= i < self.num_balls and not self.ball_lost[i]:
+            self.empty_lanes.discard(lane)
+        elif 0 <= lane < self.num_lanes:
+            self.empty_lanes.add(lane)
+
+    def bird_in_lane(self, lane):
+        """Index of the bird assigned to `lane` (lost or not), -1 if none."""
+        return self.lane_birds.get(lane, -1)
+
+    def swap_lanes(self, i, j):
+        """Exchange the lanes of birds i and j."""
+        rl = self.random_lanes
+        rl[i], rl[j] = rl[j], rl[i]
+        self.lane_birds[rl[i]] = i
+        self.lane_birds[rl[j]] = j
+        self._refresh_lane(rl[i])
+        self._refresh_lane(rl[j])
+
+    def set_lost(self, i, lost):
+        """Mark bird i as lost (or back in play) and update the empty lanes."""
+        self.ball_lost[i] = lost
+        self.roster_version += 1
+        self._refresh_lane(self.random_lanes[i])
+
+    def set_color(self, i, color):
+        """Recolour bird i (egg hatches, GLITCH copies, S transforms)."""
+        self.ball_colors[i] = color
+        self.roster_version += 1
+
+    def set_ball_vy(self, idx, val):
+        """Set vertical velocity for bird idx.
+
+        When a PURPLE bird is actively charging (purple_state == 2) or is in the
+        immediate post-fire protection window (purple_just_fired_frames > 0), we
+        must avoid overwriting its stored vertical velocity to prevent flips and
+        unintended motion. This helper centralizes that guard.
+        """
+        if self.purple_state[idx] == 2 or self.purple_just_fired_frames[idx] > 0:
+            return
+        self.ball_vy[idx] = val
 
-def allow_consume_power(idx, allowed_uses=1):
-    """Return True and consume one use if bird idx may use its power.
+    def reset_bird_power(self, idx):
+        self.bird_power_used[idx] = False
+        self.bird_power_uses[idx] = 0
 
-    allowed_uses is normally 1; for A-grade birds allowed_uses will be 2.
-    """
-    try:
-        if bird_power_uses[idx] < allowed_uses:
-            bird_power_uses[idx] += 1
-            bird_power_used[idx] = True
-            return True
-    except Exception:
-        pass
-    return False
+    def allow_consume_power(self, idx, allowed_uses=1):
+        """Return True and consume one use if bird idx may use its power.
 
+        allowed_uses is normally 1; for A-grade birds allowed_uses will be 2.
+        """
+        if self.bird_power_uses[idx] < allowed_uses:
+            self.bird_power_uses[idx] += 1
+            self.bird_power_used[idx] = True
+            return True
+        return False
 
-def get_scared_frames(bird_idx, base_seconds=2.0):
-    """Return number of frames for scared_birds for bird_idx.
+    def get_scared_frames(self, bird_idx, base_seconds=2.0):
+        """Return number of frames for scared_birds for bird_idx.
 
-    Base_seconds is the default duration in seconds. Birds with grade B1 or
-    better (B1+, i.e. B1/B2/A1/A2/S) have the duration reduced by 1 second.
-    Result is at least 1 frame.
-    """
-    try:
+        Base_seconds is the default duration in seconds. Birds with grade B1 or
+        better (B1+, i.e. B1/B2/A1/A2/S) have the duration reduced by 1 second.
+        Result is at least 1 frame.
+        """
         # convert to int frames
         base_frames = max(1, int(base_seconds / base_sleep))
-    except Exception:
-        try:
-            base_frames = max(1, int(float(base_seconds) / base_sleep))
-        except Exception:
-            base_frames = 1
-
-    try:
-        label, _ = compute_grade_from_xp(per_bird_xp[bird_idx])
-    except Exception:
-        label = None
-
-    try:
+        label, _ = compute_grade_from_xp(self.per_bird_xp[bird_idx])
         # reduce by 1 second worth of frames if grade is B1 or better
-        if isinstance(label, str) and (label.startswith('B') or label.startswith('A') or label == 'S'):
+        if label.startswith('B') or label.startswith('A') or label == 'S':
             reduce_frames = max(0, int(1.0 / base_sleep))
             base_frames = max(1, base_frames - reduce_frames)
-    except Exception:
-        pass
+        return base_frames
 
-    return base_frames
+    def transform_bird_to_s(self, bi):
+        """If bird bi reached S grade, transform its color and mark it so it won't produce eggs.
 
+        Mapping implemented:
+          BLUE -> WHITE
+          RED  -> ORANGE
+          YELLOW -> GOLD
 
-def transform_bird_to_s(bi):
-    """If bird bi reached S grade, transform its color and mark it so it won't produce eggs.
+        This function is idempotent and safe to call repeatedly.
+        """
+        if self.transformed_s[bi]:
+            return
+        label, _ = compute_grade_from_xp(self.per_bird_xp[bi])
+        if label != 'S':
+            return
+        old = self.ball_colors[bi]
+        # Decide target color and speed
+        if old == BLUE:
+            target_color, target_speed = WHITE, int(BALL_SPEEDS_DEFAULT.get('WHITE', 4))
+        elif old == RED:
+            target_color, target_speed = ORANGE, int(BALL_SPEEDS_DEFAULT.get('ORANGE', 5))
+        elif old == YELLOW:
+            target_color, target_speed = GOLD, int(BALL_SPEEDS_DEFAULT.get('GOLD', 6))
+        else:
+            # No mapping for this color: mark as transformed but do not change color
+            self.transformed_s[bi] = True
+            return
 
-    Mapping implemented:
-      BLUE -> WHITE
-      RED  -> ORANGE
-      YELLOW -> GOLD
+        # Count active birds of the target color; limit None means unlimited
+        limit = TRANSFORM_LIMITS.get(target_color)
+        cnt = sum(1 for j in range(self.num_balls) if not self.ball_lost[j] and self.ball_colors[j] == target_color)
+        if limit is None or cnt < limit:
+            self.set_color(bi, target_color)
+            self.ball_speeds[bi] = target_speed
+            self.transformed_s[bi] = True
+            add_notification(f"BIRD {self.random_lanes[bi]+1}: S-Tier TRANSFORM!")
+        else:
+            # Cannot transform due to limit; leave transformed_s False
+            add_notification("S-Tier limit reached for this color")
+
+    def _move_to_start(self, i):
+        # Update the rendering column and reset the moved bird to the starting line facing up
+        self.ball_cols[i] = LANE_POSITIONS[self.random_lanes[i]]
+        self.ball_y[i] = STARTING_LINE
+        self.set_ball_vy(i, -1)
+        self.reset_bird_power(i)
+
+    def perform_shuffle(self, count: int):
+        """Perform up to `count` smart swaps to compact birds toward the center.
+        Algorithm (greedy):
+        - Prefer moving outer birds into empty lanes close to center (lost slots)
+        - If no empty lanes, swap an outer bird with an inner bird (closer to center)
+        - If no better candidate exists, swap with a random other bird
+        """
+        center = 4
+        moved_indices = set()
+        used_lost_slots = set()
+        for _ in range(max(0, int(count))):
+            # Living bird indices not yet moved in this shuffle
+            living = [i for i in range(self.num_balls) if not self.ball_lost[i]]
+            living_available = [i for i in living if i not in moved_indices]
+            if len(living_available) <= 1:
+                break
 
-    This function is idempotent and safe to call repeatedly.
-    """
-    try:
-        bi = int(bi)
-        if bi < 0 or bi >= NUM_BALLS:
-            return
-    except Exception:
-        return
+            # Pick the living bird farthest from center among those not yet moved
+            living_sorted = sorted(living_available, key=lambda i: abs(self.random_lanes[i] - center), reverse=True)
+            src_idx = living_sorted[0]
+            src_lane = self.random_lanes[src_idx]
 
-    try:
-        if transformed_s[bi]:
+            # Find lost slots (empty lanes) and prefer the empty lane closest to center
+            lost_slots = [i for i in range(self.num_balls) if self.ball_lost[i] and i not in used_lost_slots]
+            if lost_slots:
+                empty_lanes = sorted([self.random_lanes[i] for i in lost_slots], key=lambda l: abs(l - center))
+                target_lane = empty_lanes[0]
+                # find the lost slot index that holds this lane (and not used yet)
+                target_lost_idx = next((li for li in lost_slots if self.random_lanes[li] == target_lane), None)
+                if target_lost_idx is not None:
+                    # Swap lanes between the source bird and the lost slot
+                    self.swap_lanes(src_idx, target_lost_idx)
+                    self._move_to_start(src_idx)
+                    self.ball_cols[target_lost_idx] = LANE_POSITIONS[self.random_lanes[target_lost_idx]]
+                    # Mark both slot and source as used so we don't move them twice
+                    moved_indices.add(src_idx)
+                    used_lost_slots.add(target_lost_idx)
+                    moved_indices.add(target_lost_idx)
+                    continue
+
+            # No empty lanes: try to find an inner living bird to swap with
+            inner_candidates = [i for i in living if i != src_idx and i not in moved_indices and abs(self.random_lanes[i] - center) < abs(src_lane - center)]
+            if inner_candidates:
+                # Choose the one closest to center
+                tgt_idx = sorted(inner_candidates, key=lambda i: abs(self.random_lanes[i] - center))[0]
+            else:
+                # Fallback: swap with a random different living bird
+                other_candidates = [i for i in living if i != src_idx and i not in moved_indices]
+                if not other_candidates:
+                    # nothing left to pick uniquely
+                    break
+                tgt_idx = self.rng.choice(other_candidates)
+            self.swap_lanes(src_idx, tgt_idx)
+            self._move_to_start(src_idx)
+            self._move_to_start(tgt_idx)
+            # Mark moved indices so we don't select them again
+            moved_indices.add(src_idx)
+            moved_indices.add(tgt_idx)
+
+    def add_score(self, amount, by_bird=None):
+        """Add to the run score. If by_bird is provided (bird index), also award XP to that bird.
+
+        amount may be non-integer; XP is credited as int(amount).
+        """
+        # Only score is multiplied by the prestige of the birds on the field
+        self.score += float(amount) * self.compute_prestige()
+        # Award XP when we know which bird earned it (XP not multiplied)
+        if by_bird is not None:
+            self.per_bird_xp[by_bird] += max(0, int(amount))
+            # Grade changes (and S-grade transformation) only happen when
+            # the XP crosses the bird's cached grade boundary
+            self._xp_changed(by_bird)
+        check_achievements_event('score', score=self.score)
+
+    def award_xp(self, bird_idx, xp_amount):
+        """Credit XP to a bird without affecting the score."""
+        self.per_bird_xp[bird_idx] += max(0, int(xp_amount))
+        self._xp_changed(bird_idx)
+
+    def _xp_changed(self, bi):
+        hi = self.grade_hi[bi]
+        if hi == math.inf:
+            # No boundary left to cross (top grade, or a GLITCH/lost bird that
+            # is not in the cached grades): the prestige cannot change, only an
+            # S bird whose transform was held back by a limit is re-checked.
+            if not self.transformed_s[bi]:
+                self.transform_bird_to_s(bi)
             return
-    except Exception:
-        # ensure list exists; defensive
-        try:
-            transformed_s[bi] = False
-        except Exception:
-            pass
+        if self.per_bird_xp[bi] >= hi:
+            self.prestige_cache = None
+            self.transform_bird_to_s(bi)
+
+    def invalidate_prestige(self):
+        self.prestige_cache = None
+
+    def _rebuild_prestige(self):
+        # Deterministic part of the prestige (grades of non-GLITCH birds on the
+        # field) plus the number of GLITCH birds, whose share is random.
+        mod_map = PRESTIGE_MODIFIERS if isinstance(PRESTIGE_MODIFIERS, dict) else _DEFAULT_PRESTIGE_MODIFIERS
+        total = 1.0
+        glitches = 0
+        for i in range(len(self.per_bird_xp)):
+            # Birds left out of the grade part have no boundary to watch; a
+            # roster change (set_lost/set_color) rebuilds the cache anyway
+            if self.ball_lost[i]:
+                self.grade_hi[i] = math.inf
+                continue
+            if self.ball_colors[i] == GLITCH:
+                self.grade_hi[i] = math.inf
+                glitches += 1
+                continue
+            label, _, hi = grade_band(self.per_bird_xp[i])
+            self.grade_hi[i] = hi
+            total += mod_map.get(label, 0.0)
+        self.prestige_cache = (self.roster_version, dict(mod_map), total, glitches)
+        return self.prestige_cache
 
-    try:
-        label, _ = compute_grade_from_xp(per_bird_xp[bi])
-    except Exception:
-        label = None
+    def compute_prestige(self, rng=None):
+        """Compute prestige multiplier based on grades of birds currently on the field.
 
-    try:
-        if label == 'S':
-            old = ball_colors[bi]
-            # Decide target color and speed
-            target_color = None
-            target_speed = None
-            if old == BLUE:
-                target_color = WHITE
-                try:
-                    target_speed = int(BALL_SPEEDS_DEFAULT.get('WHITE', 4))
-                except Exception:
-                    target_speed = 4
-            elif old == RED:
-                target_color = ORANGE
-                try:
-                    target_speed = int(BALL_SPEEDS_DEFAULT.get('ORANGE', 5))
-                except Exception:
-                    target_speed = 5
-            elif old == YELLOW:
-                target_color = GOLD
-                try:
-                    target_speed = int(BALL_SPEEDS_DEFAULT.get('GOLD', 6))
-                except Exception:
-                    target_speed = 6
+        Base prestige is 1. For each active (not-lost) bird, add the modifier for its grade
+        (PRESTIGE_MODIFIERS, D: 0 ... S: 5); each GLITCH bird adds a random 1..7 drawn
+        from `rng` (the game RNG by default).
 
-            # If we have a mapping, check limits before applying
-            if target_color is not None:
-                try:
-                    limit = TRANSFORM_LIMITS.get(target_color, None)
-                except Exception:
-                    limit = None
+        The grade part is cached and rebuilt only when a bird's XP crosses its
+        grade boundary, a bird's lost flag or colour changes (set_lost() and
+        set_color() bump roster_version) or PRESTIGE_MODIFIERS changes.
 
-                try:
-                    # Count active birds of target color (exclude this bird if it is not yet that color)
-                    cnt = 0
-                    for j in range(NUM_BALLS):
-                        try:
-                            if not ball_lost[j] and ball_colors[j] == target_color:
-                                cnt += 1
-                        except Exception:
-                            continue
-                    # If this bird itself is already the target color, include it in the count
-                    if ball_colors[bi] == target_color and not ball_lost[bi]:
-                        # cnt already includes it; nothing else to do
-                        pass
-                except Exception:
-                    cnt = 0
+        Returns a float >= 1.0
+        """
+        cache = self.prestige_cache
+        if cache is None or cache[0] != self.roster_version or cache[1] != PRESTIGE_MODIFIERS:
+            cache = self._rebuild_prestige()
+        total = cache[2]
+        if cache[3]:
+            draw = (rng or self.rng).randint
+            for _ in range(cache[3]):
+                total += float(draw(1, 7))
+        return float(total)
+
+    def deduct_score(self, amount):
+        self.score = max(0, self.score - amount)
+        # Re-evaluate score-based achievements when score changes
+        check_achievements_event('score', score=self.score)
+
+
+state = None
+
+
+def bind_state(st):
+    """Make `st` the active game state and point the module-level column and container names at it."""
+    global state, NUM_BALLS
+    g = globals()
+    for name, _ in _BIRD_ARRAY_COLUMNS:
+        g[name] = getattr(st, name)
+    for name in _BIRD_LIST_COLUMNS + _STATE_CONTAINERS:
+        g[name] = getattr(st, name)
+    g['lane_index'] = st.lane_index
+    g['rng'] = st.rng
+    NUM_BALLS = st.num_balls
+    state = st
+
+
+# Module-level entry points used throughout the main loop; they act on the
+# active state.
+def spawn_loot(loot):
+    return state.spawn_loot(loot)
+
+
+def expired_entities(now):
+    return state.expired(now)
+
+
+def orange_egg_of(bird):
+    return state.orange_egg(bird)
+
+
+def spawn_bat(bat):
+    return state.spawn_bat(bat)
+
+
+def remove_bat(bat):
+    return state.remove_bat(bat)
+
+
+def spawn_obstacle(obs):
+    return state.spawn_obstacle(obs)
+
+
+def remove_obstacle(obs):
+    return state.remove_obstacle(obs)
+
+
+def lane_bird(lane):
+    return state.bird_in_lane(lane)
+
+
+def swap_lanes(i, j):
+    return state.swap_lanes(i, j)
+
+
+def set_bird_lost(i, lost):
+    return state.set_lost(i, lost)
+
+
+def set_bird_color(i, color):
+    return state.set_color(i, color)
+
+
+def set_ball_vy(idx, val):
+    return state.set_ball_vy(idx, val)
+
+
+def reset_bird_power(idx):
+    return state.reset_bird_power(idx)
+
+
+def allow_consume_power(idx, allowed_uses=1):
+    return state.allow_consume_power(idx, allowed_uses)
+
+
+def get_scared_frames(bird_idx, base_seconds=2.0):
+    return state.get_scared_frames(bird_idx, base_seconds)
+
+
+def transform_bird_to_s(bi):
+    return state.transform_bird_to_s(bi)
+
+
+def perform_shuffle(count: int):
+    return state.perform_shuffle(count)
+
+
+def add_score(amount, by_bird=None):
+    return state.add_score(amount, by_bird)
+
+
+def award_xp(bird_idx, xp_amount):
+    return state.award_xp(bird_idx, xp_amount)
+
+
+def compute_prestige(rng=None):
+    return state.compute_prestige(rng)
+
+
+def invalidate_prestige():
+    return state.invalidate_prestige()
+
+
+def deduct_score(amount):
+    return state.deduct_score(amount)
 
-                # If limit is None (unlimited) or cnt < limit we can transform
-                if limit is None or cnt < limit or (ball_colors[bi] == target_color):
-                    try:
-                        ball_colors[bi] = target_color
-                        if target_speed is not None:
-                            ball_speeds[bi] = target_speed
-                        transformed_s[bi] = True
-                        try:
-                            lane = random_lanes[bi]
-                            add_notification(f"BIRD {lane+1}: S-Tier TRANSFORM!")
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
-                else:
-                    # Cannot transform due to limit; leave transformed_s False
-                    try:
-                        add_notification("S-Tier limit reached for this color")
-                    except Exception:
-                        pass
-            else:
-                # No mapping for this color: mark as transformed but do not change color
-                try:
-                    transformed_s[bi] = True
-                except Exception:
-                    pass
-    except Exception:
-        pass
 
 # Assign speeds based on color (higher = faster)
 # Blue: 4 (fastest), Red: 3, Yellow: 2, Obstacles: 1 (slowest)
@@ -1057,8 +1645,8 @@ for color in ball_colors:
         # Defensive fallback
         ball_speeds.append(2)
 
-# Red bird projectiles - list of {x_pos, y_pos, lane}
-red_projectiles = []
+# Red bird projectiles - {x_pos, y_pos, lane, ...} records
+red_projectiles = EntityStore()
 
 # Per-bird experience points (persist per bird index)
 per_bird_xp = [0] * NUM_BALLS
@@ -1066,6 +1654,12 @@ per_bird_xp = [0] * NUM_BALLS
 transformed_s = [False] * NUM_BALLS
 # Debug toggle: show per-bird XP/grade summary in the HUD when True
 show_xp_overlay = False
+# Optional NumPy bird step (plan_bird_step): False = off, True = always,
+# 'auto' = from BIRD_VECTOR_MIN_BIRDS birds on (when NumPy is installed)
+BIRD_VECTOR_MODE = 'auto'
+BIRD_VECTOR_MIN_BIRDS = 64
+# Perf overlay: rolling p50/p99 phase timings below the footer (with --profile)
+show_perf_overlay = True
 
 # Limits by category for transformations/spawns (None = unlimited)
 TRANSFORM_LIMITS = {
@@ -1084,25 +1678,38 @@ TRANSFORM_LIMITS = {
 # Background scroll offset
 bg_offset = 0
 
-# Obstacles - list of {lane, y_pos, tier, hp}
+# Entity stores (see entity_store.py): removal leaves a tombstone, the
+# survivors are compacted once at the end of each frame
+
+# Obstacles - {lane, y_pos, tier, hp} records
 # tier: 1 (dark green, low HP), 2 (medium green, medium HP), 3 (bright green, high HP)
 # HP determines how much damage before breaking
-obstacles = []
+obstacles = EntityStore()
 obstacle_spawn_timer = 0
 
-# Bats - list of {x_pos, y_pos, tier, hp, max_hp, direction, target_y}
+# Bats - {x_pos, y_pos, tier, hp, max_hp, direction, target_y}
 # Bats move horizontally and can be hit by birds from adjacent lanes
-bats = []
+bats = EntityStore()
 bat_spawn_timer = 0
 
-# Loot items - list of {x_pos, y_pos, type}
-loot_items = []
+# Loot items (eggs, power-ups, cookie crumbs) - {x_pos, y_pos, type} records
+loot_items = EntityStore()
+
+# Despawn timers of bats and loot (see GameState.schedule_despawn) and the
+# orange egg laid by each egg-state orange bird: bird -> loot handle
+despawn_heap = []
+orange_eggs = {}
+_DESPAWN_BAT = 0
+_DESPAWN_LOOT = 1
 
 # Spawn queue - entities waiting to spawn when screen is not too crowded
-spawn_queue = []
+# (bats first; see spawn_scheduler.py). Quotas/backlog are applied after the
+# config is loaded.
+spawn_queue = SpawnScheduler(rng)
 
 # Entity limit to prevent buffer overflow
 MAX_ENTITIES = 50  # Max total entities on screen (excluding birds) - greatly increased due to compact sprites
+SPAWN_MAX_BACKLOG = 6  # Max entities waiting in the spawn queue (oldest dropped first)
 
 # Speed boosts - track which birds have temp speed boosts {bird_index: remaining_frames}
 speed_boosts = {}
@@ -1161,137 +1768,39 @@ powerups.setdefault('tailwind_frames', 0)
 powerups.setdefault('tailwind_up_bonus', 0)
 powerups.setdefault('tailwind_down_penalty', 0)
 
+# Score system
+score = 0
+level = 1
+lives = 5
+game_over = False
+swaps_used = 0
+paused = False
 
-def perform_shuffle(count: int):
-    """Perform up to `count` smart swaps to compact birds toward the center.
-    Algorithm (greedy):
-    - Prefer moving outer birds into empty lanes close to center (lost slots)
-    - If no empty lanes, swap an outer bird with an inner bird (closer to center)
-    - If no better candidate exists, swap with a random other bird
-    """
+def _level_threshold(level):
+    """Score threshold for `level` from the baked progression constants."""
+    base, factor = _level_params
     try:
-        center = 4
-        moved_indices = set()
-        used_lost_slots = set()
-        for _ in range(max(0, int(count))):
-            # Living bird indices not yet moved in this shuffle
-            living = [i for i in range(NUM_BALLS) if not ball_lost[i]]
-            living_available = [i for i in living if i not in moved_indices]
-            if len(living_available) <= 1:
-                break
-
-            # Pick the living bird farthest from center among those not yet moved
-            living_sorted = sorted(living_available, key=lambda i: abs(random_lanes[i] - center), reverse=True)
-            src_idx = living_sorted[0]
-            src_lane = random_lanes[src_idx]
+        return int(base ** (factor ** (level + 1)))
+    except Exception:
+        return int(500 ** (1.07 ** (level + 1)))
 
-            # Find lost slots (empty lanes) and prefer the empty lane closest to center
-            lost_slots = [i for i in range(NUM_BALLS) if ball_lost[i] and i not in used_lost_slots]
-            if lost_slots:
-                empty_lanes = sorted([random_lanes[i] for i in lost_slots], key=lambda l: abs(l - center))
-                target_lane = empty_lanes[0]
-                # find the lost slot index that holds this lane (and not used yet)
-                target_lost_idx = next((li for li in lost_slots if random_lanes[li] == target_lane), None)
-                if target_lost_idx is not None:
-                    # Swap lanes between the source bird and the lost slot
-                    random_lanes[src_idx], random_lanes[target_lost_idx] = random_lanes[target_lost_idx], random_lanes[src_idx]
-                    # Update rendering columns and reset moved bird to starting line facing up
-                    try:
-                        ball_cols[src_idx] = LANE_POSITIONS[random_lanes[src_idx]]
-                        ball_y[src_idx] = STARTING_LINE
-                        set_ball_vy(src_idx, -1)
-                        reset_bird_power(src_idx)
-                    except Exception:
-                        pass
-                    try:
-                        ball_cols[target_lost_idx] = LANE_POSITIONS[random_lanes[target_lost_idx]]
-                    except Exception:
-                        pass
-                    # Mark both slot and source as used so we don't move them twice
-                    moved_indices.add(src_idx)
-                    used_lost_slots.add(target_lost_idx)
-                    moved_indices.add(target_lost_idx)
-                    continue
-
-            # No empty lanes: try to find an inner living bird to swap with
-            inner_candidates = [i for i in living if i != src_idx and i not in moved_indices and abs(random_lanes[i] - center) < abs(src_lane - center)]
-            if inner_candidates:
-                # Choose the one closest to center
-                tgt_idx = sorted(inner_candidates, key=lambda i: abs(random_lanes[i] - center))[0]
-                random_lanes[src_idx], random_lanes[tgt_idx] = random_lanes[tgt_idx], random_lanes[src_idx]
-                try:
-                    # Update both moved birds' rendering cols and reset positions to starting line
-                    ball_cols[src_idx] = LANE_POSITIONS[random_lanes[src_idx]]
-                    ball_y[src_idx] = STARTING_LINE
-                    set_ball_vy(src_idx, -1)
-                    reset_bird_power(src_idx)
-                except Exception:
-                    pass
-                try:
-                    ball_cols[tgt_idx] = LANE_POSITIONS[random_lanes[tgt_idx]]
-                    ball_y[tgt_idx] = STARTING_LINE
-                    set_ball_vy(tgt_idx, -1)
-                    reset_bird_power(tgt_idx)
-                except Exception:
-                    pass
-                # Mark moved indices so we don't select them again
-                moved_indices.add(src_idx)
-                moved_indices.add(tgt_idx)
-                continue
-
-            # Fallback: swap with a random different living bird
-            try:
-                other_candidates = [i for i in living if i != src_idx and i not in moved_indices]
-                if not other_candidates:
-                    # nothing left to pick uniquely
-                    break
-                other = random.choice(other_candidates)
-                random_lanes[src_idx], random_lanes[other] = random_lanes[other], random_lanes[src_idx]
-                try:
-                    ball_cols[src_idx] = LANE_POSITIONS[random_lanes[src_idx]]
-                    ball_y[src_idx] = STARTING_LINE
-                    set_ball_vy(src_idx, -1)
-                    reset_bird_power(src_idx)
-                except Exception:
-                    pass
-                try:
-                    ball_cols[other] = LANE_POSITIONS[random_lanes[other]]
-                    ball_y[other] = STARTING_LINE
-                    set_ball_vy(other, -1)
-                    reset_bird_power(other)
-                except Exception:
-                    pass
-                moved_indices.add(src_idx)
-                moved_indices.add(other)
-            except Exception:
-                # Nothing left to do
-                break
-    except Exception:
-        # Defensive: don't allow shuffle to crash the game
-        pass
-
-# Score system
-score = 0
-level = 1
-lives = 5
-game_over = False
-swaps_used = 0
-paused = False
 
 def calculate_level_threshold(level):
     """Calculate score threshold for given level"""
+    i = level - 2
+    if 0 <= i < len(_level_thresholds):
+        return _level_thresholds[i]
     try:
-        # Use configurable game level progression constants
-        base = float(LEVEL_SCORE_BASE) if 'LEVEL_SCORE_BASE' in globals() else 500.0
-        factor = float(LEVEL_SCORE_FACTOR) if 'LEVEL_SCORE_FACTOR' in globals() else 1.07
-        return int(base ** (factor ** (level + 1)))
-    except Exception:
-        return int(500 ** (1.07 ** (level + 1)))
+        return _level_threshold(level)
+    except OverflowError:
+        return math.inf
 
 
 # ---------------- Achievements ----------------
 # Achievements are unlocked by events (score, swaps, loot, destroys).
 achievements = {}
+# Locked achievements indexed by the event that can unlock them (rebuilt by init_achievements)
+achievement_index = AchievementIndex(achievements)
 notifications = []  # list of (text, expire_frame)
 # Notification display time in seconds (each achievement shown one at a time)
 notification_duration_seconds = 3.0
@@ -1306,14 +1815,26 @@ original_indices = list(range(NUM_BALLS))  # track which slots are the original
 # Bat destroy counters (total + per-tier)
 bat_destroy_counters = {'total': 0, 'tier1': 0, 'tier2': 0, 'tier3': 0, 'tier4': 0}
 
-# Recent atomic actions for combo detection: list of dicts {action, frame, lane, color}
-recent_actions = []
+# Colours tracked by the color_count achievements, and the (state,
+# roster_version) the last color_count events were fired for
+ACHIEVEMENT_COLORS = (
+    ('YELLOW', YELLOW), ('RED', RED), ('BLUE', BLUE), ('WHITE', WHITE),
+    ('CLOCKWORK', CLOCKWORK), ('PURPLE', PURPLE), ('ORANGE', ORANGE), ('GOLD', GOLD),
+)
+_color_count_memo = [None]
+
+# Recent atomic actions (last COMBO_WINDOW_FRAMES): deque of dicts {action, frame, lane, color}
+recent_actions = deque()
 # Prevents repeating the same combo too frequently: map combo_id -> expire_frame
 combo_cooldowns = {}
 
 # Combo detection configuration
 COMBO_WINDOW_FRAMES = 200  # time window to look back for sequences
 YELLOW_BLUE_CHAIN_WINDOW = 60  # tighter window for the yellow->blue bounce chain
+# Extra/overriding combo patterns from the `combo.patterns` config section
+COMBO_PATTERNS = []
+# Compiled combo patterns (see compile_combo_patterns)
+combo_matcher = ComboMatcher()
 
 def init_achievements():
     """Define achievements with simple goals."""
@@ -1400,6 +1921,8 @@ def init_achievements():
         'combo_fire_suction_bounce_fire': {'name': 'Elemental Chain', 'desc': 'Perform Fire → Suction → Bounce → Fire combo', 'unlocked': False, 'type': 'special', 'event': 'combo_fire_suction_bounce_fire'},
         'combo_yellow_blue_bounce_chain': {'name': 'Fearless Flip', 'desc': 'Perform the Yellow→Blue bounce chain combo', 'unlocked': False, 'type': 'special', 'event': 'combo_yellow_blue_bounce_chain'},
     }
+    achievement_index.rebuild(achievements)
+    _color_count_memo[0] = None
 
 
 def add_notification(text):
@@ -1412,7 +1935,11 @@ def add_notification(text):
     except Exception:
         # Fallback to a sensible default if base_sleep not available yet
         frames = 40
-    notifications.append((text, frame_count + frames))
+    notifications.append((text, state.frame_count + frames))
+    try:
+        emit_event('notification', text=text)
+    except NameError:
+        pass
 
 
 def unlock_achievement(aid):
@@ -1421,16 +1948,21 @@ def unlock_achievement(aid):
     if not a or a.get('unlocked'):
         return False
     a['unlocked'] = True
+    achievement_index.discard(aid)
     add_notification(f"Achievement unlocked: {a['name']}")
+    try:
+        emit_event('achievement', id=aid, name=a.get('name'))
+    except NameError:
+        pass
     # Try to sync/unlock achievement for remote user
     try:
-        if firebase_client:
+        if firebase_client and telemetry_enabled:
             try:
-                background_call(firebase_client.unlock_achievement, aid)
+                firebase_client.enqueue_call(firebase_client.unlock_achievement, aid)
             except Exception:
                 pass
             try:
-                background_call(firebase_client.log_event, 'achievement_unlocked', {'id': aid, 'name': a.get('name')})
+                firebase_client.enqueue_event('achievement_unlocked', {'id': aid, 'name': a.get('name')})
             except Exception:
                 pass
     except Exception:
@@ -1462,10 +1994,7 @@ def on_synergy_triggered(combo):
                     l = None
                 if p in combo and l is not None:
                     try:
-                        if l in random_lanes:
-                            bidx = random_lanes.index(l)
-                        else:
-                            bidx = next((i for i in range(NUM_BALLS) if random_lanes[i] == l), None)
+                        bidx = lane_bird(l)
                     except Exception:
                         bidx = None
                     if bidx is None or bidx < 0:
@@ -1517,32 +2046,34 @@ def on_synergy_triggered(combo):
         return None
 
 
+def _unlock_all(aids):
+    """Unlock index hits in definition order (so notifications keep their order)."""
+    if len(aids) > 1:
+        aids = achievement_index.sort_unlocks(aids)
+    for aid in aids:
+        unlock_achievement(aid)
+
+
 def check_achievements_event(event, **kwargs):
     """Handle simple achievement triggers.
 
     event: 'score', 'swap', 'collect', 'destroy_bat', 'destroy_obstacle', 'destroy_bat_with_orange'
+
+    Candidates come from `achievement_index`, so an event only touches the
+    locked achievements it can actually unlock.
     """
     global achievements
+    idx = achievement_index
+    if idx.source is not achievements:
+        idx.rebuild(achievements)
     if event == 'score':
-        sc = kwargs.get('score', 0)
-        for aid, a in achievements.items():
-            if a.get('type') == 'score' and not a.get('unlocked'):
-                if sc >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.reached(('score', None), kwargs.get('score', 0)))
 
     elif event == 'swap':
-        swaps = kwargs.get('swaps', 0)
-        for aid, a in achievements.items():
-            if a.get('type') == 'counter' and a.get('key') == 'swaps' and not a.get('unlocked'):
-                if swaps >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.reached(('counter', 'swaps'), kwargs.get('swaps', 0)))
 
     elif event == 'collect':
-        loot = kwargs.get('loot')
-        for aid, a in achievements.items():
-            if a.get('type') == 'collect' and not a.get('unlocked'):
-                if a.get('loot') == loot:
-                    unlock_achievement(aid)
+        _unlock_all(idx.take(('collect', kwargs.get('loot'))))
 
     elif event == 'destroy_bat':
         # track a simple counter for obstacle/bat destroys if defined
@@ -1555,25 +2086,14 @@ def check_achievements_event(event, **kwargs):
         except Exception:
             pass
 
-        for aid, a in achievements.items():
-            if a.get('type') == 'counter' and not a.get('unlocked'):
-                # generic total bat counter
-                if a.get('key') == 'bats_destroyed':
-                    a['progress'] = a.get('progress', 0) + 1
-                    if a['progress'] >= a.get('goal', 0):
-                        unlock_achievement(aid)
-                # per-tier counters (keys like 'bats_destroyed_tier1')
-                if tier in (1, 2, 3, 4) and a.get('key') == f'bats_destroyed_tier{tier}':
-                    a['progress'] = a.get('progress', 0) + 1
-                    if a['progress'] >= a.get('goal', 0):
-                        unlock_achievement(aid)
+        # generic total bat counter plus per-tier counters (keys like 'bats_destroyed_tier1')
+        due = idx.advance(('counter', 'bats_destroyed'))
+        if tier in (1, 2, 3, 4):
+            due += idx.advance(('counter', f'bats_destroyed_tier{tier}'))
+        _unlock_all(due)
 
     elif event == 'destroy_obstacle':
-        for aid, a in achievements.items():
-            if a.get('type') == 'counter' and a.get('key') == 'obstacles_destroyed' and not a.get('unlocked'):
-                a['progress'] = a.get('progress', 0) + 1
-                if a['progress'] >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.advance(('counter', 'obstacles_destroyed')))
 
     elif event == 'power_used':
         # kwargs: power (string, lowercase color name)
@@ -1581,18 +2101,13 @@ def check_achievements_event(event, **kwargs):
         lane = kwargs.get('lane')
         if not power:
             return
-        key = f'power_{power}'
         # increment any matching counter achievements
-        for aid, a in achievements.items():
-            if a.get('type') == 'counter' and a.get('key') == key and not a.get('unlocked'):
-                a['progress'] = a.get('progress', 0) + 1
-                if a['progress'] >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.advance(('counter', f'power_{power}')))
 
         # record recent powers for synergy detection (include lane)
-        recent_powers.append((power, frame_count, lane))
+        recent_powers.append((power, state.frame_count, lane))
         # keep recent_powers short (last 300 frames)
-        recent_powers[:] = [(p, f, l) for (p, f, l) in recent_powers if frame_count - f <= 300]
+        recent_powers[:] = [(p, f, l) for (p, f, l) in recent_powers if state.frame_count - f <= 300]
 
         # detect pair/triple synergies (distinct power names)
         distinct = set(p for (p, f, l) in recent_powers)
@@ -1613,13 +2128,9 @@ def check_achievements_event(event, **kwargs):
         combo = kwargs.get('combo', set())
         # unlock pair/triple
         if len(combo) >= 3:
-            for aid, a in achievements.items():
-                if a.get('type') == 'special' and a.get('event') == 'synergy_triple' and not a.get('unlocked'):
-                    unlock_achievement(aid)
+            _unlock_all(idx.take(('special', 'synergy_triple')))
         elif len(combo) >= 2:
-            for aid, a in achievements.items():
-                if a.get('type') == 'special' and a.get('event') == 'synergy_pair' and not a.get('unlocked'):
-                    unlock_achievement(aid)
+            _unlock_all(idx.take(('special', 'synergy_pair')))
 
         # Synergy XP transfer is handled by the dedicated helper. Only trigger it when
         # the caller explicitly requests it via explicit=True in kwargs.
@@ -1635,312 +2146,213 @@ def check_achievements_event(event, **kwargs):
 
     elif event == 'area_hold':
         # kwargs: area ('top50'|'top30'), frames
-        area = kwargs.get('area')
-        frames = kwargs.get('frames', 0)
-        for aid, a in achievements.items():
-            if a.get('type') == 'area' and a.get('key') == area and not a.get('unlocked'):
-                if frames >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.reached(('area', kwargs.get('area')), kwargs.get('frames', 0)))
 
     elif event == 'original_survive':
-        frames = kwargs.get('frames', 0)
-        for aid, a in achievements.items():
-            if a.get('type') == 'original' and not a.get('unlocked'):
-                if frames >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.reached(('original', None), kwargs.get('frames', 0)))
 
     elif event == 'color_count':
         # kwargs: color (variable name string like 'YELLOW'), count
-        color = kwargs.get('color')
         count = kwargs.get('count', 0)
-        # check color_count achievements
-        for aid, a in achievements.items():
-            if a.get('type') == 'color_count' and a.get('key') == color and not a.get('unlocked'):
-                if count >= a.get('goal', 0):
-                    unlock_achievement(aid)
+        _unlock_all(idx.reached(('color_count', kwargs.get('color')), count))
         # check all-same color
         if count >= 9:
-            for aid, a in achievements.items():
-                if a.get('type') == 'color_count_all' and not a.get('unlocked'):
-                    if a.get('goal', 0) <= count:
-                        unlock_achievement(aid)
+            _unlock_all(idx.reached(('color_count_all', None), count))
 
     elif event == 'destroy_bat_with_orange':
-        for aid, a in achievements.items():
-            if a.get('type') == 'special' and a.get('event') == 'destroy_bat_with_orange' and not a.get('unlocked'):
-                unlock_achievement(aid)
+        _unlock_all(idx.take(('special', 'destroy_bat_with_orange')))
+
+
+# ---------------- Combo detection (streaming pattern matchers) ----------------
+def default_combo_patterns():
+    """Built-in combos, one per combo achievement in init_achievements()."""
+    return [
+        {'event': 'combo_fire_suction_bounce_fire',
+         'steps': ['fire', 'suction', 'bounce', 'fire'],
+         'window': COMBO_WINDOW_FRAMES},
+        # yellow bounce then adjacent blue bounce shortly after
+        {'event': 'combo_yellow_blue_bounce_chain',
+         'steps': [{'action': 'bounce', 'color': 'YELLOW'},
+                   {'action': 'bounce', 'color': 'BLUE', 'lane_delta': 1}],
+         'window': YELLOW_BLUE_CHAIN_WINDOW},
+    ]
+
+
+def _combo_colors(spec):
+    """Colour values accepted by a combo step: names ('YELLOW', 'blue') match the bird colour too."""
+    if spec is None:
+        return None
+    names = spec if isinstance(spec, (list, tuple)) else [spec]
+    known = dict(ACHIEVEMENT_COLORS, GLITCH=GLITCH, STEALTH=STEALTH)
+    accepted = set()
+    for name in names:
+        accepted.add(name)
+        if isinstance(name, str):
+            accepted.update((name.upper(), name.lower()))
+            if name.upper() in known:
+                accepted.add(known[name.upper()])
+    return frozenset(accepted)
+
+
+def compile_combo_patterns():
+    """Build combo_matcher from the built-in patterns and the `combo.patterns` config.
+
+    A configured pattern with the event name of a built-in one replaces it.
+    Pattern: {event, steps, window (frames, default COMBO_WINDOW_FRAMES),
+    cooldown (frames, default window)}; a step is an action name or
+    {action, color (name or list), lane_delta}.
+    """
+    specs = {}
+    for spec in default_combo_patterns() + list(COMBO_PATTERNS or []):
+        try:
+            specs[spec['event']] = spec
+        except Exception:
+            pass
+    patterns = []
+    for event, spec in specs.items():
+        try:
+            steps = []
+            for st in spec['steps']:
+                if isinstance(st, str):
+                    steps.append(Step(st))
+                else:
+                    delta = st.get('lane_delta')
+                    steps.append(Step(str(st['action']), _combo_colors(st.get('color')),
+                                      None if delta is None else int(delta)))
+            patterns.append(ComboPattern(str(event), steps,
+                                         int(spec.get('window', COMBO_WINDOW_FRAMES)),
+                                         spec.get('cooldown')))
+        except Exception:
+            # Ignore malformed patterns rather than failing the whole config
+            pass
+    combo_matcher.patterns = patterns
+    return combo_matcher
 
 
-# ---------------- Combo detection (simple sequence detectors) ----------------
 def append_recent_action(action, lane=None, color=None):
     """Append an atomic action for combo detection and prune old actions."""
-    global recent_actions, frame_count
-    recent_actions.append({'action': action, 'frame': frame_count, 'lane': lane, 'color': color})
+    a = {'action': action, 'frame': state.frame_count, 'lane': lane, 'color': color}
+    recent_actions.append(a)
     # prune to window
-    recent_actions[:] = [a for a in recent_actions if frame_count - a['frame'] <= COMBO_WINDOW_FRAMES]
+    while state.frame_count - recent_actions[0]['frame'] > COMBO_WINDOW_FRAMES:
+        recent_actions.popleft()
     # run detection
-    detect_combos()
-
-
-def detect_combos():
-    """Look for configured combos in recent_actions and unlock achievements."""
-    global recent_actions, combo_cooldowns, frame_count, achievements
-    now = frame_count
-
-    # Helper to unlock a special achievement by its event name
-    def unlock_special(event_name, cooldown_frames):
-        if combo_cooldowns.get(event_name, 0) > now:
-            return False
-        unlocked_any = False
-        for aid, a in achievements.items():
-            if a.get('type') == 'special' and a.get('event') == event_name and not a.get('unlocked'):
-                unlock_achievement(aid)
-                unlocked_any = True
-        if unlocked_any:
-            combo_cooldowns[event_name] = now + cooldown_frames
-        return unlocked_any
-
-    # Build a simple list of (action, frame, lane, color)
-    seq = [(a['action'], a['frame'], a.get('lane'), a.get('color')) for a in recent_actions]
-
-    # Combo A: fire -> suction -> bounce -> fire (in order, within window)
-    pattern = ['fire', 'suction', 'bounce', 'fire']
-    # find subsequence
-    idx = 0
-    positions = []
-    for i, (act, fr, ln, clr) in enumerate(seq):
-        if act == pattern[idx]:
-            positions.append(i)
-            idx += 1
-            if idx == len(pattern):
-                break
-    if idx == len(pattern):
-        start_frame = seq[positions[0]][1]
-        end_frame = seq[positions[-1]][1]
-        if end_frame - start_frame <= COMBO_WINDOW_FRAMES:
-            unlock_special('combo_fire_suction_bounce_fire', COMBO_WINDOW_FRAMES)
-
-    # Combo B: yellow bounce then adjacent blue bounce shortly after
-    for i, a in enumerate(recent_actions):
-        if a['action'] == 'bounce' and (a.get('color') == 'YELLOW' or a.get('color') == 'yellow' or a.get('color') is None):
-            for j in range(i + 1, len(recent_actions)):
-                b = recent_actions[j]
-                if b['action'] == 'bounce' and (b.get('color') == 'BLUE' or b.get('color') == 'blue' or b.get('color') is None):
-                    lane_a = a.get('lane') or 0
-                    lane_b = b.get('lane') or 0
-                    if abs(lane_a - lane_b) == 1 and (b['frame'] - a['frame']) <= YELLOW_BLUE_CHAIN_WINDOW:
-                        unlock_special('combo_yellow_blue_bounce_chain', YELLOW_BLUE_CHAIN_WINDOW)
-                        return
+    detect_combos(a)
 
 
-
-# ---------------- Level-from-score helpers ----------------
-def compute_level_from_score(sc):
-    # Start from level 1 and find highest level such that score >= threshold
-    lvl = 1
-    while True:
-        next_thr = calculate_level_threshold(lvl + 1)
-        if sc >= next_thr:
-            lvl += 1
+def detect_combos(a):
+    """Advance the combo patterns by action `a` and unlock the achievements of completed combos."""
+    now = state.frame_count
+    for pattern in combo_matcher.feed(a['action'], a['frame'], a.get('lane'), a.get('color')):
+        # Prevents repeating the same combo too frequently
+        if combo_cooldowns.get(pattern.event, 0) > now:
             continue
-        break
-    return lvl
-
+        combo_cooldowns[pattern.event] = now + pattern.cooldown
+        emit_event('combo', name=pattern.event)
+        _unlock_all(achievement_index.take(('special', pattern.event)))
 
-def compute_grade_from_xp(xp):
-    """Return a (symbol, color) tuple for the given XP value.
 
-    Small, deterministic mapping so the floor shows the bird's current grade.
-    """
+# ---------------- Level-from-score helpers ----------------
+# Level and grade thresholds only depend on the progression constants, so they
+# are computed by bake_progression() once the config is applied and searched
+# with bisect instead of re-deriving base ** factor ** n on every lookup.
+_level_params = (500.0, 1.07)  # (LEVEL_SCORE_BASE, LEVEL_SCORE_FACTOR)
+_level_thresholds = []         # [i] = score needed for level i + 2, extended lazily
+_grade_bounds = ()             # ascending XP lower bound of each entry of _grade_bands
+_grade_bands = ()              # (label, color) reached at the matching bound
+_GRADE_D = ('D', GREEN)
+_GRADE_LABELS = ('C1', 'C2', 'B1', 'B2', 'A1', 'A2', 'S')
+_GRADE_COLORS = {'D': GREEN, 'C': ORANGE, 'B': WHITE, 'A': GOLD, 'S': RED}
+
+
+def _extend_level_thresholds(sc):
+    """Append level thresholds until the last one exceeds `sc`."""
+    thr = _level_thresholds
+    while not thr or thr[-1] <= sc:
+        try:
+            nxt = _level_threshold(len(thr) + 2)
+        except OverflowError:
+            nxt = math.inf
+        # a progression that never grows would never terminate: cap it here
+        if thr and (_level_params[0] <= 1.0 or _level_params[1] <= 1.0):
+            nxt = math.inf
+        thr.append(nxt)
+
+
+def bake_progression():
+    """Precompute the level/grade threshold tables from the progression constants."""
+    global _level_params, _grade_bounds, _grade_bands
     try:
-        xp = int(xp)
+        _level_params = (float(LEVEL_SCORE_BASE), float(LEVEL_SCORE_FACTOR))
     except Exception:
-        try:
-            xp = int(float(xp))
-        except Exception:
-            xp = 0
+        _level_params = (500.0, 1.07)
+    del _level_thresholds[:]
+    _extend_level_thresholds(0)
 
-    # Use configurable progression constants
     try:
-        base = float(XP_BASE) if 'XP_BASE' in globals() else 500.0
-        factor = float(GRADE_EXP_FACTOR) if 'GRADE_EXP_FACTOR' in globals() else 1.07
+        base = float(XP_BASE)
+        factor = float(GRADE_EXP_FACTOR)
     except Exception:
         base = 500.0
         factor = 1.07
+    floor = int(base)
+    # Walk grades from the top: a grade holds from its threshold up to the
+    # lowest threshold of any grade above it (XP below `floor` is always D,
+    # XP above `floor` that reaches no threshold falls back to C1).
+    bounds, bands = [], []
+    hi = math.inf
+    for n in reversed(range(len(_GRADE_LABELS))):
+        lbl = _GRADE_LABELS[n]
+        thr = max(int(round(base ** (factor ** n))), floor)
+        if thr < hi:
+            bounds.append(thr)
+            bands.append((lbl, _GRADE_COLORS.get(lbl[0], DARK_GRAY)))
+            hi = thr
+    if floor < hi:
+        bounds.append(floor)
+        bands.append(('C1', ORANGE))
+    bounds.reverse()
+    bands.reverse()
+    _grade_bounds = tuple(bounds)
+    _grade_bands = tuple(bands)
 
-    # If below base, D
-    if xp < int(base):
-        return ('D', GREEN)
-
-    # Build thresholds for C1, C2, B1, B2, A1, A2, S using configurable factor
-    labels = ['C1', 'C2', 'B1', 'B2', 'A1', 'A2', 'S']
-    exps = [ (factor ** n) for n in range(len(labels)) ]
-    thresholds = [ int(round(base ** e)) for e in exps ]
 
-    # Find highest label satisfied
-    for lbl, thr in reversed(list(zip(labels, thresholds))):
-        if xp >= thr:
-            # Map letter to colour by prefix
-            prefix = lbl[0]
-            color_map = {'D': GREEN, 'C': ORANGE, 'B': WHITE, 'A': GOLD, 'S': RED}
-            return (lbl, color_map.get(prefix, DARK_GRAY))
-
-    # If not matched, fallback to C1
-    return ('C1', ORANGE)
+def compute_level_from_score(sc):
+    # Highest level whose threshold the score reached
+    if sc >= _level_thresholds[-1]:
+        _extend_level_thresholds(sc)
+    return 1 + bisect_right(_level_thresholds, sc)
 
 
-def add_score(amount, by_bird=None):
-    """Add to global score. If by_bird is provided (bird index), also award XP to that bird.
+def compute_grade_from_xp(xp):
+    """Return a (symbol, color) tuple for the given XP value.
 
-    amount may be non-integer; XP is credited as int(amount).
+    Small, deterministic mapping so the floor shows the bird's current grade.
     """
-    global score, per_bird_xp
-    # Defensive parsing of amount: preserve original for XP awarding
-    try:
-        raw_amount = amount
-        # Try to interpret as float for score math
-        amt = float(amount)
-    except Exception:
-        try:
-            amt = float(int(amount))
-            raw_amount = amt
-        except Exception:
-            # Can't parse amount -> nothing to do
-            return
-
-    # Compute prestige multiplier (based on birds currently on field)
-    try:
-        prestige = compute_prestige()
-    except Exception:
-        prestige = 1.0
-
-    # Add multiplied score (only score is affected by prestige)
-    try:
-        score += amt * prestige
-    except Exception:
+    if xp.__class__ is not int:
         try:
-            score += float(amt * prestige)
+            xp = int(xp)
         except Exception:
-            pass
-
-    # Award XP when we know which bird earned it (XP not multiplied)
-    try:
-        if by_bird is not None and 0 <= int(by_bird) < len(per_bird_xp):
-            # simple XP model: 1 XP per point of raw amount
             try:
-                xp_award = int(max(0, int(raw_amount)))
+                xp = int(float(xp))
             except Exception:
-                try:
-                    xp_award = int(max(0, int(amt)))
-                except Exception:
-                    xp_award = 0
-            per_bird_xp[int(by_bird)] += xp_award
-            # Check for S-grade transformation after XP award
-            try:
-                transform_bird_to_s(int(by_bird))
-            except Exception:
-                pass
-    except Exception:
-        pass
-
-    check_achievements_event('score', score=score)
-
-
-def award_xp(bird_idx, xp_amount):
-    """Best-effort: credit XP to a bird without affecting global score.
-
-    bird_idx may be invalid; this function is defensive.
-    """
-    global per_bird_xp
-    try:
-        bi = int(bird_idx)
-        if bi < 0 or bi >= len(per_bird_xp):
-            return
-        per_bird_xp[bi] += int(max(0, int(xp_amount)))
-        # After awarding XP, check for S-grade transformation
-        try:
-            transform_bird_to_s(bi)
-        except Exception:
-            pass
-    except Exception:
-        pass
+                xp = 0
+    i = bisect_right(_grade_bounds, xp)
+    return _grade_bands[i - 1] if i else _GRADE_D
 
 
-def compute_prestige():
-    """Compute prestige multiplier based on grades of birds currently on the field.
+def grade_band(xp):
+    """Return (label, color, next_threshold): the grade for `xp` and the XP at which it changes.
 
-    Base prestige is 1. For each active (not-lost) bird, add the modifier for its grade:
-      D: 0
-      C1: 0.03125
-      C2: 0.0625
-      B1: 0.125
-      B2: 0.25
-      A1: 0.5
-      A2: 1
-      S: 5
-
-    Returns a float >= 1.0
+    next_threshold is math.inf for the top grade.
     """
-    total = 1.0
     try:
-        # mapping for exact grade labels
-        # Allow overriding the prestige modifiers via PRESTIGE_MODIFIERS
-        try:
-            mod_map = PRESTIGE_MODIFIERS if isinstance(PRESTIGE_MODIFIERS, dict) else {
-                'D': 0.0,
-                'C1': 0.03125,
-                'C2': 0.0625,
-                'B1': 0.125,
-                'B2': 0.25,
-                'A1': 0.5,
-                'A2': 1.0,
-                'S': 5.0,
-            }
-        except Exception:
-            mod_map = {
-                'D': 0.0,
-                'C1': 0.03125,
-                'C2': 0.0625,
-                'B1': 0.125,
-                'B2': 0.25,
-                'A1': 0.5,
-                'A2': 1.0,
-                'S': 5.0,
-            }
-
-        for i in range(len(per_bird_xp)):
-            try:
-                if ball_lost[i]:
-                    continue
-            except Exception:
-                # If ball_lost not available or malformed, assume active
-                pass
-
-            try:
-                # GLITCH birds contribute a random prestige between 1 and 7 each computation
-                if ball_colors[i] == GLITCH:
-                    try:
-                        total += float(random.randint(1, 7))
-                        continue
-                    except Exception:
-                        # fallback to normal mapping
-                        pass
-
-                label, _ = compute_grade_from_xp(per_bird_xp[i])
-            except Exception:
-                label = 'D'
-
-            # If compute_grade returned multi-char like 'C1' handle it, otherwise
-            # accept single-letter 'D'/'S'
-            add = mod_map.get(label, 0.0)
-            # If label is like 'C' fallback to C1 modifier (defensive)
-            if add == 0.0 and isinstance(label, str) and len(label) == 1:
-                add = mod_map.get(label, 0.0)
-            total += add
+        xp = int(xp)
     except Exception:
-        # On any error, fallback to neutral prestige
-        return 1.0
-    return float(total)
+        xp = 0
+    i = bisect_right(_grade_bounds, xp)
+    label, color = _grade_bands[i - 1] if i else _GRADE_D
+    return label, color, (_grade_bounds[i] if i < len(_grade_bounds) else math.inf)
 
 
 def adjust_rarity_weights(base_weights, prestige):
@@ -1988,15 +2400,6 @@ def adjust_rarity_weights(base_weights, prestige):
 
     return new
 
-
-def deduct_score(amount):
-    global score
-    score -= amount
-    if score < 0:
-        score = 0
-    # Re-evaluate score-based achievements when score changes
-    check_achievements_event('score', score=score)
-
 # Player
 player_lane = 2
 selected_lane = None  # Lane selected when space is pressed
@@ -2005,20 +2408,32 @@ last_up_state = False  # Track UP edge for charging detection
 
 # Frame counter and speed settings
 frame_count = 0
+sim_time = 0.0  # Game clock: seconds of simulated (unpaused) play, used for despawn timers
 base_sleep = 0.2  # Starting speed
 min_sleep = 0.02   # Maximum speed (lower = faster)
+max_render_fps = 60.0  # Render cap; simulation ticks beyond it are not drawn
+max_catchup_steps = 5  # Simulation ticks run back-to-back when the loop falls behind
+frame_scheduler = None  # FrameScheduler of the terminal client (set in main)
+input_reader = None  # key reader of the terminal client (set in main)
 
 def cleanup():
     try:
         print("\033[?25h", end="", flush=True)
     except BlockingIOError:
         pass
+    # Write the --profile trace (best-effort)
+    try:
+        if phase_timer.enabled and len(phase_timer):
+            phase_timer.dump(args.profile_out or PROFILE_OUT)
+    except Exception:
+        pass
     # Music engine removed: nothing to stop here
     # Attempt to cleanly shutdown any network/client resources (best-effort).
     # This prevents urllib3/requests atexit callbacks from raising during interpreter shutdown.
     try:
         if firebase_client:
             # Prefer an explicit close() method if provided by the firebase wrapper
+            # (flushes queued telemetry, bounded by firebase_client.CLOSE_TIMEOUT)
             try:
                 closer = getattr(firebase_client, 'close', None)
                 if callable(closer):
@@ -2242,10 +2657,6 @@ def _load_config_file(path):
     return cfg
 
 
-# Parse CLI args (only config path here; allow other args to pass through)
-parser = argparse.ArgumentParser(add_help=False)
-parser.add_argument('--config', help='Path to YAML config file to override defaults')
-args, _rest = parser.parse_known_args()
 _config = _load_config_file(args.config if args and args.config else None)
 
 # Apply config entries to known globals
@@ -2329,6 +2740,16 @@ try:
                 min_sleep = float(timing_cfg.get('min_sleep'))
             except Exception:
                 pass
+        if 'max_render_fps' in timing_cfg:
+            try:
+                max_render_fps = float(timing_cfg.get('max_render_fps'))
+            except Exception:
+                pass
+        if 'max_catchup_steps' in timing_cfg:
+            try:
+                max_catchup_steps = int(timing_cfg.get('max_catchup_steps'))
+            except Exception:
+                pass
         # NOTE: clockwork decay seconds moved under special.clockwork for grouping
 
         # --- Limits (grouped 'limits' or top-level) ---
@@ -2338,6 +2759,11 @@ try:
                 MAX_ENTITIES = int(limits_cfg.get('max_entities'))
             except Exception:
                 pass
+        if 'spawn_backlog' in limits_cfg:
+            try:
+                SPAWN_MAX_BACKLOG = int(limits_cfg.get('spawn_backlog'))
+            except Exception:
+                pass
 
         # --- Layout: width/height/num_balls/lane_positions ---
         layout_cfg = _config.get('layout') if isinstance(_config.get('layout'), dict) else _config
@@ -2533,7 +2959,7 @@ try:
             n_lanes = len(LANE_POSITIONS) if isinstance(LANE_POSITIONS, (list, tuple)) else 9
             # Ensure random_lanes has correct length and is shuffled
             random_lanes = list(range(n_lanes))
-            random.shuffle(random_lanes)
+            rng.shuffle(random_lanes)
             # Cap NUM_BALLS to available lanes
             if NUM_BALLS > n_lanes:
                 NUM_BALLS = n_lanes
@@ -2553,6 +2979,12 @@ try:
             purple_miss_count = [0] * NUM_BALLS
             purple_just_fired_frames = [0] * NUM_BALLS
             purple_hold_counter = [0] * NUM_BALLS
+            # Birds beyond the formation (wide layouts) start as YELLOW
+            while len(ball_colors) < NUM_BALLS:
+                ball_colors.append(YELLOW)
+                ball_speeds.append(int(BALL_SPEEDS_DEFAULT.get('YELLOW', 2)))
+            per_bird_xp = [0] * NUM_BALLS
+            transformed_s = [False] * NUM_BALLS
         except Exception:
             pass
         # --- Physics / powers / progression overrides ---
@@ -2574,6 +3006,14 @@ try:
                 SPEED_MAX = int(physics_cfg.get('speed_max'))
             except Exception:
                 pass
+        if 'vectorized' in physics_cfg:
+            v = physics_cfg.get('vectorized')
+            BIRD_VECTOR_MODE = v if isinstance(v, bool) else ('auto' if str(v).lower() == 'auto' else False)
+        if 'vectorized_min_birds' in physics_cfg:
+            try:
+                BIRD_VECTOR_MIN_BIRDS = int(physics_cfg.get('vectorized_min_birds'))
+            except Exception:
+                pass
         if 'combo_window_frames' in physics_cfg:
             try:
                 COMBO_WINDOW_FRAMES = int(physics_cfg.get('combo_window_frames'))
@@ -2584,6 +3024,20 @@ try:
                 YELLOW_BLUE_CHAIN_WINDOW = int(physics_cfg.get('yellow_blue_chain_window'))
             except Exception:
                 pass
+        # Combo windows and patterns (the `combo` section takes precedence)
+        combo_cfg = _config.get('combo') if isinstance(_config.get('combo'), dict) else {}
+        if 'combo_window_frames' in combo_cfg:
+            try:
+                COMBO_WINDOW_FRAMES = int(combo_cfg.get('combo_window_frames'))
+            except Exception:
+                pass
+        if 'yellow_blue_chain_window' in combo_cfg:
+            try:
+                YELLOW_BLUE_CHAIN_WINDOW = int(combo_cfg.get('yellow_blue_chain_window'))
+            except Exception:
+                pass
+        if isinstance(combo_cfg.get('patterns'), list):
+            COMBO_PATTERNS = [p for p in combo_cfg.get('patterns') if isinstance(p, dict)]
 
         powers_cfg = _config.get('powers') if isinstance(_config.get('powers'), dict) else _config
         if isinstance(powers_cfg, dict):
@@ -2660,6 +3114,26 @@ try:
                 NORMAL_BIRD_SPRITE_HEIGHT = int(rendering_cfg.get('normal_bird_sprite_height'))
             except Exception:
                 pass
+        if 'profile' in rendering_cfg:
+            try:
+                PROFILE_ENABLED = bool(rendering_cfg.get('profile'))
+            except Exception:
+                pass
+        if 'profile_out' in rendering_cfg:
+            try:
+                PROFILE_OUT = str(rendering_cfg.get('profile_out'))
+            except Exception:
+                pass
+        if 'profile_history' in rendering_cfg:
+            try:
+                PROFILE_HISTORY = max(1, int(rendering_cfg.get('profile_history')))
+            except Exception:
+                pass
+        if 'profile_window' in rendering_cfg:
+            try:
+                PROFILE_WINDOW = max(1, int(rendering_cfg.get('profile_window')))
+            except Exception:
+                pass
 
         # Shuffle power levels
         shuffle_cfg = _config.get('shuffle') if isinstance(_config.get('shuffle'), dict) else powers_cfg
@@ -3125,6 +3599,16 @@ try:
                 KEY_TOGGLE_XP_ALT = str(controls_cfg.get('key_toggle_xp_alt'))
             except Exception:
                 pass
+        if 'key_toggle_perf' in controls_cfg:
+            try:
+                KEY_TOGGLE_PERF = str(controls_cfg.get('key_toggle_perf'))
+            except Exception:
+                pass
+        if 'key_toggle_perf_alt' in controls_cfg:
+            try:
+                KEY_TOGGLE_PERF_ALT = str(controls_cfg.get('key_toggle_perf_alt'))
+            except Exception:
+                pass
         if 'key_quit' in controls_cfg:
             try:
                 KEY_QUIT = str(controls_cfg.get('key_quit'))
@@ -3134,1340 +3618,847 @@ try:
 except Exception:
     pass
 
-try:
-    setup()
-    init_achievements()
-    # Track start time for the play session (used for reporting total play time)
-    try:
-        game_start_time = time.time()
-    except Exception:
-        game_start_time = None
-    # Initialize Firebase client (best-effort)
-    try:
-        if firebase_client:
-            try:
-                # init synchronously (fast local file read); defer network calls
-                try:
-                    firebase_client.init_from_env()
-                except Exception:
-                    # initialization failed - continue without remote
-                    raise
-                # perform network calls in background to avoid blocking startup
-                try:
-                    background_call(firebase_client.sign_in_anonymous)
-                except Exception:
-                    pass
-                try:
-                    background_call(firebase_client.log_event, 'session_start', {'client': 'terminal'})
-                except Exception:
-                    pass
-                # Inform player (best-effort)
-                try:
-                    add_notification('Firebase: enabled')
-                except Exception:
-                    pass
-            except Exception:
-                # don't fail startup on network/auth issues
-                try:
-                    add_notification('Firebase: disabled')
-                except Exception:
-                    pass
-    except Exception:
-        pass
-    # Music engine support removed from this file.
-    # No music engine will be started from the game process.
-
-    # Pre-build static parts
-    ceiling = "=" * WIDTH
-    floor = ceiling
-    
-    while True:
-        # Handle input
-        key = get_key()
-
-        # Detect space key press (edge detection)
-        space_pressed_this_frame = (key == KEY_ACTION)
-        space_just_pressed = space_pressed_this_frame and not last_space_state
-        last_space_state = space_pressed_this_frame
-
-        # When paused, ignore all input except P (toggle pause) and QUIT.
-        # Also prevent SPACE edge from triggering while paused.
-        if paused:
-            if key and key not in ('P', 'p', 'QUIT'):
-                key = None
-                space_pressed_this_frame = False
-                space_just_pressed = False
-
-        if key:
-            if key == KEY_ACTION and space_just_pressed:
-                # Space pressed - toggle swap mode or execute swap
-                if selected_lane is None:
-                    # Enter swap mode - select current lane
-                    selected_lane = player_lane
-                elif selected_lane == player_lane:
-                    # Pressed on same lane - cancel swap mode
-                    selected_lane = None
+# Bake the progression constants into the level/grade lookup tables
+bake_progression()
+# Compile the built-in and configured combo patterns
+compile_combo_patterns()
+# Pre-render loot glyphs, coloured sprite lines and HP colours
+build_sprite_atlas()
+# Per-kind quotas and backlog cap of the spawn queue
+spawn_queue.configure({'bat': BAT_CONSECUTIVE_SPAWN_LIMIT, 'obstacle': OBSTACLE_CONSECUTIVE_SPAWN_LIMIT},
+                      SPAWN_MAX_BACKLOG)
+
+
+# Build the run state from the configured layout and make it active
+bind_state(GameState.from_globals())
+
+
+# Frame events produced by the simulation (drained by GameEngine.step)
+pending_events = []
+# Remote analytics from inside the simulation; the headless engine turns it off
+telemetry_enabled = True
+# Frame delay for the current level (recomputed by update_progression)
+current_sleep = base_sleep
+game_start_time = None
+# Main loop phases timed by phase_timer (see profiler.py): terminal input and
+# key handling, spawn queue, obstacle/bat movement, bat-obstacle collisions,
+# despawn, speed boost/scared/stealth/power-up timers, clockwork/purple state
+# machines, achievement checks, projectiles, bird movement and collisions,
+# frame build and terminal write. A PhaseTimer while profiling/benchmarking.
+FRAME_PHASES = ('input', 'spawn', 'bats', 'collisions', 'despawn', 'boosts', 'states',
+                'achievements', 'projectiles', 'birds', 'render', 'write')
+phase_timer = NullTimer()
+
+
+def emit_event(kind, **data):
+    """Queue a simulation event (notification, achievement, combo, loot, level_up, life_lost, game_over, quit)."""
+    data['type'] = kind
+    data['frame'] = state.frame_count
+    pending_events.append(data)
+
+
+def process_input(key):
+    """Apply one key press (or None when no key is pending) to the game state.
+
+    Returns False when the player asked to quit.
+    """
+    global show_perf_overlay, show_xp_overlay
+
+    # Detect space key press (edge detection)
+    space_pressed_this_frame = (key == KEY_ACTION)
+    space_just_pressed = space_pressed_this_frame and not state.last_space_state
+    state.last_space_state = space_pressed_this_frame
+
+    # When paused, ignore all input except P (toggle pause) and QUIT.
+    # Also prevent SPACE edge from triggering while paused.
+    if state.paused:
+        if key and key not in ('P', 'p', 'QUIT'):
+            key = None
+            space_pressed_this_frame = False
+            space_just_pressed = False
+
+    if key:
+        if key == KEY_ACTION and space_just_pressed:
+            # Space pressed - toggle swap mode or execute swap
+            if state.selected_lane is None:
+                # Enter swap mode - select current lane
+                state.selected_lane = state.player_lane
+            elif state.selected_lane == state.player_lane:
+                # Pressed on same lane - cancel swap mode
+                state.selected_lane = None
 
+            else:
+                # Different lane - execute swap (costs 200 * level points)
+                swap_cost = 200 * state.level
+                if state.score >= swap_cost:
+                    current_lane = state.player_lane
+
+                    # Find bird indices for both lanes
+                    bird_in_selected = lane_bird(state.selected_lane)
+                    bird_in_current = lane_bird(current_lane)
+
+                    # Swap if both birds exist (even if one or both are dead)
+                    if bird_in_selected >= 0 and bird_in_current >= 0:
+                        # Deduct cost (use helper so level recompute/achievements can react)
+                        deduct_score(swap_cost)
+                        # track swap usage for achievements
+                        state.swaps_used += 1
+                        check_achievements_event('swap', swaps=state.swaps_used)
+
+                        # Prima di swappare, controlla se uno dei due è arancione in stato uovo
+                        # Stato uovo: ball_colors == ORANGE, ball_speeds == 0, ball_y == 999
+                        # Sposta l'uovo arancione nella nuova lane
+                        for idx, bird_idx in [(bird_in_selected, bird_in_current), (bird_in_current, bird_in_selected)]:
+                            if ball_colors[idx] == ORANGE and ball_speeds[idx] == 0 and ball_y[idx] == 999:
+                                # L'uovo arancione di questo uccello (indicizzato per uccello)
+                                egg = orange_egg_of(idx)
+                                if egg is not None:
+                                    egg['x_pos'] = LANE_POSITIONS[random_lanes[bird_idx]]
+
+                        # Swap their lane assignments
+                        swap_lanes(bird_in_selected, bird_in_current)
+
+                        ball_cols[bird_in_selected] = LANE_POSITIONS[random_lanes[bird_in_selected]]
+                        ball_cols[bird_in_current] = LANE_POSITIONS[random_lanes[bird_in_current]]
+
+                        # Se l'uccello NON è arancione in stato uovo, lo rimetti in gioco
+                        if not ball_lost[bird_in_selected]:
+                            if not (ball_colors[bird_in_selected] == ORANGE and ball_speeds[bird_in_selected] == 0 and ball_y[bird_in_selected] == 999):
+                                ball_y[bird_in_selected] = STARTING_LINE
+                                set_ball_vy(bird_in_selected, -1)
+                        if not ball_lost[bird_in_current]:
+                            if not (ball_colors[bird_in_current] == ORANGE and ball_speeds[bird_in_current] == 0 and ball_y[bird_in_current] == 999):
+                                ball_y[bird_in_current] = STARTING_LINE
+                                set_ball_vy(bird_in_current, -1)
+
+                    # Always reset swap mode after attempting swap (whether successful or not)
+                    state.selected_lane = None
+
+        elif key == KEY_PAUSE or key == KEY_PAUSE_ALT:
+            # Toggle pause (top-level handler)
+            try:
+                state.paused = not state.paused
+                if state.paused:
+                    add_notification('PAUSED')
                 else:
-                    # Different lane - execute swap (costs 200 * level points)
-                    swap_cost = 200 * level
-                    if score >= swap_cost:
-                        current_lane = player_lane
-
-                        # Find bird indices for both lanes
-                        bird_in_selected = random_lanes.index(selected_lane) if selected_lane in random_lanes else -1
-                        bird_in_current = random_lanes.index(current_lane) if current_lane in random_lanes else -1
-
-                        # Swap if both birds exist (even if one or both are dead)
-                        if bird_in_selected >= 0 and bird_in_current >= 0:
-                            # Deduct cost (use helper so level recompute/achievements can react)
-                            deduct_score(swap_cost)
-                            # track swap usage for achievements
-                            swaps_used += 1
-                            check_achievements_event('swap', swaps=swaps_used)
-
-                            # Prima di swappare, controlla se uno dei due è arancione in stato uovo
-                            # Stato uovo: ball_colors == ORANGE, ball_speeds == 0, ball_y == 999
-                            # Sposta l'uovo arancione nella nuova lane
-                            for idx, bird_idx in [(bird_in_selected, bird_in_current), (bird_in_current, bird_in_selected)]:
-                                if ball_colors[idx] == ORANGE and ball_speeds[idx] == 0 and ball_y[idx] == 999:
-                                    # Trova l'uovo arancione in loot_items
-                                    old_lane = random_lanes[idx]
-                                    new_lane = random_lanes[bird_idx]
-                                    for loot in loot_items:
-                                        if loot['type'] == 'orange_egg' and loot['x_pos'] == LANE_POSITIONS[old_lane]:
-                                            loot['x_pos'] = LANE_POSITIONS[new_lane]
-                                            break
-
-                            # Swap their lane assignments
-                            random_lanes[bird_in_selected], random_lanes[bird_in_current] = random_lanes[bird_in_current], random_lanes[bird_in_selected]
-
-                            ball_cols[bird_in_selected] = LANE_POSITIONS[random_lanes[bird_in_selected]]
-                            ball_cols[bird_in_current] = LANE_POSITIONS[random_lanes[bird_in_current]]
-
-                            # Se l'uccello NON è arancione in stato uovo, lo rimetti in gioco
-                            if not ball_lost[bird_in_selected]:
-                                if not (ball_colors[bird_in_selected] == ORANGE and ball_speeds[bird_in_selected] == 0 and ball_y[bird_in_selected] == 999):
-                                    ball_y[bird_in_selected] = STARTING_LINE
-                                    set_ball_vy(bird_in_selected, -1)
-                            if not ball_lost[bird_in_current]:
-                                if not (ball_colors[bird_in_current] == ORANGE and ball_speeds[bird_in_current] == 0 and ball_y[bird_in_current] == 999):
-                                    ball_y[bird_in_current] = STARTING_LINE
-                                    set_ball_vy(bird_in_current, -1)
-
-                        # Always reset swap mode after attempting swap (whether successful or not)
-                        selected_lane = None
-
-            elif key == KEY_PAUSE or key == KEY_PAUSE_ALT:
-                # Toggle pause (top-level handler)
-                try:
-                    paused = not paused
-                    if paused:
-                        add_notification('PAUSED')
-                    else:
-                        add_notification('RESUMED')
-                except Exception:
-                    paused = False
-            elif key == KEY_MOVE_LEFT:
-                player_lane = max(0, player_lane - 1)
-            elif key == KEY_MOVE_RIGHT:
-                player_lane = min(8, player_lane + 1)  # 9 lanes: 0-8
-            elif key == KEY_TOGGLE_XP or key == KEY_TOGGLE_XP_ALT:
-                # Toggle XP overlay for debugging / verification
-                try:
-                    show_xp_overlay = not show_xp_overlay
-                    if show_xp_overlay:
-                        add_notification('XP overlay: ON')
-                    else:
-                        add_notification('XP overlay: OFF')
-                except Exception:
-                    pass
-            elif key == KEY_MOVE_UP:
-                # Determine which lanes to affect based on wide cursor
-                if powerups['wide_cursor_active']:
-                    # Wide cursor affects multiple lanes
-                    lanes_to_affect = []
-                    half_width = powerups['wide_cursor_lanes'] // 2
-                    for offset in range(-half_width, half_width + 1):
-                        lane = player_lane + offset
-                        if 0 <= lane <= 8:
-                            lanes_to_affect.append(lane)
+                    add_notification('RESUMED')
+            except Exception:
+                state.paused = False
+        elif key == KEY_MOVE_LEFT:
+            state.player_lane = max(0, state.player_lane - 1)
+        elif key == KEY_MOVE_RIGHT:
+            state.player_lane = min(8, state.player_lane + 1)  # 9 lanes: 0-8
+        elif key == KEY_TOGGLE_XP or key == KEY_TOGGLE_XP_ALT:
+            # Toggle XP overlay for debugging / verification
+            try:
+                show_xp_overlay = not show_xp_overlay
+                if show_xp_overlay:
+                    add_notification('XP overlay: ON')
+                else:
+                    add_notification('XP overlay: OFF')
+            except Exception:
+                pass
+        elif key == KEY_TOGGLE_PERF or key == KEY_TOGGLE_PERF_ALT:
+            try:
+                if not phase_timer.enabled:
+                    add_notification('Perf overlay: start with --profile')
                 else:
-                    lanes_to_affect = [player_lane]
+                    show_perf_overlay = not show_perf_overlay
+                    add_notification('Perf overlay: ON' if show_perf_overlay else 'Perf overlay: OFF')
+            except Exception:
+                pass
+        elif key == KEY_MOVE_UP:
+            # Determine which lanes to affect based on wide cursor
+            if powerups['wide_cursor_active']:
+                # Wide cursor affects multiple lanes
+                lanes_to_affect = []
+                half_width = powerups['wide_cursor_lanes'] // 2
+                for offset in range(-half_width, half_width + 1):
+                    lane = state.player_lane + offset
+                    if 0 <= lane <= 8:
+                        lanes_to_affect.append(lane)
+            else:
+                lanes_to_affect = [state.player_lane]
 
-                # Process each affected lane
-                for lane in lanes_to_affect:
-                    bird_in_lane = random_lanes.index(lane) if lane in random_lanes else -1
-                    if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
-                        if ball_colors[bird_in_lane] == ORANGE and ball_speeds[bird_in_lane] == 0:
-                            # Use configurable recover chance for orange eggs
+            # Process each affected lane
+            for lane in lanes_to_affect:
+                bird_in_lane = lane_bird(lane)
+                if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
+                    if ball_colors[bird_in_lane] == ORANGE and ball_speeds[bird_in_lane] == 0:
+                        # Use configurable recover chance for orange eggs
+                        try:
+                            if rng.random() >= float(ORANGE_RECOVER_CHANCE):
+                                continue
+                        except Exception:
+                            if rng.random() >= 0.10:
+                                continue
+                        ball_y[bird_in_lane] = STARTING_LINE
+                        set_ball_vy(bird_in_lane, -1)
+                        reset_bird_power(bird_in_lane)
+                        ball_speeds[bird_in_lane] = 5
+                        # rimuove l'uovo deposto da questo uccello
+                        item = orange_egg_of(bird_in_lane)
+                        orange_eggs.pop(bird_in_lane, None)
+                        if item is not None and item.get('y_pos') == STARTING_LINE:
+                            loot_items.remove(item)
+                    # Can't bounce scared birds
+                    elif bird_in_lane in scared_birds and ball_colors[bird_in_lane] != PURPLE:
+                        continue  # Scared bird ignores bounce command (tranne purple)
+                    elif ball_vy[bird_in_lane] == 1:  # Moving down - bounce it up
+                        # Special DINOSAUR behaviour: requires 10 UP presses to bounce.
+                        if ball_colors[bird_in_lane] == DINOSAUR:
+                            cnt = dinosaur_up_presses.get(bird_in_lane, 0) + 1
+                            dinosaur_up_presses[bird_in_lane] = cnt
+                            # Every DINOSAUR_PRESS_CHUNK UP presses reduce current fall speed by 1
                             try:
-                                if random.random() >= float(ORANGE_RECOVER_CHANCE):
-                                    continue
+                                chunk = int(DINOSAUR_PRESS_CHUNK)
                             except Exception:
-                                if random.random() >= 0.10:
-                                    continue
-                            lane = random_lanes[bird_in_lane]
-                            ball_y[bird_in_lane] = STARTING_LINE
-                            set_ball_vy(bird_in_lane, -1)
-                            reset_bird_power(bird_in_lane)
-                            ball_speeds[bird_in_lane] = 5
-                            item = next((li for li in loot_items
-                                         if li.get('type') == 'orange_egg' and li.get('x_pos') == LANE_POSITIONS[lane]
-                                         and li.get('y_pos') == STARTING_LINE and li.get('rarity') == 'epic'), None)
-                            if item is not None:
-                                loot_items.remove(item)   # rimuove la prima occorrenza dell'oggetto trovato
-                        # Can't bounce scared birds
-                        elif bird_in_lane in scared_birds and ball_colors[bird_in_lane] != PURPLE:
-                            continue  # Scared bird ignores bounce command (tranne purple)
-                        elif ball_vy[bird_in_lane] == 1:  # Moving down - bounce it up
-                            # Special DINOSAUR behaviour: requires 10 UP presses to bounce.
-                            if ball_colors[bird_in_lane] == DINOSAUR:
-                                cnt = dinosaur_up_presses.get(bird_in_lane, 0) + 1
-                                dinosaur_up_presses[bird_in_lane] = cnt
-                                # Every DINOSAUR_PRESS_CHUNK UP presses reduce current fall speed by 1
+                                chunk = 3
+                            if chunk > 0 and cnt % chunk == 0:
+                                # If this is the final (DINOSAUR_PRESSES_TO_BOUNCE) press, bounce up
                                 try:
-                                    chunk = int(DINOSAUR_PRESS_CHUNK)
+                                    target = int(DINOSAUR_PRESSES_TO_BOUNCE)
                                 except Exception:
-                                    chunk = 3
-                                if chunk > 0 and cnt % chunk == 0:
-                                    # If this is the final (DINOSAUR_PRESSES_TO_BOUNCE) press, bounce up
+                                    target = 15
+                                if cnt >= target:
+                                    set_ball_vy(bird_in_lane, -1)
                                     try:
-                                        target = int(DINOSAUR_PRESSES_TO_BOUNCE)
+                                        ball_speeds[bird_in_lane] = int(BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4))
                                     except Exception:
-                                        target = 15
-                                    if cnt >= target:
-                                        set_ball_vy(bird_in_lane, -1)
-                                        try:
-                                            ball_speeds[bird_in_lane] = int(BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4))
-                                        except Exception:
-                                            ball_speeds[bird_in_lane] = 4
-                                        dinosaur_up_presses[bird_in_lane] = 0
-                                        reset_bird_power(bird_in_lane)
+                                        ball_speeds[bird_in_lane] = 4
+                                    dinosaur_up_presses[bird_in_lane] = 0
+                                    reset_bird_power(bird_in_lane)
+                                else:
+                                    # Reduce the fall speed by 1 (but keep >=1)
+                                    try:
+                                        ball_speeds[bird_in_lane] = max(1, ball_speeds[bird_in_lane] - 1)
+                                    except Exception:
+                                        ball_speeds[bird_in_lane] = 1
+                            # Don't perform the normal immediate bounce
+                            continue
+                        # Normal behavior for non-DINOSAUR birds
+                        # GLITCH has a 5% chance to ignore the bounce and keep falling
+                        try:
+                            if ball_colors[bird_in_lane] == GLITCH:
+                                try:
+                                    if rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
+                                        # ignore bounce
+                                        pass
                                     else:
-                                        # Reduce the fall speed by 1 (but keep >=1)
-                                        try:
-                                            ball_speeds[bird_in_lane] = max(1, ball_speeds[bird_in_lane] - 1)
-                                        except Exception:
-                                            ball_speeds[bird_in_lane] = 1
-                                # Don't perform the normal immediate bounce
-                                continue
-                            # Normal behavior for non-DINOSAUR birds
-                            # GLITCH has a 5% chance to ignore the bounce and keep falling
-                            try:
-                                if ball_colors[bird_in_lane] == GLITCH:
+                                        set_ball_vy(bird_in_lane, -1)
+                                except Exception:
+                                    # fallback to configured chance if float conversion fails
                                     try:
-                                        if random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                            # ignore bounce
+                                        if rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
                                             pass
                                         else:
                                             set_ball_vy(bird_in_lane, -1)
                                     except Exception:
-                                        # fallback to configured chance if float conversion fails
                                         try:
-                                            if random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
+                                            if rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
                                                 pass
                                             else:
                                                 set_ball_vy(bird_in_lane, -1)
                                         except Exception:
-                                            try:
-                                                if random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                    pass
-                                                else:
-                                                    set_ball_vy(bird_in_lane, -1)
-                                            except Exception:
-                                                if random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                    pass
-                                                else:
-                                                    set_ball_vy(bird_in_lane, -1)
-                                else:
-                                    set_ball_vy(bird_in_lane, -1)
-                            except Exception:
-                                ball_vy[bird_in_lane] = -1
-                            reset_bird_power(bird_in_lane)  # Reset power when bird starts rising
-                            # Special: if this is a CLOCKWORK bird in freefall (charge == 0),
-                            # bouncing it restores charge to 1 and sets its speed accordingly.
-                            try:
-                                if ball_colors[bird_in_lane] == CLOCKWORK:
-                                    c = clockwork_charge.get(bird_in_lane, None)
-                                    if c is None:
-                                        # initialize if missing
-                                        clockwork_charge[bird_in_lane] = CLOCKWORK_INITIAL_CHARGE
-                                        c = CLOCKWORK_INITIAL_CHARGE
-                                    if c == 0:
-                                        clockwork_charge[bird_in_lane] = 1
-                                        # speed equals charge when >0
-                                        ball_speeds[bird_in_lane] = 1
-                            except Exception:
-                                pass
-                            # Apply bounce boost if active
-                            if powerups['bounce_boost_active'] and bird_in_lane not in speed_boosts:
-                                boost_frames = int(powerups['bounce_boost_duration'] / base_sleep)
-                                speed_boosts[bird_in_lane] = boost_frames
-                            # record bounce action for combo detection
-                            try:
-                                append_recent_action('bounce', lane=random_lanes[bird_in_lane], color=ball_colors[bird_in_lane])
-                            except NameError:
-                                pass
-                        elif ball_vy[bird_in_lane] == -1:  # Already moving up - activate special power
-                            # Only use power once per ascent
-                            # Allow extra power use for A-grade birds (2 uses per ascent)
-                            try:
-                                grade_label, _ = compute_grade_from_xp(per_bird_xp[bird_in_lane])
-                                allowed_uses = 2 if (grade_label and grade_label.startswith('A')) else 1
-                            except Exception:
-                                allowed_uses = 1
-                            if not allow_consume_power(bird_in_lane, allowed_uses=allowed_uses):
-                                # already consumed allowed uses - do nothing
-                                pass
+                                            if rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
+                                                pass
+                                            else:
+                                                set_ball_vy(bird_in_lane, -1)
                             else:
-                                bird_color = ball_colors[bird_in_lane]
-                                # Notify achievements about power use
-                                # map color escape to simple name
-                                if bird_color == YELLOW:
-                                    p_name = 'yellow'
-                                elif bird_color == RED:
-                                    p_name = 'red'
-                                elif bird_color == BLUE:
-                                    p_name = 'blue'
-                                elif bird_color == WHITE:
-                                    p_name = 'white'
-                                elif bird_color == PURPLE:
-                                    p_name = 'purple'
-                                elif bird_color == ORANGE:
-                                    p_name = 'orange'
-                                elif bird_color == STEALTH:
-                                    p_name = 'stealth'
-                                else:
-                                    p_name = 'unknown'
-                                bird_lane = random_lanes[bird_in_lane]
-                                check_achievements_event('power_used', power=p_name, lane=bird_lane)
-
-                                if bird_color == YELLOW:
-                                    # Yellow power: Slow down adjacent falling birds by -1
-                                    # EXCEPT for other yellow birds - bounce them instead
-                                    affected_count = 0
-                                    for adj_offset in [-1, 1]:
-                                        adj_lane = bird_lane + adj_offset
-                                        if 0 <= adj_lane < 9:
-                                            # Find which bird is in the adjacent lane
-                                            adj_bird = -1
-                                            for idx in range(NUM_BALLS):
-                                                if random_lanes[idx] == adj_lane:
-                                                    adj_bird = idx
-                                                    break
-
-                                            if adj_bird >= 0 and not ball_lost[adj_bird]:
-                                                    # Check if bird is falling (moving down)
-                                                    if ball_vy[adj_bird] == 1:
-                                                        # If the adjacent bird is a yellow/patchwork, bounce it
-                                                        if ball_colors[adj_bird] == YELLOW or ball_colors[adj_bird] == PATCHWORK:
-                                                            # GLITCH has a 5% chance to ignore the bounce
+                                set_ball_vy(bird_in_lane, -1)
+                        except Exception:
+                            ball_vy[bird_in_lane] = -1
+                        reset_bird_power(bird_in_lane)  # Reset power when bird starts rising
+                        # Special: if this is a CLOCKWORK bird in freefall (charge == 0),
+                        # bouncing it restores charge to 1 and sets its speed accordingly.
+                        try:
+                            if ball_colors[bird_in_lane] == CLOCKWORK:
+                                c = clockwork_charge.get(bird_in_lane, None)
+                                if c is None:
+                                    # initialize if missing
+                                    clockwork_charge[bird_in_lane] = CLOCKWORK_INITIAL_CHARGE
+                                    c = CLOCKWORK_INITIAL_CHARGE
+                                if c == 0:
+                                    clockwork_charge[bird_in_lane] = 1
+                                    # speed equals charge when >0
+                                    ball_speeds[bird_in_lane] = 1
+                        except Exception:
+                            pass
+                        # Apply bounce boost if active
+                        if powerups['bounce_boost_active'] and bird_in_lane not in speed_boosts:
+                            boost_frames = int(powerups['bounce_boost_duration'] / base_sleep)
+                            speed_boosts[bird_in_lane] = boost_frames
+                        # record bounce action for combo detection
+                        try:
+                            append_recent_action('bounce', lane=random_lanes[bird_in_lane], color=ball_colors[bird_in_lane])
+                        except NameError:
+                            pass
+                    elif ball_vy[bird_in_lane] == -1:  # Already moving up - activate special power
+                        # Only use power once per ascent
+                        # Allow extra power use for A-grade birds (2 uses per ascent)
+                        try:
+                            grade_label, _ = compute_grade_from_xp(per_bird_xp[bird_in_lane])
+                            allowed_uses = 2 if (grade_label and grade_label.startswith('A')) else 1
+                        except Exception:
+                            allowed_uses = 1
+                        if not allow_consume_power(bird_in_lane, allowed_uses=allowed_uses):
+                            # already consumed allowed uses - do nothing
+                            pass
+                        else:
+                            bird_color = ball_colors[bird_in_lane]
+                            # Notify achievements about power use
+                            # map color escape to simple name
+                            if bird_color == YELLOW:
+                                p_name = 'yellow'
+                            elif bird_color == RED:
+                                p_name = 'red'
+                            elif bird_color == BLUE:
+                                p_name = 'blue'
+                            elif bird_color == WHITE:
+                                p_name = 'white'
+                            elif bird_color == PURPLE:
+                                p_name = 'purple'
+                            elif bird_color == ORANGE:
+                                p_name = 'orange'
+                            elif bird_color == STEALTH:
+                                p_name = 'stealth'
+                            else:
+                                p_name = 'unknown'
+                            bird_lane = random_lanes[bird_in_lane]
+                            check_achievements_event('power_used', power=p_name, lane=bird_lane)
+
+                            if bird_color == YELLOW:
+                                # Yellow power: Slow down adjacent falling birds by -1
+                                # EXCEPT for other yellow birds - bounce them instead
+                                affected_count = 0
+                                for adj_offset in [-1, 1]:
+                                    adj_lane = bird_lane + adj_offset
+                                    if 0 <= adj_lane < 9:
+                                        # Find which bird is in the adjacent lane
+                                        adj_bird = -1
+                                        for idx in range(NUM_BALLS):
+                                            if random_lanes[idx] == adj_lane:
+                                                adj_bird = idx
+                                                break
+
+                                        if adj_bird >= 0 and not ball_lost[adj_bird]:
+                                                # Check if bird is falling (moving down)
+                                                if ball_vy[adj_bird] == 1:
+                                                    # If the adjacent bird is a yellow/patchwork, bounce it
+                                                    if ball_colors[adj_bird] == YELLOW or ball_colors[adj_bird] == PATCHWORK:
+                                                        # GLITCH has a 5% chance to ignore the bounce
+                                                        try:
                                                             try:
+                                                                if ball_colors[adj_bird] == GLITCH and rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
+                                                                    # ignore bounce
+                                                                    pass
+                                                                else:
+                                                                    set_ball_vy(adj_bird, -1)
+                                                            except Exception:
+                                                                # fallback
                                                                 try:
-                                                                    if ball_colors[adj_bird] == GLITCH and random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                                        # ignore bounce
+                                                                    if ball_colors[adj_bird] == GLITCH and rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
                                                                         pass
                                                                     else:
                                                                         set_ball_vy(adj_bird, -1)
                                                                 except Exception:
-                                                                    # fallback
-                                                                    try:
-                                                                        if ball_colors[adj_bird] == GLITCH and random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                                            pass
-                                                                        else:
-                                                                            set_ball_vy(adj_bird, -1)
-                                                                    except Exception:
-                                                                        set_ball_vy(adj_bird, -1)
-                                                            except Exception:
-                                                                set_ball_vy(adj_bird, -1)
+                                                                    set_ball_vy(adj_bird, -1)
+                                                        except Exception:
+                                                            set_ball_vy(adj_bird, -1)
 
-                                                            reset_bird_power(adj_bird)  # Reset power for bounced yellow
-                                                            affected_count += 1
-                                                            try:
-                                                                append_recent_action('bounce', lane=adj_lane, color=ball_colors[adj_bird])
-                                                            except NameError:
-                                                                pass
+                                                        reset_bird_power(adj_bird)  # Reset power for bounced yellow
+                                                        affected_count += 1
+                                                        try:
+                                                            append_recent_action('bounce', lane=adj_lane, color=ball_colors[adj_bird])
+                                                        except NameError:
+                                                            pass
 
-                                                            # When a yellow is bounced, nearby SCARED blue birds that are falling
-                                                            # and occupying adjacent lanes should lose their scared state.
-                                                            try:
-                                                                for cross_offset in [-1, 1]:
-                                                                    cross_lane = adj_lane + cross_offset
-                                                                    if 0 <= cross_lane < 9:
-                                                                        for bi in range(NUM_BALLS):
-                                                                            try:
-                                                                                if random_lanes[bi] == cross_lane and not ball_lost[bi] and ball_colors[bi] == BLUE and bi in scared_birds and ball_vy[bi] == 1:
-                                                                                    try:
-                                                                                        del scared_birds[bi]
-                                                                                    except Exception:
-                                                                                        pass
-                                                                            except Exception:
-                                                                                continue
-                                                            except Exception:
-                                                                pass
-                                                        else:
-                                                            # Non-yellow bird - apply slow effect
-                                                            speed_boosts[adj_bird] = -int(3.0 / base_sleep)  # 3 seconds of slow
-                                                            affected_count += 1
-                                                
-
-                                elif bird_color == RED:
-                                    # Red power: Launch projectile immediately
-                                    # Count adjacent red/purple/PATCHWORK birds moving up for damage bonus
-                                    damage_bonus = 0
-                                    for adj_offset in [-1, 1]:
-                                        adj_lane = bird_lane + adj_offset
-                                        if 0 <= adj_lane < 9:
-                                            for idx in range(NUM_BALLS):
-                                                if random_lanes[idx] == adj_lane and not ball_lost[idx]:
-                                                    if (ball_colors[idx] == RED or ball_colors[idx] == PURPLE or ball_colors[idx] == PATCHWORK) and ball_vy[idx] == -1:
-                                                        damage_bonus += 1
-                                                    break
-                                    red_projectiles.append({
-                                        'x_pos': LANE_POSITIONS[bird_lane],
-                                        'y_pos': ball_y[bird_in_lane],
-                                        'lane': bird_lane,
-                                        'damage': 1 + damage_bonus,
-                                        'powered': damage_bonus > 0,
-                                        'owner': bird_in_lane,
-                                        'speed': 1
-                                    })
-
-                                elif bird_color == PURPLE:
-                                    # PURPLE: begin priming the charge when UP is held; actual charging starts next frame
-                                    try:
-                                                if purple_state[bird_in_lane] == 0:
-                                                    purple_state[bird_in_lane] = 1
-                                                    purple_primed_frame[bird_in_lane] = frame_count
-                                                    try:
-                                                        purple_hold_counter[bird_in_lane] = 0
-                                                    except Exception:
-                                                        pass
-                                    except Exception:
-                                        pass
-                                elif bird_color == COOKIE:
-                                    # COOKIE power: drop a cookie crumb at current lane containing 3/4 of cookie's XP
-                                    try:
-                                        crumb_xp = int(max(0, int(per_bird_xp[bird_in_lane] * 0.75)))
-                                    except Exception:
-                                        crumb_xp = 0
-                                    try:
-                                        loot_items.append({
-                                            'x_pos': LANE_POSITIONS[bird_lane],
-                                            'y_pos': ball_y[bird_in_lane],
-                                            'type': 'cookie_crumb',
-                                            'rarity': 'rare',
-                                            'xp': crumb_xp,
-                                            'spawn_ts': time.time()
-                                        })
-                                    except Exception:
-                                        pass
+                                                        # When a yellow is bounced, nearby SCARED blue birds that are falling
+                                                        # and occupying adjacent lanes should lose their scared state.
+                                                        try:
+                                                            for cross_offset in [-1, 1]:
+                                                                cross_lane = adj_lane + cross_offset
+                                                                if 0 <= cross_lane < 9:
+                                                                    for bi in range(NUM_BALLS):
+                                                                        try:
+                                                                            if random_lanes[bi] == cross_lane and not ball_lost[bi] and ball_colors[bi] == BLUE and bi in scared_birds and ball_vy[bi] == 1:
+                                                                                try:
+                                                                                    del scared_birds[bi]
+                                                                                except Exception:
+                                                                                    pass
+                                                                        except Exception:
+                                                                            continue
+                                                        except Exception:
+                                                            pass
+                                                    else:
+                                                        # Non-yellow bird - apply slow effect
+                                                        speed_boosts[adj_bird] = -int(3.0 / base_sleep)  # 3 seconds of slow
+                                                        affected_count += 1
+
+
+                            elif bird_color == RED:
+                                # Red power: Launch projectile immediately
+                                # Count adjacent red/purple/PATCHWORK birds moving up for damage bonus
+                                damage_bonus = 0
+                                for adj_offset in [-1, 1]:
+                                    adj_lane = bird_lane + adj_offset
+                                    if 0 <= adj_lane < 9:
+                                        for idx in range(NUM_BALLS):
+                                            if random_lanes[idx] == adj_lane and not ball_lost[idx]:
+                                                if (ball_colors[idx] == RED or ball_colors[idx] == PURPLE or ball_colors[idx] == PATCHWORK) and ball_vy[idx] == -1:
+                                                    damage_bonus += 1
+                                                break
+                                red_projectiles.add(Projectile(
+                                    x_pos=LANE_POSITIONS[bird_lane],
+                                    y_pos=ball_y[bird_in_lane],
+                                    lane=bird_lane,
+                                    damage=1 + damage_bonus,
+                                    powered=damage_bonus > 0,
+                                    owner=bird_in_lane,
+                                    speed=1
+                                ))
+
+                            elif bird_color == PURPLE:
+                                # PURPLE: begin priming the charge when UP is held; actual charging starts next frame
+                                try:
+                                            if purple_state[bird_in_lane] == 0:
+                                                purple_state[bird_in_lane] = 1
+                                                purple_primed_frame[bird_in_lane] = state.frame_count
+                                                try:
+                                                    purple_hold_counter[bird_in_lane] = 0
+                                                except Exception:
+                                                    pass
+                                except Exception:
+                                    pass
+                            elif bird_color == COOKIE:
+                                # COOKIE power: drop a cookie crumb at current lane containing 3/4 of cookie's XP
+                                try:
+                                    crumb_xp = int(max(0, int(per_bird_xp[bird_in_lane] * 0.75)))
+                                except Exception:
+                                    crumb_xp = 0
+                                try:
+                                    spawn_loot(Loot(
+                                        x_pos=LANE_POSITIONS[bird_lane],
+                                        y_pos=ball_y[bird_in_lane],
+                                        type='cookie_crumb',
+                                        rarity='rare',
+                                        xp=crumb_xp,
+                                        spawn_ts=state.sim_time
+                                    ))
+                                except Exception:
+                                    pass
 
-                                    # Track crumbs created by this cookie bird
-                                    try:
-                                        cookie_crumbs_made[bird_in_lane] = cookie_crumbs_made.get(bird_in_lane, 0) + 1
-                                        # After leaving 5 crumbs, the cookie bird disappears and should count as a loss
-                                        if cookie_crumbs_made.get(bird_in_lane, 0) >= 5:
-                                            try:
-                                                # Only count the loss once (guard against double-decrement)
-                                                if not ball_lost[bird_in_lane]:
-                                                    ball_lost[bird_in_lane] = True
-                                                    # place bird off-screen to indicate loss
-                                                    ball_y[bird_in_lane] = HEIGHT - 1
-                                                    per_bird_xp[bird_in_lane] = 0
-                                                    try:
-                                                        lives -= 1
-                                                        if lives <= 0:
-                                                            game_over = True
-                                                    except Exception:
-                                                        pass
-                                            except Exception:
-                                                pass
-                                    except Exception:
-                                        pass
+                                # Track crumbs created by this cookie bird
+                                try:
+                                    cookie_crumbs_made[bird_in_lane] = cookie_crumbs_made.get(bird_in_lane, 0) + 1
+                                    # After leaving 5 crumbs, the cookie bird disappears and should count as a loss
+                                    if cookie_crumbs_made.get(bird_in_lane, 0) >= 5:
+                                        try:
+                                            # Only count the loss once (guard against double-decrement)
+                                            if not ball_lost[bird_in_lane]:
+                                                set_bird_lost(bird_in_lane, True)
+                                                # place bird off-screen to indicate loss
+                                                ball_y[bird_in_lane] = HEIGHT - 1
+                                                per_bird_xp[bird_in_lane] = 0
+                                                try:
+                                                    state.lives -= 1
+                                                    if state.lives <= 0:
+                                                        state.game_over = True
+                                                except Exception:
+                                                    pass
+                                        except Exception:
+                                            pass
+                                except Exception:
+                                    pass
 
-                                elif bird_color == BLUE:
-                                    # Blue power: Speed boost + extra damage flag
-                                    boost_frames = int(3.0 / base_sleep)
+                            elif bird_color == BLUE:
+                                # Blue power: Speed boost + extra damage flag
+                                boost_frames = int(3.0 / base_sleep)
+                                speed_boosts[bird_in_lane] = boost_frames
+                                # Mark this bird as having blue power active (for extra damage)
+                                if bird_in_lane not in speed_boosts:
                                     speed_boosts[bird_in_lane] = boost_frames
-                                    # Mark this bird as having blue power active (for extra damage)
-                                    if bird_in_lane not in speed_boosts:
-                                        speed_boosts[bird_in_lane] = boost_frames
-
-                                elif bird_color == WHITE:
-                                    # White power: Affect 4 adjacent lanes (2 left + 2 right)
-                                    for adj_offset in [-2, -1, 1, 2]:
-                                        adj_lane = bird_lane + adj_offset
-                                        if 0 <= adj_lane < 9:
-                                            # Find which bird is in the adjacent lane
-                                            adj_bird = -1
-                                            for idx in range(NUM_BALLS):
-                                                if random_lanes[idx] == adj_lane:
-                                                    adj_bird = idx
-                                                    break
-
-                                            if adj_bird >= 0 and not ball_lost[adj_bird]:
-                                                if ball_vy[adj_bird] == 1:
-                                                    # Bird is falling - bounce it up
-                                                    # But don't bounce scared birds (PURPLE exception)
-                                                    if adj_bird in scared_birds and ball_colors[adj_bird] != PURPLE:
-                                                        # ignore bounce for scared bird
-                                                        pass
-                                                    else:
-                                                        # GLITCH has 5% chance to ignore the bounce
+
+                            elif bird_color == WHITE:
+                                # White power: Affect 4 adjacent lanes (2 left + 2 right)
+                                for adj_offset in [-2, -1, 1, 2]:
+                                    adj_lane = bird_lane + adj_offset
+                                    if 0 <= adj_lane < 9:
+                                        # Find which bird is in the adjacent lane
+                                        adj_bird = -1
+                                        for idx in range(NUM_BALLS):
+                                            if random_lanes[idx] == adj_lane:
+                                                adj_bird = idx
+                                                break
+
+                                        if adj_bird >= 0 and not ball_lost[adj_bird]:
+                                            if ball_vy[adj_bird] == 1:
+                                                # Bird is falling - bounce it up
+                                                # But don't bounce scared birds (PURPLE exception)
+                                                if adj_bird in scared_birds and ball_colors[adj_bird] != PURPLE:
+                                                    # ignore bounce for scared bird
+                                                    pass
+                                                else:
+                                                    # GLITCH has 5% chance to ignore the bounce
+                                                    try:
+                                                        if ball_colors[adj_bird] == GLITCH and rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
+                                                            # ignore bounce
+                                                            pass
+                                                        else:
+                                                            set_ball_vy(adj_bird, -1)
+                                                    except Exception:
                                                         try:
-                                                            if ball_colors[adj_bird] == GLITCH and random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                                # ignore bounce
+                                                            if ball_colors[adj_bird] == GLITCH and rng.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
                                                                 pass
                                                             else:
                                                                 set_ball_vy(adj_bird, -1)
                                                         except Exception:
-                                                            try:
-                                                                if ball_colors[adj_bird] == GLITCH and random.random() < float(GLITCH_BOUNCE_IGNORE_CHANCE):
-                                                                    pass
-                                                                else:
-                                                                    set_ball_vy(adj_bird, -1)
-                                                            except Exception:
-                                                                set_ball_vy(adj_bird, -1)
-                                                        reset_bird_power(adj_bird)  # Reset their power
-                                                        try:
-                                                            append_recent_action('bounce', lane=adj_lane, color=ball_colors[adj_bird])
-                                                        except NameError:
-                                                            pass
-                                                elif ball_vy[adj_bird] == -1:
-                                                    # Bird is rising - activate its power (if not already used)
-                                                    # Allow extra power use for A-grade adjacent birds
+                                                            set_ball_vy(adj_bird, -1)
+                                                    reset_bird_power(adj_bird)  # Reset their power
                                                     try:
-                                                        adj_grade, _ = compute_grade_from_xp(per_bird_xp[adj_bird])
-                                                        adj_allowed = 2 if (adj_grade and adj_grade.startswith('A')) else 1
-                                                    except Exception:
-                                                        adj_allowed = 1
-                                                    if not allow_consume_power(adj_bird, allowed_uses=adj_allowed):
+                                                        append_recent_action('bounce', lane=adj_lane, color=ball_colors[adj_bird])
+                                                    except NameError:
                                                         pass
-                                                        adj_bird_color = ball_colors[adj_bird]
-                                                        # Notify achievements about adjacent bird power use
-                                                        if adj_bird_color == YELLOW:
-                                                            p_name = 'yellow'
-                                                        elif adj_bird_color == RED:
-                                                            p_name = 'red'
-                                                        elif adj_bird_color == BLUE:
-                                                            p_name = 'blue'
-                                                        elif adj_bird_color == WHITE:
-                                                            p_name = 'white'
-                                                        elif adj_bird_color == PURPLE:
-                                                            p_name = 'purple'
-                                                        elif adj_bird_color == ORANGE:
-                                                            p_name = 'orange'
-                                                        else:
-                                                            p_name = 'unknown'
-                                                        check_achievements_event('power_used', power=p_name, lane=adj_lane)
-                                                        adj_bird_lane = random_lanes[adj_bird]
-
-                                                        # Execute the bird's power based on its color
-                                                        if adj_bird_color == YELLOW:
-                                                            # Yellow power on adjacent bird - bounces yellows, slows others
-                                                            for y_offset in [-1, 1]:
-                                                                y_lane = adj_bird_lane + y_offset
-                                                                if 0 <= y_lane < 9:
-                                                                    y_bird = -1
-                                                                    for idx2 in range(NUM_BALLS):
-                                                                        if random_lanes[idx2] == y_lane:
-                                                                            y_bird = idx2
-                                                                            break
-                                                                    if y_bird >= 0 and not ball_lost[y_bird] and ball_vy[y_bird] == 1:
-                                                                        # Respect scared state: scared birds ignore bounces (except PURPLE)
-                                                                        if y_bird in scared_birds and ball_colors[y_bird] != PURPLE:
-                                                                            # do nothing to scared bird
-                                                                            pass
+                                            elif ball_vy[adj_bird] == -1:
+                                                # Bird is rising - activate its power (if not already used)
+                                                # Allow extra power use for A-grade adjacent birds
+                                                try:
+                                                    adj_grade, _ = compute_grade_from_xp(per_bird_xp[adj_bird])
+                                                    adj_allowed = 2 if (adj_grade and adj_grade.startswith('A')) else 1
+                                                except Exception:
+                                                    adj_allowed = 1
+                                                if not allow_consume_power(adj_bird, allowed_uses=adj_allowed):
+                                                    pass
+                                                    adj_bird_color = ball_colors[adj_bird]
+                                                    # Notify achievements about adjacent bird power use
+                                                    if adj_bird_color == YELLOW:
+                                                        p_name = 'yellow'
+                                                    elif adj_bird_color == RED:
+                                                        p_name = 'red'
+                                                    elif adj_bird_color == BLUE:
+                                                        p_name = 'blue'
+                                                    elif adj_bird_color == WHITE:
+                                                        p_name = 'white'
+                                                    elif adj_bird_color == PURPLE:
+                                                        p_name = 'purple'
+                                                    elif adj_bird_color == ORANGE:
+                                                        p_name = 'orange'
+                                                    else:
+                                                        p_name = 'unknown'
+                                                    check_achievements_event('power_used', power=p_name, lane=adj_lane)
+                                                    adj_bird_lane = random_lanes[adj_bird]
+
+                                                    # Execute the bird's power based on its color
+                                                    if adj_bird_color == YELLOW:
+                                                        # Yellow power on adjacent bird - bounces yellows, slows others
+                                                        for y_offset in [-1, 1]:
+                                                            y_lane = adj_bird_lane + y_offset
+                                                            if 0 <= y_lane < 9:
+                                                                y_bird = lane_bird(y_lane)
+                                                                if 0 <= y_bird < NUM_BALLS and not ball_lost[y_bird] and ball_vy[y_bird] == 1:
+                                                                    # Respect scared state: scared birds ignore bounces (except PURPLE)
+                                                                    if y_bird in scared_birds and ball_colors[y_bird] != PURPLE:
+                                                                        # do nothing to scared bird
+                                                                        pass
+                                                                    else:
+                                                                        if ball_colors[y_bird] == YELLOW:
+                                                                                    # Bounce yellow bird
+                                                                                    set_ball_vy(y_bird, -1)
+                                                                                    reset_bird_power(y_bird)
                                                                         else:
-                                                                            if ball_colors[y_bird] == YELLOW:
-                                                                                        # Bounce yellow bird
-                                                                                        set_ball_vy(y_bird, -1)
-                                                                                        reset_bird_power(y_bird)
-                                                                            else:
-                                                                                # Slow non-yellow bird
-                                                                                speed_boosts[y_bird] = -int(3.0 / base_sleep)
-
-                                                        elif adj_bird_color == RED:
-                                                            # Red power on adjacent bird
-                                                            # Count adjacent red birds moving up for damage bonus
-                                                            damage_bonus = 0
-                                                            for adj_offset2 in [-1, 1]:
-                                                                adj_lane2 = adj_bird_lane + adj_offset2
-                                                                if 0 <= adj_lane2 < 9:
-                                                                    for idx2 in range(NUM_BALLS):
-                                                                        if random_lanes[idx2] == adj_lane2 and not ball_lost[idx2]:
-                                                                            if ball_colors[idx2] == RED and ball_vy[idx2] == -1:
-                                                                                damage_bonus += 1
-                                                                            break
-
-                                                            red_projectiles.append({
-                                                                'x_pos': LANE_POSITIONS[adj_bird_lane],
-                                                                'y_pos': ball_y[adj_bird],
-                                                                'lane': adj_bird_lane,
-                                                                'damage': 1 + damage_bonus,
-                                                                'powered': damage_bonus > 0,
-                                                                'owner': adj_bird
-                                                            })
-
-                                                        elif adj_bird_color == BLUE:
-                                                            # Blue power on adjacent bird
-                                                            boost_frames = int(BLUE_ADJACENT_BOOST_SECONDS / base_sleep)
-                                                            speed_boosts[adj_bird] = boost_frames
-                                elif bird_color == CLOCKWORK:
-                                    # CLOCKWORK power: increase charge up to max 3.
-                                    try:
-                                        cur = clockwork_charge.get(bird_in_lane, CLOCKWORK_INITIAL_CHARGE)
-                                        if cur is None:
-                                            cur = CLOCKWORK_INITIAL_CHARGE
-                                        newc = min(int(CLOCKWORK_MAX_CHARGE), cur + 1)
-                                        clockwork_charge[bird_in_lane] = newc
-                                        # When charge > 0, speed mirrors charge
-                                        if newc > 0:
-                                            ball_speeds[bird_in_lane] = newc
-                                    except Exception:
-                                        pass
-                                elif bird_color == STEALTH:
-                                    # Stealth power: become tangible for a short duration and deal heavy damage
-                                    # bird_power_used[bird_in_lane] is already True
-                                    stealth_timers[bird_in_lane] = max(1, int(STEALTH_TANGIBLE_SECONDS / base_sleep))
-                                    # Save previous speed and apply temporary speed boost
-                                    try:
-                                        stealth_prev_speeds[bird_in_lane] = ball_speeds[bird_in_lane]
-                                        ball_speeds[bird_in_lane] = int(STEALTH_SPEED_BOOST)
-                                    except Exception:
-                                        pass
-                                    try:
-                                        append_recent_action('stealth', lane=bird_lane, color=STEALTH)
-                                    except NameError:
-                                        pass
-            elif key == KEY_MOVE_DOWN:
-                # Suction: pull bird down if moving up
-                if powerups['suction_active']:
-                    # Determine affected lanes (support wide cursor)
-                    if powerups['wide_cursor_active']:
-                        half_width = powerups['wide_cursor_lanes'] // 2
-                        lanes_to_affect = []
-                        for offset in range(-half_width, half_width + 1):
-                            lane = player_lane + offset
-                            if 0 <= lane < 9:
-                                lanes_to_affect.append(lane)
-                    else:
-                        lanes_to_affect = [player_lane]
-
-                    for lane in lanes_to_affect:
-                        bird_in_lane = random_lanes.index(lane) if lane in random_lanes else -1
-                        if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
-                            if ball_vy[bird_in_lane] == -1:  # Moving up - pull it down
-                                set_ball_vy(bird_in_lane, 1)
-                                # Apply suction boost if configured
-                                if powerups['suction_boost_duration'] > 0 and bird_in_lane not in speed_boosts:
-                                    boost_frames = int(powerups['suction_boost_duration'] / base_sleep)
-                                    speed_boosts[bird_in_lane] = boost_frames
-                                # record suction action for combo detection
+                                                                            # Slow non-yellow bird
+                                                                            speed_boosts[y_bird] = -int(3.0 / base_sleep)
+
+                                                    elif adj_bird_color == RED:
+                                                        # Red power on adjacent bird
+                                                        # Count adjacent red birds moving up for damage bonus
+                                                        damage_bonus = 0
+                                                        for adj_offset2 in [-1, 1]:
+                                                            adj_lane2 = adj_bird_lane + adj_offset2
+                                                            if 0 <= adj_lane2 < 9:
+                                                                idx2 = lane_bird(adj_lane2)
+                                                                if 0 <= idx2 < NUM_BALLS and not ball_lost[idx2]:
+                                                                    if ball_colors[idx2] == RED and ball_vy[idx2] == -1:
+                                                                        damage_bonus += 1
+
+                                                        red_projectiles.add(Projectile(
+                                                            x_pos=LANE_POSITIONS[adj_bird_lane],
+                                                            y_pos=ball_y[adj_bird],
+                                                            lane=adj_bird_lane,
+                                                            damage=1 + damage_bonus,
+                                                            powered=damage_bonus > 0,
+                                                            owner=adj_bird
+                                                        ))
+
+                                                    elif adj_bird_color == BLUE:
+                                                        # Blue power on adjacent bird
+                                                        boost_frames = int(BLUE_ADJACENT_BOOST_SECONDS / base_sleep)
+                                                        speed_boosts[adj_bird] = boost_frames
+                            elif bird_color == CLOCKWORK:
+                                # CLOCKWORK power: increase charge up to max 3.
+                                try:
+                                    cur = clockwork_charge.get(bird_in_lane, CLOCKWORK_INITIAL_CHARGE)
+                                    if cur is None:
+                                        cur = CLOCKWORK_INITIAL_CHARGE
+                                    newc = min(int(CLOCKWORK_MAX_CHARGE), cur + 1)
+                                    clockwork_charge[bird_in_lane] = newc
+                                    # When charge > 0, speed mirrors charge
+                                    if newc > 0:
+                                        ball_speeds[bird_in_lane] = newc
+                                except Exception:
+                                    pass
+                            elif bird_color == STEALTH:
+                                # Stealth power: become tangible for a short duration and deal heavy damage
+                                # bird_power_used[bird_in_lane] is already True
+                                stealth_timers[bird_in_lane] = max(1, int(STEALTH_TANGIBLE_SECONDS / base_sleep))
+                                # Save previous speed and apply temporary speed boost
+                                try:
+                                    stealth_prev_speeds[bird_in_lane] = ball_speeds[bird_in_lane]
+                                    ball_speeds[bird_in_lane] = int(STEALTH_SPEED_BOOST)
+                                except Exception:
+                                    pass
                                 try:
-                                    append_recent_action('suction', lane=random_lanes[bird_in_lane], color=ball_colors[bird_in_lane])
+                                    append_recent_action('stealth', lane=bird_lane, color=STEALTH)
                                 except NameError:
                                     pass
-            elif key == KEY_QUIT:
-                break
-
-        # Build output buffer (don't clear screen, just reposition)
-        output = "\033[2J\033[H"  # Clear screen and move to home
-        
-        # Recompute level from current score so spending points can LOWER the level
-        level = compute_level_from_score(score)
-
-        # Draw simple header with score, level, lives, and compact per-lane XP (trimmed to fit WIDTH)
-        next_level_score = calculate_level_threshold(level + 1)
-        lives_display = "●" * lives + "◌" * (5 - lives)
+        elif key == KEY_MOVE_DOWN:
+            # Suction: pull bird down if moving up
+            if powerups['suction_active']:
+                # Determine affected lanes (support wide cursor)
+                if powerups['wide_cursor_active']:
+                    half_width = powerups['wide_cursor_lanes'] // 2
+                    lanes_to_affect = []
+                    for offset in range(-half_width, half_width + 1):
+                        lane = state.player_lane + offset
+                        if 0 <= lane < 9:
+                            lanes_to_affect.append(lane)
+                else:
+                    lanes_to_affect = [state.player_lane]
 
-        # Compute prestige for display (safe fallback to 1.0)
-        try:
-            prestige_val = compute_prestige()
-            if prestige_val is None:
-                prestige_val = 1.0
-        except Exception:
-            prestige_val = 1.0
-        prestige_display = f"{prestige_val:.2f}x"
-
-        base_score_line = f"SCORE: {int(score)}  |  LEVEL: {level}  |  NEXT: {next_level_score}  |  LIVES: {lives_display}  |  PRESTIGE: {prestige_display}"
-
-        # XP and grade display removed from header per user request.
-        # Keep internal XP bookkeeping (per_bird_xp) intact, but do not render it.
-        output += f"\033[1;1H{base_score_line}\n"
-        output += f"\033[2;1H{ceiling}\n"
-        # Render single queued notification at the bottom (replace help/commands area)
-        active_notifications = [n for n in notifications if n[1] > frame_count]
-        if active_notifications:
-            text, exp = active_notifications[0]
-            footer_y = HEIGHT + 3  # bottom area after game box
-            # Truncate to width to avoid wrapping
-            display_text = text[:WIDTH]
-            output += f"\033[{footer_y};1H{YELLOW}{display_text}{RESET}\n"
-        # Prune expired notifications (keep order)
-        notifications[:] = active_notifications
-        
-        # Draw starting line (dashed line near bottom)
-        starting_line_y = STARTING_LINE + 2  # +2 for header offset
-        if 3 <= starting_line_y < HEIGHT + 2:
-            # When tailwind is active, render the starting line as blue carets '^'
-            if powerups.get('tailwind_active'):
-                dashed_line = "^ " * (WIDTH // 2)
-                output += f"\033[{starting_line_y};1H{BLUE}{dashed_line[:WIDTH]}{RESET}"
-            else:
-                dashed_line = "- " * (WIDTH // 2)  # Create dashed pattern
-                output += f"\033[{starting_line_y};1H{DARK_GRAY}{dashed_line[:WIDTH]}{RESET}"
-            
-            # Show power-up indicators on affected lanes
-            # Calculate which lanes are affected by cursor
-            if powerups['wide_cursor_active']:
-                half_width = powerups['wide_cursor_lanes'] // 2
-                lanes_to_check = []
-                for offset in range(-half_width, half_width + 1):
-                    lane = player_lane + offset
-                    if 0 <= lane < 9:
-                        lanes_to_check.append(lane)
-            else:
-                lanes_to_check = [player_lane]
-            
-            # Draw indicators on the starting line for each affected lane
-            for lane in lanes_to_check:
-                lane_x = LANE_POSITIONS[lane]
-                bird_in_lane = random_lanes.index(lane) if lane in random_lanes else -1
-                
-                if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
-                    # Bounce boost: show blue ^ if bird is falling
-                    if powerups['bounce_boost_active'] and ball_vy[bird_in_lane] == 1:
-                        output += f"\033[{starting_line_y};{lane_x}H{BLUE}\033[1m^{RESET}"
-                    # Suction: show red v if bird is rising
-                    elif powerups['suction_active'] and ball_vy[bird_in_lane] == -1:
-                        output += f"\033[{starting_line_y};{lane_x}H{RED}\033[1mv{RESET}"
-            
-        
-        # Draw obstacles
-        for obs in obstacles:
-            # Color based on remaining HP (scale from base green to black)
-            try:
-                max_hp = _OBST_MAX_HP_BY_TIER.get(obs.get('tier', 1), obs.get('hp', 1))
-            except Exception:
-                max_hp = obs.get('hp', 1)
-            obs_color = _color_from_hp(_OBST_BASE_RGB, obs.get('hp', 0), max_hp)
-
-            # Draw sprite - single line, no HP display
-            for line_idx, line in enumerate(OBSTACLE_SPRITE):
-                y_pos = obs['y_pos'] + line_idx + 2  # +2 for header offset
-                if 3 <= y_pos < HEIGHT + 2:
-                    x_pos = LANE_POSITIONS[obs['lane']] - 1  # Center 3-char sprite
-                    output += f"\033[{y_pos};{x_pos}H{obs_color}{line}{RESET}"
-        
-        # Draw bats
-        for bat in bats:
-            # Color based on remaining HP (scale from magenta to black)
-            bat_hp = bat.get('hp', 0)
-            bat_max = bat.get('max_hp', bat_hp if bat_hp > 0 else 1)
-            bat_color = _color_from_hp(_BATS_BASE_RGB, bat_hp, bat_max)
-
-            # Choose sprite frame based on animation
-            bat_sprite = BAT_FRAME_1 if (frame_count // 3) % 2 == 0 else BAT_FRAME_2
-            
-            # Draw bat - no HP display
-            for line_idx, line in enumerate(bat_sprite):
-                y_pos = bat['y_pos'] + line_idx + 2  # +2 for header offset
-                if 3 <= y_pos < HEIGHT + 2:
-                    output += f"\033[{y_pos};{bat['x_pos']}H{bat_color}{line}{RESET}"
-        
-        # Draw loot items
-        for loot in loot_items:
-            y_pos = loot['y_pos'] + 2  # +2 for header offset
-            if 3 <= y_pos < HEIGHT + 2:
-                loot_type = loot['type']
-                rarity = loot['rarity']
-                
-                # Determine color based on rarity
-                if rarity == 'common':
-                    power_color = YELLOW
-                elif rarity == 'uncommon':
-                    power_color = RED
-                elif rarity == 'rare':
-                    power_color = BLUE
-                else:  # legendary
-                    power_color = WHITE
-                
-                # Eggs - colored by bird type
-                if loot_type == 'yellow_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{YELLOW}⬯{RESET}"
-                elif loot_type == 'red_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{RED}⬯{RESET}"
-                elif loot_type == 'blue_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{BLUE}⬯{RESET}"
-                elif loot_type == 'white_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{WHITE}⬯{RESET}"
-                elif loot_type == 'clockwork_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{CLOCKWORK}⬯{RESET}"
-                elif loot_type == 'gold_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{GOLD}⬯{RESET}"
-                elif loot_type == 'stealth_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{DARK_GRAY}⬯{RESET}"
-                elif loot_type == 'patchwork_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{PATCHWORK}⬯{RESET}"
-                elif loot_type == 'orange_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{ORANGE}⬯{RESET}"
-                elif loot_type == 'cookie_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{COOKIE}⬯{RESET}"
-                elif loot_type == 'cookie_crumb':
-                    # Small dot for crumb
-                    output += f"\033[{y_pos};{loot['x_pos']}H{COOKIE}•{RESET}"
-                elif loot_type == 'dinosaur_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{DINOSAUR}⬯{RESET}"
-                elif loot_type == 'glitch_egg':
-                    output += f"\033[{y_pos};{loot['x_pos']}H{GLITCH}⬯{RESET}"
-                # Cursor power-ups
-                elif 'wide_cursor' in loot_type:
-                    output += f"\033[{y_pos};{loot['x_pos']}H{power_color}↔{RESET}"
-                # Bounce boost power-ups
-                elif 'bounce_boost' in loot_type:
-                    output += f"\033[{y_pos};{loot['x_pos']}H{power_color}↺{RESET}"
-                # Suction power-ups
-                elif 'suction' in loot_type:
-                    output += f"\033[{y_pos};{loot['x_pos']}H{power_color}⥥{RESET}"
-                # Tailwind power-ups (tiered)
-                elif 'tailwind' in loot_type:
-                    # Use a decorative wind/ornament symbol
-                    output += f"\033[{y_pos};{loot['x_pos']}H{power_color}༄{RESET}"
-                # Shuffle power-ups (tiered)
-                elif 'shuffle' in loot_type:
-                    # Use the chosen decorative shuffle icon
-                    output += f"\033[{y_pos};{loot['x_pos']}H{power_color}𖦹{RESET}"
-        
-        # Draw projectiles (red and others)
-        for proj in red_projectiles:
-            y_pos = proj['y_pos'] + 2  # +2 for header offset
-            if 3 <= y_pos < HEIGHT + 2:
-                # Use • for powered (bonus damage), ⋅ for base
-                symbol = "•" if proj.get('powered', False) else "⋅"
-                proj_color = proj.get('color', RED)
-                output += f"\033[{y_pos};{proj['x_pos']}H{proj_color}{symbol}{RESET}"
-        
-        # Draw active birds
-        for b in range(NUM_BALLS):
-            if not ball_lost[b]:
-                # Check if bird is slowed by yellow power (negative speed_boosts AND moving down)
-                is_slowed = b in speed_boosts and speed_boosts[b] < 0 and ball_vy[b] == 1
-                
-                # Choose sprite based on direction and animate with frame counter
-                # Special: CLOCKWORK animation depends on charge:
-                #  - charge > 1: normal period
-                #  - charge == 1: slower period
-                #  - charge == 0: frozen (single frame)
-                # Freeze animation if bird is slowed (external slow effect)
-                if ball_vy[b] == -1:  # Moving up
-                    if ball_colors[b] == CLOCKWORK:
-                        try:
-                            c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
-                        except Exception:
-                            c = CLOCKWORK_INITIAL_CHARGE
-                        if c == 0:
-                            sprite = BIRD_UP_2  # frozen
-                        elif c == 1:
-                            sprite = BIRD_UP_1 if (frame_count // 6) % 2 == 0 else BIRD_UP_2
-                        else:
-                            sprite = BIRD_UP_1 if (frame_count // 3) % 2 == 0 else BIRD_UP_2
-                    else:
-                        # DINOSAUR has its own larger sprites
-                        if ball_colors[b] == DINOSAUR:
-                            sprite = DINOSAUR_UP_1 if (frame_count // 3) % 2 == 0 else DINOSAUR_UP_2
-                        # If a blue bird is sprinting (power active), lock the up-frame to BIRD_UP_1
-                        # This prevents the animation from toggling while sprint is active.
-                        elif ball_colors[b] == BLUE and bird_power_used[b]:
-                            sprite = BIRD_UP_1
-                        else:
-                            sprite = BIRD_UP_1 if (frame_count // 3) % 2 == 0 else BIRD_UP_2
-                else:  # Moving down
-                    if is_slowed:
-                        sprite = BIRD_DOWN_2 # Frozen frame when slowed
-                    else:
-                        if ball_colors[b] == CLOCKWORK:
-                            try:
-                                c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
-                            except Exception:
-                                c = CLOCKWORK_INITIAL_CHARGE
-                            if c == 0:
-                                sprite = BIRD_DOWN_2  # frozen
-                            elif c == 1:
-                                sprite = BIRD_DOWN_1 if (frame_count // 6) % 2 == 0 else BIRD_DOWN_2
-                            else:
-                                sprite = BIRD_DOWN_1 if (frame_count // 3) % 2 == 0 else BIRD_DOWN_2
-                        else:
-                            # DINOSAUR falling sprites
-                            if ball_colors[b] == DINOSAUR:
-                                sprite = DINOSAUR_DOWN_1 if (frame_count // 3) % 2 == 0 else DINOSAUR_DOWN_2
-                            else:
-                                sprite = BIRD_DOWN_1 if (frame_count // 3) % 2 == 0 else BIRD_DOWN_2
-                
-                            # GLITCH: mix sprite pieces each frame to create a glitched appearance
+                for lane in lanes_to_affect:
+                    bird_in_lane = lane_bird(lane)
+                    if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
+                        if ball_vy[bird_in_lane] == -1:  # Moving up - pull it down
+                            set_ball_vy(bird_in_lane, 1)
+                            # Apply suction boost if configured
+                            if powerups['suction_boost_duration'] > 0 and bird_in_lane not in speed_boosts:
+                                boost_frames = int(powerups['suction_boost_duration'] / base_sleep)
+                                speed_boosts[bird_in_lane] = boost_frames
+                            # record suction action for combo detection
                             try:
-                                if ball_colors[b] == GLITCH:
-                                    # Choose base frames depending on direction
-                                    if ball_vy[b] == -1:
-                                        f1 = BIRD_UP_1
-                                        f2 = BIRD_UP_2
-                                    else:
-                                        f1 = BIRD_DOWN_1
-                                        f2 = BIRD_DOWN_2
-
-                                    mixed = []
-                                    for li in range(min(len(f1), len(f2))):
-                                        line1 = f1[li]
-                                        line2 = f2[li]
-                                        # Pad to same length
-                                        maxlen = max(len(line1), len(line2))
-                                        line1 = line1.ljust(maxlen)
-                                        line2 = line2.ljust(maxlen)
-                                        chars = []
-                                        for c1, c2 in zip(line1, line2):
-                                            # randomly pick char from either frame
-                                            chars.append(random.choice([c1, c2]))
-                                        mixed.append(''.join(chars))
-                                    sprite = mixed
-                            except Exception:
+                                append_recent_action('suction', lane=random_lanes[bird_in_lane], color=ball_colors[bird_in_lane])
+                            except NameError:
                                 pass
+        elif key == KEY_QUIT:
+            return False
+    return True
 
-                # Choose color - handle STEALTH specially, blue birds turn cyan when power is active
-                if ball_colors[b] == STEALTH:
-                    # Tangible when a stealth timer is active for this bird
-                    tangible = b in stealth_timers and stealth_timers.get(b, 0) > 0
-                    # Pulse between DARK_GRAY (visible) and ANSI "conceal" (invisible) over a period
-                    # This makes the bird actually invisible on terminals that support SGR 8.
-                    try:
-                        # Use a faster visible pulse (~0.5s cycle) so the change is noticeable
-                        period = max(4, int(2 / base_sleep))
-                    except Exception:
-                        period = 8
-                    phase = (frame_count % period) / period
-                    # Use DARK_GRAY for first half, ANSI conceal for second half (hidden/invisible)
-                    # If the terminal doesn't support conceal, it'll appear as no-op; we can add
-                    # a fallback later if needed.
-                    color = DARK_GRAY if phase < 0.5 else "\033[8m"
-                    # When tangible, show as a brighter color so the player clearly sees the effect
-                    if tangible:
-                        color = WHITE
-                elif ball_colors[b] == BLUE and bird_power_used[b]:
-                    color = CYAN  # Light blue when power active
-                else:
-                    color = ball_colors[b]
-                
-                # Draw each line of the bird (centered)
-                for line_idx, line in enumerate(sprite):
-                    y_pos = ball_y[b] + line_idx + 2  # +2 for header offset
-                    if 3 <= y_pos < HEIGHT + 2:
-                        # Center sprites: compute offset from sprite width (works for 3- and 5-char sprites)
-                        try:
-                            x_offset = len(line) // 2
-                        except Exception:
-                            x_offset = 1
-                        # CLOCKWORK: special per-char coloring and blinking for '.' and '\''
-                        if ball_colors[b] == CLOCKWORK:
-                            try:
-                                c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
-                            except Exception:
-                                c = CLOCKWORK_INITIAL_CHARGE
-                            try:
-                                blink_period = max(1, int(0.6 / base_sleep))
-                            except Exception:
-                                blink_period = 3
-                            blink_on = ((frame_count // blink_period) % 2) == 0
-                            colored = _render_clockwork_line(line, c, blink_on)
-                            output += f"\033[{y_pos};{ball_cols[b]-x_offset}H{colored}"
-                        elif ball_colors[b] == PATCHWORK:
-                            # Render each character with a different color pattern
-                            colored = _render_patchwork_line(line)
-                            output += f"\033[{y_pos};{ball_cols[b]-x_offset}H{colored}"
-                        else:
-                            output += f"\033[{y_pos};{ball_cols[b]-x_offset}H{color}{line}{RESET}"
-                    # After drawing the sprite lines, render a PURPLE charging orb in front of the bird if applicable
-                    try:
-                        if ball_colors[b] == PURPLE and purple_state[b] == 2:
-                            start_frame = purple_charge_started_frame[b]
-                            # Only render after charging actually started
-                            if frame_count >= start_frame:
-                                try:
-                                    elapsed_seconds = int((frame_count - start_frame) * base_sleep)
-                                except Exception:
-                                    try:
-                                        elapsed_seconds = int(float(frame_count - start_frame) * float(base_sleep))
-                                    except Exception:
-                                        elapsed_seconds = 0
-                                s = max(0, min(3, elapsed_seconds))
-                                if s <= 0:
-                                    sym = '⋅'
-                                elif s == 1:
-                                    sym = '•'
-                                else:
-                                    sym = '●'
-                                # place orb in front of the bird (one line above the sprite)
-                                orb_y = ball_y[b] + 1 + 2 - 1
-                                if 3 <= orb_y < HEIGHT + 2:
-                                    try:
-                                        output += f"\033[{orb_y};{ball_cols[b]}H{PURPLE}{sym}{RESET}"
-                                    except Exception:
-                                        pass
-                    except Exception:
-                        pass
 
-        # Check for level up
-        if score >= calculate_level_threshold(level):
-            level += 1
-        
-        # Calculate current speed based on level - more aggressive speed increase
-        try:
-            base_frame_sleep = base_sleep * (FRAME_SLEEP_LEVEL_MULTIPLIER ** level)
-            # slow-motion removed: main loop sleep is not modified by powerups
-            current_sleep = max(min_sleep, base_frame_sleep)
-        except Exception:
-            current_sleep = max(min_sleep, base_sleep * (FRAME_SLEEP_LEVEL_MULTIPLIER ** level))  # Fallback
-        # Music engine integration removed from main loop
-        
-        # Draw floor and player
-        output += f"\033[{HEIGHT+2};1H{floor}\n"
-        
-        # Draw lost balls on floor as gray X
-        for b in range(NUM_BALLS):
-            if ball_lost[b]:
-                output += f"\033[{HEIGHT+2};{ball_cols[b]}H\033[90mX{RESET}"
-        
-        
-        # Draw player cursor - large and bright for visibility
-        cursor_x = LANE_POSITIONS[player_lane] - 1  # Center on lane
-        # Change fallback cursor color when in swap mode (lane selected)
-        fallback_cursor_color = YELLOW if selected_lane is not None else GREEN
-
-        # Helper: map grade letter to requested cursor color
-        def _grade_letter_color(letter):
-            # User-specified mapping:
-            # D: verde
-            # C: bronzo (use ORANGE)
-            # B: argento (use WHITE)
-            # A: oro (use GOLD)
-            # S: rosso (use RED)
-            try:
-                # compute_grade_from_xp returns labels like 'C1','B2' etc.
-                # Use the first character as the prefix to determine color.
-                if letter and isinstance(letter, str) and len(letter) > 0:
-                    prefix = letter[0]
-                else:
-                    prefix = None
-                if prefix == 'D':
-                    return GREEN
-                if prefix == 'C':
-                    return ORANGE
-                if prefix == 'B':
-                    return CLOCKWORK
-                if prefix == 'A':
-                    return GOLD
-                if prefix == 'S':
-                    return RED
-            except Exception:
-                pass
-            return fallback_cursor_color
-
-        # Draw wide cursor if active
-        if powerups['wide_cursor_active']:
-            half_width = powerups['wide_cursor_lanes'] // 2
-            cursor_str = ""
-            for offset in range(-half_width, half_width + 1):
-                lane = player_lane + offset
-                if 0 <= lane < 9:
-                    lane_x = LANE_POSITIONS[lane] - 1
-                    # Determine grade color for this lane if a bird exists
-                    try:
-                        bird_idx = random_lanes.index(lane) if lane in random_lanes else -1
-                    except Exception:
-                        bird_idx = -1
+def update_progression():
+    """Recompute level from score and the frame delay for that level."""
+    global current_sleep
+    # Recompute level from current score so spending points can LOWER the level
+    state.level = compute_level_from_score(state.score)
 
-                    if bird_idx >= 0 and not ball_lost[bird_idx]:
-                        try:
-                            letter, _ = compute_grade_from_xp(per_bird_xp[bird_idx])
-                        except Exception:
-                            letter = None
-                        color = _grade_letter_color(letter)
-                    else:
-                        color = fallback_cursor_color
+    # Check for level up
+    if state.score >= calculate_level_threshold(state.level):
+        state.level += 1
 
-                    if lane == player_lane:
-                        # Main cursor: use glyph X1
-                        glyph = '^'
-                        cursor_str += f"\033[{HEIGHT+3};{lane_x}H{color}\033[1m[{glyph}]{RESET}"
-                    else:
-                        # Extended cursor wings: use glyph X2
-                        glyph = '^'
-                        cursor_str += f"\033[{HEIGHT+3};{lane_x}H{color}\033[1m[{glyph}]{RESET}"
-            output += cursor_str + "\n"
-        else:
-            # Normal cursor: color by grade of bird in player_lane if present
-            try:
-                bird_idx = random_lanes.index(player_lane) if player_lane in random_lanes else -1
-            except Exception:
-                bird_idx = -1
-            if bird_idx >= 0 and not ball_lost[bird_idx]:
+    # Calculate current speed based on level - more aggressive speed increase
+    try:
+        base_frame_sleep = base_sleep * (FRAME_SLEEP_LEVEL_MULTIPLIER ** state.level)
+        # slow-motion removed: main loop sleep is not modified by powerups
+        current_sleep = max(min_sleep, base_frame_sleep)
+    except Exception:
+        current_sleep = max(min_sleep, base_sleep * (FRAME_SLEEP_LEVEL_MULTIPLIER ** state.level))  # Fallback
+
+
+def simulate_frame(keys=()):
+    """Advance the world by one frame: spawns, movement, collisions, timers.
+
+    `keys` are all keys of the frame, in order (the purple charge logic looks
+    at whether UP was among them). No terminal I/O and no sleeping happens here.
+    """
+    global top30_hold_frames, top50_hold_frames
+    # Update ball positions
+    state.frame_count += 1
+    state.obstacle_spawn_timer += 1
+    state.bat_spawn_timer += 1
+    # CLOCKWORK decay: every 30s reduce charge by 1 (per bird)
+    try:
+        # Use configurable CLOCKWORK_DECAY_SECONDS (seconds) converted to frames
+        decay_frames = max(1, int(float(CLOCKWORK_DECAY_SECONDS) / base_sleep))
+        if decay_frames > 0 and state.frame_count % decay_frames == 0:
+            for i in range(NUM_BALLS):
                 try:
-                    letter, _ = compute_grade_from_xp(per_bird_xp[bird_idx])
+                    if ball_colors[i] == CLOCKWORK and not ball_lost[i]:
+                        c = clockwork_charge.get(i, None)
+                        if c is None:
+                            c = CLOCKWORK_INITIAL_CHARGE
+                            clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
+                        if c > 0:
+                            clockwork_charge[i] = c - 1
+                            newc = clockwork_charge[i]
+                            if newc > 0:
+                                ball_speeds[i] = newc
+                            else:
+                                # Enter freefall: set very fast falling speed and ensure bird is falling
+                                ball_speeds[i] = 6
+                                set_ball_vy(i, 1)
+                                add_notification('Clockwork freefall!')
                 except Exception:
-                    letter = None
-                color = _grade_letter_color(letter)
+                    pass
+    except Exception:
+        pass
+    phase_timer.lap('states')
+    # --- Per-frame achievement-related checks ---
+    # Area hold: check if all active birds are in top X% areas
+    # top50: y <= HEIGHT * 0.5, top30: y <= HEIGHT * 0.3
+    try:
+        active_idxs = [i for i in range(NUM_BALLS) if not ball_lost[i]]
+        if active_idxs:
+            top50_y = int(HEIGHT * 0.5)
+            top30_y = int(HEIGHT * 0.3)
+            all_top50 = all(ball_y[i] <= top50_y for i in active_idxs)
+            all_top30 = all(ball_y[i] <= top30_y for i in active_idxs)
+
+            if all_top50:
+                top50_hold_frames += 1
             else:
-                color = fallback_cursor_color
-
-            glyph = '^'
-            output += f"\033[{HEIGHT+3};{cursor_x}H{color}\033[1m[{glyph}]{RESET}\n"
-        
-        # Highlight selected lane if in swap mode
-        if selected_lane is not None:
-            selected_x = LANE_POSITIONS[selected_lane] - 1
-            output += f"\033[{HEIGHT+3};{selected_x}H{YELLOW}\033[1m[*]{RESET}"  # Mark selected lane
-        
-        # Count active balls
-        active_balls = sum(1 for lost in ball_lost if not lost)
-        swap_hint = " | Press SPACE again to swap or cancel" if selected_lane is not None else ""
-        output += f"\033[{HEIGHT+4};1HUse ← → to move, ↑ to bounce, Ctrl+C to quit | Birds: {active_balls}/{NUM_BALLS}{swap_hint}"
-        # Optional debug overlay: show per-bird XP and grade summary near footer
-        try:
-            if show_xp_overlay:
-                parts = []
-                for i in range(NUM_BALLS):
-                    try:
-                        label, _ = compute_grade_from_xp(per_bird_xp[i])
-                    except Exception:
-                        label = 'D'
-                    parts.append(f"{label}({int(per_bird_xp[i])})")
-                xp_summary = ' '.join(parts)
-                output += f"\033[{HEIGHT+5};1HXP: {xp_summary[:WIDTH]}{RESET}"
-        except Exception:
-            pass
-        
-        # If paused, render a PAUSED overlay (keep input responsive)
-        if paused:
-            try:
-                pause_y = 2 + (HEIGHT // 2)
-                pause_x = max(1, (WIDTH // 2) - 3)
-                output += f"\033[{pause_y};{pause_x}H{YELLOW}\033[1mPAUSED{RESET}"
-            except Exception:
-                pass
+                top50_hold_frames = 0
 
-        # Write all at once - handle blocking errors gracefully
-        try:
-            sys.stdout.write(output)
-            sys.stdout.flush()
-        except BlockingIOError:
-            # If output buffer is full, skip this frame
-            pass
+            if all_top30:
+                top30_hold_frames += 1
+            else:
+                top30_hold_frames = 0
 
-        # If paused, skip per-frame updates but sleep to avoid tight-loop
-        if paused:
-            try:
-                time.sleep(current_sleep)
-            except Exception:
-                pass
-            continue
-        
-        # Update ball positions
-        frame_count += 1
-        obstacle_spawn_timer += 1
-        bat_spawn_timer += 1
-        # CLOCKWORK decay: every 30s reduce charge by 1 (per bird)
-        try:
-            # Use configurable CLOCKWORK_DECAY_SECONDS (seconds) converted to frames
-            decay_frames = max(1, int(float(CLOCKWORK_DECAY_SECONDS) / base_sleep))
-            if decay_frames > 0 and frame_count % decay_frames == 0:
-                for i in range(NUM_BALLS):
-                    try:
-                        if ball_colors[i] == CLOCKWORK and not ball_lost[i]:
-                            c = clockwork_charge.get(i, None)
-                            if c is None:
-                                c = CLOCKWORK_INITIAL_CHARGE
-                                clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
-                            if c > 0:
-                                clockwork_charge[i] = c - 1
-                                newc = clockwork_charge[i]
-                                if newc > 0:
-                                    ball_speeds[i] = newc
-                                else:
-                                    # Enter freefall: set very fast falling speed and ensure bird is falling
-                                    ball_speeds[i] = 6
-                                    set_ball_vy(i, 1)
-                                    add_notification('Clockwork freefall!')
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-        # --- Per-frame achievement-related checks ---
-        # Area hold: check if all active birds are in top X% areas
-        # top50: y <= HEIGHT * 0.5, top30: y <= HEIGHT * 0.3
-        try:
-            active_idxs = [i for i in range(NUM_BALLS) if not ball_lost[i]]
-            if active_idxs:
-                top50_y = int(HEIGHT * 0.5)
-                top30_y = int(HEIGHT * 0.3)
-                all_top50 = all(ball_y[i] <= top50_y for i in active_idxs)
-                all_top30 = all(ball_y[i] <= top30_y for i in active_idxs)
-
-                if all_top50:
-                    top50_hold_frames += 1
-                else:
-                    top50_hold_frames = 0
+            # Fire area_hold events
+            check_achievements_event('area_hold', area='top50', frames=top50_hold_frames)
+            check_achievements_event('area_hold', area='top30', frames=top30_hold_frames)
 
-                if all_top30:
-                    top30_hold_frames += 1
-                else:
-                    top30_hold_frames = 0
+        # Original birds alive tracking
+        originals_alive = all(not ball_lost[idx] for idx in original_indices)
+        if originals_alive:
+            state.original_alive_frames += 1
+        else:
+            state.original_alive_frames = 0
+        check_achievements_event('original_survive', frames=state.original_alive_frames)
+
+        # Color counts: they only change with the roster (lost flags, colours),
+        # and an unchanged count cannot unlock anything new
+        roster = (state, state.roster_version)
+        if roster != _color_count_memo[0]:
+            _color_count_memo[0] = roster
+            counts = {}
+            for i in range(NUM_BALLS):
+                if not ball_lost[i]:
+                    c = ball_colors[i]
+                    counts[c] = counts.get(c, 0) + 1
+            for cname, cval in ACHIEVEMENT_COLORS:
+                check_achievements_event('color_count', color=cname, count=counts.get(cval, 0))
+    except Exception:
+        # Non-fatal: achievements shouldn't crash the game
+        pass
 
-                # Fire area_hold events
-                check_achievements_event('area_hold', area='top50', frames=top50_hold_frames)
-                check_achievements_event('area_hold', area='top30', frames=top30_hold_frames)
+    phase_timer.lap('achievements')
+    # Count current entities on screen (excluding birds)
+    active_birds = sum(1 for lost in ball_lost if not lost)
+    current_entities = len(obstacles) + len(bats) + active_birds
 
-            # Original birds alive tracking
-            originals_alive = all(not ball_lost[idx] for idx in original_indices)
-            if originals_alive:
-                original_alive_frames += 1
-            else:
-                original_alive_frames = 0
-            check_achievements_event('original_survive', frames=original_alive_frames)
-
-            # Color counts
-            color_map = {
-                'YELLOW': YELLOW,
-                'RED': RED,
-                'BLUE': BLUE,
-                'WHITE': WHITE,
-                'CLOCKWORK': CLOCKWORK,
-                'PURPLE': PURPLE,
-                'ORANGE': ORANGE,
-                'GOLD': GOLD,
-            }
-            for cname, cval in color_map.items():
-                count = sum(1 for i in range(NUM_BALLS) if not ball_lost[i] and ball_colors[i] == cval)
-                check_achievements_event('color_count', color=cname, count=count)
-        except Exception:
-            # Non-fatal: achievements shouldn't crash the game
-            pass
-        
-        # Count current entities on screen (excluding birds)
-        active_birds = sum(1 for lost in ball_lost if not lost)
-        current_entities = len(obstacles) + len(bats) + active_birds
-        
-        # Try to spawn from queue if we're under the entity limit
-        if current_entities < MAX_ENTITIES and spawn_queue:
-            entity = spawn_queue.pop(0)
-            if entity['type'] == 'bat':
+    # Try to spawn from queue if we're under the entity limit
+    if spawn_queue:
+        if current_entities < MAX_ENTITIES:
+            kind, entity = spawn_queue.pop()
+            if kind == 'bat':
                 # stamp a spawn timestamp for despawn logic
                 try:
-                    entity['data']['spawn_ts'] = time.time()
+                    entity['spawn_ts'] = state.sim_time
                 except Exception:
                     pass
-                bats.append(entity['data'])
-            elif entity['type'] == 'obstacle':
-                obstacles.append(entity['data'])
-        
-        # Queue bat spawns - spawn rate reduced to make bats rarer
-        # Spawn less often and allow up to 3 bats on screen
-        if len(bats) < 2 and bat_spawn_timer > random.randint(120, 220):
-            bat_spawn_timer = 0
-            
-            # Calculate target Y position based on level
-            # Lower levels: bats stop higher (around 5-8)
-            # Higher levels: bats stop lower (max half screen = 12)
-            if level <= 3:
-                target_y = random.randint(5, 8)
-            elif level <= 6:
-                target_y = random.randint(8, 10)
-            else:
-                target_y = random.randint(BAT_TARGET_Y_MIN_LOW_LEVEL, BAT_TARGET_Y_MAX_LOW_LEVEL)  # Max at half screen
-            
-            # Tier selection increases with level (4 tiers now)
-            if level <= BAT_TIER_LEVEL_THRESHOLD_1:
-                tier = random.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_0_2)[0]
-            elif level <= BAT_TIER_LEVEL_THRESHOLD_2:
-                tier = random.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_3_4)[0]
-            elif level <= BAT_TIER_LEVEL_THRESHOLD_3:
-                tier = random.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_5_7)[0]
-            else:
-                tier = random.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_8_PLUS)[0]
-            
-            # HP progression: 16, 32, 64, 128
-            if tier == 1:
-                hp = BAT_HP_TIER_1
-            elif tier == 2:
-                hp = BAT_HP_TIER_2
-            elif tier == 3:
-                hp = BAT_HP_TIER_3
-            else:  # tier 4
-                hp = BAT_HP_TIER_4
-            
-            # Try to find a spawn position that doesn't overlap with existing bats
-            max_attempts = BAT_SPAWN_MAX_ATTEMPTS
-            spawn_x = None
-            for attempt in range(max_attempts):
-                # Spawn within game box: bats are 8 chars wide, need margin
-                candidate_x = random.randint(BAT_SPAWN_X_MIN, WIDTH - BAT_SPAWN_X_MARGIN)  # Keep bat fully inside box
-                # Check if this position overlaps with any existing bat
-                overlaps = False
-                for existing_bat in bats:
-                    # Bats are 8 chars wide - need at least BAT_MIN_SEPARATION chars separation
-                    if abs(candidate_x - existing_bat['x_pos']) < BAT_MIN_SEPARATION:
-                        overlaps = True
-                        break
-                
-                # Also check overlap with spawn queue
-                for queued in spawn_queue:
-                    if queued['type'] == 'bat':
-                        if abs(candidate_x - queued['data']['x_pos']) < BAT_MIN_SEPARATION:
-                            overlaps = True
-                            break
-                
-                if not overlaps:
-                    spawn_x = candidate_x
-                    break
-            
+                spawn_bat(entity)
+            elif kind == 'obstacle':
+                spawn_obstacle(entity)
+        else:
+            spawn_queue.throttled += 1
+
+    # Queue bat spawns - spawn rate reduced to make bats rarer
+    # Spawn less often and allow up to 3 bats on screen
+    if len(bats) < 2 and state.bat_spawn_timer > rng.randint(120, 220):
+        state.bat_spawn_timer = 0
+
+        # Calculate target Y position based on level
+        # Lower levels: bats stop higher (around 5-8)
+        # Higher levels: bats stop lower (max half screen = 12)
+        if state.level <= 3:
+            target_y = rng.randint(5, 8)
+        elif state.level <= 6:
+            target_y = rng.randint(8, 10)
+        else:
+            target_y = rng.randint(BAT_TARGET_Y_MIN_LOW_LEVEL, BAT_TARGET_Y_MAX_LOW_LEVEL)  # Max at half screen
+
+        # Tier selection increases with level (4 tiers now)
+        if state.level <= BAT_TIER_LEVEL_THRESHOLD_1:
+            tier = rng.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_0_2)[0]
+        elif state.level <= BAT_TIER_LEVEL_THRESHOLD_2:
+            tier = rng.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_3_4)[0]
+        elif state.level <= BAT_TIER_LEVEL_THRESHOLD_3:
+            tier = rng.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_5_7)[0]
+        else:
+            tier = rng.choices([1, 2, 3, 4], weights=BAT_TIER_WEIGHTS_LEVEL_8_PLUS)[0]
+
+        # HP progression: 16, 32, 64, 128
+        if tier == 1:
+            hp = BAT_HP_TIER_1
+        elif tier == 2:
+            hp = BAT_HP_TIER_2
+        elif tier == 3:
+            hp = BAT_HP_TIER_3
+        else:  # tier 4
+            hp = BAT_HP_TIER_4
+
+        if spawn_queue.full('bat'):
+            # Enough bats already waiting - retry soon
+            state.bat_spawn_timer = BAT_CONSECUTIVE_RETRY_TIMER
+        else:
+            # Spawn within game box (bats are 8 chars wide, keep them fully inside),
+            # BAT_MIN_SEPARATION away from the bats on screen and in the queue
+            spawn_x = spawn_queue.place(
+                BAT_SPAWN_X_MIN, WIDTH - BAT_SPAWN_X_MARGIN,
+                [b['x_pos'] for b in bats] + [b['x_pos'] for b in spawn_queue.queued('bat')],
+                BAT_MIN_SEPARATION, BAT_SPAWN_MAX_ATTEMPTS)
+
             # If we couldn't find a good position, DON'T SPAWN
             if spawn_x is None:
-                bat_spawn_timer = BAT_SPAWN_FAIL_RETRY_TIMER  # Wait a bit before trying again
+                state.bat_spawn_timer = BAT_SPAWN_FAIL_RETRY_TIMER  # Wait a bit before trying again
             else:
-                # Check if last 2 items in queue are bats - if so, skip this spawn
-                can_add = True
-                if len(spawn_queue) >= BAT_CONSECUTIVE_SPAWN_LIMIT:
-                    if spawn_queue[-1]['type'] == 'bat' and spawn_queue[-2]['type'] == 'bat':
-                        can_add = False
-                        bat_spawn_timer = BAT_CONSECUTIVE_RETRY_TIMER  # Retry soon
-                
-                if can_add:
-                    # Found a good position - queue the bat
-                    direction = random.choice([-1, 1])  # -1 = left, 1 = right
-                    
-                    spawn_queue.append({
-                        'type': 'bat',
-                        'data': {
-                            'x_pos': spawn_x,
-                            'y_pos': BAT_SPAWN_Y_START,  # Start from top like obstacles
-                            'target_y': target_y,  # Stop at this Y position
-                            'tier': tier,
-                            'hp': hp,
-                            'max_hp': hp,
-                            'direction': direction,
-                            'wave_offset': random.randint(BAT_WAVE_OFFSET_MIN, BAT_WAVE_OFFSET_MAX)
-                        }
-                    })
-        
-        # Queue obstacle spawns - much more aggressive spawn rate
-        base_spawn_rate = max(OBSTACLE_BASE_SPAWN_RATE_MIN, OBSTACLE_BASE_SPAWN_RATE_BASE - (level * OBSTACLE_SPAWN_RATE_LEVEL_MULTIPLIER))  # Much faster spawning
-        spawn_variance = max(OBSTACLE_SPAWN_VARIANCE_MIN, OBSTACLE_SPAWN_VARIANCE_BASE - (level * OBSTACLE_SPAWN_VARIANCE_LEVEL_MULTIPLIER))
-        
-        if obstacle_spawn_timer > random.randint(base_spawn_rate - spawn_variance, base_spawn_rate + spawn_variance):
-            obstacle_spawn_timer = 0
-            
+                # Found a good position - queue the bat
+                direction = rng.choice([-1, 1])  # -1 = left, 1 = right
+
+                spawn_queue.push('bat', Bat(
+                    x_pos=spawn_x,
+                    y_pos=BAT_SPAWN_Y_START,  # Start from top like obstacles
+                    target_y=target_y,  # Stop at this Y position
+                    tier=tier,
+                    hp=hp,
+                    max_hp=hp,
+                    direction=direction,
+                    wave_offset=rng.randint(BAT_WAVE_OFFSET_MIN, BAT_WAVE_OFFSET_MAX)
+                ))
+
+    # Queue obstacle spawns - much more aggressive spawn rate
+    base_spawn_rate = max(OBSTACLE_BASE_SPAWN_RATE_MIN, OBSTACLE_BASE_SPAWN_RATE_BASE - (state.level * OBSTACLE_SPAWN_RATE_LEVEL_MULTIPLIER))  # Much faster spawning
+    spawn_variance = max(OBSTACLE_SPAWN_VARIANCE_MIN, OBSTACLE_SPAWN_VARIANCE_BASE - (state.level * OBSTACLE_SPAWN_VARIANCE_LEVEL_MULTIPLIER))
+
+    if state.obstacle_spawn_timer > rng.randint(base_spawn_rate - spawn_variance, base_spawn_rate + spawn_variance):
+        state.obstacle_spawn_timer = 0
+
+        if spawn_queue.full('obstacle'):
+            # Enough obstacles already waiting - retry sooner
+            state.obstacle_spawn_timer = max(OBSTACLE_RETRY_TIMER_MIN, base_spawn_rate // OBSTACLE_RETRY_TIMER_DIVISOR)
+        else:
             # Get list of active lanes (where birds are still alive)
             active_lanes = [random_lanes[i] for i in range(NUM_BALLS) if not ball_lost[i]]
-            
+
             # Only spawn obstacle if there are active lanes
             if active_lanes:
                 # Filter out lanes occupied by bats
@@ -4476,48 +4467,48 @@ try:
                     lane_x = LANE_POSITIONS[lane_idx]
                     lane_left = lane_x - LANE_COLLISION_HALF_WIDTH
                     lane_right = lane_x + LANE_COLLISION_HALF_WIDTH
-                    
-                    # Check if any bat overlaps with this lane
+
+                    # Check if any bat overlaps with this lane (lane index
+                    # candidates, then the exact overlap test)
                     bat_in_lane = False
-                    for bat in bats:
+                    for bat in lane_index.bats_in_lane(lane_idx):
                         bat_left = bat['x_pos']
                         bat_right = bat['x_pos'] + BAT_SPRITE_WIDTH
                         if not (bat_right < lane_left or bat_left > lane_right):
                             bat_in_lane = True
                             break
-                    
+
                     if not bat_in_lane:
                         available_lanes.append(lane_idx)
-                
+
                 # If no lanes available (all have bats), skip this spawn
                 if not available_lanes:
-                    obstacle_spawn_timer = max(5, base_spawn_rate // 2)
+                    state.obstacle_spawn_timer = max(5, base_spawn_rate // 2)
                 else:
                     # Only spawn in lanes without obstacles
                     lanes_without_obstacles = []
                     for lane_idx in available_lanes:
-                        has_obstacle = any(obs['lane'] == lane_idx for obs in obstacles)
-                        if not has_obstacle:
+                        if not lane_index.obstacles_in_lane(lane_idx):
                             lanes_without_obstacles.append(lane_idx)
-                    
+
                     # Only spawn if there's at least one free lane
                     if not lanes_without_obstacles:
                         # All available lanes have obstacles - skip spawn
-                        obstacle_spawn_timer = max(OBSTACLE_RETRY_TIMER_MIN, base_spawn_rate // OBSTACLE_RETRY_TIMER_DIVISOR)
+                        state.obstacle_spawn_timer = max(OBSTACLE_RETRY_TIMER_MIN, base_spawn_rate // OBSTACLE_RETRY_TIMER_DIVISOR)
                     else:
                         # Choose a free lane
-                        lane = random.choice(lanes_without_obstacles)
-                    
+                        lane = rng.choice(lanes_without_obstacles)
+
                         # Tier distribution changes with level - higher tiers become MORE common (4 tiers)
-                        if level <= OBSTACLE_TIER_LEVEL_THRESHOLD_1:
-                            tier = random.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_0_2)[0]
-                        elif level <= OBSTACLE_TIER_LEVEL_THRESHOLD_2:
-                            tier = random.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_3_4)[0]
-                        elif level <= OBSTACLE_TIER_LEVEL_THRESHOLD_3:
-                            tier = random.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_5_7)[0]
+                        if state.level <= OBSTACLE_TIER_LEVEL_THRESHOLD_1:
+                            tier = rng.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_0_2)[0]
+                        elif state.level <= OBSTACLE_TIER_LEVEL_THRESHOLD_2:
+                            tier = rng.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_3_4)[0]
+                        elif state.level <= OBSTACLE_TIER_LEVEL_THRESHOLD_3:
+                            tier = rng.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_5_7)[0]
                         else:
-                            tier = random.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_8_PLUS)[0]
-                        
+                            tier = rng.choices([1, 2, 3, 4], weights=OBSTACLE_TIER_WEIGHTS_LEVEL_8_PLUS)[0]
+
                         # HP based on tier: 4, 6, 10, 16
                         if tier == 1:
                             hp = OBSTACLE_HP_TIER_1
@@ -4527,927 +4518,929 @@ try:
                             hp = OBSTACLE_HP_TIER_3
                         else:  # tier 4
                             hp = OBSTACLE_HP_TIER_4
-                        
-                        # Check if last 2 items in queue are obstacles - if so, skip this spawn
-                        can_add = True
-                        if len(spawn_queue) >= OBSTACLE_CONSECUTIVE_SPAWN_LIMIT:
-                            if spawn_queue[-1]['type'] == 'obstacle' and spawn_queue[-2]['type'] == 'obstacle':
-                                can_add = False
-                                obstacle_spawn_timer = max(OBSTACLE_RETRY_TIMER_MIN, base_spawn_rate // OBSTACLE_RETRY_TIMER_DIVISOR)  # Retry sooner
-                        
-                        if can_add:
-                            spawn_queue.append({
-                                'type': 'obstacle',
-                                'data': {'lane': lane, 'y_pos': 1, 'tier': tier, 'hp': hp}
-                            })
-        
-        # Move obstacles down - always speed 1 (slowest)
-        for obs in obstacles[:]:
-            if frame_count % (6 - 1) == 0:  # Speed 1: move every 5 frames
-                obs['y_pos'] += 1
-            
-            # Auto-remove obstacles when they reach the line above the starting line
-            if obs['y_pos'] >= STARTING_LINE - 1:
-                obstacles.remove(obs)
-            elif obs['y_pos'] >= HEIGHT:
-                obstacles.remove(obs)
-        
-        # Move bats horizontally and vertically (wave motion)
-        for bat in bats[:]:
-            if frame_count % 3 == 0:  # Bats move every 3 frames
-                # Calculate next horizontal position
-                next_x = bat['x_pos'] + bat['direction'] * 2
-                
-                # Check if bat would overlap with another bat at next position
-                can_move = True
-                
-                # Check collision with other bats
-                for other_bat in bats:
-                    if other_bat is bat:
-                        continue
-                    # Bats are 8 chars wide - check overlap
-                    other_left = other_bat['x_pos']
-                    other_right = other_bat['x_pos'] + 8
-                    next_left = next_x
-                    next_right = next_x + 8
-                    
-                    # Check horizontal overlap
-                    if not (next_right < other_left or next_left > other_right):
-                        can_move = False
-                        break
-                
-                # Check collision with birds
-                if can_move:
-                    for i in range(NUM_BALLS):
-                        if not ball_lost[i]:
-                            # Get bird's LANE position - birds are in lanes!
-                            bird_lane_x = LANE_POSITIONS[random_lanes[i]]
-                            # Each lane is effectively a column - if bat enters lane, block it
-                            bird_y = ball_y[i]
-                            
-                            # Predict bird's next movement
-                            current_speed = ball_speeds[i]
-                            if i in speed_boosts:
-                                current_speed += 1
-                            move_interval = max(1, int(SPEED_MAX - current_speed))
-                            
-                            # Check if bird will move this frame
-                            if frame_count % move_interval == 0:
-                                next_bird_y = bird_y + ball_vy[i]
-                            else:
-                                next_bird_y = bird_y
-                            
-                            # Bat horizontal range at next position (8 chars wide)
-                            bat_left = next_x
-                            bat_right = next_x + 8
-                            bat_top = bat['y_pos']
-                            bat_bottom = bat['y_pos'] + 2
-                            
-                            # If bat overlaps with bird's lane AT ALL, block movement
-                            # Lane is centered at bird_lane_x, 5 chars wide (±2 from center)
-                            lane_left = bird_lane_x - 2
-                            lane_right = bird_lane_x + 2
-                            
-                            # Check if bat would enter this lane
-                            horizontal_overlap = not (bat_right < lane_left or bat_left > lane_right)
-                            
-                            if horizontal_overlap:
-                                # Check if bird is anywhere near bat vertically (give margin)
-                                if abs(bird_y - bat['y_pos']) < 8 or abs(next_bird_y - bat['y_pos']) < 8:
-                                    can_move = False
-                                    break
-                
-                if can_move:
-                    bat['x_pos'] = next_x
-                    # Bounce off walls (bats are 8 chars wide)
-                    if bat['x_pos'] <= 0:
-                        bat['x_pos'] = 0
-                        bat['direction'] = 1
-                    elif bat['x_pos'] >= WIDTH - 8:
-                        bat['x_pos'] = WIDTH - 8
-                        bat['direction'] = -1
-                else:
-                    # Can't move, reverse direction
-                    bat['direction'] *= -1
-            
-            # Move bat downward at speed 1 until it reaches target_y
-            if frame_count % (6 - 1) == 0:  # Speed 1: move every 5 frames (same as obstacles)
-                if bat['y_pos'] < bat['target_y']:
-                    bat['y_pos'] += 1
-        
-        # Check bat-obstacle collisions and remove obstacles
-        for bat in bats:
-            bat_left = bat['x_pos']
-            bat_right = bat['x_pos'] + 8  # Bats are 8 chars wide
-            bat_top = bat['y_pos']
-            bat_bottom = bat['y_pos'] + 1  # Bats are 2 lines tall
-            
-            for obs in obstacles[:]:
-                obs_lane_x = LANE_POSITIONS[obs['lane']]
-                obs_left = obs_lane_x - 1  # Obstacles are 3 chars wide centered on lane
-                obs_right = obs_lane_x + 1
-                obs_y = obs['y_pos']
-                
-                # Check horizontal overlap
-                horizontal_overlap = not (bat_right < obs_left or bat_left > obs_right)
-                # Check vertical overlap (obstacle is 1 line tall)
-                vertical_overlap = abs(bat_top - obs_y) <= 1 or abs(bat_bottom - obs_y) <= 1
-                
-                if horizontal_overlap and vertical_overlap:
-                    obstacles.remove(obs)
-        
-        # Despawn old bats and loot (older than 60 seconds)
-        try:
-            now_ts = time.time()
-            # Remove bats older than BAT_DESPAWN_TIME seconds
-            for bat in bats[:]:
-                try:
-                    if now_ts - float(bat.get('spawn_ts', now_ts)) > BAT_DESPAWN_TIME:
-                        bats.remove(bat)
-                except Exception:
-                    # If malformed spawn_ts, skip removal for safety
-                    continue
-            # Remove loot items older than LOOT_DESPAWN_TIME seconds
-            for loot in loot_items[:]:
-                try:
-                    if now_ts - float(loot.get('spawn_ts', now_ts)) > LOOT_DESPAWN_TIME:
-                        if loot.get('type') == 'orange_egg' and loot.get('y_pos') == STARTING_LINE:
-                                # find lane index from x_pos
-                                lane_x = loot.get('x_pos')
-                                lane = LANE_POSITIONS.index(lane_x)
-                                # find the bird that occupies that lane
-                                for bi in range(NUM_BALLS):
-                                    if random_lanes[bi] == lane:
-                                            # check for egg-state markers
-                                            if (ball_colors[bi] == ORANGE and ball_y[bi] == ORANGE_OUT_OF_PLAY_Y and ball_speeds[bi] == 0 and not ball_lost[bi]):
-                                                # mark bird as lost and decrement lives
-                                                ball_lost[bi] = True
-                                                ball_y[bi] = HEIGHT - 1
-                                                lives -= 1
-                                                if lives <= 0:
-                                                    game_over = True
-                                            break
-                        # Finally, remove the loot item (best-effort)
-                        loot_items.remove(loot)
-                except Exception:
+
+                        spawn_queue.push('obstacle', Obstacle(lane=lane, y_pos=1, tier=tier, hp=hp))
+
+    phase_timer.lap('spawn')
+    # Move obstacles down - always speed 1 (slowest)
+    for obs in obstacles:
+        if state.frame_count % (6 - 1) == 0:  # Speed 1: move every 5 frames
+            obs['y_pos'] += 1
+
+        # Auto-remove obstacles when they reach the line above the starting line
+        if obs['y_pos'] >= STARTING_LINE - 1:
+            remove_obstacle(obs)
+        elif obs['y_pos'] >= HEIGHT:
+            remove_obstacle(obs)
+
+    # Move bats horizontally and vertically (wave motion)
+    for bat in bats:
+        if state.frame_count % 3 == 0:  # Bats move every 3 frames
+            # Calculate next horizontal position
+            next_x = bat['x_pos'] + bat['direction'] * 2
+
+            # Check if bat would overlap with another bat at next position
+            can_move = True
+
+            # Check collision with other bats
+            for other_bat in bats:
+                if other_bat is bat:
                     continue
-        except Exception:
-            pass
+                # Bats are 8 chars wide - check overlap
+                other_left = other_bat['x_pos']
+                other_right = other_bat['x_pos'] + 8
+                next_left = next_x
+                next_right = next_x + 8
 
-        # Update speed boosts (decrease frame counter)
-        for bird_idx in list(speed_boosts.keys()):
-            if speed_boosts[bird_idx] > 0:
-                # Positive = speed boost
-                speed_boosts[bird_idx] -= 1
-                if speed_boosts[bird_idx] <= 0:
-                    try:
-                        del speed_boosts[bird_idx]
-                    except KeyError:
-                        pass
-                    # If a positive speed boost expired naturally, ensure the
-                    # bird's power-used flag is cleared so UI/colour returns to normal
-                    try:
-                        if 0 <= bird_idx < len(ball_colors) and ball_colors[bird_idx] == BLUE:
-                            reset_bird_power(bird_idx)
-                    except Exception:
-                        pass
+                # Check horizontal overlap
+                if not (next_right < other_left or next_left > other_right):
+                    can_move = False
+                    break
+
+            # Check collision with birds
+            if can_move:
+                for i in range(NUM_BALLS):
+                    if not ball_lost[i]:
+                        # Get bird's LANE position - birds are in lanes!
+                        bird_lane_x = LANE_POSITIONS[random_lanes[i]]
+                        # Each lane is effectively a column - if bat enters lane, block it
+                        bird_y = ball_y[i]
+
+                        # Predict bird's next movement
+                        current_speed = ball_speeds[i]
+                        if i in speed_boosts:
+                            current_speed += 1
+                        move_interval = max(1, int(SPEED_MAX - current_speed))
+
+                        # Check if bird will move this frame
+                        if state.frame_count % move_interval == 0:
+                            next_bird_y = bird_y + ball_vy[i]
+                        else:
+                            next_bird_y = bird_y
+
+                        # Bat horizontal range at next position (8 chars wide)
+                        bat_left = next_x
+                        bat_right = next_x + 8
+                        bat_top = bat['y_pos']
+                        bat_bottom = bat['y_pos'] + 2
+
+                        # If bat overlaps with bird's lane AT ALL, block movement
+                        # Lane is centered at bird_lane_x, 5 chars wide (±2 from center)
+                        lane_left = bird_lane_x - 2
+                        lane_right = bird_lane_x + 2
+
+                        # Check if bat would enter this lane
+                        horizontal_overlap = not (bat_right < lane_left or bat_left > lane_right)
+
+                        if horizontal_overlap:
+                            # Check if bird is anywhere near bat vertically (give margin)
+                            if abs(bird_y - bat['y_pos']) < 8 or abs(next_bird_y - bat['y_pos']) < 8:
+                                can_move = False
+                                break
+
+            if can_move:
+                bat['x_pos'] = next_x
+                # Bounce off walls (bats are 8 chars wide)
+                if bat['x_pos'] <= 0:
+                    bat['x_pos'] = 0
+                    bat['direction'] = 1
+                elif bat['x_pos'] >= WIDTH - 8:
+                    bat['x_pos'] = WIDTH - 8
+                    bat['direction'] = -1
+                lane_index.move_bat(bat)
             else:
-                # Negative = slow effect (count up towards 0)
-                speed_boosts[bird_idx] += 1
-                if speed_boosts[bird_idx] >= 0:
-                    del speed_boosts[bird_idx]
-        
-        # Update scared birds (decrease frame counter)
-        for bird_idx in list(scared_birds.keys()):
-            scared_birds[bird_idx] -= 1
-            if scared_birds[bird_idx] <= 0:
-                del scared_birds[bird_idx]
-
-        # Update stealth timers (decrease frame counter) - when expired, return to stealth
-        for bird_idx in list(stealth_timers.keys()):
-            stealth_timers[bird_idx] -= 1
-            if stealth_timers[bird_idx] <= 0:
+                # Can't move, reverse direction
+                bat['direction'] *= -1
+
+        # Move bat downward at speed 1 until it reaches target_y
+        if state.frame_count % (6 - 1) == 0:  # Speed 1: move every 5 frames (same as obstacles)
+            if bat['y_pos'] < bat['target_y']:
+                bat['y_pos'] += 1
+
+    phase_timer.lap('bats')
+    # Check bat-obstacle collisions and remove obstacles
+    for bat in bats:
+        bat_left = bat['x_pos']
+        bat_right = bat['x_pos'] + 8  # Bats are 8 chars wide
+        bat_top = bat['y_pos']
+        bat_bottom = bat['y_pos'] + 1  # Bats are 2 lines tall
+
+        # Only obstacles in the lanes the bat spans can overlap it
+        for obs in lane_index.obstacles_in_lanes(lane_index.bat_lanes(bat)):
+            obs_lane_x = LANE_POSITIONS[obs['lane']]
+            obs_left = obs_lane_x - 1  # Obstacles are 3 chars wide centered on lane
+            obs_right = obs_lane_x + 1
+            obs_y = obs['y_pos']
+
+            # Check horizontal overlap
+            horizontal_overlap = not (bat_right < obs_left or bat_left > obs_right)
+            # Check vertical overlap (obstacle is 1 line tall)
+            vertical_overlap = abs(bat_top - obs_y) <= 1 or abs(bat_bottom - obs_y) <= 1
+
+            if horizontal_overlap and vertical_overlap:
+                remove_obstacle(obs)
+
+    phase_timer.lap('collisions')
+    # Despawn bats older than BAT_DESPAWN_TIME and loot older than
+    # LOOT_DESPAWN_TIME seconds of game time (only the due timers are touched)
+    try:
+        for kind, ent in expired_entities(state.sim_time):
+            try:
+                if kind == _DESPAWN_BAT:
+                    remove_bat(ent)
+                    continue
+                if ent.get('type') == 'orange_egg' and ent.get('y_pos') == STARTING_LINE:
+                    # the egg was never recovered: its bird is lost
+                    bi = ent.get('bird')
+                    if bi is not None and orange_eggs.get(bi) == loot_items.handle(ent):
+                        del orange_eggs[bi]
+                        # check for egg-state markers
+                        if (ball_colors[bi] == ORANGE and ball_y[bi] == ORANGE_OUT_OF_PLAY_Y and ball_speeds[bi] == 0 and not ball_lost[bi]):
+                            # mark bird as lost and decrement lives
+                            set_bird_lost(bi, True)
+                            ball_y[bi] = HEIGHT - 1
+                            state.lives -= 1
+                            if state.lives <= 0:
+                                state.game_over = True
+                # Finally, remove the loot item (best-effort)
+                loot_items.remove(ent)
+            except Exception:
+                continue
+    except Exception:
+        pass
+
+    phase_timer.lap('despawn')
+    # Update speed boosts (decrease frame counter)
+    for bird_idx in list(speed_boosts.keys()):
+        if speed_boosts[bird_idx] > 0:
+            # Positive = speed boost
+            speed_boosts[bird_idx] -= 1
+            if speed_boosts[bird_idx] <= 0:
                 try:
-                    del stealth_timers[bird_idx]
-                except Exception:
+                    del speed_boosts[bird_idx]
+                except KeyError:
                     pass
-                # IMPORTANT: do NOT reset bird_power_used here.
-                # bird_power_used should remain True until the bird finishes the ascent
-                # (e.g. bounces or starts descending). Resetting here would allow the
-                # player to re-activate the power again during the same rise.
-                # Restore previous speed if we saved one
+                # If a positive speed boost expired naturally, ensure the
+                # bird's power-used flag is cleared so UI/colour returns to normal
                 try:
-                    if bird_idx in stealth_prev_speeds:
-                        prev = stealth_prev_speeds.pop(bird_idx)
-                        # Only restore if bird still exists
-                        try:
-                            ball_speeds[bird_idx] = prev
-                        except Exception:
-                            pass
+                    if 0 <= bird_idx < len(ball_colors) and ball_colors[bird_idx] == BLUE:
+                        reset_bird_power(bird_idx)
                 except Exception:
                     pass
-        
-        # Blue birds lose fear when crossing yellow birds
-        # (blue going down, yellow going up, in adjacent lanes, blue passes yellow)
-        birds_to_unfear = []
-        for i in range(NUM_BALLS):
-            if ball_colors[i] == BLUE and i in scared_birds and not ball_lost[i]:
-                if ball_vy[i] == 1:  # Blue bird moving down
-                    blue_lane = random_lanes[i]
-                    blue_y = ball_y[i]
-                    
-                    # Check adjacent lanes for yellow birds moving up
-                    for adj_offset in [-1, 1]:
-                        adj_lane = blue_lane + adj_offset
-                        if 0 <= adj_lane < 9:
-                            # Find bird in adjacent lane
-                            for j in range(NUM_BALLS):
-                                if j != i and not ball_lost[j] and random_lanes[j] == adj_lane:
-                                    if ball_colors[j] == YELLOW and ball_vy[j] == -1:  # Yellow moving up
-                                        yellow_y = ball_y[j]
-                                        # Check if they're crossing (blue coming from above, yellow from below)
-                                        # Crossing happens when blue is just above or at same height as yellow
-                                        if abs(blue_y - yellow_y) <= 2:
-                                            # Pride restored - remove fear
-                                            birds_to_unfear.append(i)
-                                            break
-                        if i in birds_to_unfear:
-                            break
-        
-        # Remove fear from birds that crossed yellows
-        for bird_idx in birds_to_unfear:
-            if bird_idx in scared_birds:
-                del scared_birds[bird_idx]
-        
-        # Track UP hold/release state (edge detection) to support charging behavior
-        # Use prev_up_state to remember the previous-frame state so intermittent
-        # terminal key-repeat (missing frames) doesn't cancel primed charging.
-        # Debounced UP hold/release detection to avoid single-frame glitches
-        try:
-            up_pressed_this_frame = (key == KEY_MOVE_UP)
-        except Exception:
-            up_pressed_this_frame = False
+        else:
+            # Negative = slow effect (count up towards 0)
+            speed_boosts[bird_idx] += 1
+            if speed_boosts[bird_idx] >= 0:
+                del speed_boosts[bird_idx]
 
-        try:
-            if up_pressed_this_frame:
-                up_hold_counter = up_hold_counter + 1
-                up_miss_counter = 0
-            else:
-                up_miss_counter = up_miss_counter + 1
-        except Exception:
+    # Update scared birds (decrease frame counter)
+    for bird_idx in list(scared_birds.keys()):
+        scared_birds[bird_idx] -= 1
+        if scared_birds[bird_idx] <= 0:
+            del scared_birds[bird_idx]
+
+    # Update stealth timers (decrease frame counter) - when expired, return to stealth
+    for bird_idx in list(stealth_timers.keys()):
+        stealth_timers[bird_idx] -= 1
+        if stealth_timers[bird_idx] <= 0:
             try:
-                up_hold_counter = 0
-                up_miss_counter = 0
+                del stealth_timers[bird_idx]
+            except Exception:
+                pass
+            # IMPORTANT: do NOT reset bird_power_used here.
+            # bird_power_used should remain True until the bird finishes the ascent
+            # (e.g. bounces or starts descending). Resetting here would allow the
+            # player to re-activate the power again during the same rise.
+            # Restore previous speed if we saved one
+            try:
+                if bird_idx in stealth_prev_speeds:
+                    prev = stealth_prev_speeds.pop(bird_idx)
+                    # Only restore if bird still exists
+                    try:
+                        ball_speeds[bird_idx] = prev
+                    except Exception:
+                        pass
             except Exception:
-                up_hold_counter = 0
-                up_miss_counter = 0
+                pass
 
-        # Consider a release only when UP has been missing for >=2 consecutive frames
-        try:
-            up_released = (up_hold_counter > 0 and up_miss_counter >= 2)
-            if up_released:
-                up_hold_counter = 0
-                up_miss_counter = 0
-        except Exception:
-            up_released = False
+    # Blue birds lose fear when crossing yellow birds
+    # (blue going down, yellow going up, in adjacent lanes, blue passes yellow)
+    birds_to_unfear = []
+    for i in range(NUM_BALLS):
+        if ball_colors[i] == BLUE and i in scared_birds and not ball_lost[i]:
+            if ball_vy[i] == 1:  # Blue bird moving down
+                blue_lane = random_lanes[i]
+                blue_y = ball_y[i]
+
+                # Check adjacent lanes for yellow birds moving up
+                for adj_offset in [-1, 1]:
+                    adj_lane = blue_lane + adj_offset
+                    if 0 <= adj_lane < 9:
+                        # Find bird in adjacent lane
+                        for j in range(NUM_BALLS):
+                            if j != i and not ball_lost[j] and random_lanes[j] == adj_lane:
+                                if ball_colors[j] == YELLOW and ball_vy[j] == -1:  # Yellow moving up
+                                    yellow_y = ball_y[j]
+                                    # Check if they're crossing (blue coming from above, yellow from below)
+                                    # Crossing happens when blue is just above or at same height as yellow
+                                    if abs(blue_y - yellow_y) <= 2:
+                                        # Pride restored - remove fear
+                                        birds_to_unfear.append(i)
+                                        break
+                    if i in birds_to_unfear:
+                        break
+
+    # Remove fear from birds that crossed yellows
+    for bird_idx in birds_to_unfear:
+        if bird_idx in scared_birds:
+            del scared_birds[bird_idx]
 
-        # Handle PURPLE charging state machine per bird
+    phase_timer.lap('boosts')
+    # Track UP hold/release state (edge detection) to support charging behavior
+    # Use prev_up_state to remember the previous-frame state so intermittent
+    # terminal key-repeat (missing frames) doesn't cancel primed charging.
+    # Debounced UP hold/release detection to avoid single-frame glitches
+    try:
+        up_pressed_this_frame = KEY_MOVE_UP in keys
+    except Exception:
+        up_pressed_this_frame = False
+
+    try:
+        if up_pressed_this_frame:
+            state.up_hold_counter = state.up_hold_counter + 1
+            state.up_miss_counter = 0
+        else:
+            state.up_miss_counter = state.up_miss_counter + 1
+    except Exception:
         try:
-            for b in range(NUM_BALLS):
-                try:
-                    state = purple_state[b]
-                    # Transition primed -> charging on next frame if UP still held
-                    if state == 1:
-                        # Transition primed -> charging if UP is still considered held.
-                        # Use prev_up_state OR current up_pressed_this_frame to tolerate
-                        # intermittent key-repeat frames where the terminal doesn't
-                        # emit the arrow every single game frame.
-                        # Consider UP held only if currently pressed (debounced via miss count).
-                        held = up_pressed_this_frame
-
-                        # Enter charging if we've not seen too many misses since priming
-                        if frame_count > purple_primed_frame[b] and purple_miss_count[b] < 2 and not ball_lost[b] and ball_vy[b] == -1:
-                            # Enter charging: save current vy (do NOT change ball_vy so sprite/direction remains)
-                            try:
-                                purple_saved_vy[b] = ball_vy[b]
-                            except Exception:
-                                purple_saved_vy[b] = None
-                            purple_state[b] = 2
-                            purple_charge_started_frame[b] = frame_count
-                        else:
-                            # Debounced cancel: allow up to 1 missed frame before cancelling primed
-                            if not held:
-                                purple_miss_count[b] += 1
-                            else:
-                                purple_miss_count[b] = 0
+            state.up_hold_counter = 0
+            state.up_miss_counter = 0
+        except Exception:
+            state.up_hold_counter = 0
+            state.up_miss_counter = 0
 
-                            if purple_miss_count[b] >= 3:
-                                try:
-                                    if bird_power_uses[b] > 0:
-                                        bird_power_uses[b] = max(0, bird_power_uses[b] - 1)
-                                    bird_power_used[b] = False
-                                except Exception:
-                                    pass
-                                # ensure any saved vy is cleared
-                                try:
-                                    purple_saved_vy[b] = None
-                                except Exception:
-                                    pass
-                                purple_state[b] = 0
-                                purple_primed_frame[b] = 0
-                                purple_miss_count[b] = 0
+    # Consider a release only when UP has been missing for >=2 consecutive frames
+    try:
+        up_released = (state.up_hold_counter > 0 and state.up_miss_counter >= 2)
+        if up_released:
+            state.up_hold_counter = 0
+            state.up_miss_counter = 0
+    except Exception:
+        up_released = False
 
-                    elif state == 2:
-                        # Charging: compute elapsed seconds
-                        start_frame = purple_charge_started_frame[b]
-                        elapsed_seconds = 0
+    # Handle PURPLE charging state machine per bird
+    try:
+        for b in range(NUM_BALLS):
+            try:
+                pstate = purple_state[b]
+                # Transition primed -> charging on next frame if UP still held
+                if pstate == 1:
+                    # Transition primed -> charging if UP is still considered held.
+                    # Use prev_up_state OR current up_pressed_this_frame to tolerate
+                    # intermittent key-repeat frames where the terminal doesn't
+                    # emit the arrow every single game frame.
+                    # Consider UP held only if currently pressed (debounced via miss count).
+                    held = up_pressed_this_frame
+
+                    # Enter charging if we've not seen too many misses since priming
+                    if state.frame_count > purple_primed_frame[b] and purple_miss_count[b] < 2 and not ball_lost[b] and ball_vy[b] == -1:
+                        # Enter charging: save current vy (do NOT change ball_vy so sprite/direction remains)
                         try:
-                            elapsed_seconds = int((frame_count - start_frame) * base_sleep)
+                            purple_saved_vy[b] = ball_vy[b]
                         except Exception:
-                            try:
-                                elapsed_seconds = int(float(frame_count - start_frame) * float(base_sleep))
-                            except Exception:
-                                elapsed_seconds = 0
-                        s = max(0, min(3, elapsed_seconds))
-
-                        # Auto-fire at max charge
-                        if s >= 3:
-                            fire_now = True
+                            purple_saved_vy[b] = None
+                        purple_state[b] = 2
+                        purple_charge_started_frame[b] = state.frame_count
+                    else:
+                        # Debounced cancel: allow up to 1 missed frame before cancelling primed
+                        if not held:
+                            purple_miss_count[b] += 1
                         else:
-                            # Only fire when player releases UP or the bird is lost.
-                            # Do NOT treat changes to ball_vy as a trigger because we
-                            # intentionally set ball_vy=0 to freeze the bird while
-                            # charging; treating that as 'not -1' caused immediate
-                            # accidental firing.
-                            fire_now = bool(up_released or ball_lost[b])
-
-                        if fire_now:
-                            if s >= 1:
-                                dmg = int(pow(4, s))
-                                try:
-                                    red_projectiles.append({
-                                        'x_pos': LANE_POSITIONS[random_lanes[b]],
-                                        'y_pos': ball_y[b],
-                                        'lane': random_lanes[b],
-                                        'damage': dmg,
-                                        'powered': dmg > 1,
-                                        'owner': b,
-                                        'speed': 4,
-                                        'color': PURPLE
-                                    })
-                                    # Briefly protect the bird from immediate collision changes
-                                    try:
-                                        # Provide a slightly larger protection window (frames)
-                                        # so the per-bird decrement at loop start doesn't
-                                        # immediately clear the protection. Use a small
-                                        # safety margin (at least 3 frames).
-                                        purple_just_fired_frames[b] = max(3, int(0.2 / base_sleep) + 2)
-                                    except Exception:
-                                        purple_just_fired_frames[b] = 3
-                                except Exception:
-                                    pass
-                            else:
-                                # Cancelled before 1s: refund power
-                                try:
-                                    if bird_power_uses[b] > 0:
-                                        bird_power_uses[b] = max(0, bird_power_uses[b] - 1)
-                                    bird_power_used[b] = False
-                                except Exception:
-                                    pass
+                            purple_miss_count[b] = 0
 
-                            # Restore bird vertical movement from saved vy
+                        if purple_miss_count[b] >= 3:
                             try:
-                                if purple_saved_vy[b] is not None:
-                                    ball_vy[b] = purple_saved_vy[b]
+                                if bird_power_uses[b] > 0:
+                                    bird_power_uses[b] = max(0, bird_power_uses[b] - 1)
+                                bird_power_used[b] = False
                             except Exception:
                                 pass
+                            # ensure any saved vy is cleared
                             try:
                                 purple_saved_vy[b] = None
                             except Exception:
                                 pass
-
-                            # Reset charging state
                             purple_state[b] = 0
-                            purple_charge_started_frame[b] = 0
                             purple_primed_frame[b] = 0
-                except Exception:
-                    continue
-        except Exception:
-            pass
+                            purple_miss_count[b] = 0
 
-        # Update red projectiles
-        for proj in red_projectiles[:]:
-            # Move projectile upward by its speed (allow fast purple shots). We move step-by-step
-            # so collisions are checked for each unit traveled.
-            move_steps = int(max(1, proj.get('speed', 1)))
-            removed_proj = False
-            for _step in range(move_steps):
-                proj['y_pos'] -= 1
-
-                # Remove if off screen
-                if proj['y_pos'] < 0:
+                elif pstate == 2:
+                    # Charging: compute elapsed seconds
+                    start_frame = purple_charge_started_frame[b]
+                    elapsed_seconds = 0
                     try:
-                        red_projectiles.remove(proj)
-                    except ValueError:
-                        pass
-                    removed_proj = True
-                    break
-
-                # Check collision with bats
-                hit_bat = False
-                for bat in bats[:]:
-                    bat_left = bat['x_pos']
-                    bat_right = bat['x_pos'] + 8
-                    bat_top = bat['y_pos']
-                    bat_bottom = bat['y_pos'] + 1
-
-                    if (bat_left <= proj['x_pos'] <= bat_right and 
-                        bat_top <= proj['y_pos'] <= bat_bottom):
-                        # Hit bat - deal damage based on projectile power
-                        dmg = int(proj.get('damage', 1))
-                        bat['hp'] -= dmg
-                        hit_bat = True
-
-                        # Award XP equal to damage to projectile owner if present
+                        elapsed_seconds = int((state.frame_count - start_frame) * base_sleep)
+                    except Exception:
                         try:
-                            owner = proj.get('owner', None)
-                            if owner is not None:
-                                award_xp(owner, dmg)
+                            elapsed_seconds = int(float(state.frame_count - start_frame) * float(base_sleep))
                         except Exception:
-                            pass
+                            elapsed_seconds = 0
+                    s = max(0, min(3, elapsed_seconds))
 
-                        if bat['hp'] <= 0:
-                            # Bat defeated: award bonus XP based on tier to owner
+                    # Auto-fire at max charge
+                    if s >= 3:
+                        fire_now = True
+                    else:
+                        # Only fire when player releases UP or the bird is lost.
+                        # Do NOT treat changes to ball_vy as a trigger because we
+                        # intentionally set ball_vy=0 to freeze the bird while
+                        # charging; treating that as 'not -1' caused immediate
+                        # accidental firing.
+                        fire_now = bool(up_released or ball_lost[b])
+
+                    if fire_now:
+                        if s >= 1:
+                            dmg = int(pow(4, s))
                             try:
-                                owner = proj.get('owner', None)
-                                tier = int(bat.get('tier', 1) or 1)
-                                bonus = XP_BONUS_PER_TIER * tier
-                                if owner is not None:
-                                    award_xp(owner, bonus)
+                                red_projectiles.add(Projectile(
+                                    x_pos=LANE_POSITIONS[random_lanes[b]],
+                                    y_pos=ball_y[b],
+                                    lane=random_lanes[b],
+                                    damage=dmg,
+                                    powered=dmg > 1,
+                                    owner=b,
+                                    speed=4,
+                                    color=PURPLE
+                                ))
+                                # Briefly protect the bird from immediate collision changes
+                                try:
+                                    # Provide a slightly larger protection window (frames)
+                                    # so the per-bird decrement at loop start doesn't
+                                    # immediately clear the protection. Use a small
+                                    # safety margin (at least 3 frames).
+                                    purple_just_fired_frames[b] = max(3, int(0.2 / base_sleep) + 2)
+                                except Exception:
+                                    purple_just_fired_frames[b] = 3
                             except Exception:
                                 pass
-
-                            # Bat defeated - award score and drop loot
-                            add_score(bat.get('max_hp', 0))
-
-                            # Find closest lane to bat center
-                            bat_center_x = bat['x_pos'] + BAT_CENTER_OFFSET
-                            closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
-
-                            # Loot drop logic (4 tiers with new percentages)
-                            tier = bat['tier']
-                            prestige = compute_prestige()
-                            base = BAT_LOOT_BASE_WEIGHTS.get(tier, BAT_LOOT_BASE_WEIGHTS.get(4))
-                            adj_weights = adjust_rarity_weights(base, prestige)
-                            rarity = random.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
-
-                            loot_type = choose_loot_type(rarity)
-
-                            loot_items.append({
-                                'x_pos': LANE_POSITIONS[closest_lane],
-                                'y_pos': bat['y_pos'],
-                                'type': loot_type,
-                                'rarity': rarity,
-                                'spawn_ts': time.time()
-                            })
-
-                            tier = bat.get('tier', None)
-                            # notify achievements about bat destroy (with tier)
-                            check_achievements_event('destroy_bat', tier=tier)
+                        else:
+                            # Cancelled before 1s: refund power
                             try:
-                                bats.remove(bat)
-                            except ValueError:
+                                if bird_power_uses[b] > 0:
+                                    bird_power_uses[b] = max(0, bird_power_uses[b] - 1)
+                                bird_power_used[b] = False
+                            except Exception:
                                 pass
-                        break
-                if hit_bat:
-                    try:
-                        red_projectiles.remove(proj)
-                    except ValueError:
-                        pass
-                    removed_proj = True
-                    break
-
-                # Check collision with obstacles
-                for obs in obstacles[:]:
-                    if obs['lane'] == proj['lane'] and abs(proj['y_pos'] - obs['y_pos']) <= NORMAL_BIRD_SPRITE_HEIGHT:
-                        # Hit obstacle - deal damage based on projectile power
-                        dmg = int(proj.get('damage', 1))
-                        obs['hp'] -= dmg
-
-                        # Award XP equal to damage to projectile owner if present
-                        try:
-                            owner = proj.get('owner', None)
-                            if owner is not None:
-                                award_xp(owner, dmg)
-                        except Exception:
-                            pass
 
-                        if obs['hp'] <= 0:
-                            try:
-                                obstacles.remove(obs)
-                            except ValueError:
-                                pass
-                        # Projectile is consumed by hitting obstacle
-                        try:
-                            red_projectiles.remove(proj)
-                        except ValueError:
-                            pass
-                        removed_proj = True
-                        break
-                if removed_proj:
-                    break
-        
-        # Update power-ups (decrease frame counters)
-        # Active STEALTH tangible damage: while a stealth bird is tangible, apply 24 damage
-        # to any bat/obstacle/loot in proximity so the power reliably has an effect.
-        for i in range(NUM_BALLS):
-            if ball_colors[i] == STEALTH and i in stealth_timers and stealth_timers.get(i, 0) > 0 and not ball_lost[i]:
-                bird_lane = random_lanes[i]
-                bird_x = LANE_POSITIONS[bird_lane]
-                bird_y = ball_y[i]
-
-                # Damage bats in proximity
-                for bat in bats[:]:
-                    if abs(bat.get('x_pos', 0) - bird_x) <= 6 and abs(bat.get('y_pos', 0) - bird_y) <= 2:
-                        dmg = 24
-                        bat['hp'] -= dmg
-                        # award XP for damage from this bird
+                        # Restore bird vertical movement from saved vy
                         try:
-                            award_xp(i, dmg)
+                            if purple_saved_vy[b] is not None:
+                                ball_vy[b] = purple_saved_vy[b]
                         except Exception:
                             pass
-                        if bat.get('hp', 0) <= 0:
-                            # bonus XP for kill
-                            try:
-                                tier = int(bat.get('tier', 1) or 1)
-                                award_xp(i, XP_BONUS_PER_TIER * tier)
-                            except Exception:
-                                pass
-                            add_score(bat.get('max_hp', 0))
-                            bat_center_x = bat.get('x_pos', 0) + BAT_CENTER_OFFSET
-                            closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
-                            tier = bat.get('tier', None)
-                            prestige = compute_prestige()
-                            # Use configurable base weights for bat loot by tier
-                            try:
-                                base = BAT_LOOT_BASE_WEIGHTS.get(int(tier) or 4, BAT_LOOT_BASE_WEIGHTS.get(4))
-                            except Exception:
-                                base = BAT_LOOT_BASE_WEIGHTS.get(4)
-                            adj_weights = adjust_rarity_weights(base, prestige)
-                            rarity = random.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
-                            loot_type = choose_loot_type(rarity)
-                            loot_items.append({
-                                'x_pos': LANE_POSITIONS[closest_lane],
-                                'y_pos': bat.get('y_pos', 0),
-                                'type': loot_type,
-                                'rarity': rarity,
-                                'spawn_ts': time.time()
-                            })
-                            try:
-                                check_achievements_event('destroy_bat', tier=tier)
-                            except Exception:
-                                pass
-                            try:
-                                bats.remove(bat)
-                            except ValueError:
-                                pass
-
-                # Damage obstacles in same lane
-                for obs in obstacles[:]:
-                    if obs.get('lane') == bird_lane and abs(obs.get('y_pos', 0) - bird_y) <= 1:
-                        dmg = 24
-                        obs['hp'] -= dmg
                         try:
-                            award_xp(i, dmg)
+                            purple_saved_vy[b] = None
                         except Exception:
                             pass
-                        if obs.get('hp', 0) <= 0:
-                            try:
-                                tier = int(obs.get('tier', 1) or 1)
-                                award_xp(i, XP_BONUS_PER_TIER * tier)
-                            except Exception:
-                                pass
-                            add_score(obs.get('tier', 0) * OBSTACLE_SCORE_MULTIPLIER)
-                            try:
-                                obstacles.remove(obs)
-                            except ValueError:
-                                pass
 
-                # Destroy loot items in proximity (tangible destroys loot)
-                for loot in loot_items[:]:
-                    if abs(bird_x - loot.get('x_pos', 0)) <= 2 and abs(bird_y - loot.get('y_pos', 0)) <= 2:
-                        try:
-                            loot_items.remove(loot)
-                        except ValueError:
-                            pass
-        if powerups['wide_cursor_active']:
-            powerups['wide_cursor_frames'] -= 1
-            if powerups['wide_cursor_frames'] <= 0:
-                powerups['wide_cursor_active'] = False
-                powerups['wide_cursor_lanes'] = 1
-        
-        if powerups['bounce_boost_active']:
-            powerups['bounce_boost_frames'] -= 1
-            if powerups['bounce_boost_frames'] <= 0:
-                powerups['bounce_boost_active'] = False
-                powerups['bounce_boost_duration'] = 0
-        
-        if powerups['suction_active']:
-            powerups['suction_frames'] -= 1
-            if powerups['suction_frames'] <= 0:
-                powerups['suction_active'] = False
-                powerups['suction_boost_duration'] = 0
-
-        # Tailwind expiry handling
-        if powerups.get('tailwind_active'):
-            try:
-                powerups['tailwind_frames'] -= 1
-                if powerups['tailwind_frames'] <= 0:
-                    powerups['tailwind_active'] = False
-                    powerups['tailwind_up_bonus'] = 0
-                    powerups['tailwind_down_penalty'] = 0
+                        # Reset charging state
+                        purple_state[b] = 0
+                        purple_charge_started_frame[b] = 0
+                        purple_primed_frame[b] = 0
             except Exception:
-                powerups['tailwind_active'] = False
-                powerups['tailwind_up_bonus'] = 0
-                powerups['tailwind_down_penalty'] = 0
+                continue
+    except Exception:
+        pass
 
-        # (slow-motion powerup removed; no expiry handling required)
-        
-        for i in range(NUM_BALLS):
-            # Decrement any just-fired protection timers
-            try:
-                if purple_just_fired_frames[i] > 0:
-                    purple_just_fired_frames[i] -= 1
-            except Exception:
-                pass
+    phase_timer.lap('states')
+    # Update red projectiles. Each shot moves up by its speed (fast purple shots
+    # cover several rows); one swept query over the rows it crosses finds the
+    # first bat or obstacle in its lane. Spent shots are tombstoned and go
+    # away with the end-of-frame compaction.
+    for proj in red_projectiles:
+        y_old = proj['y_pos']
+        y_new = y_old - int(max(1, proj.get('speed', 1)))
+        # rows below 0 are off screen: the shot leaves before reaching them
+        hit = lane_index.sweep_up(proj['lane'], proj['x_pos'], y_old - 1, max(y_new, 0),
+                                  bat_span=8, bat_rows=1, obstacle_reach=NORMAL_BIRD_SPRITE_HEIGHT)
+        if hit is None:
+            proj['y_pos'] = y_new
+            if y_new < 0:
+                red_projectiles.discard(proj)
+            continue
+        proj['y_pos'], target, is_bat = hit
+        red_projectiles.discard(proj)
 
-            # If this bird is charging or under just-fired protection, keep it frozen
-            # and skip any behaviors that could change its vy (GLITCH flips, duplicates, etc.)
-            try:
-                if purple_state[i] == 2 or (purple_just_fired_frames[i] > 0):
-                    # Skip any behavior that could flip direction while charging
-                    # or during immediate post-fire protection. Do NOT modify
-                    # ball_vy here so rendering keeps the original direction.
-                    continue
-            except Exception:
-                pass
-            # GLITCH birds pick a random speed each step
+        # Hit - deal damage based on projectile power; the projectile is consumed
+        dmg = int(proj.get('damage', 1))
+        target['hp'] -= dmg
+
+        # Award XP equal to damage to projectile owner if present
+        try:
+            owner = proj.get('owner', None)
+            if owner is not None:
+                award_xp(owner, dmg)
+        except Exception:
+            pass
+
+        if not is_bat:
+            if target['hp'] <= 0:
+                try:
+                    remove_obstacle(target)
+                except ValueError:
+                    pass
+            continue
+
+        bat = target
+        if bat['hp'] <= 0:
+            # Bat defeated: award bonus XP based on tier to owner
             try:
-                if ball_colors[i] == GLITCH and not ball_lost[i]:
-                    # Random speed each step (configurable range)
-                    ball_speeds[i] = random.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
+                owner = proj.get('owner', None)
+                tier = int(bat.get('tier', 1) or 1)
+                bonus = XP_BONUS_PER_TIER * tier
+                if owner is not None:
+                    award_xp(owner, bonus)
             except Exception:
                 pass
-            current_speed = ball_speeds[i]
 
-            # Apply speed boost if active (only when going up)
-            if i in speed_boosts:
-                if speed_boosts[i] > 0 and ball_vy[i] == -1:
-                    # Positive = speed boost
-                    current_speed += 1
-                elif speed_boosts[i] < 0 and ball_vy[i] == 1:
-                    # Negative = slow effect (yellow power)
-                    current_speed = max(int(SPEED_MIN), current_speed - 1)
-            
-            # Apply scared speed boost when going down
-            if i in scared_birds and ball_vy[i] == 1:
-                current_speed += 1
+            # Bat defeated - award score and drop loot
+            add_score(bat.get('max_hp', 0))
+
+            # Find closest lane to bat center
+            bat_center_x = bat['x_pos'] + BAT_CENTER_OFFSET
+            closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
+
+            # Loot drop logic (4 tiers with new percentages)
+            tier = bat['tier']
+            prestige = compute_prestige()
+            base = BAT_LOOT_BASE_WEIGHTS.get(tier, BAT_LOOT_BASE_WEIGHTS.get(4))
+            adj_weights = adjust_rarity_weights(base, prestige)
+            rarity = rng.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
+
+            loot_type = choose_loot_type(rarity)
+
+            spawn_loot(Loot(
+                x_pos=LANE_POSITIONS[closest_lane],
+                y_pos=bat['y_pos'],
+                type=loot_type,
+                rarity=rarity,
+                spawn_ts=state.sim_time
+            ))
 
-            # GLITCH: 1% chance to flip direction spontaneously each step
+            tier = bat.get('tier', None)
+            # notify achievements about bat destroy (with tier)
+            check_achievements_event('destroy_bat', tier=tier)
             try:
-                if ball_colors[i] == GLITCH and not ball_lost[i]:
-                    if random.random() < float(GLITCH_FLIP_CHANCE):
-                        ball_vy[i] = -ball_vy[i]
-            except Exception:
+                remove_bat(bat)
+            except ValueError:
                 pass
 
-            # GLITCH additional chaotic behaviors requested by user:
-            # 1) 1% chance to swap lanes with another active bird
-            # 2) 1% chance to nudge the player cursor +/-1 lane
-            # 3) 1% chance to duplicate into another lane (resurrect or replace)
-            try:
-                if ball_colors[i] == GLITCH and not ball_lost[i]:
-                    # 1) swap lanes with another random active bird (1%)
+    phase_timer.lap('projectiles')
+    # Update power-ups (decrease frame counters)
+    # Active STEALTH tangible damage: while a stealth bird is tangible, apply 24 damage
+    # to any bat/obstacle/loot in proximity so the power reliably has an effect.
+    for i in range(NUM_BALLS):
+        if ball_colors[i] == STEALTH and i in stealth_timers and stealth_timers.get(i, 0) > 0 and not ball_lost[i]:
+            bird_lane = random_lanes[i]
+            bird_x = LANE_POSITIONS[bird_lane]
+            bird_y = ball_y[i]
+
+            # Damage bats in proximity
+            for bat in bats:
+                if abs(bat.get('x_pos', 0) - bird_x) <= 6 and abs(bat.get('y_pos', 0) - bird_y) <= 2:
+                    dmg = 24
+                    bat['hp'] -= dmg
+                    # award XP for damage from this bird
                     try:
-                        if random.random() < float(GLITCH_SWAP_CHANCE):
-                            others = [j for j in range(NUM_BALLS) if j != i and not ball_lost[j]]
-                            if others:
-                                j = random.choice(others)
-                                random_lanes[i], random_lanes[j] = random_lanes[j], random_lanes[i]
-                                # update rendered columns
-                                try:
-                                    ball_cols[i] = LANE_POSITIONS[random_lanes[i]]
-                                except Exception:
-                                    pass
-                                try:
-                                    ball_cols[j] = LANE_POSITIONS[random_lanes[j]]
-                                except Exception:
-                                    pass
+                        award_xp(i, dmg)
                     except Exception:
                         pass
+                    if bat.get('hp', 0) <= 0:
+                        # bonus XP for kill
+                        try:
+                            tier = int(bat.get('tier', 1) or 1)
+                            award_xp(i, XP_BONUS_PER_TIER * tier)
+                        except Exception:
+                            pass
+                        add_score(bat.get('max_hp', 0))
+                        bat_center_x = bat.get('x_pos', 0) + BAT_CENTER_OFFSET
+                        closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
+                        tier = bat.get('tier', None)
+                        prestige = compute_prestige()
+                        # Use configurable base weights for bat loot by tier
+                        try:
+                            base = BAT_LOOT_BASE_WEIGHTS.get(int(tier) or 4, BAT_LOOT_BASE_WEIGHTS.get(4))
+                        except Exception:
+                            base = BAT_LOOT_BASE_WEIGHTS.get(4)
+                        adj_weights = adjust_rarity_weights(base, prestige)
+                        rarity = rng.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
+                        loot_type = choose_loot_type(rarity)
+                        spawn_loot(Loot(
+                            x_pos=LANE_POSITIONS[closest_lane],
+                            y_pos=bat.get('y_pos', 0),
+                            type=loot_type,
+                            rarity=rarity,
+                            spawn_ts=state.sim_time
+                        ))
+                        try:
+                            check_achievements_event('destroy_bat', tier=tier)
+                        except Exception:
+                            pass
+                        try:
+                            remove_bat(bat)
+                        except ValueError:
+                            pass
 
-                    # 2) nudge player cursor by -1 or +1 with 1% chance
+            # Damage obstacles in same lane
+            for obs in lane_index.obstacles_in_lane(bird_lane):
+                if obs.get('lane') == bird_lane and abs(obs.get('y_pos', 0) - bird_y) <= 1:
+                    dmg = 24
+                    obs['hp'] -= dmg
                     try:
-                        if random.random() < float(GLITCH_NUDGE_CHANCE):
-                            delta = random.choice([-1, 1])
-                            # clamp between min and max lane index
-                            player_lane = max(int(MIN_LANE_INDEX), min(int(MAX_LANE_INDEX), player_lane + delta))
+                        award_xp(i, dmg)
                     except Exception:
                         pass
-
-                    # 3) duplicate: 1% chance to spawn/replace a GLITCH in a random lane
-                    try:
-                        if random.random() < float(GLITCH_DUPLICATE_CHANCE):
-                            target_lane = random.randint(int(MIN_LANE_INDEX), int(MAX_LANE_INDEX))
-                            target_idx = next((idx for idx in range(NUM_BALLS) if random_lanes[idx] == target_lane), None)
-                            if target_idx is not None:
-                                # If the slot is empty (lost), resurrect it as GLITCH
-                                if ball_lost[target_idx]:
-                                    ball_lost[target_idx] = False
-                                    ball_colors[target_idx] = GLITCH
-                                    ball_speeds[target_idx] = random.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
-                                    ball_y[target_idx] = STARTING_LINE
-                                    ball_vy[target_idx] = -1
-                                    try:
-                                        per_bird_xp[target_idx] = 0
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transformed_s[target_idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        ball_cols[target_idx] = LANE_POSITIONS[target_lane]
-                                    except Exception:
-                                        pass
-                                else:
-                                    # Replace existing bird in that lane with GLITCH
-                                    ball_colors[target_idx] = GLITCH
-                                    ball_speeds[target_idx] = random.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
-                                    try:
-                                        per_bird_xp[target_idx] = 0
-                                    except Exception:
-                                        pass
-                                    ball_y[target_idx] = STARTING_LINE
-                                    ball_vy[target_idx] = -1
-                                    try:
-                                        transformed_s[target_idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        ball_cols[target_idx] = LANE_POSITIONS[target_lane]
-                                    except Exception:
-                                        pass
-                    except Exception:
+                    if obs.get('hp', 0) <= 0:
+                        try:
+                            tier = int(obs.get('tier', 1) or 1)
+                            award_xp(i, XP_BONUS_PER_TIER * tier)
+                        except Exception:
+                            pass
+                        add_score(obs.get('tier', 0) * OBSTACLE_SCORE_MULTIPLIER)
+                        try:
+                            remove_obstacle(obs)
+                        except ValueError:
+                            pass
+
+            # Destroy loot items in proximity (tangible destroys loot)
+            for loot in loot_items:
+                if abs(bird_x - loot.get('x_pos', 0)) <= 2 and abs(bird_y - loot.get('y_pos', 0)) <= 2:
+                    try:
+                        loot_items.remove(loot)
+                    except ValueError:
                         pass
-            except Exception:
-                pass
+    if powerups['wide_cursor_active']:
+        powerups['wide_cursor_frames'] -= 1
+        if powerups['wide_cursor_frames'] <= 0:
+            powerups['wide_cursor_active'] = False
+            powerups['wide_cursor_lanes'] = 1
+
+    if powerups['bounce_boost_active']:
+        powerups['bounce_boost_frames'] -= 1
+        if powerups['bounce_boost_frames'] <= 0:
+            powerups['bounce_boost_active'] = False
+            powerups['bounce_boost_duration'] = 0
+
+    if powerups['suction_active']:
+        powerups['suction_frames'] -= 1
+        if powerups['suction_frames'] <= 0:
+            powerups['suction_active'] = False
+            powerups['suction_boost_duration'] = 0
+
+    # Tailwind expiry handling
+    if powerups.get('tailwind_active'):
+        try:
+            powerups['tailwind_frames'] -= 1
+            if powerups['tailwind_frames'] <= 0:
+                powerups['tailwind_active'] = False
+                powerups['tailwind_up_bonus'] = 0
+                powerups['tailwind_down_penalty'] = 0
+        except Exception:
+            powerups['tailwind_active'] = False
+            powerups['tailwind_up_bonus'] = 0
+            powerups['tailwind_down_penalty'] = 0
+
+    # (slow-motion powerup removed; no expiry handling required)
+
+    phase_timer.lap('boosts')
+    # Plain birds take the NumPy batch when it is on (see plan_bird_step)
+    plan = plan_bird_step() if vector_birds_enabled() else None
+    for i in range(NUM_BALLS):
+        if plan is not None and apply_bird_plan(plan, i):
+            continue
+        # Decrement any just-fired protection timers
+        try:
+            if purple_just_fired_frames[i] > 0:
+                purple_just_fired_frames[i] -= 1
+        except Exception:
+            pass
+
+        # If this bird is charging or under just-fired protection, keep it frozen
+        # and skip any behaviors that could change its vy (GLITCH flips, duplicates, etc.)
+        try:
+            if purple_state[i] == 2 or (purple_just_fired_frames[i] > 0):
+                # Skip any behavior that could flip direction while charging
+                # or during immediate post-fire protection. Do NOT modify
+                # ball_vy here so rendering keeps the original direction.
+                continue
+        except Exception:
+            pass
+        # GLITCH birds pick a random speed each step
+        try:
+            if ball_colors[i] == GLITCH and not ball_lost[i]:
+                # Random speed each step (configurable range)
+                ball_speeds[i] = rng.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
+        except Exception:
+            pass
+        current_speed = ball_speeds[i]
+
+        # Apply speed boost if active (only when going up)
+        if i in speed_boosts:
+            if speed_boosts[i] > 0 and ball_vy[i] == -1:
+                # Positive = speed boost
+                current_speed += 1
+            elif speed_boosts[i] < 0 and ball_vy[i] == 1:
+                # Negative = slow effect (yellow power)
+                current_speed = max(int(SPEED_MIN), current_speed - 1)
+
+        # Apply scared speed boost when going down
+        if i in scared_birds and ball_vy[i] == 1:
+            current_speed += 1
+
+        # GLITCH: 1% chance to flip direction spontaneously each step
+        try:
+            if ball_colors[i] == GLITCH and not ball_lost[i]:
+                if rng.random() < float(GLITCH_FLIP_CHANCE):
+                    ball_vy[i] = -ball_vy[i]
+        except Exception:
+            pass
+
+        # GLITCH additional chaotic behaviors requested by user:
+        # 1) 1% chance to swap lanes with another active bird
+        # 2) 1% chance to nudge the player cursor +/-1 lane
+        # 3) 1% chance to duplicate into another lane (resurrect or replace)
+        try:
+            if ball_colors[i] == GLITCH and not ball_lost[i]:
+                # 1) swap lanes with another random active bird (1%)
+                try:
+                    if rng.random() < float(GLITCH_SWAP_CHANCE):
+                        others = [j for j in range(NUM_BALLS) if j != i and not ball_lost[j]]
+                        if others:
+                            j = rng.choice(others)
+                            swap_lanes(i, j)
+                            # update rendered columns
+                            try:
+                                ball_cols[i] = LANE_POSITIONS[random_lanes[i]]
+                            except Exception:
+                                pass
+                            try:
+                                ball_cols[j] = LANE_POSITIONS[random_lanes[j]]
+                            except Exception:
+                                pass
+                except Exception:
+                    pass
+
+                # 2) nudge player cursor by -1 or +1 with 1% chance
+                try:
+                    if rng.random() < float(GLITCH_NUDGE_CHANCE):
+                        delta = rng.choice([-1, 1])
+                        # clamp between min and max lane index
+                        state.player_lane = max(int(MIN_LANE_INDEX), min(int(MAX_LANE_INDEX), state.player_lane + delta))
+                except Exception:
+                    pass
 
-            # Apply tailwind powerup effects (tiered):
-            # - when rising (ball_vy == -1) apply up bonus (increase speed)
-            # - when falling (ball_vy == 1) apply down penalty (decrease speed)
-            # Clamp overall speed to [1, 6]
-            if powerups.get('tailwind_active'):
+                # 3) duplicate: 1% chance to spawn/replace a GLITCH in a random lane
                 try:
-                    up_bonus = int(powerups.get('tailwind_up_bonus', 0))
-                    down_pen = int(powerups.get('tailwind_down_penalty', 0))
-                    if ball_vy[i] == -1 and up_bonus != 0:
-                        current_speed = min(int(SPEED_MAX), current_speed + up_bonus)
-                    elif ball_vy[i] == 1 and down_pen != 0:
-                        current_speed = max(int(SPEED_MIN), current_speed - down_pen)
+                    if rng.random() < float(GLITCH_DUPLICATE_CHANCE):
+                        target_lane = rng.randint(int(MIN_LANE_INDEX), int(MAX_LANE_INDEX))
+                        target_idx = next((idx for idx in range(NUM_BALLS) if random_lanes[idx] == target_lane), None)
+                        if target_idx is not None:
+                            # If the slot is empty (lost), resurrect it as GLITCH
+                            if ball_lost[target_idx]:
+                                set_bird_lost(target_idx, False)
+                                set_bird_color(target_idx, GLITCH)
+                                ball_speeds[target_idx] = rng.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
+                                ball_y[target_idx] = STARTING_LINE
+                                ball_vy[target_idx] = -1
+                                try:
+                                    per_bird_xp[target_idx] = 0
+                                except Exception:
+                                    pass
+                                try:
+                                    transformed_s[target_idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    ball_cols[target_idx] = LANE_POSITIONS[target_lane]
+                                except Exception:
+                                    pass
+                            else:
+                                # Replace existing bird in that lane with GLITCH
+                                set_bird_color(target_idx, GLITCH)
+                                ball_speeds[target_idx] = rng.randint(int(GLITCH_SPEED_MIN), int(GLITCH_SPEED_MAX))
+                                try:
+                                    per_bird_xp[target_idx] = 0
+                                except Exception:
+                                    pass
+                                ball_y[target_idx] = STARTING_LINE
+                                ball_vy[target_idx] = -1
+                                try:
+                                    transformed_s[target_idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    ball_cols[target_idx] = LANE_POSITIONS[target_lane]
+                                except Exception:
+                                    pass
                 except Exception:
-                    # On any unexpected issue, don't alter speed
                     pass
-            
-            # Convert speed: higher number = faster, so invert for modulo
-            move_interval = max(1, int(SPEED_MAX - current_speed))
+        except Exception:
+            pass
 
-            # If this bird is actively charging (PURPLE state == 2) or was
-            # just fired, keep it frozen: skip physics, collisions and loot
-            # collection until charging finishes or protection expires.
+        # Apply tailwind powerup effects (tiered):
+        # - when rising (ball_vy == -1) apply up bonus (increase speed)
+        # - when falling (ball_vy == 1) apply down penalty (decrease speed)
+        # Clamp overall speed to [1, 6]
+        if powerups.get('tailwind_active'):
             try:
-                if purple_state[i] == 2 or (purple_just_fired_frames[i] > 0):
-                    continue
+                up_bonus = int(powerups.get('tailwind_up_bonus', 0))
+                down_pen = int(powerups.get('tailwind_down_penalty', 0))
+                if ball_vy[i] == -1 and up_bonus != 0:
+                    current_speed = min(int(SPEED_MAX), current_speed + up_bonus)
+                elif ball_vy[i] == 1 and down_pen != 0:
+                    current_speed = max(int(SPEED_MIN), current_speed - down_pen)
             except Exception:
+                # On any unexpected issue, don't alter speed
                 pass
 
-            if not ball_lost[i] and frame_count % move_interval == 0:
-                # Calculate score for active bird based on speed and position
-                position_multiplier = 0.5 + (HEIGHT - ball_y[i]) / HEIGHT
-                # Gold bird scores a fixed 100 points instead of its speed
-                try:
-                    score_value = GOLD_SCORE_VALUE if ball_colors[i] == GOLD else ball_speeds[i]
-                except Exception:
-                    score_value = ball_speeds[i]
-                # Credit the bird that generated this score with XP as well
-                add_score(score_value * position_multiplier, by_bird=i)
-                
-                # Check collision with obstacles BEFORE moving (when moving up)
-                if ball_vy[i] == -1:  # Only check collision when bird is moving up
-                    bird_lane = random_lanes[i]
-                    bird_lane_x = LANE_POSITIONS[bird_lane]
-                    next_y = ball_y[i] + ball_vy[i]  # Calculate next position
-                    collided = False
-                    broken_through = False
-
-                    # Bird sprite height (default or DINOSAUR)
-                    bird_height = int(DINOSAUR_SPRITE_HEIGHT) if ball_colors[i] == DINOSAUR else int(NORMAL_BIRD_SPRITE_HEIGHT)
-
-                    # Check collision with bats first - if bat enters bird's lane AT ALL, collision!
-                    # Stealth birds (when not tangible) pass through bats
+        # Convert speed: higher number = faster, so invert for modulo
+        move_interval = max(1, int(SPEED_MAX - current_speed))
+
+        # If this bird is actively charging (PURPLE state == 2) or was
+        # just fired, keep it frozen: skip physics, collisions and loot
+        # collection until charging finishes or protection expires.
+        try:
+            if purple_state[i] == 2 or (purple_just_fired_frames[i] > 0):
+                continue
+        except Exception:
+            pass
+
+        if not ball_lost[i] and state.frame_count % move_interval == 0:
+            # Calculate score for active bird based on speed and position
+            position_multiplier = 0.5 + (HEIGHT - ball_y[i]) / HEIGHT
+            # Gold bird scores a fixed 100 points instead of its speed
+            try:
+                score_value = GOLD_SCORE_VALUE if ball_colors[i] == GOLD else ball_speeds[i]
+            except Exception:
+                score_value = ball_speeds[i]
+            # Credit the bird that generated this score with XP as well
+            add_score(score_value * position_multiplier, by_bird=i)
+
+            # Check collision with obstacles BEFORE moving (when moving up)
+            if ball_vy[i] == -1:  # Only check collision when bird is moving up
+                bird_lane = random_lanes[i]
+                bird_lane_x = LANE_POSITIONS[bird_lane]
+                next_y = ball_y[i] + ball_vy[i]  # Calculate next position
+                collided = False
+                broken_through = False
+
+                # Bird sprite height (default or DINOSAUR)
+                bird_height = int(DINOSAUR_SPRITE_HEIGHT) if ball_colors[i] == DINOSAUR else int(NORMAL_BIRD_SPRITE_HEIGHT)
+
+                # Check collision with bats first - if bat enters bird's lane AT ALL, collision!
+                # Stealth birds (when not tangible) pass through bats
+                if not (ball_colors[i] == STEALTH and not (i in stealth_timers and stealth_timers.get(i, 0) > 0)):
+                    for bat in lane_index.bats_in_lane(bird_lane):
+                        bat_left = bat['x_pos']
+                        bat_right = bat['x_pos'] + BAT_SPRITE_WIDTH
+                        bat_top = bat['y_pos']
+                        bat_bottom = bat['y_pos'] + 1
+
+                        lane_left = bird_lane_x - LANE_COLLISION_HALF_WIDTH
+                        lane_right = bird_lane_x + LANE_COLLISION_HALF_WIDTH
+                        horizontal_overlap = not (bat_right < lane_left or bat_left > lane_right)
+                        vertical_overlap = not (next_y + bird_height < bat_top or next_y > bat_bottom)
+
+                        if horizontal_overlap and vertical_overlap:
+                            # Orange bird: destroy bat instantly
+                            if ball_colors[i] == ORANGE:
+                                bat['hp'] = 0
+                            else:
+                                # DINOSAUR deals fixed damage
+                                if ball_colors[i] == DINOSAUR:
+                                    damage = DINOSAUR_DAMAGE
+                                # STEALTH tangible: fixed high damage
+                                elif ball_colors[i] == STEALTH and (i in stealth_timers and stealth_timers.get(i, 0) > 0):
+                                    damage = STEALTH_DAMAGE
+                                # GOLD bird deals fixed damage
+                                elif ball_colors[i] == GOLD:
+                                    damage = GOLD_DAMAGE
+                                # GLITCH deals random damage in configured range
+                                elif ball_colors[i] == GLITCH:
+                                    try:
+                                        damage = int(rng.randint(int(GLITCH_DAMAGE_MIN), int(GLITCH_DAMAGE_MAX)))
+                                    except Exception:
+                                        damage = int(GOLD_DAMAGE)
+                                else:
+                                    damage = current_speed
+                                    if ball_colors[i] == BLUE and bird_power_used[i]:
+                                        damage += 1
+                                bat['hp'] -= damage
+                                # Award XP equal to damage inflicted
+                                try:
+                                    award_xp(i, damage)
+                                except Exception:
+                                    pass
+
+                            # Effects on the bird (only when NOT stealth-tangible)
+                            if not (ball_colors[i] == STEALTH and (i in stealth_timers and stealth_timers.get(i, 0) > 0)):
+                                bat_tier = bat['tier']
+                                if bat_tier == 1:
+                                    scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
+                                elif bat_tier == 2:
+                                    scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
+                                elif bat_tier == 3:
+                                    scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
+                                    speed_boosts[i] = int(SCARED_SPEED_BOOST_SECONDS / base_sleep)
+                                else:
+                                    scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
+                                    speed_boosts[i] = int(SCARED_SPEED_BOOST_SECONDS / base_sleep)
+
+                            if bat['hp'] <= 0:
+                                # Bonus XP for destroying the bat
+                                try:
+                                    tier = int(bat.get('tier', 1) or 1)
+                                    award_xp(i, XP_BONUS_PER_TIER * tier)
+                                except Exception:
+                                    pass
+                                add_score(bat['max_hp'])
+                                bat_center_x = bat['x_pos'] + BAT_CENTER_OFFSET
+                                closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
+                                tier = bat['tier']
+                                prestige = compute_prestige()
+                                # Use configured bat loot base weights when available
+                                try:
+                                    base = BAT_LOOT_BASE_WEIGHTS.get(int(tier) or 4, BAT_LOOT_BASE_WEIGHTS.get(4))
+                                except Exception:
+                                    base = BAT_LOOT_BASE_WEIGHTS.get(4)
+                                adj_weights = adjust_rarity_weights(base, prestige)
+                                rarity = rng.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
+                                loot_type = choose_loot_type(rarity)
+                                spawn_loot(Loot(
+                                    x_pos=LANE_POSITIONS[closest_lane],
+                                    y_pos=bat['y_pos'],
+                                    type=loot_type,
+                                    rarity=rarity,
+                                    spawn_ts=state.sim_time
+                                ))
+                                tier = bat.get('tier', None)
+                                if ball_colors[i] == ORANGE:
+                                    check_achievements_event('destroy_bat_with_orange')
+                                check_achievements_event('destroy_bat', tier=tier)
+                                remove_bat(bat)
+                                broken_through = True
+                            else:
+                                set_ball_vy(i, 1)
+                                ball_y[i] = bat_bottom + 1
+                                try:
+                                    if ball_colors[i] == BLUE:
+                                        reset_bird_power(i)
+                                except Exception:
+                                    pass
+                                collided = True
+                            break
+
+                # Check collision with obstacles if not hit bat
+                if not collided and not broken_through:
                     if not (ball_colors[i] == STEALTH and not (i in stealth_timers and stealth_timers.get(i, 0) > 0)):
-                        for bat in bats[:]:
-                            bat_left = bat['x_pos']
-                            bat_right = bat['x_pos'] + BAT_SPRITE_WIDTH
-                            bat_top = bat['y_pos']
-                            bat_bottom = bat['y_pos'] + 1
-
-                            lane_left = bird_lane_x - LANE_COLLISION_HALF_WIDTH
-                            lane_right = bird_lane_x + LANE_COLLISION_HALF_WIDTH
-                            horizontal_overlap = not (bat_right < lane_left or bat_left > lane_right)
-                            vertical_overlap = not (next_y + bird_height < bat_top or next_y > bat_bottom)
-
-                            if horizontal_overlap and vertical_overlap:
-                                # Orange bird: destroy bat instantly
+                        for obs in lane_index.obstacles_in_lane(bird_lane):
+                            if obs['lane'] == bird_lane and abs(next_y - obs['y_pos']) <= 1:
                                 if ball_colors[i] == ORANGE:
-                                    bat['hp'] = 0
+                                    obs['hp'] = 0
                                 else:
-                                    # DINOSAUR deals fixed damage
                                     if ball_colors[i] == DINOSAUR:
                                         damage = DINOSAUR_DAMAGE
-                                    # STEALTH tangible: fixed high damage
                                     elif ball_colors[i] == STEALTH and (i in stealth_timers and stealth_timers.get(i, 0) > 0):
                                         damage = STEALTH_DAMAGE
-                                    # GOLD bird deals fixed damage
                                     elif ball_colors[i] == GOLD:
                                         damage = GOLD_DAMAGE
-                                    # GLITCH deals random damage in configured range
                                     elif ball_colors[i] == GLITCH:
                                         try:
-                                            damage = int(random.randint(int(GLITCH_DAMAGE_MIN), int(GLITCH_DAMAGE_MAX)))
+                                            damage = int(rng.randint(int(GLITCH_DAMAGE_MIN), int(GLITCH_DAMAGE_MAX)))
                                         except Exception:
                                             damage = int(GOLD_DAMAGE)
                                     else:
                                         damage = current_speed
                                         if ball_colors[i] == BLUE and bird_power_used[i]:
                                             damage += 1
-                                    bat['hp'] -= damage
-                                    # Award XP equal to damage inflicted
+                                    obs['hp'] -= damage
+                                    # Award XP equal to damage to this bird
                                     try:
                                         award_xp(i, damage)
                                     except Exception:
                                         pass
 
-                                # Effects on the bird (only when NOT stealth-tangible)
-                                if not (ball_colors[i] == STEALTH and (i in stealth_timers and stealth_timers.get(i, 0) > 0)):
-                                    bat_tier = bat['tier']
-                                    if bat_tier == 1:
-                                        scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
-                                    elif bat_tier == 2:
-                                        scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
-                                    elif bat_tier == 3:
-                                        scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
-                                        speed_boosts[i] = int(SCARED_SPEED_BOOST_SECONDS / base_sleep)
-                                    else:
-                                        scared_birds[i] = get_scared_frames(i, SCARED_BASE_SECONDS)
-                                        speed_boosts[i] = int(SCARED_SPEED_BOOST_SECONDS / base_sleep)
-
-                                if bat['hp'] <= 0:
-                                    # Bonus XP for destroying the bat
+                                if obs['hp'] <= 0:
                                     try:
-                                        tier = int(bat.get('tier', 1) or 1)
+                                        tier = int(obs.get('tier', 1) or 1)
                                         award_xp(i, XP_BONUS_PER_TIER * tier)
                                     except Exception:
                                         pass
-                                    add_score(bat['max_hp'])
-                                    bat_center_x = bat['x_pos'] + BAT_CENTER_OFFSET
-                                    closest_lane = min(range(NUM_LANES), key=lambda lane_idx: abs(LANE_POSITIONS[lane_idx] - bat_center_x))
-                                    tier = bat['tier']
-                                    prestige = compute_prestige()
-                                    # Use configured bat loot base weights when available
-                                    try:
-                                        base = BAT_LOOT_BASE_WEIGHTS.get(int(tier) or 4, BAT_LOOT_BASE_WEIGHTS.get(4))
-                                    except Exception:
-                                        base = BAT_LOOT_BASE_WEIGHTS.get(4)
-                                    adj_weights = adjust_rarity_weights(base, prestige)
-                                    rarity = random.choices(['common', 'uncommon', 'rare', 'epic'], weights=adj_weights)[0]
-                                    loot_type = choose_loot_type(rarity)
-                                    loot_items.append({
-                                        'x_pos': LANE_POSITIONS[closest_lane],
-                                        'y_pos': bat['y_pos'],
-                                        'type': loot_type,
-                                        'rarity': rarity,
-                                        'spawn_ts': time.time()
-                                    })
-                                    tier = bat.get('tier', None)
-                                    if ball_colors[i] == ORANGE:
-                                        check_achievements_event('destroy_bat_with_orange')
-                                    check_achievements_event('destroy_bat', tier=tier)
-                                    bats.remove(bat)
+                                    add_score(obs['tier'] * OBSTACLE_SCORE_MULTIPLIER)
+                                    remove_obstacle(obs)
                                     broken_through = True
                                 else:
                                     set_ball_vy(i, 1)
-                                    ball_y[i] = bat_bottom + 1
                                     try:
                                         if ball_colors[i] == BLUE:
                                             reset_bird_power(i)
@@ -5456,103 +5449,69 @@ try:
                                     collided = True
                                 break
 
-                    # Check collision with obstacles if not hit bat
-                    if not collided and not broken_through:
-                        if not (ball_colors[i] == STEALTH and not (i in stealth_timers and stealth_timers.get(i, 0) > 0)):
-                            for obs in obstacles[:]:
-                                if obs['lane'] == bird_lane and abs(next_y - obs['y_pos']) <= 1:
-                                    if ball_colors[i] == ORANGE:
-                                        obs['hp'] = 0
-                                    else:
-                                        if ball_colors[i] == DINOSAUR:
-                                            damage = DINOSAUR_DAMAGE
-                                        elif ball_colors[i] == STEALTH and (i in stealth_timers and stealth_timers.get(i, 0) > 0):
-                                            damage = STEALTH_DAMAGE
-                                        elif ball_colors[i] == GOLD:
-                                            damage = GOLD_DAMAGE
-                                        elif ball_colors[i] == GLITCH:
-                                            try:
-                                                damage = int(random.randint(int(GLITCH_DAMAGE_MIN), int(GLITCH_DAMAGE_MAX)))
-                                            except Exception:
-                                                damage = int(GOLD_DAMAGE)
-                                        else:
-                                            damage = current_speed
-                                            if ball_colors[i] == BLUE and bird_power_used[i]:
-                                                damage += 1
-                                        obs['hp'] -= damage
-                                        # Award XP equal to damage to this bird
-                                        try:
-                                            award_xp(i, damage)
-                                        except Exception:
-                                            pass
-
-                                    if obs['hp'] <= 0:
-                                        try:
-                                            tier = int(obs.get('tier', 1) or 1)
-                                            award_xp(i, XP_BONUS_PER_TIER * tier)
-                                        except Exception:
-                                            pass
-                                        add_score(obs['tier'] * OBSTACLE_SCORE_MULTIPLIER)
-                                        obstacles.remove(obs)
-                                        broken_through = True
-                                    else:
-                                        set_ball_vy(i, 1)
-                                        try:
-                                            if ball_colors[i] == BLUE:
-                                                reset_bird_power(i)
-                                        except Exception:
-                                            pass
-                                        collided = True
-                                    break
-
-                    # Only move if no collision OR broke through
-                    if not collided:
-                        ball_y[i] += ball_vy[i]
-                else:
-                    # Moving down, just move
-                    if ball_colors[i] == CLOCKWORK and ball_vy[i] == 1 and ball_y[i] + ball_vy[i] >= STARTING_LINE:
-                        try:
-                            c = clockwork_charge.get(i, None)
-                            if c is None:
-                                c = CLOCKWORK_INITIAL_CHARGE
-                                clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
-                            if c > 0:
-                                ball_y[i] = STARTING_LINE
-                                ball_vy[i] = -1
-                                reset_bird_power(i)
-                            else:
-                                ball_y[i] += ball_vy[i]
-                        except Exception:
+                # Only move if no collision OR broke through
+                if not collided:
+                    ball_y[i] += ball_vy[i]
+            else:
+                # Moving down, just move
+                if ball_colors[i] == CLOCKWORK and ball_vy[i] == 1 and ball_y[i] + ball_vy[i] >= STARTING_LINE:
+                    try:
+                        c = clockwork_charge.get(i, None)
+                        if c is None:
+                            c = CLOCKWORK_INITIAL_CHARGE
+                            clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
+                        if c > 0:
                             ball_y[i] = STARTING_LINE
                             ball_vy[i] = -1
                             reset_bird_power(i)
-                    else:
-                        ball_y[i] += ball_vy[i]
-                
-                # Check for loot collection
-                bird_lane = random_lanes[i]
-                bird_lane_x = LANE_POSITIONS[bird_lane]
-                for loot in loot_items[:]:
-                    # Stealth birds pass through loot unless their power is active (tangible)
-                    if ball_colors[i] == STEALTH and not (i in stealth_timers and stealth_timers.get(i, 0) > 0):
-                        continue
-                    # Check if bird is near loot (within lane and vertically close)
-                    if abs(bird_lane_x - loot['x_pos']) <= LOOT_COLLECTION_DISTANCE and abs(ball_y[i] - loot['y_pos']) <= LOOT_COLLECTION_DISTANCE:
-                        # Collect loot
-                        loot_type = loot['type']
-                        # Notify achievements about collected loot
-                        check_achievements_event('collect', loot=loot_type)
-
-                        # GLITCH interaction with loot: configurable ignore/promote chances
-                        try:
-                            if ball_colors[i] == GLITCH:
-                                r = random.random()
+                        else:
+                            ball_y[i] += ball_vy[i]
+                    except Exception:
+                        ball_y[i] = STARTING_LINE
+                        ball_vy[i] = -1
+                        reset_bird_power(i)
+                else:
+                    ball_y[i] += ball_vy[i]
+
+            # Check for loot collection
+            bird_lane = random_lanes[i]
+            bird_lane_x = LANE_POSITIONS[bird_lane]
+            for loot in loot_items:
+                # Stealth birds pass through loot unless their power is active (tangible)
+                if ball_colors[i] == STEALTH and not (i in stealth_timers and stealth_timers.get(i, 0) > 0):
+                    continue
+                # Check if bird is near loot (within lane and vertically close)
+                if abs(bird_lane_x - loot['x_pos']) <= LOOT_COLLECTION_DISTANCE and abs(ball_y[i] - loot['y_pos']) <= LOOT_COLLECTION_DISTANCE:
+                    # Collect loot
+                    loot_type = loot['type']
+                    emit_event('loot', loot=loot_type, rarity=loot.get('rarity'), bird=i)
+                    # Notify achievements about collected loot
+                    check_achievements_event('collect', loot=loot_type)
+
+                    # GLITCH interaction with loot: configurable ignore/promote chances
+                    try:
+                        if ball_colors[i] == GLITCH:
+                            r = rng.random()
+                            try:
+                                if r < float(GLITCH_LOOT_IGNORE_CHANCE):
+                                    # ignore the loot entirely
+                                    continue
+                                elif r < float(GLITCH_LOOT_IGNORE_CHANCE) + float(GLITCH_LOOT_PROMOTE_CHANCE):
+                                    # promote rarity one tier
+                                    rar = loot.get('rarity', 'common')
+                                    if rar == 'common':
+                                        loot['rarity'] = 'uncommon'
+                                    elif rar == 'uncommon':
+                                        loot['rarity'] = 'rare'
+                                    elif rar == 'rare':
+                                        loot['rarity'] = 'epic'
+                                    # otherwise epic stays epic
+                            except Exception:
+                                # fallback: try using configured glitch loot chances
                                 try:
                                     if r < float(GLITCH_LOOT_IGNORE_CHANCE):
-                                        # ignore the loot entirely
                                         continue
                                     elif r < float(GLITCH_LOOT_IGNORE_CHANCE) + float(GLITCH_LOOT_PROMOTE_CHANCE):
-                                        # promote rarity one tier
                                         rar = loot.get('rarity', 'common')
                                         if rar == 'common':
                                             loot['rarity'] = 'uncommon'
@@ -5560,9 +5519,8 @@ try:
                                             loot['rarity'] = 'rare'
                                         elif rar == 'rare':
                                             loot['rarity'] = 'epic'
-                                        # otherwise epic stays epic
                                 except Exception:
-                                    # fallback: try using configured glitch loot chances
+                                    # final fallback using configured constants where possible
                                     try:
                                         if r < float(GLITCH_LOOT_IGNORE_CHANCE):
                                             continue
@@ -5575,59 +5533,158 @@ try:
                                             elif rar == 'rare':
                                                 loot['rarity'] = 'epic'
                                     except Exception:
-                                        # final fallback using configured constants where possible
-                                        try:
-                                            if r < float(GLITCH_LOOT_IGNORE_CHANCE):
-                                                continue
-                                            elif r < float(GLITCH_LOOT_IGNORE_CHANCE) + float(GLITCH_LOOT_PROMOTE_CHANCE):
-                                                rar = loot.get('rarity', 'common')
-                                                if rar == 'common':
-                                                    loot['rarity'] = 'uncommon'
-                                                elif rar == 'uncommon':
-                                                    loot['rarity'] = 'rare'
-                                                elif rar == 'rare':
-                                                    loot['rarity'] = 'epic'
-                                        except Exception:
-                                            # absolute last resort literal fallback
-                                            if r < 0.05:
-                                                continue
-                                            elif r < 0.10:
-                                                rar = loot.get('rarity', 'common')
-                                                if rar == 'common':
-                                                    loot['rarity'] = 'uncommon'
-                                                elif rar == 'uncommon':
-                                                    loot['rarity'] = 'rare'
-                                                elif rar == 'rare':
-                                                    loot['rarity'] = 'epic'
-                        except Exception:
-                            pass
+                                        # absolute last resort literal fallback
+                                        if r < 0.05:
+                                            continue
+                                        elif r < 0.10:
+                                            rar = loot.get('rarity', 'common')
+                                            if rar == 'common':
+                                                loot['rarity'] = 'uncommon'
+                                            elif rar == 'uncommon':
+                                                loot['rarity'] = 'rare'
+                                            elif rar == 'rare':
+                                                loot['rarity'] = 'epic'
+                    except Exception:
+                        pass
 
-                        # Cookie crumbs should NOT be collected by COOKIE birds themselves;
-                        # if the nearest collector is the COOKIE that dropped it, skip collection.
-                        try:
-                            if loot_type == 'cookie_crumb' and ball_colors[i] == COOKIE:
-                                continue
-                        except Exception:
-                            pass
+                    # Cookie crumbs should NOT be collected by COOKIE birds themselves;
+                    # if the nearest collector is the COOKIE that dropped it, skip collection.
+                    try:
+                        if loot_type == 'cookie_crumb' and ball_colors[i] == COOKIE:
+                            continue
+                    except Exception:
+                        pass
 
-                        loot_items.remove(loot)
+                    loot_items.remove(loot)
 
-                        # Apply loot effects
-                        if loot_type == 'yellow_egg':
-                            # Spawn yellow bird in first empty lane
-                            for idx in range(NUM_BALLS):
+                    # Apply loot effects
+                    if loot_type == 'yellow_egg':
+                        # Spawn yellow bird in first empty lane
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_color(idx, YELLOW)
+                                set_bird_lost(idx, False)
+                                # Ensure speed matches configured color speed
+                                try:
+                                    cname = COLOR_NAME_MAP.get(YELLOW, 'YELLOW')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('YELLOW', 2)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('YELLOW', 2))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'cookie_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_color(idx, COOKIE)
+                                set_bird_lost(idx, False)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(COOKIE, 'COOKIE')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('COOKIE', 3)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('COOKIE', 3))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'red_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_color(idx, RED)
+                                set_bird_lost(idx, False)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(RED, 'RED')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('RED', 3)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('RED', 3))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'blue_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_color(idx, BLUE)
+                                set_bird_lost(idx, False)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(BLUE, 'BLUE')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('BLUE', 4)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('BLUE', 4))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'white_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, WHITE)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(WHITE, 'WHITE')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('WHITE', 5)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('WHITE', 5))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'clockwork_egg':
+                        for idx in range(NUM_BALLS):
                                 if ball_lost[idx]:
-                                    ball_colors[idx] = YELLOW
-                                    ball_lost[idx] = False
-                                    # Ensure speed matches configured color speed
+                                    set_bird_lost(idx, False)
+                                    set_bird_color(idx, CLOCKWORK)
+                                    # Initialize clockwork charge and speed
                                     try:
-                                        cname = COLOR_NAME_MAP.get(YELLOW, 'YELLOW')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('YELLOW', 2)))
+                                        clockwork_charge[idx] = CLOCKWORK_INITIAL_CHARGE
+                                        cname = COLOR_NAME_MAP.get(CLOCKWORK, 'CLOCKWORK')
+                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('CLOCKWORK', 2)))
                                     except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('YELLOW', 2))
+                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('CLOCKWORK', 2))
                                     ball_y[idx] = STARTING_LINE
                                     ball_vy[idx] = -1
-                                    lives += 1  # Restore life
+                                    state.lives += 1  # Restore life
                                     try:
                                         transformed_s[idx] = False
                                     except Exception:
@@ -5637,600 +5694,1818 @@ try:
                                     except Exception:
                                         pass
                                     break
-                        elif loot_type == 'cookie_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_colors[idx] = COOKIE
-                                    ball_lost[idx] = False
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(COOKIE, 'COOKIE')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('COOKIE', 3)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('COOKIE', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'red_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_colors[idx] = RED
-                                    ball_lost[idx] = False
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(RED, 'RED')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('RED', 3)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('RED', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'blue_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_colors[idx] = BLUE
-                                    ball_lost[idx] = False
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(BLUE, 'BLUE')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('BLUE', 4)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('BLUE', 4))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'white_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = WHITE
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(WHITE, 'WHITE')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('WHITE', 5)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('WHITE', 5))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'clockwork_egg':
-                            for idx in range(NUM_BALLS):
-                                    if ball_lost[idx]:
-                                        ball_lost[idx] = False
-                                        ball_colors[idx] = CLOCKWORK
-                                        # Initialize clockwork charge and speed
-                                        try:
-                                            clockwork_charge[idx] = CLOCKWORK_INITIAL_CHARGE
-                                            cname = COLOR_NAME_MAP.get(CLOCKWORK, 'CLOCKWORK')
-                                            ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('CLOCKWORK', 2)))
-                                        except Exception:
-                                            ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('CLOCKWORK', 2))
-                                        ball_y[idx] = STARTING_LINE
-                                        ball_vy[idx] = -1
-                                        lives += 1  # Restore life
-                                        try:
-                                            transformed_s[idx] = False
-                                        except Exception:
-                                            pass
-                                        try:
-                                            transform_bird_to_s(idx)
-                                        except Exception:
-                                            pass
-                                        break
-                        elif loot_type == 'purple_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = PURPLE
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(PURPLE, 'PURPLE')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('PURPLE', 3)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('PURPLE', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'dinosaur_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = DINOSAUR
-                                    # DINOSAUR legendary: set a high base speed (4)
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(DINOSAUR, 'DINOSAUR')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4))
-                                    ball_y[idx] = STARTING_LINE
-                                    set_ball_vy(idx, -1)
-                                    lives += 1
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'glitch_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = GLITCH
-                                    # GLITCH bird: variable behavior; set medium speed
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(GLITCH, 'GLITCH')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('GLITCH', 3)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('GLITCH', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    set_ball_vy(idx, -1)
-                                    lives += 1
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'gold_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = GOLD
-                                    # Gold special bird = speed 6
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(GOLD, 'GOLD')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('GOLD', 6)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('GOLD', 6))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'patchwork_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = PATCHWORK
-                                    # Patchwork bird = speed 3 (per design)
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(PATCHWORK, 'PATCHWORK')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('PATCHWORK', 3)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('PATCHWORK', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'stealth_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = STEALTH
-                                    # Stealth bird = speed 3 by default
-                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('STEALTH', 3))
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        elif loot_type == 'orange_egg':
-                            for idx in range(NUM_BALLS):
-                                if ball_lost[idx]:
-                                    ball_lost[idx] = False
-                                    ball_colors[idx] = ORANGE
-                                    try:
-                                        cname = COLOR_NAME_MAP.get(ORANGE, 'ORANGE')
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('ORANGE', 5)))
-                                    except Exception:
-                                        ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('ORANGE', 5))  # Fastest bird (fallback)
-                                    ball_y[idx] = STARTING_LINE
-                                    ball_vy[idx] = -1
-                                    lives += 1  # Restore life
-                                    try:
-                                        transformed_s[idx] = False
-                                    except Exception:
-                                        pass
-                                    try:
-                                        transform_bird_to_s(idx)
-                                    except Exception:
-                                        pass
-                                    break
-                        # Cookie crumb pickup: grant contained XP to non-COOKIE birds only
-                        elif loot_type == 'cookie_crumb':
-                            # Only non-COOKIE birds can collect crumbs
-                            try:
-                                if ball_colors[i] == COOKIE:
-                                    # Cookie birds ignore crumbs
+                    elif loot_type == 'purple_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, PURPLE)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(PURPLE, 'PURPLE')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('PURPLE', 3)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('PURPLE', 3))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
                                     pass
-                                else:
-                                    xp_val = int(loot.get('xp', 0) or 0)
-                                    if xp_val > 0:
-                                        try:
-                                            award_xp(i, xp_val)
-                                        except Exception:
-                                            pass
-                            except Exception:
-                                pass
-                        elif loot_type.startswith('wide_cursor'):
-                            cfg = POWERS_DEFAULT.get('wide_cursor', {})
-                            powerups['wide_cursor_active'] = True
-                            # determine which seconds to use based on suffix
-                            if loot_type == 'wide_cursor':
-                                sec = cfg.get('base_seconds', WIDE_CURSOR_BASE_SECONDS)
-                                lanes = cfg.get('lanes_base', WIDE_CURSOR_LANES_BASE)
-                            elif loot_type == 'wide_cursor+':
-                                sec = cfg.get('plus_seconds', WIDE_CURSOR_PLUS_SECONDS)
-                                lanes = cfg.get('lanes_base', WIDE_CURSOR_LANES_BASE)
-                            elif loot_type == 'wide_cursor++':
-                                sec = cfg.get('plusplus_seconds', WIDE_CURSOR_PLUSPLUS_SECONDS)
-                                lanes = cfg.get('lanes_max', WIDE_CURSOR_LANES_MAX)
-                            else:
-                                sec = cfg.get('max_seconds', WIDE_CURSOR_MAX_SECONDS)
-                                lanes = cfg.get('lanes_max', WIDE_CURSOR_LANES_MAX)
-                            powerups['wide_cursor_frames'] = max(1, int(float(sec) / base_sleep))
-                            powerups['wide_cursor_lanes'] = int(lanes)
-                            check_achievements_event('power_used', power='wide_cursor')
-                        elif loot_type.startswith('bounce_boost'):
-                            cfg = POWERS_DEFAULT.get('bounce_boost', {})
-                            powerups['bounce_boost_active'] = True
-                            if loot_type == 'bounce_boost':
-                                sec = cfg.get('base_seconds', BOUNCE_BOOST_BASE_SECONDS)
-                                duration = cfg.get('duration_base', BOUNCE_BOOST_DURATION_BASE)
-                            elif loot_type == 'bounce_boost+':
-                                sec = cfg.get('plus_seconds', BOUNCE_BOOST_PLUS_SECONDS)
-                                duration = cfg.get('duration_plus', BOUNCE_BOOST_DURATION_PLUS)
-                            elif loot_type == 'bounce_boost++':
-                                sec = cfg.get('plusplus_seconds', BOUNCE_BOOST_PLUSPLUS_SECONDS)
-                                duration = cfg.get('duration_plusplus', BOUNCE_BOOST_DURATION_PLUSPLUS)
-                            else:
-                                sec = cfg.get('max_seconds', BOUNCE_BOOST_MAX_SECONDS)
-                                duration = cfg.get('duration_max', BOUNCE_BOOST_DURATION_MAX)
-                            powerups['bounce_boost_frames'] = max(1, int(float(sec) / base_sleep))
-                            powerups['bounce_boost_duration'] = int(duration)
-                            check_achievements_event('power_used', power='bounce_boost')
-                        elif loot_type.startswith('suction'):
-                            cfg = POWERS_DEFAULT.get('suction', {})
-                            powerups['suction_active'] = True
-                            if loot_type == 'suction':
-                                sec = cfg.get('base_seconds', SUCTION_BASE_SECONDS)
-                                boost = cfg.get('boost_duration_base', SUCTION_BOOST_DURATION_BASE)
-                            elif loot_type == 'suction+':
-                                sec = cfg.get('plus_seconds', SUCTION_PLUS_SECONDS)
-                                boost = cfg.get('boost_duration_plus', SUCTION_BOOST_DURATION_PLUS)
-                            elif loot_type == 'suction++':
-                                sec = cfg.get('plusplus_seconds', SUCTION_PLUSPLUS_SECONDS)
-                                boost = cfg.get('boost_duration_plusplus', SUCTION_BOOST_DURATION_PLUSPLUS)
-                            else:
-                                sec = cfg.get('max_seconds', SUCTION_MAX_SECONDS)
-                                boost = cfg.get('boost_duration_max', SUCTION_BOOST_DURATION_MAX)
-                            powerups['suction_frames'] = max(1, int(float(sec) / base_sleep))
-                            powerups['suction_boost_duration'] = int(boost)
-                            check_achievements_event('power_used', power='suction')
-                        elif loot_type.startswith('tailwind'):
-                            cfg = POWERS_DEFAULT.get('tailwind', {})
-                            powerups['tailwind_active'] = True
-                            if loot_type == 'tailwind':
-                                sec = cfg.get('base_seconds', TAILWIND_BASE_SECONDS)
-                                up = cfg.get('up_bonus_base', TAILWIND_UP_BONUS_BASE)
-                                down = cfg.get('down_penalty_base', TAILWIND_DOWN_PENALTY_BASE)
-                            elif loot_type == 'tailwind+':
-                                sec = cfg.get('plus_seconds', TAILWIND_PLUS_SECONDS)
-                                up = cfg.get('up_bonus_plus', TAILWIND_UP_BONUS_PLUS)
-                                down = cfg.get('down_penalty_plus', TAILWIND_DOWN_PENALTY_PLUS)
-                            elif loot_type == 'tailwind++':
-                                sec = cfg.get('plusplus_seconds', TAILWIND_PLUSPLUS_SECONDS)
-                                up = cfg.get('up_bonus_plusplus', TAILWIND_UP_BONUS_PLUSPLUS)
-                                down = cfg.get('down_penalty_plusplus', TAILWIND_DOWN_PENALTY_PLUSPLUS)
-                            else:
-                                sec = cfg.get('max_seconds', TAILWIND_MAX_SECONDS)
-                                up = cfg.get('up_bonus_plusplus', TAILWIND_UP_BONUS_PLUSPLUS)
-                                down = cfg.get('down_penalty_max', TAILWIND_DOWN_PENALTY_MAX)
-                            powerups['tailwind_frames'] = max(1, int(float(sec) / base_sleep))
-                            powerups['tailwind_up_bonus'] = int(up)
-                            powerups['tailwind_down_penalty'] = int(down)
-                            check_achievements_event('power_used', power='tailwind')
-                        elif loot_type == 'shuffle':
-                            # Shuffle 2 birds (basic)
-                            try:
-                                perform_shuffle(SHUFFLE_LEVEL_BASE)
-                                check_achievements_event('power_used', power='shuffle')
-                            except Exception:
-                                pass
-                        elif loot_type == 'shuffle+':
-                            # Shuffle 4 birds
-                            try:
-                                perform_shuffle(SHUFFLE_LEVEL_PLUS)
-                                check_achievements_event('power_used', power='shuffle')
-                            except Exception:
-                                pass
-                        elif loot_type == 'shuffle++':
-                            # Shuffle 6 birds
-                            try:
-                                perform_shuffle(SHUFFLE_LEVEL_PLUSPLUS)
-                                check_achievements_event('power_used', power='shuffle')
-                            except Exception:
-                                pass
-                        elif loot_type == 'shuffle_max':
-                            # Shuffle many (attempt to compact all outer birds)
-                            try:
-                                perform_shuffle(SHUFFLE_LEVEL_MAX)
-                                check_achievements_event('power_used', power='shuffle')
-                            except Exception:
-                                pass
-                
-                # Bounce off ceiling
-                if ball_y[i] <= 1:
-                    if ball_colors[i] == ORANGE:
-                        lane = random_lanes[i]
-                        ball_lost[i] = False
-                        ball_y[i] = ORANGE_OUT_OF_PLAY_Y
-                        set_ball_vy(i, 0)
-                        reset_bird_power(i)
-                        ball_speeds[i] = 0
-                        # Transformed S-birds do not produce egg loot
-                        try:
-                            if not transformed_s[i]:
-                                loot_items.append({'x_pos': LANE_POSITIONS[lane], 'y_pos': STARTING_LINE, 'type': 'orange_egg', 'rarity': 'epic', 'spawn_ts': time.time()})
-                        except Exception:
-                            # Defensive: if transformed_s is missing or error, still append
-                            loot_items.append({'x_pos': LANE_POSITIONS[lane], 'y_pos': STARTING_LINE, 'type': 'orange_egg', 'rarity': 'epic', 'spawn_ts': time.time()})
-                        continue
-                    ball_y[i] = 1
-                    set_ball_vy(i, 1)
-                    reset_bird_power(i)  # Reset power when starting to descend
-                
-                # Check if ball hits floor
-                if ball_y[i] >= HEIGHT - 1:
-                    if ball_colors[i] == CLOCKWORK:
-                        # CLOCKWORK behaviour: only auto-bounce if charge > 0
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'dinosaur_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, DINOSAUR)
+                                # DINOSAUR legendary: set a high base speed (4)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(DINOSAUR, 'DINOSAUR')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('DINOSAUR', 4))
+                                ball_y[idx] = STARTING_LINE
+                                set_ball_vy(idx, -1)
+                                state.lives += 1
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'glitch_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, GLITCH)
+                                # GLITCH bird: variable behavior; set medium speed
+                                try:
+                                    cname = COLOR_NAME_MAP.get(GLITCH, 'GLITCH')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('GLITCH', 3)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('GLITCH', 3))
+                                ball_y[idx] = STARTING_LINE
+                                set_ball_vy(idx, -1)
+                                state.lives += 1
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'gold_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, GOLD)
+                                # Gold special bird = speed 6
+                                try:
+                                    cname = COLOR_NAME_MAP.get(GOLD, 'GOLD')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('GOLD', 6)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('GOLD', 6))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'patchwork_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, PATCHWORK)
+                                # Patchwork bird = speed 3 (per design)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(PATCHWORK, 'PATCHWORK')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('PATCHWORK', 3)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('PATCHWORK', 3))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'stealth_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, STEALTH)
+                                # Stealth bird = speed 3 by default
+                                ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('STEALTH', 3))
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    elif loot_type == 'orange_egg':
+                        for idx in range(NUM_BALLS):
+                            if ball_lost[idx]:
+                                set_bird_lost(idx, False)
+                                set_bird_color(idx, ORANGE)
+                                try:
+                                    cname = COLOR_NAME_MAP.get(ORANGE, 'ORANGE')
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get(cname, BALL_SPEEDS_DEFAULT.get('ORANGE', 5)))
+                                except Exception:
+                                    ball_speeds[idx] = int(BALL_SPEEDS_DEFAULT.get('ORANGE', 5))  # Fastest bird (fallback)
+                                ball_y[idx] = STARTING_LINE
+                                ball_vy[idx] = -1
+                                state.lives += 1  # Restore life
+                                try:
+                                    transformed_s[idx] = False
+                                except Exception:
+                                    pass
+                                try:
+                                    transform_bird_to_s(idx)
+                                except Exception:
+                                    pass
+                                break
+                    # Cookie crumb pickup: grant contained XP to non-COOKIE birds only
+                    elif loot_type == 'cookie_crumb':
+                        # Only non-COOKIE birds can collect crumbs
                         try:
-                            c = clockwork_charge.get(i, None)
-                            if c is None:
-                                c = CLOCKWORK_INITIAL_CHARGE
-                                clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
-                            if c > 0:
-                                ball_y[i] = STARTING_LINE
-                                set_ball_vy(i, -1)
-                                reset_bird_power(i)
+                            if ball_colors[i] == COOKIE:
+                                # Cookie birds ignore crumbs
+                                pass
                             else:
-                                # charge == 0: behave like other birds hitting the floor -> die
-                                if not ball_lost[i]:
-                                    ball_lost[i] = True
-                                    ball_y[i] = HEIGHT - 1
-                                    # Reset XP for this bird on death so a new spawn starts at 0
+                                xp_val = int(loot.get('xp', 0) or 0)
+                                if xp_val > 0:
                                     try:
-                                        per_bird_xp[i] = 0
+                                        award_xp(i, xp_val)
                                     except Exception:
                                         pass
-                                    lives -= 1
-                                    # Check for game over
-                                    if lives <= 0:
-                                        game_over = True
                         except Exception:
-                            # Fallback: normal behaviour
+                            pass
+                    elif loot_type.startswith('wide_cursor'):
+                        cfg = POWERS_DEFAULT.get('wide_cursor', {})
+                        powerups['wide_cursor_active'] = True
+                        # determine which seconds to use based on suffix
+                        if loot_type == 'wide_cursor':
+                            sec = cfg.get('base_seconds', WIDE_CURSOR_BASE_SECONDS)
+                            lanes = cfg.get('lanes_base', WIDE_CURSOR_LANES_BASE)
+                        elif loot_type == 'wide_cursor+':
+                            sec = cfg.get('plus_seconds', WIDE_CURSOR_PLUS_SECONDS)
+                            lanes = cfg.get('lanes_base', WIDE_CURSOR_LANES_BASE)
+                        elif loot_type == 'wide_cursor++':
+                            sec = cfg.get('plusplus_seconds', WIDE_CURSOR_PLUSPLUS_SECONDS)
+                            lanes = cfg.get('lanes_max', WIDE_CURSOR_LANES_MAX)
+                        else:
+                            sec = cfg.get('max_seconds', WIDE_CURSOR_MAX_SECONDS)
+                            lanes = cfg.get('lanes_max', WIDE_CURSOR_LANES_MAX)
+                        powerups['wide_cursor_frames'] = max(1, int(float(sec) / base_sleep))
+                        powerups['wide_cursor_lanes'] = int(lanes)
+                        check_achievements_event('power_used', power='wide_cursor')
+                    elif loot_type.startswith('bounce_boost'):
+                        cfg = POWERS_DEFAULT.get('bounce_boost', {})
+                        powerups['bounce_boost_active'] = True
+                        if loot_type == 'bounce_boost':
+                            sec = cfg.get('base_seconds', BOUNCE_BOOST_BASE_SECONDS)
+                            duration = cfg.get('duration_base', BOUNCE_BOOST_DURATION_BASE)
+                        elif loot_type == 'bounce_boost+':
+                            sec = cfg.get('plus_seconds', BOUNCE_BOOST_PLUS_SECONDS)
+                            duration = cfg.get('duration_plus', BOUNCE_BOOST_DURATION_PLUS)
+                        elif loot_type == 'bounce_boost++':
+                            sec = cfg.get('plusplus_seconds', BOUNCE_BOOST_PLUSPLUS_SECONDS)
+                            duration = cfg.get('duration_plusplus', BOUNCE_BOOST_DURATION_PLUSPLUS)
+                        else:
+                            sec = cfg.get('max_seconds', BOUNCE_BOOST_MAX_SECONDS)
+                            duration = cfg.get('duration_max', BOUNCE_BOOST_DURATION_MAX)
+                        powerups['bounce_boost_frames'] = max(1, int(float(sec) / base_sleep))
+                        powerups['bounce_boost_duration'] = int(duration)
+                        check_achievements_event('power_used', power='bounce_boost')
+                    elif loot_type.startswith('suction'):
+                        cfg = POWERS_DEFAULT.get('suction', {})
+                        powerups['suction_active'] = True
+                        if loot_type == 'suction':
+                            sec = cfg.get('base_seconds', SUCTION_BASE_SECONDS)
+                            boost = cfg.get('boost_duration_base', SUCTION_BOOST_DURATION_BASE)
+                        elif loot_type == 'suction+':
+                            sec = cfg.get('plus_seconds', SUCTION_PLUS_SECONDS)
+                            boost = cfg.get('boost_duration_plus', SUCTION_BOOST_DURATION_PLUS)
+                        elif loot_type == 'suction++':
+                            sec = cfg.get('plusplus_seconds', SUCTION_PLUSPLUS_SECONDS)
+                            boost = cfg.get('boost_duration_plusplus', SUCTION_BOOST_DURATION_PLUSPLUS)
+                        else:
+                            sec = cfg.get('max_seconds', SUCTION_MAX_SECONDS)
+                            boost = cfg.get('boost_duration_max', SUCTION_BOOST_DURATION_MAX)
+                        powerups['suction_frames'] = max(1, int(float(sec) / base_sleep))
+                        powerups['suction_boost_duration'] = int(boost)
+                        check_achievements_event('power_used', power='suction')
+                    elif loot_type.startswith('tailwind'):
+                        cfg = POWERS_DEFAULT.get('tailwind', {})
+                        powerups['tailwind_active'] = True
+                        if loot_type == 'tailwind':
+                            sec = cfg.get('base_seconds', TAILWIND_BASE_SECONDS)
+                            up = cfg.get('up_bonus_base', TAILWIND_UP_BONUS_BASE)
+                            down = cfg.get('down_penalty_base', TAILWIND_DOWN_PENALTY_BASE)
+                        elif loot_type == 'tailwind+':
+                            sec = cfg.get('plus_seconds', TAILWIND_PLUS_SECONDS)
+                            up = cfg.get('up_bonus_plus', TAILWIND_UP_BONUS_PLUS)
+                            down = cfg.get('down_penalty_plus', TAILWIND_DOWN_PENALTY_PLUS)
+                        elif loot_type == 'tailwind++':
+                            sec = cfg.get('plusplus_seconds', TAILWIND_PLUSPLUS_SECONDS)
+                            up = cfg.get('up_bonus_plusplus', TAILWIND_UP_BONUS_PLUSPLUS)
+                            down = cfg.get('down_penalty_plusplus', TAILWIND_DOWN_PENALTY_PLUSPLUS)
+                        else:
+                            sec = cfg.get('max_seconds', TAILWIND_MAX_SECONDS)
+                            up = cfg.get('up_bonus_plusplus', TAILWIND_UP_BONUS_PLUSPLUS)
+                            down = cfg.get('down_penalty_max', TAILWIND_DOWN_PENALTY_MAX)
+                        powerups['tailwind_frames'] = max(1, int(float(sec) / base_sleep))
+                        powerups['tailwind_up_bonus'] = int(up)
+                        powerups['tailwind_down_penalty'] = int(down)
+                        check_achievements_event('power_used', power='tailwind')
+                    elif loot_type == 'shuffle':
+                        # Shuffle 2 birds (basic)
+                        try:
+                            perform_shuffle(SHUFFLE_LEVEL_BASE)
+                            check_achievements_event('power_used', power='shuffle')
+                        except Exception:
+                            pass
+                    elif loot_type == 'shuffle+':
+                        # Shuffle 4 birds
+                        try:
+                            perform_shuffle(SHUFFLE_LEVEL_PLUS)
+                            check_achievements_event('power_used', power='shuffle')
+                        except Exception:
+                            pass
+                    elif loot_type == 'shuffle++':
+                        # Shuffle 6 birds
+                        try:
+                            perform_shuffle(SHUFFLE_LEVEL_PLUSPLUS)
+                            check_achievements_event('power_used', power='shuffle')
+                        except Exception:
+                            pass
+                    elif loot_type == 'shuffle_max':
+                        # Shuffle many (attempt to compact all outer birds)
+                        try:
+                            perform_shuffle(SHUFFLE_LEVEL_MAX)
+                            check_achievements_event('power_used', power='shuffle')
+                        except Exception:
+                            pass
+
+            # Bounce off ceiling
+            if ball_y[i] <= 1:
+                if ball_colors[i] == ORANGE:
+                    lane = random_lanes[i]
+                    set_bird_lost(i, False)
+                    ball_y[i] = ORANGE_OUT_OF_PLAY_Y
+                    set_ball_vy(i, 0)
+                    reset_bird_power(i)
+                    ball_speeds[i] = 0
+                    # Transformed S-birds do not produce egg loot
+                    try:
+                        if not transformed_s[i]:
+                            spawn_loot(Loot(x_pos=LANE_POSITIONS[lane], y_pos=STARTING_LINE, type='orange_egg', rarity='epic', spawn_ts=state.sim_time, bird=i))
+                    except Exception:
+                        # Defensive: if transformed_s is missing or error, still append
+                        spawn_loot(Loot(x_pos=LANE_POSITIONS[lane], y_pos=STARTING_LINE, type='orange_egg', rarity='epic', spawn_ts=state.sim_time, bird=i))
+                    continue
+                ball_y[i] = 1
+                set_ball_vy(i, 1)
+                reset_bird_power(i)  # Reset power when starting to descend
+
+            # Check if ball hits floor
+            if ball_y[i] >= HEIGHT - 1:
+                if ball_colors[i] == CLOCKWORK:
+                    # CLOCKWORK behaviour: only auto-bounce if charge > 0
+                    try:
+                        c = clockwork_charge.get(i, None)
+                        if c is None:
+                            c = CLOCKWORK_INITIAL_CHARGE
+                            clockwork_charge[i] = CLOCKWORK_INITIAL_CHARGE
+                        if c > 0:
                             ball_y[i] = STARTING_LINE
                             set_ball_vy(i, -1)
                             reset_bird_power(i)
-                    elif ball_colors[i] == ORANGE:
-                        continue
-                    elif not ball_lost[i]:  # Solo gli altri muoiono (incl. GLITCH special-case)
-                        # GLITCH: 20% chance to survive and bounce instead of dying
+                        else:
+                            # charge == 0: behave like other birds hitting the floor -> die
+                            if not ball_lost[i]:
+                                set_bird_lost(i, True)
+                                ball_y[i] = HEIGHT - 1
+                                # Reset XP for this bird on death so a new spawn starts at 0
+                                try:
+                                    per_bird_xp[i] = 0
+                                except Exception:
+                                    pass
+                                state.lives -= 1
+                                # Check for game over
+                                if state.lives <= 0:
+                                    state.game_over = True
+                    except Exception:
+                        # Fallback: normal behaviour
+                        ball_y[i] = STARTING_LINE
+                        set_ball_vy(i, -1)
+                        reset_bird_power(i)
+                elif ball_colors[i] == ORANGE:
+                    continue
+                elif not ball_lost[i]:  # Solo gli altri muoiono (incl. GLITCH special-case)
+                    # GLITCH: 20% chance to survive and bounce instead of dying
+                    try:
+                        if ball_colors[i] == GLITCH and rng.random() < float(GLITCH_SURVIVE_ON_FLOOR_CHANCE):
+                            # Bounce instead of dying
+                            ball_y[i] = STARTING_LINE
+                            set_ball_vy(i, -1)
+                            reset_bird_power(i)
+                            continue
+                    except Exception:
+                        pass
+
+                    set_bird_lost(i, True)
+                    ball_y[i] = HEIGHT - 1
+                    # Reset XP for this bird on death so a new spawn starts at 0
+                    try:
+                        per_bird_xp[i] = 0
+                    except Exception:
+                        pass
+                    state.lives -= 1
+                    # Check for game over
+                    if state.lives <= 0:
+                        state.game_over = True
+    phase_timer.lap('birds')
+
+
+def vector_birds_enabled():
+    if np is None or not BIRD_VECTOR_MODE:
+        return False
+    return BIRD_VECTOR_MODE is True or NUM_BALLS >= BIRD_VECTOR_MIN_BIRDS
+
+
+# NumPy bird step. plan_bird_step() computes, for every bird at once, what
+# the per-bird step in simulate_frame would do to a bird that meets nothing
+# this frame: boosted speed, move eligibility, score delta, next y and the
+# floor/ceiling bounce. A bird is left to the per-bird step (masked out of the
+# batch) when its colour has its own rules (_SCALAR_BIRD_COLORS), when it
+# rises into a lane with bats or obstacles, when loot is within reach after
+# the move, or when its score would push its XP over a grade boundary (which
+# can transform it mid-step). simulate_frame still walks the birds in index
+# order and asks apply_bird_plan() first, so score, XP, prestige and random
+# draws happen in exactly the same sequence as without the batch.
+_SCALAR_BIRD_COLORS = (PURPLE, DINOSAUR, GLITCH, STEALTH, ORANGE, CLOCKWORK)
+
+
+def _tailwind_bonus():
+    """(up bonus, down penalty) of an active tailwind power-up, else None."""
+    if not powerups.get('tailwind_active'):
+        return None
+    try:
+        return int(powerups.get('tailwind_up_bonus', 0)), int(powerups.get('tailwind_down_penalty', 0))
+    except Exception:
+        return None
+
+
+def _bird_inputs():
+    """What a bird's step depends on besides the world: one snapshot list per column."""
+    return (list(ball_y), list(ball_vy), list(ball_speeds), list(ball_lost), list(random_lanes),
+            list(purple_state), list(purple_just_fired_frames), list(ball_colors),
+            {b: (v > 0) - (v < 0) for b, v in speed_boosts.items()}, set(scared_birds),
+            _tailwind_bonus(), loot_items.issued)
+
+
+def _s_transform_pending(i):
+    """True when an XP award makes GameState._xp_changed() retry bird `i`'s S transform."""
+    return state.grade_hi[i] == math.inf and not transformed_s[i] and ball_colors[i] in (BLUE, RED, YELLOW)
+
+
+def plan_bird_step():
+    """Batch plan of this frame's bird step (None when no bird can be batched)."""
+    n = NUM_BALLS
+    inputs = _bird_inputs()
+    colors, boosts, scared_set, tailwind = inputs[7][:n], inputs[8], inputs[9], inputs[10]
+    special = [c in _SCALAR_BIRD_COLORS for c in colors]
+    if all(special):
+        return None
+    y = np.frombuffer(ball_y, ball_y.typecode).astype(np.int64)
+    vy = np.frombuffer(ball_vy, ball_vy.typecode).astype(np.int64)
+    speeds = np.frombuffer(ball_speeds, ball_speeds.typecode).astype(np.int64)
+
+    # just-fired protection counts down first; charging/protected birds stay frozen
+    frozen = (np.frombuffer(purple_state, purple_state.typecode) == 2) | \
+             (np.frombuffer(purple_just_fired_frames, purple_just_fired_frames.typecode) > 1)
+
+    speed = speeds
+    if boosts or scared_set or tailwind is not None:
+        up = vy == -1
+        down = vy == 1
+        boost = np.zeros(n, np.int64)
+        scared = np.zeros(n, bool)
+        for b, v in boosts.items():
+            if 0 <= b < n:
+                boost[b] = v
+        for b in scared_set:
+            if 0 <= b < n:
+                scared[b] = True
+        speed = speed + ((boost > 0) & up)
+        speed = np.where((boost < 0) & down, np.maximum(int(SPEED_MIN), speed - 1), speed)
+        speed = speed + (scared & down)
+        if tailwind is not None:
+            up_bonus, down_pen = tailwind
+            if up_bonus != 0:
+                speed = np.where(up, np.minimum(int(SPEED_MAX), speed + up_bonus), speed)
+            if down_pen != 0:
+                speed = np.where(down, np.maximum(int(SPEED_MIN), speed - down_pen), speed)
+    interval = np.maximum(1, int(SPEED_MAX) - speed)
+    eligible = (state.frame_count % interval == 0) & ~frozen & (np.frombuffer(ball_lost, ball_lost.typecode) == 0)
+
+    # score for the height the bird moves from (GOLD scores a fixed value)
+    value = np.where([c == GOLD for c in colors], GOLD_SCORE_VALUE, speeds) if GOLD in colors else speeds
+    delta = value * (0.5 + (HEIGHT - y) / HEIGHT)
+    # ... unless it moves the bird's XP to its next grade, or the bird is an
+    # untransformed S bird that retries its transform (either may recolour it)
+    regrade = np.frombuffer(per_bird_xp, per_bird_xp.typecode) + np.trunc(delta) >= state.grade_hi
+    for b, hi in enumerate(state.grade_hi[:n]):
+        if hi == math.inf and _s_transform_pending(b):
+            regrade[b] = True
+    scalar = (eligible & regrade) | special
+
+    # rising into a lane with bats/obstacles, or reaching loot: collisions are scalar
+    if len(bats) or len(obstacles):
+        busy = lane_index.occupied_lanes()
+        scalar |= eligible & (vy == -1) & np.array([busy[li] for li in random_lanes])
+    if len(loot_items):
+        lx = np.array([l['x_pos'] for l in loot_items])
+        ly = np.array([l['y_pos'] for l in loot_items])
+        bx = np.array([LANE_POSITIONS[li] for li in random_lanes])[:, None]
+        d = LOOT_COLLECTION_DISTANCE
+        near = (np.abs(bx - lx) <= d) & (np.abs((y + vy)[:, None] - ly) <= d)
+        scalar |= eligible & near.any(axis=1)
+
+    return {'batch': (~scalar).tolist(), 'frozen': frozen.tolist(), 'eligible': eligible.tolist(),
+            'delta': delta.tolist(), 'inputs': inputs, 'dirty': False, 'pending': None}
+
+
+def _bird_plan_valid(inputs, i, eligible, delta):
+    """True while nothing the plan of bird `i` was computed from has changed."""
+    y, vy, speeds, lost, lanes, ps, pj, colors, boosts, scared, tailwind, issued = inputs
+    if (ball_y[i] != y[i] or ball_vy[i] != vy[i] or ball_speeds[i] != speeds[i] or ball_lost[i] != lost[i]
+            or random_lanes[i] != lanes[i] or purple_state[i] != ps[i] or purple_just_fired_frames[i] != pj[i]
+            or ball_colors[i] != colors[i]):
+        return False
+    v = speed_boosts.get(i, 0)
+    if (v > 0) - (v < 0) != boosts.get(i, 0) or (i in scared_birds) != (i in scared) or _tailwind_bonus() != tailwind:
+        return False
+    if not eligible:
+        return True
+    if loot_items.issued != issued or per_bird_xp[i] + int(delta) >= state.grade_hi[i] or _s_transform_pending(i):
+        return False
+    return not (ball_vy[i] == -1 and lane_index.occupied(random_lanes[i]))
+
+
+def apply_bird_plan(plan, i):
+    """Step bird `i` from the plan; False when it has to take the per-bird step instead."""
+    # A bird only changes other birds when it collects loot (eggs, power-ups)
+    # or is a GLITCH (lane swaps, duplicates); after that the rest of the plan
+    # is checked bird by bird before it is used.
+    if plan['pending'] is not None:
+        j, was_glitch, loot_seen = plan['pending']
+        plan['pending'] = None
+        if was_glitch or ball_colors[j] == GLITCH or loot_seen != (loot_items.issued, loot_items.tombstones):
+            plan['dirty'] = True
+    eligible = plan['eligible'][i]
+    delta = plan['delta'][i]
+    if not plan['batch'][i] or (plan['dirty'] and not _bird_plan_valid(plan['inputs'], i, eligible, delta)):
+        plan['pending'] = (i, ball_colors[i] == GLITCH, (loot_items.issued, loot_items.tombstones))
+        return False
+    if purple_just_fired_frames[i] > 0:
+        purple_just_fired_frames[i] -= 1
+    if plan['frozen'][i] or not eligible:
+        return True
+    add_score(delta, by_bird=i)
+    ball_y[i] += ball_vy[i]
+    if ball_y[i] <= 1:
+        # ceiling bounce (ORANGE birds, which lay their egg here, are never planned)
+        ball_y[i] = 1
+        set_ball_vy(i, 1)
+        reset_bird_power(i)
+    elif ball_y[i] >= HEIGHT - 1:
+        # floor: the bird is lost and costs a life
+        set_bird_lost(i, True)
+        ball_y[i] = HEIGHT - 1
+        per_bird_xp[i] = 0
+        state.lives -= 1
+        if state.lives <= 0:
+            state.game_over = True
+    return True
+
+
+def render_frame(screen):
+    """Draw the current game state into the back buffer of `screen`."""
+    ceiling = "=" * WIDTH
+    floor = ceiling
+
+    screen.begin_frame()
+
+    # Draw simple header with score, level, lives, and compact per-lane XP (trimmed to fit WIDTH)
+    next_level_score = calculate_level_threshold(state.level + 1)
+    lives_display = "●" * state.lives + "◌" * (5 - state.lives)
+
+    # Compute prestige for display (safe fallback to 1.0); GLITCH flicker
+    # uses the cosmetic RNG so drawing never changes the game
+    try:
+        prestige_val = compute_prestige(fx_rng)
+        if prestige_val is None:
+            prestige_val = 1.0
+    except Exception:
+        prestige_val = 1.0
+    prestige_display = f"{prestige_val:.2f}x"
+
+    base_score_line = f"SCORE: {int(state.score)}  |  LEVEL: {state.level}  |  NEXT: {next_level_score}  |  LIVES: {lives_display}  |  PRESTIGE: {prestige_display}"
+
+    # XP and grade display removed from header per user request.
+    # Keep internal XP bookkeeping (per_bird_xp) intact, but do not render it.
+    screen.put(1, 1, base_score_line)
+    screen.put(2, 1, ceiling)
+    # Render single queued notification at the bottom (replace help/commands area)
+    active_notifications = [n for n in notifications if n[1] > state.frame_count]
+    if active_notifications:
+        text, exp = active_notifications[0]
+        footer_y = HEIGHT + 3  # bottom area after game box
+        # Truncate to width to avoid wrapping
+        display_text = text[:WIDTH]
+        screen.put(footer_y, 1, display_text, YELLOW)
+
+    # Draw starting line (dashed line near bottom)
+    starting_line_y = STARTING_LINE + 2  # +2 for header offset
+    if 3 <= starting_line_y < HEIGHT + 2:
+        # When tailwind is active, render the starting line as blue carets '^'
+        if powerups.get('tailwind_active'):
+            dashed_line = "^ " * (WIDTH // 2)
+            screen.put(starting_line_y, 1, dashed_line[:WIDTH], BLUE)
+        else:
+            dashed_line = "- " * (WIDTH // 2)  # Create dashed pattern
+            screen.put(starting_line_y, 1, dashed_line[:WIDTH], DARK_GRAY)
+
+        # Show power-up indicators on affected lanes
+        # Calculate which lanes are affected by cursor
+        if powerups['wide_cursor_active']:
+            half_width = powerups['wide_cursor_lanes'] // 2
+            lanes_to_check = []
+            for offset in range(-half_width, half_width + 1):
+                lane = state.player_lane + offset
+                if 0 <= lane < 9:
+                    lanes_to_check.append(lane)
+        else:
+            lanes_to_check = [state.player_lane]
+
+        # Draw indicators on the starting line for each affected lane
+        for lane in lanes_to_check:
+            lane_x = LANE_POSITIONS[lane]
+            bird_in_lane = lane_bird(lane)
+
+            if bird_in_lane >= 0 and not ball_lost[bird_in_lane]:
+                # Bounce boost: show blue ^ if bird is falling
+                if powerups['bounce_boost_active'] and ball_vy[bird_in_lane] == 1:
+                    screen.put(starting_line_y, lane_x, "^", BLUE + "\033[1m")
+                # Suction: show red v if bird is rising
+                elif powerups['suction_active'] and ball_vy[bird_in_lane] == -1:
+                    screen.put(starting_line_y, lane_x, "v", RED + "\033[1m")
+
+
+    # Draw obstacles
+    for obs in obstacles:
+        # Color based on remaining HP (scale from base green to black)
+        try:
+            max_hp = _OBST_MAX_HP_BY_TIER.get(obs.get('tier', 1), obs.get('hp', 1))
+        except Exception:
+            max_hp = obs.get('hp', 1)
+        obs_color = _color_from_hp(_OBST_BASE_RGB, obs.get('hp', 0), max_hp)
+
+        # Draw sprite - single line, no HP display
+        for line_idx, line in enumerate(OBSTACLE_SPRITE):
+            y_pos = obs['y_pos'] + line_idx + 2  # +2 for header offset
+            if 3 <= y_pos < HEIGHT + 2:
+                x_pos = LANE_POSITIONS[obs['lane']] - 1  # Center 3-char sprite
+                screen.put(y_pos, x_pos, line, obs_color)
+
+    # Draw bats
+    for bat in bats:
+        # Color based on remaining HP (scale from magenta to black)
+        bat_hp = bat.get('hp', 0)
+        bat_max = bat.get('max_hp', bat_hp if bat_hp > 0 else 1)
+        bat_color = _color_from_hp(_BATS_BASE_RGB, bat_hp, bat_max)
+
+        # Choose sprite frame based on animation
+        bat_sprite = BAT_FRAME_1 if (state.frame_count // 3) % 2 == 0 else BAT_FRAME_2
+
+        # Draw bat - no HP display
+        for line_idx, line in enumerate(bat_sprite):
+            y_pos = bat['y_pos'] + line_idx + 2  # +2 for header offset
+            if 3 <= y_pos < HEIGHT + 2:
+                screen.put(y_pos, bat['x_pos'], line, bat_color)
+
+    # Draw loot items
+    for loot in loot_items:
+        y_pos = loot['y_pos'] + 2  # +2 for header offset
+        if 3 <= y_pos < HEIGHT + 2:
+            sprite = loot_sprite(loot['type'], loot['rarity'])
+            if sprite is not None:
+                screen.put(y_pos, loot['x_pos'], sprite[0], sprite[1])
+
+    # Draw projectiles (red and others)
+    for proj in red_projectiles:
+        y_pos = proj['y_pos'] + 2  # +2 for header offset
+        if 3 <= y_pos < HEIGHT + 2:
+            # Use • for powered (bonus damage), ⋅ for base
+            symbol = "•" if proj.get('powered', False) else "⋅"
+            proj_color = proj.get('color', RED)
+            screen.put(y_pos, proj['x_pos'], symbol, proj_color)
+
+    # Draw active birds
+    for b in range(NUM_BALLS):
+        if not ball_lost[b]:
+            # Check if bird is slowed by yellow power (negative speed_boosts AND moving down)
+            is_slowed = b in speed_boosts and speed_boosts[b] < 0 and ball_vy[b] == 1
+
+            # Choose sprite based on direction and animate with frame counter
+            # Special: CLOCKWORK animation depends on charge:
+            #  - charge > 1: normal period
+            #  - charge == 1: slower period
+            #  - charge == 0: frozen (single frame)
+            # Freeze animation if bird is slowed (external slow effect)
+            if ball_vy[b] == -1:  # Moving up
+                if ball_colors[b] == CLOCKWORK:
+                    try:
+                        c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
+                    except Exception:
+                        c = CLOCKWORK_INITIAL_CHARGE
+                    if c == 0:
+                        sprite = BIRD_UP_2  # frozen
+                    elif c == 1:
+                        sprite = BIRD_UP_1 if (state.frame_count // 6) % 2 == 0 else BIRD_UP_2
+                    else:
+                        sprite = BIRD_UP_1 if (state.frame_count // 3) % 2 == 0 else BIRD_UP_2
+                else:
+                    # DINOSAUR has its own larger sprites
+                    if ball_colors[b] == DINOSAUR:
+                        sprite = DINOSAUR_UP_1 if (state.frame_count // 3) % 2 == 0 else DINOSAUR_UP_2
+                    # If a blue bird is sprinting (power active), lock the up-frame to BIRD_UP_1
+                    # This prevents the animation from toggling while sprint is active.
+                    elif ball_colors[b] == BLUE and bird_power_used[b]:
+                        sprite = BIRD_UP_1
+                    else:
+                        sprite = BIRD_UP_1 if (state.frame_count // 3) % 2 == 0 else BIRD_UP_2
+            else:  # Moving down
+                if is_slowed:
+                    sprite = BIRD_DOWN_2 # Frozen frame when slowed
+                else:
+                    if ball_colors[b] == CLOCKWORK:
                         try:
-                            if ball_colors[i] == GLITCH and random.random() < float(GLITCH_SURVIVE_ON_FLOOR_CHANCE):
-                                # Bounce instead of dying
-                                ball_y[i] = STARTING_LINE
-                                set_ball_vy(i, -1)
-                                reset_bird_power(i)
-                                continue
+                            c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
                         except Exception:
-                            pass
+                            c = CLOCKWORK_INITIAL_CHARGE
+                        if c == 0:
+                            sprite = BIRD_DOWN_2  # frozen
+                        elif c == 1:
+                            sprite = BIRD_DOWN_1 if (state.frame_count // 6) % 2 == 0 else BIRD_DOWN_2
+                        else:
+                            sprite = BIRD_DOWN_1 if (state.frame_count // 3) % 2 == 0 else BIRD_DOWN_2
+                    else:
+                        # DINOSAUR falling sprites
+                        if ball_colors[b] == DINOSAUR:
+                            sprite = DINOSAUR_DOWN_1 if (state.frame_count // 3) % 2 == 0 else DINOSAUR_DOWN_2
+                        else:
+                            sprite = BIRD_DOWN_1 if (state.frame_count // 3) % 2 == 0 else BIRD_DOWN_2
 
-                        ball_lost[i] = True
-                        ball_y[i] = HEIGHT - 1
-                        # Reset XP for this bird on death so a new spawn starts at 0
+                        # GLITCH: mix sprite pieces each frame to create a glitched appearance
                         try:
-                            per_bird_xp[i] = 0
+                            if ball_colors[b] == GLITCH:
+                                # Choose base frames depending on direction
+                                if ball_vy[b] == -1:
+                                    f1 = BIRD_UP_1
+                                    f2 = BIRD_UP_2
+                                else:
+                                    f1 = BIRD_DOWN_1
+                                    f2 = BIRD_DOWN_2
+
+                                mixed = []
+                                for li in range(min(len(f1), len(f2))):
+                                    line1 = f1[li]
+                                    line2 = f2[li]
+                                    # Pad to same length
+                                    maxlen = max(len(line1), len(line2))
+                                    line1 = line1.ljust(maxlen)
+                                    line2 = line2.ljust(maxlen)
+                                    chars = []
+                                    for c1, c2 in zip(line1, line2):
+                                        # randomly pick char from either frame
+                                        chars.append(fx_rng.choice([c1, c2]))
+                                    mixed.append(''.join(chars))
+                                sprite = mixed
                         except Exception:
                             pass
-                        lives -= 1
-                        # Check for game over
-                        if lives <= 0:
-                            game_over = True
-        
-        # Check if game over
-        if game_over:
-            # Clean up terminal first
-            if os.name != 'nt':
-                termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
-                fcntl.fcntl(sys.stdin, fcntl.F_SETFL, old_flags)
-            
-            # Clear screen and show cursor
-            print("\033[2J\033[H\033[?25h")
-            
-            # Simple game over screen with proper line endings
-            print("\r")
-            print("\r")
-            print("\r")
-            print("\r")
-            print("\r")
-            print("\r")
-            print("\r")
-            print("\r")
-            print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
-            print(f"{RED}                   GAME OVER                     {RESET}\r")
-            print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
-            print("\r")
-            print(f"  Final Score:      {int(score)}\r")
-            print(f"  Level Reached:    {level}\r")
-            print("\r")
-            # Calculate and display elapsed play time
-            try:
-                if game_start_time:
-                    elapsed = int(time.time() - game_start_time)
-                else:
-                    elapsed = 0
-            except Exception:
-                elapsed = 0
 
-            hours = elapsed // GAME_OVER_TIME_DIVIDER
-            minutes = (elapsed % GAME_OVER_TIME_REMAINDER) // GAME_OVER_MINUTES_DIVIDER
-            seconds = elapsed % GAME_OVER_MINUTES_DIVIDER
-            if hours > 0:
-                elapsed_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            # Choose color - handle STEALTH specially, blue birds turn cyan when power is active
+            if ball_colors[b] == STEALTH:
+                # Tangible when a stealth timer is active for this bird
+                tangible = b in stealth_timers and stealth_timers.get(b, 0) > 0
+                # Pulse between DARK_GRAY (visible) and ANSI "conceal" (invisible) over a period
+                # This makes the bird actually invisible on terminals that support SGR 8.
+                try:
+                    # Use a faster visible pulse (~0.5s cycle) so the change is noticeable
+                    period = max(4, int(2 / base_sleep))
+                except Exception:
+                    period = 8
+                phase = (state.frame_count % period) / period
+                # Use DARK_GRAY for first half, ANSI conceal for second half (hidden/invisible)
+                # If the terminal doesn't support conceal, it'll appear as no-op; we can add
+                # a fallback later if needed.
+                color = DARK_GRAY if phase < 0.5 else "\033[8m"
+                # When tangible, show as a brighter color so the player clearly sees the effect
+                if tangible:
+                    color = WHITE
+            elif ball_colors[b] == BLUE and bird_power_used[b]:
+                color = CYAN  # Light blue when power active
             else:
-                elapsed_str = f"{minutes:02d}:{seconds:02d}"
-
-            print(f"  Time Played:      {elapsed_str} ({elapsed} s)\r")
-            print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
-            print("\r")
-            # Prompt for optional leaderboard name and submit score
-            try:
-                name = input("Enter name for leaderboard (leave blank to skip): ").strip()[:LEADERBOARD_NAME_MAX_LENGTH]
-            except Exception:
-                name = ""
+                color = ball_colors[b]
 
-            # Best-effort remote reporting
-            try:
-                if firebase_client:
+            # Draw each line of the bird (centered)
+            for line_idx, line in enumerate(sprite):
+                y_pos = ball_y[b] + line_idx + 2  # +2 for header offset
+                if 3 <= y_pos < HEIGHT + 2:
+                    # Center sprites: compute offset from sprite width (works for 3- and 5-char sprites)
                     try:
-                        if name:
-                            # Include time played and version when submitting leaderboard entry
+                        x_offset = len(line) // 2
+                    except Exception:
+                        x_offset = 1
+                    # CLOCKWORK: special per-char coloring and blinking for '.' and '\''
+                    if ball_colors[b] == CLOCKWORK:
+                        try:
+                            c = clockwork_charge.get(b, CLOCKWORK_INITIAL_CHARGE)
+                        except Exception:
+                            c = CLOCKWORK_INITIAL_CHARGE
+                        try:
+                            blink_period = max(1, int(0.6 / base_sleep))
+                        except Exception:
+                            blink_period = 3
+                        blink_on = ((state.frame_count // blink_period) % 2) == 0
+                        screen.put_runs(y_pos, ball_cols[b]-x_offset, clockwork_runs(line, c, blink_on))
+                    elif ball_colors[b] == PATCHWORK:
+                        # Render each character with a different color pattern
+                        screen.put_runs(y_pos, ball_cols[b]-x_offset, patchwork_runs(line))
+                    else:
+                        screen.put(y_pos, ball_cols[b]-x_offset, line, color)
+                # After drawing the sprite lines, render a PURPLE charging orb in front of the bird if applicable
+                try:
+                    if ball_colors[b] == PURPLE and purple_state[b] == 2:
+                        start_frame = purple_charge_started_frame[b]
+                        # Only render after charging actually started
+                        if state.frame_count >= start_frame:
                             try:
-                                # Compute average points per minute (avg_ppm).
+                                elapsed_seconds = int((state.frame_count - start_frame) * base_sleep)
+                            except Exception:
                                 try:
-                                    minutes = float(elapsed) / float(GAME_OVER_MINUTES_DIVIDER) if elapsed > 0 else 0.0
-                                    if minutes > 0:
-                                        avg_ppm = float(score) / minutes
-                                    else:
-                                        avg_ppm = float(score)
+                                    elapsed_seconds = int(float(state.frame_count - start_frame) * float(base_sleep))
                                 except Exception:
-                                    avg_ppm = float(score)
-
-                                background_call(firebase_client.send_score, name, int(score), elapsed, elapsed_str, GAME_VERSION, avg_ppm)
-                            except Exception:
-                                # Fallback to original call if something goes wrong
+                                    elapsed_seconds = 0
+                            s = max(0, min(3, elapsed_seconds))
+                            if s <= 0:
+                                sym = '⋅'
+                            elif s == 1:
+                                sym = '•'
+                            else:
+                                sym = '●'
+                            # place orb in front of the bird (one line above the sprite)
+                            orb_y = ball_y[b] + 1 + 2 - 1
+                            if 3 <= orb_y < HEIGHT + 2:
                                 try:
-                                    background_call(firebase_client.send_score, name, int(score))
+                                    screen.put(orb_y, ball_cols[b], sym, PURPLE)
                                 except Exception:
                                     pass
-                        # Include time played in the game_over analytics event
-                        try:
-                            # Include version and avg_ppm in the game_over analytics event as well
-                            try:
-                                minutes = float(elapsed) / float(GAME_OVER_MINUTES_DIVIDER) if elapsed > 0 else 0.0
-                                if minutes > 0:
-                                    avg_ppm = float(score) / minutes
-                                else:
-                                    avg_ppm = float(score)
-                            except Exception:
-                                avg_ppm = float(score)
+                except Exception:
+                    pass
 
-                            background_call(firebase_client.log_event, 'game_over', {'score': int(score), 'level': level, 'time_played_seconds': elapsed, 'time_played': elapsed_str, 'version': GAME_VERSION, 'avg_ppm': avg_ppm})
-                        except Exception:
-                            # Fallback: log without time info
-                            background_call(firebase_client.log_event, 'game_over', {'score': int(score), 'level': level, 'version': GAME_VERSION})
-                        background_call(firebase_client.sync_achievements, achievements)
+    # Draw floor and player
+    screen.put(HEIGHT+2, 1, floor)
+
+    # Draw lost balls on floor as gray X
+    for b in range(NUM_BALLS):
+        if ball_lost[b]:
+            screen.put(HEIGHT+2, ball_cols[b], "X", "\033[90m")
+
+
+    # Draw player cursor - large and bright for visibility
+    cursor_x = LANE_POSITIONS[state.player_lane] - 1  # Center on lane
+    # Change fallback cursor color when in swap mode (lane selected)
+    fallback_cursor_color = YELLOW if state.selected_lane is not None else GREEN
+
+    # Helper: map grade letter to requested cursor color
+    def _grade_letter_color(letter):
+        # User-specified mapping:
+        # D: verde
+        # C: bronzo (use ORANGE)
+        # B: argento (use WHITE)
+        # A: oro (use GOLD)
+        # S: rosso (use RED)
+        try:
+            # compute_grade_from_xp returns labels like 'C1','B2' etc.
+            # Use the first character as the prefix to determine color.
+            if letter and isinstance(letter, str) and len(letter) > 0:
+                prefix = letter[0]
+            else:
+                prefix = None
+            if prefix == 'D':
+                return GREEN
+            if prefix == 'C':
+                return ORANGE
+            if prefix == 'B':
+                return CLOCKWORK
+            if prefix == 'A':
+                return GOLD
+            if prefix == 'S':
+                return RED
+        except Exception:
+            pass
+        return fallback_cursor_color
+
+    # Draw wide cursor if active
+    if powerups['wide_cursor_active']:
+        half_width = powerups['wide_cursor_lanes'] // 2
+        for offset in range(-half_width, half_width + 1):
+            lane = state.player_lane + offset
+            if 0 <= lane < 9:
+                lane_x = LANE_POSITIONS[lane] - 1
+                # Determine grade color for this lane if a bird exists
+                try:
+                    bird_idx = lane_bird(lane)
+                except Exception:
+                    bird_idx = -1
+
+                if bird_idx >= 0 and not ball_lost[bird_idx]:
+                    try:
+                        letter, _ = compute_grade_from_xp(per_bird_xp[bird_idx])
                     except Exception:
-                        pass
+                        letter = None
+                    color = _grade_letter_color(letter)
+                else:
+                    color = fallback_cursor_color
+
+                if lane == state.player_lane:
+                    # Main cursor: use glyph X1
+                    glyph = '^'
+                    screen.put(HEIGHT+3, lane_x, f"[{glyph}]", color + "\033[1m")
+                else:
+                    # Extended cursor wings: use glyph X2
+                    glyph = '^'
+                    screen.put(HEIGHT+3, lane_x, f"[{glyph}]", color + "\033[1m")
+    else:
+        # Normal cursor: color by grade of bird in player_lane if present
+        try:
+            bird_idx = lane_bird(state.player_lane)
+        except Exception:
+            bird_idx = -1
+        if bird_idx >= 0 and not ball_lost[bird_idx]:
+            try:
+                letter, _ = compute_grade_from_xp(per_bird_xp[bird_idx])
             except Exception:
-                pass
+                letter = None
+            color = _grade_letter_color(letter)
+        else:
+            color = fallback_cursor_color
+
+        glyph = '^'
+        screen.put(HEIGHT+3, cursor_x, f"[{glyph}]", color + "\033[1m")
+
+    # Highlight selected lane if in swap mode
+    if state.selected_lane is not None:
+        selected_x = LANE_POSITIONS[state.selected_lane] - 1
+        screen.put(HEIGHT+3, selected_x, "[*]", YELLOW + "\033[1m")  # Mark selected lane
+
+    # Count active balls
+    active_balls = sum(1 for lost in ball_lost if not lost)
+    swap_hint = " | Press SPACE again to swap or cancel" if state.selected_lane is not None else ""
+    screen.put(HEIGHT+4, 1, f"Use ← → to move, ↑ to bounce, Ctrl+C to quit | Birds: {active_balls}/{NUM_BALLS}{swap_hint}")
+    # Optional debug overlay: show per-bird XP and grade summary near footer
+    try:
+        if show_xp_overlay:
+            parts = []
+            for i in range(NUM_BALLS):
+                try:
+                    label, _ = compute_grade_from_xp(per_bird_xp[i])
+                except Exception:
+                    label = 'D'
+                parts.append(f"{label}({int(per_bird_xp[i])})")
+            xp_summary = ' '.join(parts)
+            screen.put(HEIGHT+5, 1, f"XP: {xp_summary[:WIDTH]}")
+    except Exception:
+        pass
+    # Perf overlay (--profile): one line below the XP overlay
+    try:
+        if show_perf_overlay and phase_timer.enabled:
+            screen.put(HEIGHT+6, 1, phase_timer.hud(screen.width - 1), DARK_GRAY)
+    except Exception:
+        pass
+
+    # If paused, render a PAUSED overlay (keep input responsive)
+    if state.paused:
+        try:
+            pause_y = 2 + (HEIGHT // 2)
+            pause_x = max(1, (WIDTH // 2) - 3)
+            screen.put(pause_y, pause_x, "PAUSED", YELLOW + "\033[1m")
+        except Exception:
+            pass
+
 
-            print("Thanks for playing. Press Enter to exit.")
+def show_game_over_screen():
+    """Restore the terminal, print the final summary and submit the score."""
+    # Clean up terminal first
+    if os.name != 'nt':
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+        fcntl.fcntl(sys.stdin, fcntl.F_SETFL, old_flags)
+
+    # Clear screen and show cursor
+    print("\033[2J\033[H\033[?25h")
+
+    # Simple game over screen with proper line endings
+    print("\r")
+    print("\r")
+    print("\r")
+    print("\r")
+    print("\r")
+    print("\r")
+    print("\r")
+    print("\r")
+    print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
+    print(f"{RED}                   GAME OVER                     {RESET}\r")
+    print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
+    print("\r")
+    print(f"  Final Score:      {int(state.score)}\r")
+    print(f"  Level Reached:    {state.level}\r")
+    print("\r")
+    # Calculate and display elapsed play time
+    try:
+        if game_start_time:
+            elapsed = int(time.time() - game_start_time)
+        else:
+            elapsed = 0
+    except Exception:
+        elapsed = 0
+
+    hours = elapsed // GAME_OVER_TIME_DIVIDER
+    minutes = (elapsed % GAME_OVER_TIME_REMAINDER) // GAME_OVER_MINUTES_DIVIDER
+    seconds = elapsed % GAME_OVER_MINUTES_DIVIDER
+    if hours > 0:
+        elapsed_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    else:
+        elapsed_str = f"{minutes:02d}:{seconds:02d}"
+
+    print(f"  Time Played:      {elapsed_str} ({elapsed} s)\r")
+    try:
+        if frame_scheduler is not None and frame_scheduler.ticks:
+            fs = frame_scheduler.stats()
+            print(f"  Missed Frames:    {fs['missed_deadlines']} late, {fs['dropped_ticks']} dropped "
+                  f"of {fs['ticks']} (max {fs['max_lateness_ms']} ms late)\r")
+    except Exception:
+        pass
+    try:
+        if input_reader is not None and input_reader.latency.count:
+            lat = input_reader.latency.summary()
+            print(f"  Input Latency:    p50 {lat['p50_ms']} ms, p99 {lat['p99_ms']} ms, max {lat['max_ms']} ms "
+                  f"({lat['keys']} keys)\r")
+    except Exception:
+        pass
+    print(f"{RED}{'=' * GAME_OVER_SEPARATOR_WIDTH}{RESET}\r")
+    print("\r")
+    # Prompt for optional leaderboard name and submit score
+    try:
+        name = input("Enter name for leaderboard (leave blank to skip): ").strip()[:LEADERBOARD_NAME_MAX_LENGTH]
+    except Exception:
+        name = ""
+
+    # Best-effort remote reporting
+    try:
+        if firebase_client:
             try:
-                input()
+                if name:
+                    # Include time played and version when submitting leaderboard entry
+                    try:
+                        # Compute average points per minute (avg_ppm).
+                        try:
+                            minutes = float(elapsed) / float(GAME_OVER_MINUTES_DIVIDER) if elapsed > 0 else 0.0
+                            if minutes > 0:
+                                avg_ppm = float(state.score) / minutes
+                            else:
+                                avg_ppm = float(state.score)
+                        except Exception:
+                            avg_ppm = float(state.score)
+
+                        firebase_client.enqueue_score(name, int(state.score), elapsed, elapsed_str, GAME_VERSION, avg_ppm)
+                    except Exception:
+                        # Fallback to original call if something goes wrong
+                        try:
+                            firebase_client.enqueue_score(name, int(state.score))
+                        except Exception:
+                            pass
+                # Include time played in the game_over analytics event
+                try:
+                    # Include version and avg_ppm in the game_over analytics event as well
+                    try:
+                        minutes = float(elapsed) / float(GAME_OVER_MINUTES_DIVIDER) if elapsed > 0 else 0.0
+                        if minutes > 0:
+                            avg_ppm = float(state.score) / minutes
+                        else:
+                            avg_ppm = float(state.score)
+                    except Exception:
+                        avg_ppm = float(state.score)
+
+                    firebase_client.enqueue_event('game_over', {'score': int(state.score), 'level': state.level, 'time_played_seconds': elapsed, 'time_played': elapsed_str, 'version': GAME_VERSION, 'avg_ppm': avg_ppm}, droppable=False)
+                except Exception:
+                    # Fallback: log without time info
+                    firebase_client.enqueue_event('game_over', {'score': int(state.score), 'level': state.level, 'version': GAME_VERSION}, droppable=False)
+                firebase_client.enqueue_call(firebase_client.sync_achievements, dict(achievements))
             except Exception:
                 pass
+    except Exception:
+        pass
+
+    print("Thanks for playing. Press Enter to exit.")
+    try:
+        input()
+    except Exception:
+        pass
+
+
+class GameEngine:
+    """Headless driver for the simulation.
+
+    step() advances exactly one frame from a list of key events and returns
+    the events produced during that frame. It never touches the terminal,
+    never sleeps and (unless `telemetry=True`) never talks to Firebase, so it
+    can run as fast as the CPU allows for benchmarks, bots and servers.
+    The terminal front end in main() is a thin client of the same call.
+    """
+
+    def __init__(self, telemetry=False):
+        global telemetry_enabled
+        telemetry_enabled = bool(telemetry)
+        if not achievements:
+            init_achievements()
+        update_progression()
+
+    @property
+    def frame(self):
+        return state.frame_count
+
+    @property
+    def game_over(self):
+        return state.game_over
+
+    @property
+    def paused(self):
+        return state.paused
+
+    @property
+    def world(self):
+        """The module holding the live game globals (ball_y, player_lane, ...), for bots."""
+        return sys.modules[__name__]
+
+    @property
+    def frame_seconds(self):
+        """Wall-clock duration of one frame at the current level."""
+        return current_sleep
+
+    def snapshot(self):
+        """Small summary of the run, handy for bots and benchmarks."""
+        return {
+            'frame': state.frame_count,
+            'score': state.score,
+            'level': state.level,
+            'lives': state.lives,
+            'birds_alive': sum(1 for lost in ball_lost if not lost),
+            'bats': len(bats),
+            'obstacles': len(obstacles),
+            'loot': len(loot_items),
+            'projectiles': len(red_projectiles),
+            'spawn_backlog': len(spawn_queue),
+        }
+
+    def digest(self):
+        return state.digest()
+
+    def step(self, inputs=()):
+        """Advance one frame. `inputs` are key codes as returned by get_key()."""
+        if state.game_over:
+            return []
+        prev_level = state.level
+        prev_lives = state.lives
+        keys = [k for k in (inputs or ()) if k] or [None]
+        for k in keys:
+            if not process_input(k):
+                emit_event('quit')
+                return self._drain()
+        phase_timer.lap('input')
+        update_progression()
+        if not state.paused:
+            state.sim_time += current_sleep
+            simulate_frame(keys)
+            # Gestione auto-bounce CLOCKWORK
+            handle_clockwork_auto_bounce()
+            update_progression()
+            phase_timer.lap('states')
+        state.compact()
+        # Prune expired notifications (keep order)
+        notifications[:] = [n for n in notifications if n[1] > state.frame_count]
+        if state.level > prev_level:
+            emit_event('level_up', level=state.level)
+        if state.lives < prev_lives:
+            emit_event('life_lost', lives=state.lives)
+        if state.game_over:
+            emit_event('game_over', score=int(state.score), level=state.level)
+        return self._drain()
+
+    def _drain(self):
+        events = pending_events[:]
+        pending_events.clear()
+        return events
+
+
+def run_replay(path):
+    """Re-simulate a recorded game headlessly at full speed; returns an exit code."""
+    header, ticks, trailer = replay.load(path)
+    if (header.get('config') or None) != (args.config or None):
+        print(f"warning: replay was recorded with --config {header.get('config')}", file=sys.stderr)
+    engine = GameEngine()
+    t0 = time.perf_counter()
+    for keys in ticks:
+        events = engine.step(keys)
+        if engine.game_over or any(ev['type'] == 'quit' for ev in events):
             break
-        
-        # Gestione auto-bounce CLOCKWORK
-        handle_clockwork_auto_bounce()
+    elapsed = time.perf_counter() - t0
+    digest = engine.digest()
+    fps = engine.frame / elapsed if elapsed > 0 else 0.0
+    print(f"replay {path}: seed {game_seed}, {engine.frame} frames in {elapsed:.2f} s ({fps:.0f} fps), "
+          f"score {int(state.score)}, level {state.level}")
+    expected = trailer.get('digest')
+    if not expected:
+        print(f"digest {digest} (no recorded digest to compare)")
+        return 0
+    if expected != digest:
+        print(f"MISMATCH: recorded digest {expected}, replayed {digest}")
+        return 1
+    print(f"digest {digest} matches")
+    return 0
+
+
+def new_run(base, seed=None):
+    """Make a fresh copy of `base` (an untouched GameState) the active run.
+
+    With `seed` the copy's RNG is reseeded and, if lanes are randomized, the
+    birds are dealt to lanes from it. Per-run bookkeeping that lives outside
+    the state (achievements, notifications, combo/synergy history, kill
+    counters) starts over too.
+    """
+    global top50_hold_frames, top30_hold_frames
+    st = base.snapshot()
+    if seed is not None:
+        st.rng.seed(seed)
+        if RANDOMIZE_LANES:
+            st.shuffle_lanes()
+    bind_state(st)
+    init_achievements()
+    for q in (notifications, pending_events, recent_actions, recent_powers):
+        q.clear()
+    combo_cooldowns.clear()
+    combo_matcher.reset()
+    power_usage_counters.clear()
+    for k in bat_destroy_counters:
+        bat_destroy_counters[k] = 0
+    top50_hold_frames = top30_hold_frames = 0
+
+
+# Subsystems of the bench report and the FRAME_PHASES they add up to
+BENCH_SUBSYSTEMS = {
+    'input': ('input',),
+    'spawn': ('spawn', 'despawn'),
+    'movement': ('bats', 'birds'),     # the bird loop also resolves bird collisions
+    'collisions': ('collisions', 'projectiles'),
+    'timers': ('states', 'boosts', 'achievements'),
+    'render': ('render', 'write'),
+}
 
-        time.sleep(current_sleep)
 
-except KeyboardInterrupt:
-    pass
-except Exception:
-    # Report unexpected crashes to Firebase (best-effort) and re-raise for visibility
+def _bench_goto(lane, keys):
+    """Append the LEFT/RIGHT presses that bring the cursor from its position after `keys` to `lane`."""
+    at = state.player_lane + keys.count(KEY_MOVE_RIGHT) - keys.count(KEY_MOVE_LEFT)
+    keys.extend([KEY_MOVE_RIGHT] * (lane - at) if lane > at else [KEY_MOVE_LEFT] * (at - lane))
+    return keys
+
+
+def _bench_autopilot():
+    """Keys that bounce the lowest falling bird (cursor moves are instant)."""
+    best = -1
+    for i in range(NUM_BALLS):
+        if not ball_lost[i] and ball_vy[i] == 1 and (best < 0 or ball_y[i] > ball_y[best]):
+            best = i
+    if best < 0:
+        return []
+    return _bench_goto(random_lanes[best], []) + [KEY_MOVE_UP]
+
+
+def _bench_keep_flock():
+    """Revive lost birds and keep lives up, so a scenario's load stays constant."""
+    for i in range(NUM_BALLS):
+        if ball_lost[i]:
+            set_bird_lost(i, False)
+            ball_y[i] = STARTING_LINE
+            ball_vy[i] = -1
+    state.lives = max(state.lives, 99)
+
+
+def _bench_idle_frame():
+    state.obstacle_spawn_timer = state.bat_spawn_timer = 0
+    spawn_queue.clear()
+    return _bench_autopilot()
+
+
+def _bench_max_entities_frame():
+    # queue an obstacle every frame; the spawner lets them in up to MAX_ENTITIES
+    state.obstacle_spawn_timer = state.bat_spawn_timer = 10 ** 6
+    return _bench_autopilot()
+
+
+def _bench_red_setup():
+    try:
+        speed = int(BALL_SPEEDS_DEFAULT.get('RED', 2))
+    except Exception:
+        speed = 2
+    for i in range(NUM_BALLS):
+        set_bird_color(i, RED)
+        ball_speeds[i] = speed
+
+
+def _bench_red_frame():
+    keys = _bench_autopilot()
+    # fire from every rising bird, power uses are refilled each frame
+    for i in sorted(range(NUM_BALLS), key=lambda i: random_lanes[i]):
+        if not ball_lost[i] and ball_vy[i] == -1:
+            reset_bird_power(i)
+            _bench_goto(random_lanes[i], keys).append(KEY_MOVE_UP)
+    return keys
+
+
+def _bench_shuffle_frame():
+    perform_shuffle(3)
+    return _bench_autopilot()
+
+
+def _bench_late_level_setup():
+    # first level whose frame delay is clamped to min_sleep
+    target = 30
+    try:
+        if 0 < FRAME_SLEEP_LEVEL_MULTIPLIER < 1 and min_sleep > 0:
+            target = max(1, math.ceil(math.log(min_sleep / base_sleep) / math.log(FRAME_SLEEP_LEVEL_MULTIPLIER)))
+    except Exception:
+        pass
+    if target > 1:
+        state.score = calculate_level_threshold(target - 1)
+    update_progression()
+
+
+# name -> (description, setup before the first frame, keys for each frame)
+BENCH_SCENARIOS = {
+    'idle_flock': ('full flock bouncing, no spawns', None, _bench_idle_frame),
+    'max_entities': ('obstacles queued every frame, capped by MAX_ENTITIES', None, _bench_max_entities_frame),
+    'red_projectiles': ('all birds RED, every rising bird fires each frame', _bench_red_setup, _bench_red_frame),
+    'shuffle_storm': ('perform_shuffle(3) every frame', None, _bench_shuffle_frame),
+    'late_level': ('level whose frame delay is min_sleep, normal spawns', _bench_late_level_setup, _bench_autopilot),
+}
+
+
+def _bench_run(base, name, frames, warmup, track_alloc=False):
+    """Run one scenario from a copy of `base`; returns (timer, output bytes, engine)."""
+    global phase_timer
+    _, setup_fn, keys_fn = BENCH_SCENARIOS[name]
+    new_run(base)
+    if setup_fn:
+        setup_fn()
+    engine = GameEngine()
+    screen = Screen(max(WIDTH, 80), HEIGHT + 5)
+    timer = PhaseTimer(FRAME_PHASES, track_alloc=track_alloc)
+    out_bytes = 0
+    phase_timer = timer
+    try:
+        for n in range(warmup + frames):
+            if n == warmup:
+                timer.reset()
+                out_bytes = 0
+            _bench_keep_flock()
+            keys = keys_fn()
+            timer.begin()
+            engine.step(keys)
+            render_frame(screen)
+            timer.lap('render')
+            output = screen.flush()
+            timer.lap('write')
+            timer.end(state.frame_count)
+            out_bytes += len(output.encode('utf-8'))
+            if engine.game_over:
+                break
+    finally:
+        phase_timer = NullTimer()
+    return timer, out_bytes, engine
+
+
+def _bench_subsystems(timer):
+    frames = len(timer) or 1
+    total = sum(timer.totals) or 1
+    out = {}
+    for group, phases in BENCH_SUBSYSTEMS.items():
+        per_frame = [sum(v) for v in zip(*(timer.samples[p] for p in phases))]
+        out[group] = {
+            'mean_us': round(sum(per_frame) / frames / 1000, 2),
+            'p50_us': round(percentile(per_frame, 50) / 1000, 2),
+            'p99_us': round(percentile(per_frame, 99) / 1000, 2),
+            'share': round(sum(per_frame) / total, 4),
+        }
+    return out
+
+
+def run_bench(argv):
+    """`start.py bench`: run the benchmark scenarios headlessly and print a JSON report."""
+    import json
+    import platform
+    try:
+        import tracemalloc
+    except Exception:
+        tracemalloc = None
+    bench_parser = argparse.ArgumentParser(prog='start.py bench', description='Headless benchmark scenarios')
+    bench_parser.add_argument('--scenario', action='append', choices=sorted(BENCH_SCENARIOS),
+                              help='Scenario to run (repeatable; default: all)')
+    bench_parser.add_argument('--frames', type=int, default=600, help='Measured frames per scenario')
+    bench_parser.add_argument('--warmup', type=int, default=30, help='Frames run before measuring')
+    bench_parser.add_argument('--alloc-frames', type=int, default=200,
+                              help='Frames of the separate tracemalloc pass (0 to skip)')
+    bench_parser.add_argument('--out', metavar='PATH', help='Write the JSON report to PATH instead of stdout')
+    opts = bench_parser.parse_args(argv)
+
+    base = state.snapshot()
+    report = {
+        'format': 'bvb-bench',
+        'version': 1,
+        'game_version': GAME_VERSION,
+        'python': platform.python_version(),
+        'seed': game_seed,
+        'config': args.config,
+        'max_entities': MAX_ENTITIES,
+        'bird_vector': vector_birds_enabled(),
+        'scenarios': {},
+    }
+    for name in opts.scenario or list(BENCH_SCENARIOS):
+        timer, out_bytes, engine = _bench_run(base, name, max(1, opts.frames), max(0, opts.warmup))
+        frames = len(timer) or 1
+        seconds = sum(timer.totals) / 1e9
+        result = {
+            'description': BENCH_SCENARIOS[name][0],
+            'frames': len(timer),
+            'seconds': round(seconds, 4),
+            'fps': round(frames / seconds, 1) if seconds > 0 else 0.0,
+            'frame_us': {
+                'mean': round(sum(timer.totals) / frames / 1000, 2),
+                'p50': round(percentile(timer.totals, 50) / 1000, 2),
+                'p99': round(percentile(timer.totals, 99) / 1000, 2),
+                'max': round(max(timer.totals, default=0) / 1000, 2),
+            },
+            'bytes_per_frame': round(out_bytes / frames, 1),
+            'subsystems': _bench_subsystems(timer),
+            'phases': timer.summary(),
+            'spawn_queue': spawn_queue.stats(),
+            'final': engine.snapshot(),
+        }
+        # tracemalloc slows everything down, so allocations are measured in a
+        # second, untimed pass over the same scenario
+        if tracemalloc is not None and opts.alloc_frames > 0:
+            tracemalloc.start()
+            try:
+                atimer, _, _ = _bench_run(base, name, opts.alloc_frames, max(0, opts.warmup), track_alloc=True)
+            finally:
+                tracemalloc.stop()
+            aframes = len(atimer) or 1
+            allocs = {p: sum(q) / aframes for p, q in atimer.allocs.items()}
+            result['alloc_bytes_per_frame'] = round(sum(allocs.values()))
+            for group, phases in BENCH_SUBSYSTEMS.items():
+                result['subsystems'][group]['alloc_bytes'] = round(sum(allocs[p] for p in phases))
+            for p, v in allocs.items():
+                result['phases'][p]['alloc_bytes'] = round(v)
+        report['scenarios'][name] = result
+        print(f"{name}: {result['fps']:.0f} fps, p50 {result['frame_us']['p50']:.0f} us, "
+              f"p99 {result['frame_us']['p99']:.0f} us, {result['bytes_per_frame']:.0f} B/frame",
+              file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if opts.out:
+        with open(opts.out, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+# Bot policies for `start.py simulate`: name -> factory(seed) returning a
+# policy(engine) -> list of keys for the next frame. Plugged-in bots use the
+# same shape ('package.module:factory' or 'path/to/bot.py:factory') and read
+# the game through engine.world.
+def _bot_idle(seed):
+    return lambda engine: []
+
+
+def _bot_autopilot(seed, attention=1.0):
+    """Chase the lowest falling bird one cursor step per frame and bounce it.
+
+    With nothing falling low, rising birds under the cursor use their power.
+    `attention` < 1 skips that share of the frames (seeded, so runs repeat).
+    """
+    draw = random.Random(seed).random
+
+    def policy(engine):
+        if attention < 1.0 and draw() >= attention:
+            return []
+        best = -1
+        for i in range(NUM_BALLS):
+            if not ball_lost[i] and ball_vy[i] == 1 and (best < 0 or ball_y[i] > ball_y[best]):
+                best = i
+        if best >= 0 and (ball_y[best] >= HEIGHT // 2 or random_lanes[best] == state.player_lane):
+            lane = random_lanes[best]
+            if lane < state.player_lane:
+                return [KEY_MOVE_LEFT]
+            if lane > state.player_lane:
+                return [KEY_MOVE_RIGHT]
+            return [KEY_MOVE_UP]
+        here = lane_bird(state.player_lane)
+        if here >= 0 and not ball_lost[here] and ball_vy[here] == -1 and not bird_power_used[here]:
+            return [KEY_MOVE_UP]
+        return []
+    return policy
+
+
+SIM_BOTS = {
+    'idle': _bot_idle,
+    'autopilot': _bot_autopilot,
+    'casual': lambda seed: _bot_autopilot(seed, attention=0.6),
+}
+
+
+def load_bot(spec):
+    """Bot factory for a SIM_BOTS name, 'module:factory' or 'file.py:factory' (factory defaults to make_bot)."""
+    if spec in SIM_BOTS:
+        return SIM_BOTS[spec]
+    import importlib
+    import importlib.util
+    module_name, _, attr = spec.partition(':')
+    if module_name.endswith('.py'):
+        mod_spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0],
+                                                          module_name)
+        module = importlib.util.module_from_spec(mod_spec)
+        mod_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, attr or 'make_bot')
+
+
+# Untouched start state every simulated game is copied from (taken on first use)
+_sim_base = None
+
+
+def simulate_game(seed, bot='autopilot', max_frames=20000):
+    """Play one headless game with `seed` and the `bot` policy; returns its stats.
+
+    Entry point of the `simulate` worker processes.
+    """
+    global _sim_base
+    if _sim_base is None:
+        _sim_base = state.snapshot()
+    new_run(_sim_base, seed)
+    engine = GameEngine()
+    policy = load_bot(bot)(seed)
+    eggs = {}
+    while not engine.game_over and engine.frame < max_frames:
+        for ev in engine.step(policy(engine)):
+            if ev['type'] == 'loot' and str(ev['loot']).endswith('_egg'):
+                rarity = ev.get('rarity') or 'unknown'
+                eggs[rarity] = eggs.get(rarity, 0) + 1
+    return {
+        'seed': seed,
+        'score': int(state.score),
+        'level': state.level,
+        'frames': state.frame_count,
+        'seconds': round(state.sim_time, 3),
+        'game_over': bool(state.game_over),
+        'eggs': eggs,
+        'bats': {k: v for k, v in bat_destroy_counters.items() if k != 'total'},
+        'spawn_throttled': spawn_queue.throttled,
+        'achievements': sum(1 for a in achievements.values() if a.get('unlocked')),
+    }
+
+
+def _sim_distribution(values):
+    import statistics
+    values = list(values)
+    if not values:
+        return {}
+    return {
+        'mean': round(statistics.fmean(values), 2),
+        'stdev': round(statistics.pstdev(values), 2),
+        'min': min(values),
+        'p10': percentile(values, 10),
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'max': max(values),
+    }
+
+
+def _sim_counts(rows, games):
+    totals = {}
+    for row in rows:
+        for k, v in row.items():
+            totals[k] = totals.get(k, 0) + v
+    return {k: {'total': v, 'per_game': round(v / games, 3)} for k, v in sorted(totals.items())}
+
+
+def run_simulate(argv):
+    """`start.py simulate`: play many headless games on a process pool and print a JSON report."""
+    import json
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    sim_parser = argparse.ArgumentParser(prog='start.py simulate', description='Monte Carlo balance simulation')
+    sim_parser.add_argument('--games', type=int, default=200, help='Number of games (seeds --seed .. --seed+N-1)')
+    sim_parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes (1 = in-process)')
+    sim_parser.add_argument('--bot', default='autopilot',
+                            help=f"Bot policy: {', '.join(SIM_BOTS)} or module:factory / file.py:factory")
+    sim_parser.add_argument('--max-frames', type=int, default=20000, help='Stop a game after this many frames')
+    sim_parser.add_argument('--per-game', action='store_true', help='Include every game in the report')
+    sim_parser.add_argument('--out', metavar='PATH', help='Write the JSON report to PATH instead of stdout')
+    opts = sim_parser.parse_args(argv)
+    try:
+        load_bot(opts.bot)
+    except Exception as e:
+        sim_parser.error(f'cannot load bot {opts.bot!r}: {e}')
+
+    games = max(1, opts.games)
+    jobs = max(1, min(opts.jobs, games))
+    seeds = [game_seed + i for i in range(games)]
+    play = partial(simulate_game, bot=opts.bot, max_frames=max(1, opts.max_frames))
+    t0 = time.perf_counter()
+    results = []
+    step = max(1, games // 10)
+    if jobs == 1:
+        outcomes = map(play, seeds)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        outcomes = pool.map(play, seeds, chunksize=max(1, games // (jobs * 8)))
+    try:
+        for res in outcomes:
+            results.append(res)
+            if len(results) % step == 0:
+                print(f"simulate: {len(results)}/{games} games", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    wall = time.perf_counter() - t0
+
+    levels = {}
+    for r in results:
+        levels[r['level']] = levels.get(r['level'], 0) + 1
+    report = {
+        'format': 'bvb-simulate',
+        'version': 1,
+        'game_version': GAME_VERSION,
+        'config': args.config,
+        'bot': opts.bot,
+        'games': games,
+        'seeds': [seeds[0], seeds[-1]],
+        'max_frames': opts.max_frames,
+        'capped': sum(1 for r in results if not r['game_over']),
+        'jobs': jobs,
+        'wall_seconds': round(wall, 2),
+        'score': _sim_distribution(r['score'] for r in results),
+        'level': _sim_distribution(r['level'] for r in results),
+        'level_histogram': {str(k): v for k, v in sorted(levels.items())},
+        'seconds_survived': _sim_distribution(r['seconds'] for r in results),
+        'frames': _sim_distribution(r['frames'] for r in results),
+        'eggs_by_rarity': _sim_counts((r['eggs'] for r in results), games),
+        'bats_by_tier': _sim_counts((r['bats'] for r in results), games),
+        'achievements': _sim_distribution(r['achievements'] for r in results),
+        'spawn_throttled_frames': _sim_distribution(r['spawn_throttled'] for r in results),
+    }
+    if opts.per_game:
+        report['per_game'] = results
+    print(f"simulate: {games} games in {wall:.1f} s on {jobs} process(es), score p50 {report['score']['p50']}, "
+          f"level p50 {report['level']['p50']}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if opts.out:
+        with open(opts.out, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+def main():
+    global game_start_time, frame_scheduler, input_reader, phase_timer
+    recorder = None
     try:
-        import traceback as _tb
-        trace = _tb.format_exc()
+        setup()
+        init_achievements()
+        # Track start time for the play session (used for reporting total play time)
+        try:
+            game_start_time = time.time()
+        except Exception:
+            game_start_time = None
+        # Initialize Firebase client (best-effort)
         try:
             if firebase_client:
-                firebase_client.report_crash(trace)
+                try:
+                    # init synchronously (fast local file read); defer network calls
+                    try:
+                        firebase_client.init_from_env()
+                    except Exception:
+                        # initialization failed - continue without remote
+                        raise
+                    # network calls run on the telemetry worker to avoid blocking startup
+                    try:
+                        firebase_client.enqueue_call(firebase_client.sign_in_anonymous)
+                    except Exception:
+                        pass
+                    try:
+                        firebase_client.enqueue_event('session_start', {'client': 'terminal'})
+                    except Exception:
+                        pass
+                    # Inform player (best-effort)
+                    try:
+                        add_notification('Firebase: enabled')
+                    except Exception:
+                        pass
+                except Exception:
+                    # don't fail startup on network/auth issues
+                    try:
+                        add_notification('Firebase: disabled')
+                    except Exception:
+                        pass
         except Exception:
             pass
-    except Exception:
-        pass
-    raise
-finally:
-    cleanup()
+        # Music engine support removed from this file.
+        # No music engine will be started from the game process.
+
+        engine = GameEngine(telemetry=True)
+        if args.profile or PROFILE_ENABLED:
+            phase_timer = PhaseTimer(FRAME_PHASES, history=PROFILE_HISTORY, window=PROFILE_WINDOW)
+        if args.record:
+            recorder = replay.ReplayWriter(args.record, {
+                'seed': game_seed,
+                'config': args.config,
+                'game_version': GAME_VERSION,
+            })
+
+        # Cell-buffer renderer sized to the game box plus header/footer rows.
+        # Header and footer text is wider than WIDTH, so use the terminal width.
+        try:
+            _term_cols = shutil.get_terminal_size((80, 24)).columns
+        except Exception:
+            _term_cols = 80
+        # (one more row for the perf overlay when profiling)
+        screen = Screen(max(WIDTH, _term_cols), HEIGHT + (6 if phase_timer.enabled else 5))
+
+        # Ticks run on perf_counter deadlines spaced by engine.frame_seconds;
+        # when behind, several ticks run before the next render.
+        frame_scheduler = FrameScheduler(max_catchup_steps, max_render_fps)
+        # Keys are read on a thread as they arrive (a get_key() poll on Windows)
+        if os.name == 'nt':
+            input_reader = PollingReader(get_key)
+        else:
+            input_reader = InputReader(sys.stdin.fileno())
+        input_reader.start()
+        phase_timer.watch('key>draw', input_reader.latency.hist)
+        pending_keys = []
+        # arrival times of pending_keys, and of keys ticked but not drawn yet
+        pending_key_times = []
+        undrawn_key_times = []
+        needs_render = True
+        quit_requested = False
+
+        while True:
+            # Handle input: every key read since the last pass, in order, goes
+            # to the next tick
+            phase_timer.begin()
+            for ev in input_reader.drain():
+                pending_keys.append(ev.key)
+                pending_key_times.append(ev.t)
+            phase_timer.lap('input')
+            worked = False
+
+            frame_scheduler.begin()
+            while frame_scheduler.step_due(engine.frame_seconds):
+                if recorder:
+                    recorder.record(pending_keys)
+                events = engine.step(pending_keys)
+                pending_keys = []
+                undrawn_key_times += pending_key_times
+                pending_key_times = []
+                frame_scheduler.advance(engine.frame_seconds)
+                needs_render = True
+                worked = True
+                if engine.game_over or any(ev['type'] == 'quit' for ev in events):
+                    quit_requested = not engine.game_over
+                    break
+            if quit_requested:
+                break
+
+            if needs_render and (engine.game_over or frame_scheduler.render_due()):
+                render_frame(screen)
+                phase_timer.lap('render')
 
+                # Write only the changed runs - handle blocking errors gracefully
+                output = screen.flush()
+                try:
+                    if output:
+                        sys.stdout.write(output)
+                        sys.stdout.flush()
+                except BlockingIOError:
+                    # If output buffer is full the terminal may hold a partial frame:
+                    # repaint everything next time
+                    screen.invalidate()
+                phase_timer.lap('write')
+                if undrawn_key_times:
+                    drawn = time.perf_counter()
+                    for t in undrawn_key_times:
+                        input_reader.latency.add(drawn - t)
+                    undrawn_key_times = []
+                frame_scheduler.rendered()
+                needs_render = False
+                worked = True
+            # Loop passes that neither ticked nor drew are not frames
+            if worked:
+                phase_timer.end(state.frame_count)
+
+            # Check if game over
+            if engine.game_over:
+                # the summary screen reads stdin itself
+                input_reader.stop()
+                show_game_over_screen()
+                break
+
+            frame_scheduler.wait(needs_render)
+
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        # Report unexpected crashes to Firebase (best-effort) and re-raise for visibility
+        try:
+            import traceback as _tb
+            trace = _tb.format_exc()
+            try:
+                if firebase_client:
+                    firebase_client.report_crash(trace)
+            except Exception:
+                pass
+        except Exception:
+            pass
+        raise
+    finally:
+        if input_reader is not None:
+            input_reader.stop()
+        if recorder:
+            try:
+                recorder.close({'frames': state.frame_count, 'ticks': recorder.ticks,
+                                'score': int(state.score), 'digest': state.digest()})
+            except Exception:
+                pass
+        cleanup()
+
+
+if __name__ == '__main__':
+    if args.replay:
+        sys.exit(run_replay(args.replay))
+    if _rest[:1] == ['bench']:
+        sys.exit(run_bench(_rest[1:]))
+    if _rest[:1] == ['simulate']:
+        # packaged (PyInstaller) builds start pool workers through this entry point
+        import multiprocessing
+        multiprocessing.freeze_support()
+        sys.exit(run_simulate(_rest[1:]))
+    main()
@@ -0,0 +1,23 @@
+# Shared fixtures: start.py parses sys.argv at import, so it is imported with
+# an empty command line patched in for the import only.
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def start():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys, 'argv', sys.argv[:1])
+        mp.syspath_prepend(ROOT)
+        return importlib.import_module('start')
+
+
+@pytest.fixture(scope='session')
+def base_state(start):
+    """The run state as built at import; tests bind copies, so it is never stepped."""
+    return start.state.snapshot()
@@ -0,0 +1,27 @@
+# GameEngine.step(): every key of a tick reaches the simulation.
+import pytest
+
+
+@pytest.fixture
+def eng(start, base_state):
+    start.bind_state(base_state.snapshot())
+    return start.GameEngine()
+
+
+def test_up_is_held_when_another_key_follows_it(start, eng):
+    before = start.state.up_hold_counter
+    eng.step([start.KEY_MOVE_UP, start.KEY_MOVE_LEFT])
+    assert start.state.up_hold_counter == before + 1
+    assert start.state.up_miss_counter == 0
+
+
+def test_tick_without_up_counts_a_miss(start, eng):
+    before = start.state.up_miss_counter
+    eng.step([start.KEY_MOVE_LEFT])
+    assert start.state.up_miss_counter == before + 1
+
+
+def test_keys_are_processed_in_order(start, eng):
+    lane = start.state.player_lane
+    eng.step([start.KEY_MOVE_LEFT, start.KEY_MOVE_RIGHT, start.KEY_MOVE_RIGHT])
+    assert start.state.player_lane == min(start.MAX_LANE_INDEX, max(start.MIN_LANE_INDEX, lane - 1) + 2)
@@ -0,0 +1,80 @@
+# Prestige cache: XP awards that cannot change a bird's grade must not throw
+# the cached grade part away; a grade crossing must.
+import pytest
+
+
+@pytest.fixture
+def game(start, base_state, monkeypatch):
+    st = base_state.snapshot()
+    start.bind_state(st)
+    rebuilds = []
+    real = start.GameState._rebuild_prestige
+
+    def counting(self):
+        rebuilds.append(self.roster_version)
+        return real(self)
+
+    monkeypatch.setattr(start.GameState, '_rebuild_prestige', counting)
+    return st, rebuilds
+
+
+def _award(st, bird, times=50):
+    for _ in range(times):
+        st.add_score(10, by_bird=bird)
+
+
+def _crossings(start, xp, step, times):
+    """Grade boundaries crossed by `times` awards of `step` XP from `xp`."""
+    hi = start.grade_band(xp)[2]
+    n = 0
+    for _ in range(times):
+        xp += step
+        if xp >= hi:
+            n += 1
+            hi = start.grade_band(xp)[2]
+    return n
+
+
+def test_normal_bird_rebuilds_only_on_grade_change(start, game):
+    st, rebuilds = game
+    st.set_color(0, start.PATCHWORK)
+    st.per_bird_xp[0] = 0
+    st.compute_prestige()
+    rebuilds.clear()
+    _award(st, 0)
+    # the cache is rebuilt lazily, on the first prestige lookup after a crossing
+    st.compute_prestige()
+    expected = _crossings(start, 0, 10, 50)
+    assert expected > 0
+    assert len(rebuilds) == expected
+
+
+def test_roster_change_rebuilds(start, game):
+    st, rebuilds = game
+    st.compute_prestige()
+    rebuilds.clear()
+    st.set_lost(1, True)
+    st.compute_prestige()
+    st.set_color(2, start.GLITCH)
+    st.compute_prestige()
+    st.compute_prestige()
+    assert len(rebuilds) == 2
+
+
+def test_glitch_bird_does_not_rebuild(start, game):
+    st, rebuilds = game
+    st.set_color(0, start.GLITCH)
+    st.compute_prestige()
+    rebuilds.clear()
+    _award(st, 0)
+    assert rebuilds == []
+
+
+def test_top_grade_bird_does_not_rebuild(start, game):
+    st, rebuilds = game
+    st.set_color(0, start.PATCHWORK)
+    st.per_bird_xp[0] = 10 ** 9
+    st.compute_prestige()
+    rebuilds.clear()
+    _award(st, 0)
+    assert rebuilds == []